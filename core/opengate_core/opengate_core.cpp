@@ -362,6 +362,8 @@ void init_GateVDigitizerWithOutputActor(py::module &);
 
 void init_GateHitsCollectionActor(py::module &);
 
+void init_GateStepRecordActor(py::module &);
+
 void init_GateHitsAdderActor(py::module &);
 
 void init_GateDigitizerReadoutActor(py::module &m);
@@ -382,6 +384,8 @@ void init_GateDigiAttributeManager(py::module &m);
 
 void init_GateVDigiAttribute(py::module &m);
 
+void init_GateDigiCollection(py::module &m);
+
 void init_GateUniqueVolumeIDManager(py::module &);
 
 void init_GateUniqueVolumeID(py::module &);
@@ -617,9 +621,11 @@ PYBIND11_MODULE(opengate_core, m) {
 
   init_GatePhaseSpaceActor(m);
   init_GateHitsCollectionActor(m);
+  init_GateStepRecordActor(m);
   init_GateVDigitizerWithOutputActor(m);
   init_GateDigiAttributeManager(m);
   init_GateVDigiAttribute(m);
+  init_GateDigiCollection(m);
   init_GateHitsAdderActor(m);
   init_GateDigitizerReadoutActor(m);
   init_GateDigitizerBlurringActor(m);
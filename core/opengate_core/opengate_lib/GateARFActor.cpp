@@ -40,18 +40,42 @@ void GateARFActor::EndOfRunAction(const G4Run * /*run*/) {
   // When the run ends, we send the current remaining hits to the ARF
   if (l.fCurrentNumberOfHits > 0) {
     fApply(this);
-    l.fEnergy.clear();
-    l.fPositionX.clear();
-    l.fPositionY.clear();
-    // l.fPositionZ.clear();
-    l.fDirectionX.clear();
-    l.fDirectionY.clear();
-    l.fDirectionZ.clear();
-    l.fWeights.clear();
-    l.fCurrentNumberOfHits = 0;
+    ClearBatch();
   }
 }
 
+void GateARFActor::ClearBatch() {
+  auto &l = fThreadLocalData.Get();
+  // (the vectors may have been moved out by TakeBatch)
+  l.fEnergy.clear();
+  l.fPositionX.clear();
+  l.fPositionY.clear();
+  // l.fPositionZ.clear();
+  l.fDirectionX.clear();
+  l.fDirectionY.clear();
+  l.fDirectionZ.clear();
+  l.fWeights.clear();
+  l.fCurrentNumberOfHits = 0;
+}
+
+std::map<std::string, std::vector<double>> GateARFActor::TakeBatch() {
+  auto &l = fThreadLocalData.Get();
+  std::map<std::string, std::vector<double>> batch;
+  batch["Energy"] = std::move(l.fEnergy);
+  batch["PositionX"] = std::move(l.fPositionX);
+  batch["PositionY"] = std::move(l.fPositionY);
+  batch["DirectionX"] = std::move(l.fDirectionX);
+  batch["DirectionY"] = std::move(l.fDirectionY);
+  batch["DirectionZ"] = std::move(l.fDirectionZ);
+  batch["Weights"] = std::move(l.fWeights);
+  ClearBatch();
+  // the next batch is allocated once
+  for (auto *v : {&l.fEnergy, &l.fPositionX, &l.fPositionY, &l.fDirectionX,
+                  &l.fDirectionY, &l.fDirectionZ, &l.fWeights})
+    v->reserve(fBatchSize);
+  return batch;
+}
+
 void GateARFActor::PreUserTrackingAction(const G4Track *track) {
   GateVActor::PostUserTrackingAction(track);
   auto &l = fThreadLocalData.Get();
@@ -99,15 +123,7 @@ void GateARFActor::SteppingAction(G4Step *step) {
   // trigger the "apply" (ARF) if the number of hits in the batch is reached
   if (l.fCurrentNumberOfHits >= fBatchSize) {
     fApply(this);
-    l.fEnergy.clear();
-    l.fPositionX.clear();
-    l.fPositionY.clear();
-    // l.fPositionZ.clear();
-    l.fDirectionX.clear();
-    l.fDirectionY.clear();
-    l.fDirectionZ.clear();
-    l.fWeights.clear();
-    l.fCurrentNumberOfHits = 0;
+    ClearBatch();
   }
 
   l.fIsFirstInteraction = false;
@@ -10,7 +10,10 @@
 
 #include "GateHelpers.h"
 #include "GateVActor.h"
+#include <map>
 #include <pybind11/stl.h>
+#include <string>
+#include <vector>
 
 namespace py = pybind11;
 
@@ -51,6 +54,10 @@ public:
 
   std::vector<double> GetWeights() const;
 
+  // Move the current batch of hits (thread local) out of the actor, without
+  // copy: name -> values. The actor then starts a new (empty) batch.
+  std::map<std::string, std::vector<double>> TakeBatch();
+
   // This main function is called every step in the attached volume
   void SteppingAction(G4Step *) override;
 
@@ -58,6 +65,8 @@ public:
   void SetARFFunction(ARFFunctionType &f);
 
 protected:
+  void ClearBatch();
+
   int fBatchSize;
   ARFFunctionType fApply;
   bool fKeepNegativeSide;
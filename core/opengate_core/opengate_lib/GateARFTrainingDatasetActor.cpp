@@ -44,6 +44,7 @@ void GateARFTrainingDatasetActor::StartSimulationAction() {
   } else {
     outputPath = GetOutputPath(fOutputNameRoot);
   }
+  fHits->SetOutputFormat(GetOutputFormat(fOutputNameRoot));
   fHits->SetFilenameAndInitRoot(outputPath);
   // create the attributes
   auto *att_e = new GateTDigiAttribute<double>("E");
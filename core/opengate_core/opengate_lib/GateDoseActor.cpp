@@ -18,6 +18,7 @@
 #include "GateHelpersDict.h"
 #include "GateHelpersImage.h"
 
+#include <algorithm>
 #include <cmath>
 #include <iostream>
 #include <itkAddImageFilter.h>
@@ -41,6 +42,11 @@ GateDoseActor::GateDoseActor(py::dict &user_info)
   fNbEventsNextCheck = 0;
   fGoalUncertainty = 0.0;
   fNbOfEvent = 0;
+  fWallClockTimeBudget = 0.0;
+  fNumberOfEventsBudget = 0;
+  fLastMeanUncertainty = 1.0;
+  fRunTerminationReason = kNotTerminated;
+  fUncertaintyMaxEdep = 0.0;
 }
 
 void GateDoseActor::InitializeUserInfo(py::dict &user_info) {
@@ -51,6 +57,10 @@ void GateDoseActor::InitializeUserInfo(py::dict &user_info) {
   fTranslation = DictGetG4ThreeVector(user_info, "translation");
   // Hit type (random, pre, post, etc)
   fHitType = DictGetStr(user_info, "hit_type");
+  // Thread local buffers
+  fThreadLocalBuffersFlag = DictGetBool(user_info, "thread_local_buffers");
+  fThreadLocalFlushInterval =
+      DictGetInt(user_info, "thread_local_flush_interval");
 }
 
 void GateDoseActor::InitializeCpp() {
@@ -92,6 +102,18 @@ void GateDoseActor::BeginOfRunActionMasterThread(int run_id) {
   Image3DType::RegionType region = cpp_edep_image->GetLargestPossibleRegion();
   size_edep = region.GetSize();
 
+  // Reset the sparse uncertainty evaluation and the budgets (per run)
+  fRunStartTime = std::chrono::steady_clock::now();
+  fRunTerminationReason = kNotTerminated;
+  fLastMeanUncertainty = 1.0;
+  fUncertaintyMaxEdep = 0.0;
+  fUncertaintyVoxels.clear();
+  fUncertaintyTouchedIndices.clear();
+  if (fUncertaintyGoal > 0) {
+    const auto N_voxels = size_edep[0] * size_edep[1] * size_edep[2];
+    fUncertaintyTouchedFlags.assign(N_voxels, 0);
+  }
+
   if (fEdepSquaredFlag) {
     AttachImageToVolume<Image3DType>(cpp_edep_squared_image,
                                      fPhysicalVolumeName, fTranslation);
@@ -110,14 +132,41 @@ void GateDoseActor::BeginOfRunActionMasterThread(int run_id) {
   }
 }
 
-void GateDoseActor::PrepareLocalDataForRun(threadLocalT &data,
-                                           const unsigned int numberOfVoxels) {
+void GateDoseActor::PrepareLocalDataForRun(
+    threadLocalT &data, const unsigned int numberOfVoxels) const {
   data.squared_worker_flatimg.resize(numberOfVoxels);
   std::fill(data.squared_worker_flatimg.begin(),
             data.squared_worker_flatimg.end(), 0.0);
   data.lastid_worker_flatimg.resize(numberOfVoxels);
   std::fill(data.lastid_worker_flatimg.begin(),
             data.lastid_worker_flatimg.end(), 0);
+  data.pending_worker_flatimg.assign(numberOfVoxels, 0);
+  data.pending_indices.clear();
+  if (fThreadLocalBuffersFlag && fThreadLocalBuffersMaxVoxels == 0) {
+    data.squared_sum_worker_flatimg.resize(numberOfVoxels);
+    std::fill(data.squared_sum_worker_flatimg.begin(),
+              data.squared_sum_worker_flatimg.end(), 0.0);
+  }
+}
+
+void GateDoseActor::PrepareLocalBuffersForRun(
+    threadLocalBuffersT &buffers, const unsigned int numberOfVoxels) const {
+  buffers.nb_of_events_since_flush = 0;
+  if (fThreadLocalBuffersMaxVoxels > 0) {
+    // sparse buffers: no image-sized allocation
+    buffers.sparse_voxels.clear();
+    buffers.sparse_voxels.reserve(fThreadLocalBuffersMaxVoxels);
+    return;
+  }
+  buffers.edep_worker_flatimg.assign(numberOfVoxels, 0.0);
+  if (fDoseFlag) {
+    buffers.dose_worker_flatimg.assign(numberOfVoxels, 0.0);
+  }
+  if (fCountsFlag) {
+    buffers.counts_worker_flatimg.assign(numberOfVoxels, 0.0);
+  }
+  buffers.touched_worker_flatimg.assign(numberOfVoxels, 0);
+  buffers.touched_indices.clear();
 }
 
 void GateDoseActor::BeginOfRunAction(const G4Run *run) {
@@ -128,6 +177,9 @@ void GateDoseActor::BeginOfRunAction(const G4Run *run) {
   if (fDoseSquaredFlag) {
     PrepareLocalDataForRun(fThreadLocalDataDose.Get(), N_voxels);
   }
+  if (fThreadLocalBuffersFlag) {
+    PrepareLocalBuffersForRun(fThreadLocalBuffers.Get(), N_voxels);
+  }
 }
 
 void GateDoseActor::BeginOfEventAction(const G4Event *event) {
@@ -228,10 +280,39 @@ void GateDoseActor::SteppingAction(G4Step *step) {
       dose = edep / density;
     }
 
-    // all ImageAddValue calls in a mutex-scope
-    {
+    if (fThreadLocalBuffersFlag) {
+      // no lock: the buffers are reduced into the images at the end of run
+      auto &buffers = fThreadLocalBuffers.Get();
+      const int index_flat = sub2ind(index);
+      if (fThreadLocalBuffersMaxVoxels > 0) {
+        auto &sums = GetSparseVoxelSums(buffers, index_flat);
+        sums.edep += edep;
+        if (fDoseFlag) {
+          sums.dose += dose;
+        }
+        if (fCountsFlag) {
+          sums.counts += 1;
+        }
+      } else {
+        if (buffers.touched_worker_flatimg[index_flat] == 0) {
+          buffers.touched_worker_flatimg[index_flat] = 1;
+          buffers.touched_indices.push_back(index_flat);
+        }
+        buffers.edep_worker_flatimg[index_flat] += edep;
+        if (fDoseFlag) {
+          buffers.dose_worker_flatimg[index_flat] += dose;
+        }
+        if (fCountsFlag) {
+          buffers.counts_worker_flatimg[index_flat] += 1;
+        }
+      }
+    } else {
+      // all ImageAddValue calls in a mutex-scope
       G4AutoLock mutex(&SetPixelMutex);
       ImageAddValue<Image3DType>(cpp_edep_image, index, edep);
+      if (fUncertaintyGoal > 0) {
+        MarkVoxelForUncertainty(sub2ind(index));
+      }
       if (fDoseFlag) {
         ImageAddValue<Image3DType>(cpp_dose_image, index, dose);
       }
@@ -241,6 +322,7 @@ void GateDoseActor::SteppingAction(G4Step *step) {
     } // mutex scope
 
     // ScoreSquaredValue() is thread-safe because it contains a mutex
+    // (or only writes in thread local data)
     if (fEdepSquaredFlag || fDoseSquaredFlag) {
       if (fEdepSquaredFlag) {
         ScoreSquaredValue(fThreadLocalDataEdep.Get(), cpp_edep_squared_image,
@@ -255,6 +337,20 @@ void GateDoseActor::SteppingAction(G4Step *step) {
 }
 
 void GateDoseActor::EndOfEventAction(const G4Event *event) {
+  // periodic reduction of the thread local buffers
+  if (fThreadLocalBuffersFlag && fThreadLocalFlushInterval > 0) {
+    auto &buffers = fThreadLocalBuffers.Get();
+    buffers.nb_of_events_since_flush++;
+    if (buffers.nb_of_events_since_flush >= fThreadLocalFlushInterval) {
+      ReduceThreadLocalBuffers();
+    }
+  }
+
+  // stop the run if the budgets are exhausted
+  if (fNumberOfEventsBudget > 0 || fWallClockTimeBudget > 0) {
+    CheckRunTermination();
+  }
+
   // if the user didn't set an uncertainty goal, do nothing
   if (fUncertaintyGoal == 0) {
     return;
@@ -278,7 +374,7 @@ void GateDoseActor::EndOfEventAction(const G4Event *event) {
       // check stop criteria
       double UncCurrent = ComputeMeanUncertainty();
       if (UncCurrent <= fUncertaintyGoal) {
-        GateSourceManager::SetRunTerminationFlag(true);
+        SetRunTerminationReason(kUncertaintyGoal);
       } else {
         // estimate nb of events at which the next check should occur
         fNbEventsNextCheck = static_cast<int>((UncCurrent / fUncertaintyGoal) *
@@ -289,10 +385,56 @@ void GateDoseActor::EndOfEventAction(const G4Event *event) {
   }
 }
 
+void GateDoseActor::CheckRunTermination() {
+  if (fNumberOfEventsBudget > 0 && fNbOfEvent >= fNumberOfEventsBudget) {
+    SetRunTerminationReason(kNumberOfEventsBudget);
+    return;
+  }
+  if (fWallClockTimeBudget > 0) {
+    const std::chrono::duration<double> elapsed =
+        std::chrono::steady_clock::now() - fRunStartTime;
+    if (elapsed.count() * CLHEP::s >= fWallClockTimeBudget) {
+      SetRunTerminationReason(kWallClockTimeBudget);
+    }
+  }
+}
+
+void GateDoseActor::SetRunTerminationReason(const RunTerminationReason reason) {
+  // (called by the worker threads, the first reason wins)
+  int expected = kNotTerminated;
+  fRunTerminationReason.compare_exchange_strong(expected, reason);
+  GateSourceManager::SetRunTerminationFlag(true);
+}
+
+std::string GateDoseActor::GetRunTerminationReason() const {
+  switch (fRunTerminationReason.load()) {
+  case kUncertaintyGoal:
+    return "uncertainty_goal";
+  case kNumberOfEventsBudget:
+    return "number_of_events_budget";
+  case kWallClockTimeBudget:
+    return "wall_clock_time_budget";
+  default:
+    return "";
+  }
+}
+
+void GateDoseActor::MarkVoxelForUncertainty(const int index_flat) {
+  if (fUncertaintyTouchedFlags[index_flat] == 0) {
+    fUncertaintyTouchedFlags[index_flat] = 1;
+    fUncertaintyTouchedIndices.push_back(index_flat);
+  }
+}
+
+void GateDoseActor::MarkVoxelForUncertaintyWithLock(const int index_flat) {
+  G4AutoLock mutex(&SetPixelMutex);
+  MarkVoxelForUncertainty(index_flat);
+}
+
 double GateDoseActor::ComputeMeanUncertainty() {
   G4AutoLock mutex(&ComputeUncertaintyMutex);
-  itk::ImageRegionIterator<Image3DType> edep_iterator3D(
-      cpp_edep_image, cpp_edep_image->GetLargestPossibleRegion());
+  // the images and the list of touched voxels are modified under this lock
+  G4AutoLock mutex_pixel(&SetPixelMutex);
   double mean_unc = 0.0;
   int n_voxel_unc = 0;
   double n = 2.0;
@@ -301,14 +443,37 @@ double GateDoseActor::ComputeMeanUncertainty() {
   if (n < 2.0) {
     n = 2.0;
   }
-  double max_edep = GetMaxValueOfImage(cpp_edep_image);
 
-  for (edep_iterator3D.GoToBegin(); !edep_iterator3D.IsAtEnd();
-       ++edep_iterator3D) {
-    Image3DType::IndexType index_f = edep_iterator3D.GetIndex();
+  // Only the voxels touched since the last evaluation may change the max
+  // or enter the set of voxels above the threshold
+  Image3DType::IndexType index_f;
+  for (const auto index_flat : fUncertaintyTouchedIndices) {
+    ind2sub(index_flat, index_f);
+    const double val = cpp_edep_image->GetPixel(index_f);
+    if (val > fUncertaintyMaxEdep) {
+      fUncertaintyMaxEdep = val;
+    }
+  }
+  const double threshold = fUncertaintyMaxEdep * fThreshEdepPerc;
+
+  // candidates = voxels previously above the threshold + touched voxels
+  std::vector<int> candidates;
+  candidates.swap(fUncertaintyVoxels);
+  for (const auto index_flat : fUncertaintyTouchedIndices) {
+    fUncertaintyTouchedFlags[index_flat] = 0;
+    candidates.push_back(index_flat);
+  }
+  fUncertaintyTouchedIndices.clear();
+  std::sort(candidates.begin(), candidates.end());
+  candidates.erase(std::unique(candidates.begin(), candidates.end()),
+                   candidates.end());
+
+  for (const auto index_flat : candidates) {
+    ind2sub(index_flat, index_f);
     double val = cpp_edep_image->GetPixel(index_f);
 
-    if (val > max_edep * fThreshEdepPerc) {
+    if (val > threshold) {
+      fUncertaintyVoxels.push_back(index_flat);
       val /= n;
       n_voxel_unc++;
       const double val_squared_mean =
@@ -337,6 +502,7 @@ double GateDoseActor::ComputeMeanUncertainty() {
   } else {
     mean_unc = 1.;
   }
+  fLastMeanUncertainty = mean_unc;
   return mean_unc;
 }
 
@@ -365,6 +531,120 @@ void GateDoseActor::EndOfRunAction(const G4Run *run) {
     GateDoseActor::FlushSquaredValues(fThreadLocalDataDose.Get(),
                                       cpp_dose_squared_image);
   }
+  // ReduceThreadLocalBuffers() is thread-safe because it contains a mutex
+  if (fThreadLocalBuffersFlag) {
+    ReduceThreadLocalBuffers();
+  }
+}
+
+void GateDoseActor::ReduceThreadLocalBuffers() {
+  auto &buffers = fThreadLocalBuffers.Get();
+  buffers.nb_of_events_since_flush = 0;
+  if (fThreadLocalBuffersMaxVoxels > 0) {
+    // sparse buffers: one single lock for all the stored voxels
+    {
+      G4AutoLock mutex(&SetPixelMutex);
+      Image3DType::IndexType index;
+      for (const auto &[index_flat, sums] : buffers.sparse_voxels) {
+        ind2sub(index_flat, index);
+        ImageAddValue<Image3DType>(cpp_edep_image, index, sums.edep);
+        if (fDoseFlag) {
+          ImageAddValue<Image3DType>(cpp_dose_image, index, sums.dose);
+        }
+        if (fCountsFlag) {
+          ImageAddValue<Image3DType>(cpp_counts_image, index, sums.counts);
+        }
+        if (fEdepSquaredFlag) {
+          ImageAddValue<Image3DType>(cpp_edep_squared_image, index,
+                                     sums.edep_squared);
+        }
+        if (fDoseSquaredFlag) {
+          ImageAddValue<Image3DType>(cpp_dose_squared_image, index,
+                                     sums.dose_squared);
+        }
+      }
+    } // mutex scope
+    buffers.sparse_voxels.clear();
+    return;
+  }
+  auto *edep_sq = fEdepSquaredFlag ? &fThreadLocalDataEdep.Get() : nullptr;
+  auto *dose_sq = fDoseSquaredFlag ? &fThreadLocalDataDose.Get() : nullptr;
+  // one single lock for all the voxels touched by this thread
+  {
+    G4AutoLock mutex(&SetPixelMutex);
+    Image3DType::IndexType index;
+    for (const auto index_flat : buffers.touched_indices) {
+      ind2sub(index_flat, index);
+      ImageAddValue<Image3DType>(cpp_edep_image, index,
+                                 buffers.edep_worker_flatimg[index_flat]);
+      if (fDoseFlag) {
+        ImageAddValue<Image3DType>(cpp_dose_image, index,
+                                   buffers.dose_worker_flatimg[index_flat]);
+      }
+      if (fCountsFlag) {
+        ImageAddValue<Image3DType>(cpp_counts_image, index,
+                                   buffers.counts_worker_flatimg[index_flat]);
+      }
+      if (edep_sq != nullptr) {
+        ImageAddValue<Image3DType>(
+            cpp_edep_squared_image, index,
+            edep_sq->squared_sum_worker_flatimg[index_flat]);
+      }
+      if (dose_sq != nullptr) {
+        ImageAddValue<Image3DType>(
+            cpp_dose_squared_image, index,
+            dose_sq->squared_sum_worker_flatimg[index_flat]);
+      }
+    }
+  } // mutex scope
+  // reset only the voxels that were touched
+  for (const auto index_flat : buffers.touched_indices) {
+    buffers.edep_worker_flatimg[index_flat] = 0.0;
+    if (fDoseFlag) {
+      buffers.dose_worker_flatimg[index_flat] = 0.0;
+    }
+    if (fCountsFlag) {
+      buffers.counts_worker_flatimg[index_flat] = 0.0;
+    }
+    if (edep_sq != nullptr) {
+      edep_sq->squared_sum_worker_flatimg[index_flat] = 0.0;
+    }
+    if (dose_sq != nullptr) {
+      dose_sq->squared_sum_worker_flatimg[index_flat] = 0.0;
+    }
+    buffers.touched_worker_flatimg[index_flat] = 0;
+  }
+  buffers.touched_indices.clear();
+}
+
+GateDoseActor::voxelSumsT &
+GateDoseActor::GetSparseVoxelSums(threadLocalBuffersT &buffers,
+                                  const int index_flat) {
+  if (buffers.sparse_voxels.size() >=
+          static_cast<size_t>(fThreadLocalBuffersMaxVoxels) &&
+      buffers.sparse_voxels.find(index_flat) == buffers.sparse_voxels.end()) {
+    ReduceThreadLocalBuffers();
+  }
+  return buffers.sparse_voxels[index_flat];
+}
+
+void GateDoseActor::AddSquaredSum(threadLocalT &data, const int index_flat,
+                                  const double value) {
+  if (fThreadLocalBuffersMaxVoxels > 0) {
+    auto &sums = GetSparseVoxelSums(fThreadLocalBuffers.Get(), index_flat);
+    if (&data == &fThreadLocalDataEdep.Get()) {
+      sums.edep_squared += value;
+    } else {
+      sums.dose_squared += value;
+    }
+    return;
+  }
+  data.squared_sum_worker_flatimg[index_flat] += value;
+  auto &buffers = fThreadLocalBuffers.Get();
+  if (buffers.touched_worker_flatimg[index_flat] == 0) {
+    buffers.touched_worker_flatimg[index_flat] = 1;
+    buffers.touched_indices.push_back(index_flat);
+  }
 }
 
 void GateDoseActor::ScoreSquaredValue(threadLocalT &data,
@@ -372,6 +652,10 @@ void GateDoseActor::ScoreSquaredValue(threadLocalT &data,
                                       const double value, const int event_id,
                                       const Image3DType::IndexType &index) {
   const int index_flat = sub2ind(index);
+  if (data.pending_worker_flatimg[index_flat] == 0) {
+    data.pending_worker_flatimg[index_flat] = 1;
+    data.pending_indices.push_back(index_flat);
+  }
   const auto previous_id = data.lastid_worker_flatimg[index_flat];
   data.lastid_worker_flatimg[index_flat] = event_id;
   if (event_id == previous_id) {
@@ -382,7 +666,10 @@ void GateDoseActor::ScoreSquaredValue(threadLocalT &data,
     // Different event: square deposited quantity from the last event ID
     // and start accumulating deposited quantity for this new event ID
     auto v = data.squared_worker_flatimg[index_flat];
-    {
+    if (fThreadLocalBuffersFlag) {
+      // reduced into the shared image with the other thread local buffers
+      AddSquaredSum(data, index_flat, v * v);
+    } else {
       G4AutoLock mutex(&SetPixelMutex);
       ImageAddValue<Image3DType>(cpp_image, index, v * v); // implicit flush
     }
@@ -393,21 +680,36 @@ void GateDoseActor::ScoreSquaredValue(threadLocalT &data,
 
 void GateDoseActor::FlushSquaredValues(threadLocalT &data,
                                        const Image3DType::Pointer &cpp_image) {
-  G4AutoLock mutex(&SetPixelMutex);
-  itk::ImageRegionIterator<Image3DType> iterator3D(
-      cpp_image, cpp_image->GetLargestPossibleRegion());
-  for (iterator3D.GoToBegin(); !iterator3D.IsAtEnd(); ++iterator3D) {
-    Image3DType::IndexType index_f = iterator3D.GetIndex();
-    Image3DType::PixelType pixelValue3D =
-        data.squared_worker_flatimg[sub2ind(index_f)];
-    ImageAddValue<Image3DType>(cpp_image, index_f, pixelValue3D * pixelValue3D);
+  // Only the voxels with a pending value are visited
+  if (fThreadLocalBuffersFlag) {
+    // fold the pending values of the last event into the thread local sum,
+    // it is later reduced in ReduceThreadLocalBuffers (no lock needed here)
+    for (const auto index_flat : data.pending_indices) {
+      const auto v = data.squared_worker_flatimg[index_flat];
+      AddSquaredSum(data, index_flat, v * v);
+    }
+  } else {
+    G4AutoLock mutex(&SetPixelMutex);
+    Image3DType::IndexType index_f;
+    for (const auto index_flat : data.pending_indices) {
+      ind2sub(index_flat, index_f);
+      const auto v = data.squared_worker_flatimg[index_flat];
+      ImageAddValue<Image3DType>(cpp_image, index_f, v * v);
+    }
   }
   // reset thread local data to zero
-  const auto N_voxels = size_edep[0] * size_edep[1] * size_edep[2];
-  PrepareLocalDataForRun(data, N_voxels);
+  for (const auto index_flat : data.pending_indices) {
+    data.squared_worker_flatimg[index_flat] = 0.0;
+    data.lastid_worker_flatimg[index_flat] = 0;
+    data.pending_worker_flatimg[index_flat] = 0;
+  }
+  data.pending_indices.clear();
 }
 
-int GateDoseActor::EndOfRunActionMasterThread(int run_id) { return 0; }
+int GateDoseActor::EndOfRunActionMasterThread(int run_id) {
+  // 1 if the run was stopped because the uncertainty goal was reached
+  return fRunTerminationReason == kUncertaintyGoal ? 1 : 0;
+}
 
 double GateDoseActor::GetMaxValueOfImage(Image3DType::Pointer imageP) {
   itk::ImageRegionIterator<Image3DType> iterator3D(
@@ -13,6 +13,9 @@
 #include "G4VPrimitiveScorer.hh"
 #include "GateVActor.h"
 #include "itkImage.h"
+#include <atomic>
+#include <chrono>
+#include <unordered_map>
 
 namespace py = pybind11;
 
@@ -71,6 +74,26 @@ public:
 
   void SetNbEventsFirstCheck(const int b) { fNbEventsFirstCheck = b; }
 
+  void SetWallClockTimeBudget(const double b) { fWallClockTimeBudget = b; }
+
+  void SetNumberOfEventsBudget(const long b) { fNumberOfEventsBudget = b; }
+
+  double GetLastMeanUncertainty() const { return fLastMeanUncertainty; }
+
+  std::string GetRunTerminationReason() const;
+
+  bool GetThreadLocalBuffersFlag() const { return fThreadLocalBuffersFlag; }
+
+  void SetThreadLocalBuffersFlag(const bool b) { fThreadLocalBuffersFlag = b; }
+
+  int GetThreadLocalBuffersMaxVoxels() const {
+    return fThreadLocalBuffersMaxVoxels;
+  }
+
+  void SetThreadLocalBuffersMaxVoxels(const int n) {
+    fThreadLocalBuffersMaxVoxels = n;
+  }
+
   std::string GetPhysicalVolumeName() const { return fPhysicalVolumeName; }
 
   void SetPhysicalVolumeName(std::string s) { fPhysicalVolumeName = s; }
@@ -85,6 +108,27 @@ public:
   double GetMaxValueOfImage(Image3DType::Pointer imageP);
   double ComputeMeanUncertainty();
 
+  // Record that the edep of this voxel changed since the last uncertainty
+  // evaluation. Must be called while holding SetPixelMutex.
+  void MarkVoxelForUncertainty(int index_flat);
+
+  // Same, but takes SetPixelMutex (for derived actors using their own lock)
+  void MarkVoxelForUncertaintyWithLock(int index_flat);
+
+  // Check the uncertainty goal and the budgets, stop the run if needed
+  void CheckRunTermination();
+
+  // Reasons why a run was stopped by this actor
+  enum RunTerminationReason {
+    kNotTerminated = 0,
+    kUncertaintyGoal,
+    kNumberOfEventsBudget,
+    kWallClockTimeBudget
+  };
+
+  // Only the first reason is kept (several threads may end the run)
+  void SetRunTerminationReason(RunTerminationReason reason);
+
   // The image is accessible on py side (shared by all threads)
   Image3DType::Pointer cpp_edep_image;
   Image3DType::Pointer cpp_edep_squared_image;
@@ -98,6 +142,41 @@ public:
     G4EmCalculator emcalc;
     std::vector<double> squared_worker_flatimg;
     std::vector<int> lastid_worker_flatimg;
+    // flat indices of the voxels holding a pending (not yet squared) value,
+    // so that FlushSquaredValues does not scan the whole image
+    std::vector<char> pending_worker_flatimg;
+    std::vector<int> pending_indices;
+    // only used with thread local buffers: sum of the squared values of all
+    // finished events, reduced into the shared image at the end of the run
+    std::vector<double> squared_sum_worker_flatimg;
+  };
+
+  // Sums of one voxel in the sparse thread local buffers
+  struct voxelSumsT {
+    double edep = 0.0;
+    double dose = 0.0;
+    double counts = 0.0;
+    double edep_squared = 0.0;
+    double dose_squared = 0.0;
+  };
+
+  // Per-thread accumulation buffers (option thread_local_buffers).
+  // Each worker scores into its own flat images, without lock, and the
+  // buffers are reduced into the shared images at the end of the run (or
+  // every fThreadLocalFlushInterval events of the thread).
+  // With fThreadLocalBuffersMaxVoxels > 0, the flat images are replaced by
+  // a map of the touched voxels, reduced as soon as it is full, so that the
+  // memory does not depend on the size of the image.
+  struct threadLocalBuffersT {
+    std::vector<double> edep_worker_flatimg;
+    std::vector<double> dose_worker_flatimg;
+    std::vector<double> counts_worker_flatimg;
+    // flat indices of the voxels modified since the last reduction, so that
+    // the reduction only visits the voxels that were actually hit
+    std::vector<char> touched_worker_flatimg;
+    std::vector<int> touched_indices;
+    std::unordered_map<int, voxelSumsT> sparse_voxels;
+    int nb_of_events_since_flush = 0;
   };
 
   void ScoreSquaredValue(threadLocalT &data,
@@ -107,8 +186,20 @@ public:
   void FlushSquaredValues(threadLocalT &data,
                           const Image3DType::Pointer &cpp_image);
 
-  static void PrepareLocalDataForRun(threadLocalT &data,
-                                     unsigned int numberOfVoxels);
+  void PrepareLocalDataForRun(threadLocalT &data,
+                              unsigned int numberOfVoxels) const;
+
+  void PrepareLocalBuffersForRun(threadLocalBuffersT &buffers,
+                                 unsigned int numberOfVoxels) const;
+
+  void ReduceThreadLocalBuffers();
+
+  // Sums of a voxel in the sparse buffers of this thread. The buffers are
+  // reduced first if a new voxel does not fit in them.
+  voxelSumsT &GetSparseVoxelSums(threadLocalBuffersT &buffers, int index_flat);
+
+  // Add the squared value of a finished event to the thread local buffers
+  void AddSquaredSum(threadLocalT &data, int index_flat, double value);
 
   void GetVoxelPosition(G4Step *step, G4ThreeVector &position, bool &isInside,
                         Image3DType::IndexType &index) const;
@@ -126,6 +217,16 @@ public:
   // Option: Are counts to be scored
   bool fCountsFlag{};
 
+  // Option: score in thread local buffers instead of the shared images
+  bool fThreadLocalBuffersFlag{};
+
+  // Option: reduce the thread local buffers every N events (0 = end of run)
+  int fThreadLocalFlushInterval{};
+
+  // Option: max number of voxels in the sparse thread local buffers
+  // (0 = image-sized buffers)
+  int fThreadLocalBuffersMaxVoxels{};
+
   double fVoxelVolume{};
 
   // Option: set target statistical uncertainty for each run
@@ -140,6 +241,25 @@ public:
   int fNbEventsNextCheck;
   double fGoalUncertainty;
 
+  // Option: stop the run after this wall clock time or number of events
+  // (0 means no budget)
+  double fWallClockTimeBudget;
+  long fNumberOfEventsBudget;
+  std::chrono::steady_clock::time_point fRunStartTime;
+
+  // Result of the last uncertainty evaluation and reason of the run end
+  double fLastMeanUncertainty;
+  std::atomic<int> fRunTerminationReason;
+
+  // Sparse uncertainty evaluation: the edep values only increase during a
+  // run, so a voxel below the threshold that has not been touched since
+  // the last evaluation remains below it. Only the touched voxels and the
+  // voxels previously above the threshold need to be visited.
+  std::vector<char> fUncertaintyTouchedFlags;
+  std::vector<int> fUncertaintyTouchedIndices;
+  std::vector<int> fUncertaintyVoxels;
+  double fUncertaintyMaxEdep;
+
   std::string fPhysicalVolumeName;
 
   G4ThreeVector fTranslation;
@@ -148,6 +268,7 @@ public:
 protected:
   G4Cache<threadLocalT> fThreadLocalDataEdep;
   G4Cache<threadLocalT> fThreadLocalDataDose;
+  G4Cache<threadLocalBuffersT> fThreadLocalBuffers;
 };
 
 #endif // GateDoseActor_h
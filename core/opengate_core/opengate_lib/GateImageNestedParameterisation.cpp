@@ -42,6 +42,34 @@ void GateImageNestedParameterisation::initialize_material(
   }
 }
 
+void GateImageNestedParameterisation::SetAllLabels(const unsigned short *labels,
+                                                   const size_t n) {
+  const auto nb = cpp_image->GetLargestPossibleRegion().GetNumberOfPixels();
+  if (n != nb) {
+    std::ostringstream oss;
+    oss << "GateImageNestedParameterisation: " << n
+        << " labels given while the image has " << nb << " voxels";
+    Fatal(oss.str());
+  }
+  std::copy(labels, labels + n, cpp_image->GetBufferPointer());
+}
+
+void GateImageNestedParameterisation::SetLabels(const int64_t *indices,
+                                                const unsigned short *labels,
+                                                const size_t n) {
+  const int64_t nb = cpp_image->GetLargestPossibleRegion().GetNumberOfPixels();
+  auto *buffer = cpp_image->GetBufferPointer();
+  for (size_t i = 0; i < n; i++) {
+    if (indices[i] < 0 || indices[i] >= nb) {
+      std::ostringstream oss;
+      oss << "GateImageNestedParameterisation: the voxel index " << indices[i]
+          << " is outside the image (" << nb << " voxels)";
+      Fatal(oss.str());
+    }
+    buffer[indices[i]] = labels[i];
+  }
+}
+
 G4Material *GateImageNestedParameterisation::ComputeMaterial(
     G4VPhysicalVolume * /*currentVol*/, const G4int repNo,
     const G4VTouchable *parentTouch) {
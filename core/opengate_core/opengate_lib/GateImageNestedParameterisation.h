@@ -32,6 +32,13 @@ public:
 
   void initialize_material(std::vector<std::string> materials);
 
+  // Set the labels of all voxels (n must be the number of voxels)
+  void SetAllLabels(const unsigned short *labels, size_t n);
+
+  // Set the labels of some voxels, given by their index in the image buffer
+  void SetLabels(const int64_t *indices, const unsigned short *labels,
+                 size_t n);
+
   // This line to avoid Woverloaded-virtual warning
   // e.g.
   // https://stackoverflow.com/questions/46060018/woverloaded-virtual-warning-on-usual-method
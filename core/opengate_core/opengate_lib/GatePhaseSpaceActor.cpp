@@ -70,6 +70,7 @@ void GatePhaseSpaceActor::StartSimulationAction() {
   } else {
     outputPath = GetOutputPath(fOutputNameRoot);
   }
+  fHits->SetOutputFormat(GetOutputFormat(fOutputNameRoot));
   fHits->SetFilenameAndInitRoot(outputPath);
   fHits->InitDigiAttributesFromNames(fUserDigiAttributeNames);
   fHits->RootInitializeTupleForMaster();
@@ -8,11 +8,14 @@
 #include "GatePhaseSpaceSource.h"
 #include "G4IonTable.hh"
 #include "G4ParticleTable.hh"
+#include "G4Threading.hh"
 #include "G4UnitsTable.hh"
 #include "GateHelpersDict.h"
 #include "GateHelpersPyBind.h"
 #include "Randomize.hh"
 
+G4Mutex PhaseSpaceUsedEntriesMutex = G4MUTEX_INITIALIZER;
+
 GatePhaseSpaceSource::GatePhaseSpaceSource() : GateVSource() {
   fCharge = 0;
   fMass = 0;
@@ -67,6 +70,15 @@ void GatePhaseSpaceSource::InitializeUserInfo(py::dict &user_info) {
   ll.fCurrentIndex = 0;
   ll.fCurrentBatchSize = 0;
 
+  // number of entries consumed by this thread, readable from the master thread
+  // once the simulation is terminated (the map nodes do not move)
+  {
+    G4AutoLock mutex(&PhaseSpaceUsedEntriesMutex);
+    auto &n = fNumberOfUsedEntries[G4Threading::G4GetThreadId()];
+    n = 0;
+    ll.fNumberOfUsedEntries = &n;
+  }
+
   ll.fGenerateUntilNextPrimary =
       DictGetBool(user_info, "generate_until_next_primary");
   ll.fPrimaryLowerEnergyThreshold =
@@ -133,6 +145,7 @@ void GatePhaseSpaceSource::GeneratePrimaries(G4Event *event,
 
         // update the root file index;
         ll.fCurrentIndex++;
+        (*ll.fNumberOfUsedEntries)++;
       } else
         break;
     }
@@ -149,12 +162,22 @@ void GatePhaseSpaceSource::GeneratePrimaries(G4Event *event,
 
     // update the root file index;
     ll.fCurrentIndex++;
+    (*ll.fNumberOfUsedEntries)++;
 
     // update the number of generated event
     l.fNumberOfGeneratedEvents++;
   }
 }
 
+unsigned long
+GatePhaseSpaceSource::GetNumberOfUsedEntries(int thread_id) const {
+  G4AutoLock mutex(&PhaseSpaceUsedEntriesMutex);
+  auto it = fNumberOfUsedEntries.find(thread_id);
+  if (it == fNumberOfUsedEntries.end())
+    return 0;
+  return it->second;
+}
+
 G4ParticleMomentum GatePhaseSpaceSource::GenerateRandomDirection() {
   G4double cosTheta = 2.0 * G4UniformRand() - 1.0;
   G4double sinTheta = std::sqrt(1.0 - cosTheta * cosTheta);
@@ -11,6 +11,7 @@
 #include "GateSPSVoxelsPosDistribution.h"
 #include "GateSingleParticleSource.h"
 #include "GateVSource.h"
+#include <map>
 #include <pybind11/numpy.h>
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
@@ -49,6 +50,9 @@ public:
 
   void GenerateBatchOfParticles();
 
+  // number of entries used to generate primaries by the given thread
+  unsigned long GetNumberOfUsedEntries(int thread_id) const;
+
   G4ParticleTable *fParticleTable;
   std::float_t fCharge;
   std::float_t fMass;
@@ -87,6 +91,7 @@ public:
     unsigned long fNumberOfGeneratedEvents;
     size_t fCurrentIndex;
     size_t fCurrentBatchSize;
+    unsigned long *fNumberOfUsedEntries;
 
     std::int32_t *fPDGCode;
 
@@ -103,6 +108,9 @@ public:
     // double * fTime; // FIXME todo
   };
   G4Cache<threadLocalTPhsp> fThreadLocalDataPhsp;
+
+  // per thread, the entries actually consumed (not only read in batches)
+  std::map<int, unsigned long> fNumberOfUsedEntries;
 };
 
 #endif // GatePhaseSpaceSource_h
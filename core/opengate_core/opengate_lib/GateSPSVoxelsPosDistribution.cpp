@@ -17,6 +17,14 @@ GateSPSVoxelsPosDistribution::GateSPSVoxelsPosDistribution() {
   // default position
   fGlobalTranslation = G4ThreeVector();
   fGlobalRotation = G4RotationMatrix();
+
+  // no alias table by default
+  fAliasIndicesData = nullptr;
+  fAliasProbabilitiesData = nullptr;
+  fAliasAliasesData = nullptr;
+  fAliasSize = 0;
+  fSizeX = 0;
+  fSizeY = 0;
 }
 
 void GateSPSVoxelsPosDistribution::SetCumulativeDistributionFunction(
@@ -27,9 +35,46 @@ void GateSPSVoxelsPosDistribution::SetCumulativeDistributionFunction(
   fCDFX = vx;
 }
 
+void GateSPSVoxelsPosDistribution::SetAliasTable(
+    const ArrayIndex &indices, const ArrayProbability &probabilities,
+    const ArrayIndex &aliases) {
+  if (indices.size() == 0 || indices.size() != probabilities.size() ||
+      indices.size() != aliases.size()) {
+    Fatal("The alias table of the voxel source must have three non-empty "
+          "arrays of the same size");
+  }
+  // Keep a reference to the numpy arrays (no copy)
+  fAliasIndices = indices;
+  fAliasProbabilities = probabilities;
+  fAliasAliases = aliases;
+  fAliasIndicesData = fAliasIndices.data();
+  fAliasProbabilitiesData = fAliasProbabilities.data();
+  fAliasAliasesData = fAliasAliases.data();
+  fAliasSize = indices.size();
+  // the image size is needed to convert the flat index
+  const auto size = cpp_image->GetLargestPossibleRegion().GetSize();
+  fSizeX = size[0];
+  fSizeY = size[1];
+}
+
 G4ThreeVector GateSPSVoxelsPosDistribution::VGenerateOne() {
   // G4UniformRand: default boundaries ]0.1[ for operator()().
 
+  // Alias table: a column is uniformly drawn, then the voxel is either the
+  // column or its alias (constant time)
+  if (fAliasSize > 0) {
+    auto c = (size_t)(G4UniformRand() * fAliasSize);
+    if (c >= fAliasSize)
+      c = fAliasSize - 1;
+    if (G4UniformRand() >= fAliasProbabilitiesData[c])
+      c = fAliasAliasesData[c];
+    const size_t v = fAliasIndicesData[c];
+    const auto x = (long)(v % fSizeX);
+    const auto y = (long)((v / fSizeX) % fSizeY);
+    const auto z = (long)(v / (fSizeX * fSizeY));
+    return VoxelToPosition(x, y, z);
+  }
+
   // Get Cumulative Distribution Function for Z
   auto i = 0;
   do {
@@ -55,9 +100,15 @@ G4ThreeVector GateSPSVoxelsPosDistribution::VGenerateOne() {
     k = std::distance(fCDFX[i][j].begin(), lower);
   } while (k >= (int)fCDFX[i][j].size());
 
-  // convert to physical coordinate
   // (warning to the numpy order Z Y X)
-  const itk::Index<3> index = {k, j, i};
+  return VoxelToPosition(k, j, i);
+}
+
+G4ThreeVector GateSPSVoxelsPosDistribution::VoxelToPosition(const long x,
+                                                            const long y,
+                                                            const long z) {
+  // convert to physical coordinate
+  const itk::Index<3> index = {x, y, z};
   itk::Point<double> point;
   cpp_image->TransformIndexToPhysicalPoint(index, point);
 
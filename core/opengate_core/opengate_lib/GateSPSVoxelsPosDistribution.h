@@ -13,6 +13,9 @@
 #include "G4ParticleDefinition.hh"
 #include "GateSPSPosDistribution.h"
 #include "itkImage.h"
+#include <pybind11/numpy.h>
+
+namespace py = pybind11;
 
 class GateSPSVoxelsPosDistribution : public GateSPSPosDistribution {
 
@@ -32,6 +35,17 @@ public:
   void SetCumulativeDistributionFunction(const VD &vz, const VD2 &vy,
                                          const VD3 &vx);
 
+  // Alias table over the non-zero voxels (flat index in numpy order ZYX).
+  // The arrays are not copied: they are kept alive here and read by all
+  // threads. When set, it is used instead of the CDF.
+  typedef py::array_t<uint32_t, py::array::c_style | py::array::forcecast>
+      ArrayIndex;
+  typedef py::array_t<double, py::array::c_style | py::array::forcecast>
+      ArrayProbability;
+  void SetAliasTable(const ArrayIndex &indices,
+                     const ArrayProbability &probabilities,
+                     const ArrayIndex &aliases);
+
   // Image type is 3D float by default (the pixel data are not used
   // nor even allocated. Only useful to convert pixel coordinates
   // to physical coordinates.
@@ -45,9 +59,22 @@ public:
   G4RotationMatrix fGlobalRotation;
 
 protected:
+  // random position within the voxel, in the world
+  G4ThreeVector VoxelToPosition(long x, long y, long z);
+
   VD3 fCDFX;
   VD2 fCDFY;
   VD fCDFZ;
+
+  ArrayIndex fAliasIndices;
+  ArrayProbability fAliasProbabilities;
+  ArrayIndex fAliasAliases;
+  const uint32_t *fAliasIndicesData;
+  const double *fAliasProbabilitiesData;
+  const uint32_t *fAliasAliasesData;
+  size_t fAliasSize;
+  size_t fSizeX;
+  size_t fSizeY;
 };
 
 #endif // GateSPSVoxelsPosDistribution_h
@@ -223,6 +223,8 @@ void GateSourceManager::PrepareRunToStart(int run_id) {
   for (auto *source : fSources) {
     source->PrepareNextRun();
   }
+  // (the number of events may change from one run to another)
+  InitializeSourceScheduler();
   // Check next time
   PrepareNextSource();
   if (l.fNextActiveSource == nullptr) {
@@ -235,25 +237,98 @@ void GateSourceManager::PrepareRunToStart(int run_id) {
           : std::to_string(G4Threading::G4GetThreadId()));
 }
 
+void GateSourceManager::InitializeSourceScheduler() const {
+  auto &l = fThreadLocalData.Get();
+  l.fDynamicSources.clear();
+  l.fReadySources = {};
+  l.fWaitingSources = {};
+  l.fScheduledFixedSource = -1;
+  for (size_t i = 0; i < fSources.size(); i++) {
+    if (fSources[i]->HasFixedNumberOfEvents())
+      ScheduleFixedSource(i);
+    else
+      l.fDynamicSources.push_back(i);
+  }
+}
+
+void GateSourceManager::ScheduleFixedSource(const size_t index) const {
+  auto &l = fThreadLocalData.Get();
+  auto *source = fSources[index];
+  G4int numberOfSimulatedEvents = source->GetNumberOfSimulatedEvents();
+  auto t = source->PrepareNextTime(l.fCurrentSimulationTime,
+                                   numberOfSimulatedEvents);
+  // The source is done for this run: all events are generated, or its time
+  // is out of the current interval (the time never decreases)
+  if ((t < l.fCurrentTimeInterval.first) ||
+      (t >= l.fCurrentTimeInterval.second))
+    return;
+  if (t <= l.fCurrentSimulationTime)
+    l.fReadySources.push(index);
+  else
+    l.fWaitingSources.emplace(t, index);
+}
+
 void GateSourceManager::PrepareNextSource() const {
   auto &l = fThreadLocalData.Get();
   l.fNextActiveSource = nullptr;
-  G4int nbOfRunFromTimes = fSimulationTimes.size();
+
+  // Only the fixed n source that just shot may have a new next time
+  if (l.fScheduledFixedSource >= 0) {
+    ScheduleFixedSource(l.fScheduledFixedSource);
+    l.fScheduledFixedSource = -1;
+  }
 
   double min_time = l.fCurrentTimeInterval.first;
   double max_time = l.fCurrentTimeInterval.second;
 
-  // Ask all sources their next time, keep the closest one
-  for (auto *source : fSources) {
+  // Ask the other sources their next time, keep the closest one
+  long next_index = -1;
+  for (auto i : l.fDynamicSources) {
+    auto *source = fSources[i];
     G4int numberOfSimulatedEvents = source->GetNumberOfSimulatedEvents();
     auto t = source->PrepareNextTime(l.fCurrentSimulationTime,
                                      numberOfSimulatedEvents);
     if ((t >= min_time) && (t < max_time)) {
       max_time = t;
-      l.fNextActiveSource = source;
-      l.fNextSimulationTime = t;
+      next_index = i;
+    }
+  }
+
+  // Fixed n sources: the waiting ones whose start time is reached shoot at the
+  // current time, the ones after their end time are done
+  while (!l.fWaitingSources.empty() &&
+         l.fWaitingSources.top().first <= l.fCurrentSimulationTime) {
+    l.fReadySources.push(l.fWaitingSources.top().second);
+    l.fWaitingSources.pop();
+  }
+  while (!l.fReadySources.empty() &&
+         fSources[l.fReadySources.top()]->fEndTime <=
+             l.fCurrentSimulationTime) {
+    l.fReadySources.pop();
+  }
+
+  // Earliest fixed n source, first added source in case of equal times
+  bool ready = !l.fReadySources.empty();
+  if (ready || !l.fWaitingSources.empty()) {
+    double t = ready ? l.fCurrentSimulationTime : l.fWaitingSources.top().first;
+    size_t i = ready ? l.fReadySources.top() : l.fWaitingSources.top().second;
+    if ((t >= min_time) &&
+        ((t < max_time) ||
+         (next_index >= 0 && t == max_time && (long)i < next_index))) {
+      max_time = t;
+      next_index = (long)i;
+      l.fScheduledFixedSource = next_index;
+      if (ready)
+        l.fReadySources.pop();
+      else
+        l.fWaitingSources.pop();
     }
   }
+
+  if (next_index >= 0) {
+    l.fNextActiveSource = fSources[next_index];
+    l.fNextSimulationTime = max_time;
+  }
   // If no next time in the current interval,
   // the next active source is nullptr
 }
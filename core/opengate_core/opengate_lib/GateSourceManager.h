@@ -15,6 +15,7 @@
 #include <G4UIsession.hh>
 #include <G4VUserPrimaryGeneratorAction.hh>
 #include <G4VisExecutive.hh>
+#include <queue>
 
 #include "GateImageBox.h"
 #include "GateUserEventInformation.h"
@@ -43,6 +44,13 @@ public:
  * - select one source according to the time
  * - check end of run
  *
+ * Sources with a fixed number of events (n) are not asked for their next time
+ * at every event: they are kept in two heaps (ready to shoot at the current
+ * time, or waiting for their start time) and only the source that just shot
+ * is asked again. Other sources (activity) draw a new time at every event and
+ * are asked each time, in the order of fSources. The selected source is the
+ * same as when asking all sources: the earliest time, then the first added.
+ *
  */
 
 class GateSourceManager : public G4VUserPrimaryGeneratorAction {
@@ -78,6 +86,12 @@ public:
   // After an event, prepare for the next
   void PrepareNextSource() const;
 
+  // Sort the sources of the run in the scheduler heaps
+  void InitializeSourceScheduler() const;
+
+  // Put back a fixed n source in the scheduler according to its next time
+  void ScheduleFixedSource(size_t index) const;
+
   // Check if the current run is terminated
   void CheckForNextRun() const;
 
@@ -130,6 +144,23 @@ public:
     // Next active source
     GateVSource *fNextActiveSource;
 
+    // Scheduler: index of the sources asked at every event
+    std::vector<size_t> fDynamicSources;
+
+    // Scheduler: fixed n sources that can shoot at the current time
+    // (smallest index first)
+    std::priority_queue<size_t, std::vector<size_t>, std::greater<>>
+        fReadySources;
+
+    // Scheduler: fixed n sources waiting for their (time, index)
+    std::priority_queue<std::pair<double, size_t>,
+                        std::vector<std::pair<double, size_t>>, std::greater<>>
+        fWaitingSources;
+
+    // Scheduler: index of the selected fixed n source, removed from the
+    // heaps until its next time is known (-1 if none)
+    long fScheduledFixedSource = -1;
+
     // User information data
     GateUserEventInformation *fUserEventInformation;
 
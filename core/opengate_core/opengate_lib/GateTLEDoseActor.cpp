@@ -277,6 +277,9 @@ void GateTLEDoseActor::SteppingAction(G4Step *step) {
       ImageAddValue<Image3DType>(cpp_dose_image, index, dose);
     }
     ImageAddValue<Image3DType>(cpp_edep_image, index, edep);
+    if (fUncertaintyGoal > 0) {
+      MarkVoxelForUncertaintyWithLock(sub2ind(index));
+    }
 
     if (fEdepSquaredFlag || fDoseSquaredFlag) {
       if (fEdepSquaredFlag) {
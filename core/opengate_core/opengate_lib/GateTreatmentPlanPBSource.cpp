@@ -15,7 +15,6 @@ GateTreatmentPlanPBSource::GateTreatmentPlanPBSource() : GateVSource() {
   fEngine = nullptr;
   fDistriGeneral = nullptr;
   fSortedSpotGenerationFlag = false;
-  fPDF = nullptr;
   fTotalNumberOfSpots = 0;
 }
 
@@ -36,8 +35,7 @@ void GateTreatmentPlanPBSource::InitializeUserInfo(py::dict &user_info) {
 
   // common to all spots
   InitializeParticle(user_info);
-  std::vector<double> mPDFVector = DictGetVecDouble(user_info, "pdf");
-  fPDF = mPDFVector.data(); // returns pointer to first element of the array
+  fPDF = DictGetVecDouble(user_info, "pdf");
   fSortedSpotGenerationFlag = DictGetBool(user_info, "sorted_spot_generation");
 
   // vectors with info for each spot
@@ -64,17 +62,29 @@ void GateTreatmentPlanPBSource::InitializeUserInfo(py::dict &user_info) {
 
 void GateTreatmentPlanPBSource::InitNbPrimariesVec() {
   auto &ll = GetThreadLocalDataTPSource();
-  // Initialize all spots to zero particles
+  // Multinomial sampling of the number of primaries of all spots, with one
+  // binomial draw per spot (conditional on the primaries left), instead of
+  // one draw per primary
   ll.fNbIonsToGenerate.resize(fTotalNumberOfSpots, 0);
-  for (long int i = 0; i < fMaxN; i++) {
-    int bin = fTotalNumberOfSpots * fDistriGeneral->fire();
-    ++ll.fNbIonsToGenerate[bin];
+  long remaining_n = fMaxN;
+  double remaining_p = 1.0;
+  for (int i = 0; i < fTotalNumberOfSpots && remaining_n > 0; i++) {
+    if (i == fTotalNumberOfSpots - 1 || remaining_p <= fPDF[i]) {
+      ll.fNbIonsToGenerate[i] = remaining_n;
+      break;
+    }
+    const double p = fPDF[i] / remaining_p;
+    const auto n = (long)CLHEP::RandBinomial::shoot(fEngine, remaining_n, p);
+    ll.fNbIonsToGenerate[i] = n;
+    remaining_n -= n;
+    remaining_p -= fPDF[i];
   }
 }
+
 void GateTreatmentPlanPBSource::InitRandomEngine() {
   fEngine = new CLHEP::HepJamesRandom();
   fDistriGeneral =
-      new CLHEP::RandGeneral(fEngine, fPDF, fTotalNumberOfSpots, 0);
+      new CLHEP::RandGeneral(fEngine, fPDF.data(), fTotalNumberOfSpots, 0);
 }
 
 double GateTreatmentPlanPBSource::CalcNextTime(double current_simulation_time) {
@@ -180,8 +190,8 @@ void GateTreatmentPlanPBSource::ConfigureSingleSpot() {
   UpdatePositionSPS(translation, rotation);
 
   // Phase space parameters
-  std::vector<double> x_param = fPhSpaceX[ll.fCurrentSpot];
-  std::vector<double> y_param = fPhSpaceY[ll.fCurrentSpot];
+  const auto &x_param = fPhSpaceX[ll.fCurrentSpot];
+  const auto &y_param = fPhSpaceY[ll.fCurrentSpot];
   ll.fSPS_PB->SetPBSourceParam(x_param, y_param);
 }
 
@@ -9,6 +9,7 @@
 #define GateTreatmentPlanPBSource_h
 
 // CLHEP
+#include "CLHEP/Random/RandBinomial.h"
 #include "CLHEP/Random/RandGauss.h"
 #include "CLHEP/Random/RandomEngine.h"
 #include "Randomize.hh"
@@ -31,6 +32,8 @@ public:
                          double NumberOfGeneratedEvents) override;
   void PrepareNextRun() override;
   double CalcNextTime(double current_simulation_time) override;
+  // n is spread over the run duration (see CalcNextTime)
+  bool HasFixedNumberOfEvents() const override { return false; }
 
   // unsigned long fNumberOfGeneratedEvents;
   py::list GetGeneratedPrimaries();
@@ -56,7 +59,7 @@ protected:
   bool fSortedSpotGenerationFlag;
 
   // vectors collecting spot-specific variables
-  double *fPDF;
+  std::vector<double> fPDF;
   std::vector<double> fSpotWeight;
   std::vector<double> fSpotEnergy;
   std::vector<double> fSigmaEnergy;
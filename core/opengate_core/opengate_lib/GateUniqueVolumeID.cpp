@@ -73,6 +73,28 @@ int GateUniqueVolumeID::GetIdUpToDepthAsHash(const int depth) const {
   return h;
 }
 
+int GateUniqueVolumeID::GetNumericIdUpToDepth(const int depth) const {
+  if (depth == -1)
+    return fNumericID;
+  if (const auto it = fCachedNumericIdDepth.find(depth);
+      it != fCachedNumericIdDepth.end()) {
+    return it->second;
+  }
+  // The string ID up to this depth is the string ID of the touchable of
+  // the volume at this depth
+  const int id = GateUniqueVolumeIDManager::GetNumericID(
+      GetLogicalVolumeUpToDepth(depth), GetIdUpToDepth(depth));
+  fCachedNumericIdDepth[depth] = id;
+  return id;
+}
+
+const G4LogicalVolume *
+GateUniqueVolumeID::GetLogicalVolumeUpToDepth(const int depth) const {
+  if (depth == -1)
+    return GetTopPhysicalVolume()->GetLogicalVolume();
+  return fTouchable.GetVolume(depth)->GetLogicalVolume();
+}
+
 std::string GateUniqueVolumeID::GetIdUpToDepth(const int depth) const {
   if (depth == -1)
     return fID;
@@ -66,6 +66,14 @@ public:
   // Get the hashed ID for a given depth (uses an internal cache)
   int GetIdUpToDepthAsHash(int depth) const;
 
+  // Get the numeric ID of the volume at a given depth (uses an internal
+  // cache). The IDs are unique within a logical volume, see
+  // GateUniqueVolumeIDManager::GetNumericID
+  int GetNumericIdUpToDepth(int depth) const;
+
+  // Get the logical volume at a given depth (-1 is the volume itself)
+  const G4LogicalVolume *GetLogicalVolumeUpToDepth(int depth) const;
+
   IDArrayType fArrayID{};
   std::string fID;
   int fNumericID;
@@ -75,6 +83,7 @@ public:
   // methods
   mutable std::map<int, std::string> fCachedIdDepth;
   mutable std::map<int, int> fCachedIdDepthHash;
+  mutable std::map<int, int> fCachedNumericIdDepth;
 };
 
 #endif // GateUniqueVolumeID_h
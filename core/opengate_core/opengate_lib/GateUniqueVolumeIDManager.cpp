@@ -6,13 +6,23 @@
    -------------------------------------------------- */
 
 #include "GateUniqueVolumeIDManager.h"
+#include "G4AutoLock.hh"
+#include "G4LogicalVolume.hh"
+#include "G4LogicalVolumeStore.hh"
+#include "G4PhysicalVolumeStore.hh"
 #include "GateGeometryUtils.h"
 #include "GateHelpers.h"
+#include <climits>
+#include <functional>
 #include <shared_mutex>
 
 G4Cache<GateUniqueVolumeIDManager::threadLocalT>
     GateUniqueVolumeIDManager::fThreadLocalData;
 GateUniqueVolumeIDManager *GateUniqueVolumeIDManager::fInstance = nullptr;
+std::map<std::string, std::map<int, std::string>>
+    GateUniqueVolumeIDManager::fUsedNumericIDs;
+
+G4Mutex UsedNumericIDsMutex = G4MUTEX_INITIALIZER;
 
 GateUniqueVolumeIDManager *GateUniqueVolumeIDManager::GetInstance() {
   if (fInstance == nullptr) {
@@ -63,30 +73,34 @@ int GateUniqueVolumeIDManager::GetNumericID(const G4LogicalVolume *lv,
                                             const std::string &id) {
   auto &l = fThreadLocalData.Get();
   auto it = l.fLVtoNumericIds.find(lv);
-  if (it != l.fLVtoNumericIds.end()) {
-    auto idIt = it->second.find(id);
-    if (idIt != it->second.end()) {
-      return idIt->second;
-    }
+  if (it == l.fLVtoNumericIds.end() ||
+      it->second.find(id) == it->second.end()) {
+    // Not found, need to initialize all IDs for this LV
+    InitializeNumericIDsForLV(lv);
+    it = l.fLVtoNumericIds.find(lv);
   }
-
-  // Not found, need to initialize all IDs for this LV
-  InitializeNumericIDsForLV(lv);
-
-  it = l.fLVtoNumericIds.find(lv);
-  if (it != l.fLVtoNumericIds.end()) {
-    return it->second.at(id);
+  if (it == l.fLVtoNumericIds.end()) {
+    // Should never reach here
+    Fatal("Failed to initialize numeric ID");
   }
-
-  // Should never reach here
-  Fatal("Failed to initialize numeric ID");
-  return -1;
+  const int numericID = it->second.at(id);
+
+  // Keep the ID for the tables written next to the outputs. This function is
+  // only called when the ID is not yet cached (by the thread), so the lock
+  // is rare.
+  G4AutoLock mutex(&UsedNumericIDsMutex);
+  fUsedNumericIDs[lv->GetName()][numericID] = id;
+  return numericID;
 }
 
 void GateUniqueVolumeIDManager::InitializeNumericIDsForLV(
     const G4LogicalVolume *lv) {
   auto &l = fThreadLocalData.Get();
+  l.fLVtoNumericIds[lv] = ComputeNumericIDs(lv);
+}
 
+std::map<std::string, int>
+GateUniqueVolumeIDManager::ComputeNumericIDs(const G4LogicalVolume *lv) {
   // Collect all touchables for this LV
   const auto touchables = FindAllTouchables(lv->GetName());
 
@@ -99,20 +113,111 @@ void GateUniqueVolumeIDManager::InitializeNumericIDsForLV(
   // Sort for deterministic ordering
   std::sort(stringIDs.begin(), stringIDs.end());
 
-  // Assign sequential IDs
+  // Assign sequential IDs, in the range of IDs of this LV
+  const auto [offset, count] = GetNumericIDRange(lv);
   std::map<std::string, int> sIDRegistry;
   int nextID = 1;
   for (const auto &stringID : stringIDs) {
     if (sIDRegistry.find(stringID) == sIDRegistry.end()) {
-      sIDRegistry[stringID] = nextID++;
+      if (nextID > count) {
+        Fatal("Too many touchables for the numeric IDs of the volume " +
+              lv->GetName());
+      }
+      sIDRegistry[stringID] = offset + nextID++;
     }
   }
+  return sIDRegistry;
+}
+
+std::pair<int, int>
+GateUniqueVolumeIDManager::GetNumericIDRange(const G4LogicalVolume *lv) {
+  auto &l = fThreadLocalData.Get();
+  auto it = l.fLVtoNumericIDRange.find(lv);
+  if (it == l.fLVtoNumericIDRange.end()) {
+    // The geometry may have changed since the ranges were computed
+    InitializeNumericIDRanges();
+    it = l.fLVtoNumericIDRange.find(lv);
+    if (it == l.fLVtoNumericIDRange.end()) {
+      Fatal("Cannot find the logical volume " + lv->GetName() +
+            " in the logical volume store");
+    }
+  }
+  return it->second;
+}
+
+void GateUniqueVolumeIDManager::InitializeNumericIDRanges() {
+  // The physical volumes placing each logical volume
+  std::map<const G4LogicalVolume *, std::vector<const G4VPhysicalVolume *>>
+      placements;
+  for (const auto *pv : *G4PhysicalVolumeStore::GetInstance()) {
+    placements[pv->GetLogicalVolume()].push_back(pv);
+  }
+
+  // Number of touchables of a logical volume: the copies of each of its
+  // physical volumes in all the touchables of the mother volume
+  std::map<const G4LogicalVolume *, long long> counts;
+  std::function<long long(const G4LogicalVolume *)> countTouchables =
+      [&](const G4LogicalVolume *lv) -> long long {
+    if (const auto it = counts.find(lv); it != counts.end())
+      return it->second;
+    long long n = 0;
+    for (const auto *pv : placements[lv]) {
+      const auto *mother = pv->GetMotherLogical();
+      n += static_cast<long long>(pv->GetMultiplicity()) *
+           (mother == nullptr ? 1 : countTouchables(mother));
+    }
+    counts[lv] = n;
+    return n;
+  };
+
+  // Consecutive ranges, in the (deterministic) order of the store
+  auto &l = fThreadLocalData.Get();
+  l.fLVtoNumericIDRange.clear();
+  long long offset = 0;
+  for (const auto *lv : *G4LogicalVolumeStore::GetInstance()) {
+    const auto n = countTouchables(lv);
+    if (offset + n > INT_MAX) {
+      Fatal("The numeric volume IDs of all the touchables of the geometry "
+            "exceed the range of a 32 bits integer");
+    }
+    l.fLVtoNumericIDRange[lv] = {static_cast<int>(offset), static_cast<int>(n)};
+    offset += n;
+  }
+}
+
+std::map<std::string, std::map<int, std::string>>
+GateUniqueVolumeIDManager::GetNumericIDTables(const std::string &lvName) {
+  std::map<std::string, std::map<int, std::string>> tables;
+  const auto *lvs = G4LogicalVolumeStore::GetInstance();
+  const auto *lv = lvs->GetVolume(lvName, false);
+  if (lv == nullptr) {
+    Fatal("GetNumericIDTables: cannot find the logical volume " + lvName);
+  }
+  // depth-first traversal of the daughters, each logical volume once
+  std::vector<const G4LogicalVolume *> toVisit{lv};
+  while (!toVisit.empty()) {
+    const auto *current = toVisit.back();
+    toVisit.pop_back();
+    if (tables.count(current->GetName()) > 0)
+      continue;
+    auto &table = tables[current->GetName()];
+    for (const auto &[stringID, numericID] : ComputeNumericIDs(current))
+      table[numericID] = stringID;
+    for (size_t i = 0; i < current->GetNoDaughters(); i++)
+      toVisit.push_back(current->GetDaughter(i)->GetLogicalVolume());
+  }
+  return tables;
+}
 
-  l.fLVtoNumericIds[lv] = std::move(sIDRegistry);
+std::map<std::string, std::map<int, std::string>>
+GateUniqueVolumeIDManager::GetUsedNumericIDTables() {
+  G4AutoLock mutex(&UsedNumericIDsMutex);
+  return fUsedNumericIDs; // copy
 }
 
 void GateUniqueVolumeIDManager::Clear() {
   auto &l = fThreadLocalData.Get();
   l.fToVolumeID.clear();
   l.fLVtoNumericIds.clear();
+  l.fLVtoNumericIDRange.clear();
 }
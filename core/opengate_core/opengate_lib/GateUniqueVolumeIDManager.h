@@ -32,12 +32,33 @@ public:
 
   static void Clear();
 
+  // Numeric ID of a touchable (given by its string ID) of a logical volume.
+  // The IDs are unique over the whole geometry: each logical volume has a
+  // range of IDs (in the order of the logical volume store) with one ID per
+  // possible touchable, the touchables are numbered in the order of their
+  // string IDs. They are the same for all threads.
+  static int GetNumericID(const G4LogicalVolume *lv, const std::string &id);
+
+  // Tables numeric ID -> string ID of all the touchables of the logical volume
+  // and of all its daughters (recursively), for each logical volume name
+  static std::map<std::string, std::map<int, std::string>>
+  GetNumericIDTables(const std::string &lvName);
+
+  // Tables numeric ID -> string ID of all the numeric IDs given (by all the
+  // threads) in this process, for each logical volume name. It contains the
+  // IDs of volumes outside the attached volumes (e.g. PostStep volumes).
+  static std::map<std::string, std::map<int, std::string>>
+  GetUsedNumericIDTables();
+
 protected:
   GateUniqueVolumeIDManager();
   static GateUniqueVolumeIDManager *fInstance;
 
   static void InitializeNumericIDsForLV(const G4LogicalVolume *lv);
-  static int GetNumericID(const G4LogicalVolume *lv, const std::string &id);
+  static void InitializeNumericIDRanges();
+  static std::pair<int, int> GetNumericIDRange(const G4LogicalVolume *lv);
+  static std::map<std::string, int>
+  ComputeNumericIDs(const G4LogicalVolume *lv);
 
   // Thread-local map: this duplicates the memory and the computation of the UiD
   // to all threads, but this avoids mutex and complex race conditions.
@@ -47,8 +68,13 @@ protected:
         fToVolumeID;
     std::map<const G4LogicalVolume *, std::map<std::string, int>>
         fLVtoNumericIds;
+    // first numeric ID (minus one) and number of IDs of each logical volume
+    std::map<const G4LogicalVolume *, std::pair<int, int>> fLVtoNumericIDRange;
   };
   static G4Cache<threadLocalT> fThreadLocalData;
+
+  // Shared between threads (protected by a mutex)
+  static std::map<std::string, std::map<int, std::string>> fUsedNumericIDs;
 };
 
 #endif // GateUniqueVolumeIDManager_h
@@ -79,6 +79,26 @@ std::string GateVActor::GetOutputPath(std::string outputName) const {
   return ""; // to avoid warning
 }
 
+void GateVActor::SetOutputFormat(const std::string &outputName,
+                                 const std::string &outputFormat) {
+  fActorOutputInfos[outputName].outputFormat = outputFormat;
+}
+
+std::string GateVActor::GetOutputFormat(std::string outputName) const {
+  try {
+    ActorOutputInfo_t aInfo;
+    aInfo = fActorOutputInfos.at(outputName);
+    return aInfo.outputFormat;
+  } catch (std::out_of_range &) {
+    std::ostringstream msg;
+    msg << "(GetOutputFormat) No actor output with the name " << outputName
+        << " exists in actor " << GetName() << " attached to "
+        << fAttachedToVolumeName << ".";
+    Fatal(msg.str());
+  }
+  return ""; // to avoid warning
+}
+
 void GateVActor::SetWriteToDisk(const std::string &outputName,
                                 const bool writeToDisk) {
   fActorOutputInfos[outputName].writeToDisk = writeToDisk;
@@ -116,6 +116,11 @@ public:
 
   bool GetWriteToDisk(std::string outputName) const;
 
+  void SetOutputFormat(const std::string &outputName,
+                       const std::string &outputFormat);
+
+  std::string GetOutputFormat(std::string outputName) const;
+
   void AddActorOutputInfo(const std::string &outputName);
 
   static bool
@@ -130,6 +135,7 @@ public:
     std::string outputName = "";
     std::string outputPath = "";
     bool writeToDisk = false;
+    std::string outputFormat = "root";
   };
 
   typedef ActorOutputInfo ActorOutputInfo_t;
@@ -93,6 +93,8 @@ double GateVSource::PrepareNextTime(double current_simulation_time,
   return fStartTime; // FIXME timing ?
 }
 
+bool GateVSource::HasFixedNumberOfEvents() const { return fMaxN > 0; }
+
 void GateVSource::GeneratePrimaries(G4Event * /*event*/, double /*time*/) {
   Fatal("GeneratePrimaries must be overloaded");
 }
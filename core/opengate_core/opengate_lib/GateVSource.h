@@ -41,6 +41,11 @@ public:
   virtual double PrepareNextTime(double current_simulation_time,
                                  double NumberOfGeneratedEvents);
 
+  // True if the number of events of the current run is fixed (n): the next
+  // time is then the current time, bounded by the start/end time, and does
+  // not need to be asked at every event (see GateSourceManager)
+  virtual bool HasFixedNumberOfEvents() const;
+
   virtual void GeneratePrimaries(G4Event *event,
                                  double current_simulation_time);
 
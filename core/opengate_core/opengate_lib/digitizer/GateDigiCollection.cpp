@@ -7,6 +7,7 @@
 
 #include "GateDigiCollection.h"
 #include "G4Step.hh"
+#include "G4Threading.hh"
 #include "GateDigiAttributeManager.h"
 #include "GateDigiCollectionIterator.h"
 #include "GateDigiCollectionsRootManager.h"
@@ -16,6 +17,11 @@ GateDigiCollection::GateDigiCollection(const std::string &collName)
   fTupleId = -1;
   fDigiCollectionTitle = "Digi collection";
   fCurrentDigiAttributeId = 0;
+  fOutputFormat = "root";
+  fWriteToColumnsFlag = false;
+  fColumnsChunkSize = 100000;
+  fCallbackFunction = nullptr;
+  fCallbackEveryNEvents = 1;
   SetFilenameAndInitRoot("");
   threadLocalData.Get().fBeginOfEventIndex = 0;
   fWriteToRootFlag = false;
@@ -41,13 +47,39 @@ void GateDigiCollection::SetWriteToRootFlag(const bool f) {
 
 void GateDigiCollection::SetFilenameAndInitRoot(const std::string &filename) {
   fFilename = filename;
-  if (fFilename.empty())
+  // for columnar output, the filename is the folder of the column files
+  const bool columns = fOutputFormat != "root";
+  fWriteToColumnsFlag = !fFilename.empty() && columns;
+  if (fFilename.empty() || columns)
     SetWriteToRootFlag(false);
   else
     SetWriteToRootFlag(true);
   RootStartInitialization();
 }
 
+void GateDigiCollection::SetOutputFormat(const std::string &format) {
+  if (format != "root" && format != "hdf5" && format != "npy") {
+    std::ostringstream oss;
+    oss << "Unknown output format '" << format << "' for the digi collection "
+        << fDigiCollectionName << ", must be 'root', 'hdf5' or 'npy'";
+    Fatal(oss.str());
+  }
+  fOutputFormat = format;
+}
+
+void GateDigiCollection::SetCallbackFunction(const CallbackFunctionType &f,
+                                             const int everyNEvents) {
+  if (everyNEvents < 1) {
+    std::ostringstream oss;
+    oss << "The callback of the digi collection " << fDigiCollectionName
+        << " must be called every N events with N >= 1, while it is "
+        << everyNEvents;
+    Fatal(oss.str());
+  }
+  fCallbackFunction = f;
+  fCallbackEveryNEvents = everyNEvents;
+}
+
 void GateDigiCollection::InitDigiAttributesFromNames(
     const std::vector<std::string> &names) {
   for (const auto &name : names)
@@ -86,6 +118,18 @@ void GateDigiCollection::FillToRootIfNeeded(bool clear) {
       - can write to root or not according to the flag
       - can clear every N calls
    */
+  if (fCallbackFunction != nullptr) {
+    ApplyCallbackAndFlush(clear);
+    return;
+  }
+  if (fWriteToColumnsFlag) {
+    // the values are kept until a whole chunk can be written
+    if (GetSize() >= fColumnsChunkSize)
+      FillToColumns();
+    else
+      SetBeginOfEventIndex();
+    return;
+  }
   if (!fWriteToRootFlag) {
     // need to set the index before (in case we don't clear)
     if (clear)
@@ -97,6 +141,33 @@ void GateDigiCollection::FillToRootIfNeeded(bool clear) {
   FillToRoot();
 }
 
+void GateDigiCollection::ApplyCallbackAndFlush(const bool clear) {
+  /*
+     Called at the beginning of every event (clear is false) and at the end of
+     the run (clear is true). The digi are kept until N events have been
+     tracked by this thread, then the callback is called with the collection
+     and the digi are written (if needed) and cleared: the memory is bounded by
+     the number of digi in N events.
+   */
+  auto &l = threadLocalData.Get();
+  if (!clear && l.fNumberOfEventsSinceCallback < fCallbackEveryNEvents) {
+    l.fNumberOfEventsSinceCallback++;
+    SetBeginOfEventIndex();
+    return;
+  }
+  if (GetSize() > 0)
+    fCallbackFunction(this);
+  // if it is the beginning of an event, this event is the first of the next
+  // batch
+  l.fNumberOfEventsSinceCallback = clear ? 0 : 1;
+  if (fWriteToColumnsFlag)
+    FillToColumns();
+  else if (fWriteToRootFlag)
+    FillToRoot();
+  else
+    Clear();
+}
+
 void GateDigiCollection::FillToRoot() {
   /*
    * maybe not very efficient to loop that way (row then column)
@@ -113,6 +184,35 @@ void GateDigiCollection::FillToRoot() {
   Clear();
 }
 
+void GateDigiCollection::FillToColumns() const {
+  // one (append) write of the whole vector per attribute
+  for (const auto *att : fDigiAttributes) {
+    const auto filename = GetColumnFilename(att);
+    std::ofstream file(filename, std::ios::binary | std::ios::app);
+    if (!file) {
+      Fatal("Cannot open the column file " + filename);
+    }
+    att->WriteToColumnFile(file);
+  }
+  Clear();
+}
+
+std::string
+GateDigiCollection::GetColumnFilename(const GateVDigiAttribute *att) const {
+  // <folder>/<collection>.<id>.<attribute>.<type>.<thread>.bin
+  // (the id keeps the order of the attributes)
+  std::ostringstream oss;
+  oss << fFilename << "/" << fDigiCollectionName << "."
+      << att->GetDigiAttributeId() << "." << att->GetDigiAttributeName() << "."
+      << att->GetDigiAttributeType() << ".";
+  if (G4Threading::IsMasterThread())
+    oss << "master";
+  else
+    oss << G4Threading::G4GetThreadId();
+  oss << ".bin";
+  return oss.str();
+}
+
 void GateDigiCollection::Clear() const {
   for (auto *att : fDigiAttributes) {
     att->Clear();
@@ -121,6 +221,11 @@ void GateDigiCollection::Clear() const {
 }
 
 void GateDigiCollection::Write() const {
+  // write the remaining values (the files are created even if empty)
+  if (fWriteToColumnsFlag) {
+    FillToColumns();
+    return;
+  }
   if (!fWriteToRootFlag)
     return;
   const auto *am = GateDigiCollectionsRootManager::GetInstance();
@@ -40,6 +40,17 @@ class GateDigiCollectionIterator;
  *       (EndSimulationAction) *
       6) Close may not be needed (unsure)
  *
+ *  - if columnar output (SetOutputFormat "hdf5" or "npy", before
+ *    SetFilenameAndInitRoot), the filename is a folder. FillToRootIfNeeded
+ *    appends each attribute vector to one binary file per attribute and per
+ *    thread, by chunks of fColumnsChunkSize digi. Write appends the remaining
+ *    digi. The files are converted to the final format on the python side.
+ *
+ *  - if a callback function is set (SetCallbackFunction), the digi are kept
+ *    during N events (per thread), then the function is called with the
+ *    collection, and the digi are written (if needed) and cleared.
+ *    The function is also called by FillToRootIfNeeded(true) (end of run).
+ *
  */
 
 class GateDigiCollection : public G4VHitsCollection {
@@ -48,6 +59,9 @@ public:
 
   typedef GateDigiCollectionIterator Iterator;
 
+  // Callback function (python) called with the digi of the last N events
+  using CallbackFunctionType = std::function<void(GateDigiCollection *)>;
+
   ~GateDigiCollection() override;
 
   void InitDigiAttributesFromNames(const std::vector<std::string> &names);
@@ -76,10 +90,20 @@ public:
 
   void SetFilenameAndInitRoot(const std::string &filename);
 
+  void SetOutputFormat(const std::string &format);
+
+  std::string GetOutputFormat() const { return fOutputFormat; }
+
   std::string GetFilename() const { return fFilename; }
 
   std::string GetTitle() const { return fDigiCollectionTitle; }
 
+  std::string GetDigiCollectionName() const { return fDigiCollectionName; }
+
+  void SetCallbackFunction(const CallbackFunctionType &f, int everyNEvents);
+
+  bool HasCallbackFunction() const { return fCallbackFunction != nullptr; }
+
   void SetTupleId(int id) { fTupleId = id; }
 
   int GetTupleId() const { return fTupleId; }
@@ -126,15 +150,27 @@ protected:
   int fTupleId;
   int fCurrentDigiAttributeId;
   bool fWriteToRootFlag;
+  std::string fOutputFormat;
+  bool fWriteToColumnsFlag;
+  size_t fColumnsChunkSize;
+  CallbackFunctionType fCallbackFunction;
+  int fCallbackEveryNEvents;
 
   // thread local: the index of the beginning
   // of event is specific for each thread
   struct threadLocal_t {
     size_t fBeginOfEventIndex = 0;
+    int fNumberOfEventsSinceCallback = 0;
   };
   G4Cache<threadLocal_t> threadLocalData;
 
   void FillToRoot();
+
+  void FillToColumns() const;
+
+  void ApplyCallbackAndFlush(bool clear);
+
+  std::string GetColumnFilename(const GateVDigiAttribute *att) const;
 };
 
 #endif // GateDigiCollection_h
@@ -21,6 +21,7 @@ GateDigitizerAdderActor::GateDigitizerAdderActor(py::dict &user_info)
   fPolicy = AdderPolicy::EnergyWinnerPosition;
   fTimeDifferenceFlag = false;
   fNumberOfHitsFlag = false;
+  fGroupVolumeIDAsIntFlag = false;
   fWeightsAreUsedFlag = false;
 }
 
@@ -46,6 +47,7 @@ void GateDigitizerAdderActor::InitializeUserInfo(py::dict &user_info) {
   // option
   fTimeDifferenceFlag = DictGetBool(user_info, "time_difference");
   fNumberOfHitsFlag = DictGetBool(user_info, "number_of_hits");
+  fGroupVolumeIDAsIntFlag = DictGetBool(user_info, "group_volume_id_as_int");
 
   // init
   fGroupVolumeDepth = -1;
@@ -70,6 +72,10 @@ void GateDigitizerAdderActor::StartSimulationAction() {
     auto *att = new GateTDigiAttribute<double>("NumberOfHits");
     fOutputDigiCollection->InitDigiAttribute(att);
   }
+  if (fGroupVolumeIDAsIntFlag) {
+    auto *att = new GateTDigiAttribute<int>("GroupVolumeIDAsInt");
+    fOutputDigiCollection->InitDigiAttribute(att);
+  }
   fOutputDigiCollection->RootInitializeTupleForMaster();
 
   // check required attributes
@@ -90,6 +96,8 @@ void GateDigitizerAdderActor::DigitInitialize(
     att.emplace_back("TimeDifference");
   if (fNumberOfHitsFlag)
     att.emplace_back("NumberOfHits");
+  if (fGroupVolumeIDAsIntFlag)
+    att.emplace_back("GroupVolumeIDAsInt");
   GateVDigitizerWithOutputActor::DigitInitialize(att);
 
   // Get thread local variables
@@ -107,6 +115,9 @@ void GateDigitizerAdderActor::DigitInitialize(
   if (fNumberOfHitsFlag)
     fOutputNumberOfHitsAttribute =
         fOutputDigiCollection->GetDigiAttribute("NumberOfHits");
+  if (fGroupVolumeIDAsIntFlag)
+    fOutputGroupVolumeIDAsIntAttribute =
+        fOutputDigiCollection->GetDigiAttribute("GroupVolumeIDAsInt");
 
   // set input pointers to the attributes needed for computation
   auto &lr = fThreadLocalVDigitizerData.Get();
@@ -139,6 +150,7 @@ void GateDigitizerAdderActor::EndOfEventAction(const G4Event *event) {
   auto &l = fThreadLocalData.Get();
 
   for (auto &h : l.fMapOfDigiInVolume) {
+    const auto &key = h.first;
     const auto &hit = h.second;
     // terminate the merge
     hit->Terminate();
@@ -151,6 +163,8 @@ void GateDigitizerAdderActor::EndOfEventAction(const G4Event *event) {
         fOutputTimeDifferenceAttribute->FillDValue(hit->fDifferenceTime);
       if (fNumberOfHitsFlag)
         fOutputNumberOfHitsAttribute->FillDValue(hit->fNumberOfHits);
+      if (fGroupVolumeIDAsIntFlag)
+        fOutputGroupVolumeIDAsIntAttribute->FillIValue(key.volumeID);
       lr.fDigiAttributeFiller->Fill(hit->fFinalIndex);
     }
     // Clean up the allocated GateDigiAdderInVolume object
@@ -173,9 +187,11 @@ void GateDigitizerAdderActor::AddDigiPerVolume() const {
   // This key combines the volume ID and, if needed, the track weight.
   DigiKey key{};
 
-  // 1. Get the cached hash of the volume ID string based on the required depth.
-  // This function handles caching internally
-  key.volumeID = l.volID->get()->GetIdUpToDepthAsHash(fGroupVolumeDepth);
+  // 1. Get the logical volume and the numeric ID of the volume at the
+  // required depth. GetNumericIdUpToDepth handles caching internally
+  const auto *volID = l.volID->get();
+  key.volume = volID->GetLogicalVolumeUpToDepth(fGroupVolumeDepth);
+  key.volumeID = volID->GetNumericIdUpToDepth(fGroupVolumeDepth);
 
   // 2. Get the weight. If VRT is used, we must group only hits with the
   // exact same weight. To do this safely with floating-point numbers,
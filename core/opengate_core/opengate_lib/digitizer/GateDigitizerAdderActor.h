@@ -17,6 +17,7 @@
 #include "GateVDigitizerWithOutputActor.h"
 #include <cstdint> // Required for uint64_t
 #include <pybind11/stl.h>
+#include <tuple>
 
 namespace py = pybind11;
 
@@ -69,17 +70,18 @@ public:
 
 protected:
   // A compact key for grouping hits.
-  // It combines the volume ID (as a hash of the depth-specific string)
-  // and the weight (as its bit representation) for exact matching.
+  // It combines the logical volume at the group depth, the numeric ID of
+  // the volume at this depth (unique within a logical volume, so no
+  // collision is possible) and the weight (as its bit representation) for
+  // exact matching.
   struct DigiKey {
-    uint64_t volumeID;
+    const G4LogicalVolume *volume;
+    int volumeID;
     uint64_t weightBits;
 
     bool operator<(const DigiKey &other) const {
-      if (volumeID != other.volumeID) {
-        return volumeID < other.volumeID;
-      }
-      return weightBits < other.weightBits;
+      return std::tie(volume, volumeID, weightBits) <
+             std::tie(other.volume, other.volumeID, other.weightBits);
     }
   };
 
@@ -87,6 +89,7 @@ protected:
   AdderPolicy fPolicy;
   bool fTimeDifferenceFlag;
   bool fNumberOfHitsFlag;
+  bool fGroupVolumeIDAsIntFlag;
   bool fWeightsAreUsedFlag;
 
   GateVDigiAttribute *fOutputEdepAttribute{};
@@ -94,6 +97,7 @@ protected:
   GateVDigiAttribute *fOutputGlobalTimeAttribute{};
   GateVDigiAttribute *fOutputTimeDifferenceAttribute{};
   GateVDigiAttribute *fOutputNumberOfHitsAttribute{};
+  GateVDigiAttribute *fOutputGroupVolumeIDAsIntAttribute{};
 
   void DigitInitialize(
       const std::vector<std::string> &attributes_not_in_filler) override;
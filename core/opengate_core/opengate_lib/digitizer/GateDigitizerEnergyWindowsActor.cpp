@@ -21,6 +21,8 @@ GateDigitizerEnergyWindowsActor::GateDigitizerEnergyWindowsActor(
   fActions.insert("EndOfRunAction");
   fActions.insert("EndOfSimulationWorkerAction");
   fActions.insert("EndSimulationAction");
+  fCallbackFunction = nullptr;
+  fCallbackEveryNEvents = 1;
 }
 
 void GateDigitizerEnergyWindowsActor::InitializeUserInfo(py::dict &user_info) {
@@ -29,6 +31,7 @@ void GateDigitizerEnergyWindowsActor::InitializeUserInfo(py::dict &user_info) {
   fInputDigiCollectionName = DictGetStr(user_info, "input_digi_collection");
   fUserSkipDigiAttributeNames = DictGetVecStr(user_info, "skip_attributes");
   fClearEveryNEvents = DictGetInt(user_info, "clear_every");
+  fCallbackEveryNEvents = DictGetInt(user_info, "callback_every");
 
   // Get information for all channels
   const auto dv = DictGetVecDict(user_info, "channels");
@@ -39,6 +42,11 @@ void GateDigitizerEnergyWindowsActor::InitializeUserInfo(py::dict &user_info) {
   }
 }
 
+void GateDigitizerEnergyWindowsActor::SetCallbackFunction(
+    GateDigiCollection::CallbackFunctionType &f) {
+  fCallbackFunction = f;
+}
+
 void GateDigitizerEnergyWindowsActor::InitializeCpp() {
   GateVActor::InitializeCpp();
   fInputDigiCollection = nullptr;
@@ -65,11 +73,15 @@ void GateDigitizerEnergyWindowsActor::StartSimulationAction() {
     } else {
       outputPath = GetOutputPath(fOutputNameRoot);
     }
+    hc->SetOutputFormat(GetOutputFormat(fOutputNameRoot));
     hc->SetFilenameAndInitRoot(outputPath);
     // hc->InitDigiAttributesFromNames(names);
     hc->InitDigiAttributesFromCopy(fInputDigiCollection,
                                    fUserSkipDigiAttributeNames);
     hc->RootInitializeTupleForMaster();
+    // the callback is called for each energy window
+    if (fCallbackFunction != nullptr)
+      hc->SetCallbackFunction(fCallbackFunction, fCallbackEveryNEvents);
     fChannelDigiCollections.push_back(hc);
   }
 }
@@ -93,7 +105,9 @@ void GateDigitizerEnergyWindowsActor::BeginOfRunAction(const G4Run *run) {
 }
 
 void GateDigitizerEnergyWindowsActor::BeginOfEventAction(const G4Event *event) {
-  const bool must_clear = event->GetEventID() % fClearEveryNEvents == 0;
+  // (if a callback is set, the digi are kept until it is called)
+  const bool must_clear = fCallbackFunction == nullptr &&
+                          event->GetEventID() % fClearEveryNEvents == 0;
   for (auto *hc : fChannelDigiCollections) {
     hc->FillToRootIfNeeded(must_clear);
   }
@@ -54,6 +54,9 @@ public:
   // Get the id of the last energy window
   int GetLastEnergyWindowId() const;
 
+  // set the user callback function (python), called every N events
+  void SetCallbackFunction(GateDigiCollection::CallbackFunctionType &f);
+
 protected:
   std::string fInputDigiCollectionName;
   GateDigiCollection *fInputDigiCollection;
@@ -63,6 +66,8 @@ protected:
   std::vector<double> fChannelMin;
   std::vector<double> fChannelMax;
   int fClearEveryNEvents;
+  GateDigiCollection::CallbackFunctionType fCallbackFunction;
+  int fCallbackEveryNEvents;
 
   void ApplyThreshold(size_t i, double min, double max) const;
 
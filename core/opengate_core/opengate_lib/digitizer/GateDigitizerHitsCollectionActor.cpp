@@ -24,6 +24,8 @@ GateDigitizerHitsCollectionActor::GateDigitizerHitsCollectionActor(
   fDebug = false;
   fKeepZeroEdep = false;
   fClearEveryNEvents = 100000;
+  fCallbackFunction = nullptr;
+  fCallbackEveryNEvents = 1;
 }
 
 GateDigitizerHitsCollectionActor::~GateDigitizerHitsCollectionActor() = default;
@@ -36,6 +38,12 @@ void GateDigitizerHitsCollectionActor::InitializeUserInfo(py::dict &user_info) {
   fDebug = DictGetBool(user_info, "debug");
   fClearEveryNEvents = DictGetInt(user_info, "clear_every");
   fKeepZeroEdep = DictGetBool(user_info, "keep_zero_edep");
+  fCallbackEveryNEvents = DictGetInt(user_info, "callback_every");
+}
+
+void GateDigitizerHitsCollectionActor::SetCallbackFunction(
+    GateDigiCollection::CallbackFunctionType &f) {
+  fCallbackFunction = f;
 }
 
 void GateDigitizerHitsCollectionActor::InitializeCpp() {
@@ -55,9 +63,12 @@ void GateDigitizerHitsCollectionActor::StartSimulationAction() {
   } else {
     outputPath = GetOutputPath(fOutputNameRoot);
   }
+  fHits->SetOutputFormat(GetOutputFormat(fOutputNameRoot));
   fHits->SetFilenameAndInitRoot(outputPath);
   fHits->InitDigiAttributesFromNames(fUserDigiAttributeNames);
   fHits->RootInitializeTupleForMaster();
+  if (fCallbackFunction != nullptr)
+    fHits->SetCallbackFunction(fCallbackFunction, fCallbackEveryNEvents);
 }
 
 // Called every time a Run starts
@@ -77,8 +88,11 @@ void GateDigitizerHitsCollectionActor::BeginOfEventAction(
      memory (lower is better). Default fClearEveryNEvents value is 1. Some other
      actors may need hits from several events, so we leave the option to keep
      more events. It only fills to root if needed.
+     If a callback is set, the hits are kept until it is called (every
+     'fCallbackEveryNEvents' of this thread), clear_every is then ignored.
    */
-  const bool must_clear = event->GetEventID() % fClearEveryNEvents == 0;
+  const bool must_clear = !fHits->HasCallbackFunction() &&
+                          event->GetEventID() % fClearEveryNEvents == 0;
   fHits->FillToRootIfNeeded(must_clear);
 }
 
@@ -46,6 +46,9 @@ public:
   // Called when the simulation ends (master thread only)
   void EndSimulationAction() override;
 
+  // set the user callback function (python), called every N events
+  void SetCallbackFunction(GateDigiCollection::CallbackFunctionType &f);
+
 protected:
   std::string fHitsCollectionName;
   std::vector<std::string> fUserDigiAttributeNames;
@@ -53,6 +56,8 @@ protected:
   bool fDebug{};
   bool fKeepZeroEdep{};
   int fClearEveryNEvents{};
+  GateDigiCollection::CallbackFunctionType fCallbackFunction;
+  int fCallbackEveryNEvents{};
 };
 
 #endif // GateHitsCollectionActor_h
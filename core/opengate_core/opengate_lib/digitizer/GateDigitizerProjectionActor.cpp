@@ -23,6 +23,7 @@ GateDigitizerProjectionActor::GateDigitizerProjectionActor(py::dict &user_info)
   fActions.insert("EndOfRunAction");
   fPhysicalVolumeName = "None";
   fSquaredImageIsEnabled = false;
+  fThreadLocalImagesAreEnabled = false;
   fImage = nullptr;
 }
 
@@ -51,6 +52,10 @@ void GateDigitizerProjectionActor::EnableSquaredImage(const bool b) {
   // FIXME check if weight exists ?
 }
 
+void GateDigitizerProjectionActor::EnableThreadLocalImages(const bool b) {
+  fThreadLocalImagesAreEnabled = b;
+}
+
 // Called when the simulation starts
 void GateDigitizerProjectionActor::StartSimulationAction() {
   // Get the input hits collection
@@ -91,17 +96,39 @@ void GateDigitizerProjectionActor::BeginOfRunAction(const G4Run *run) {
         l.fInputWeights[slice]->clear();
       }
     }
-    // Set size and allocate temporary images
+    // Set size and allocate temporary images. With thread local images, they
+    // only contain the slices of one run (one per channel).
+    auto region = fImage->GetLargestPossibleRegion();
+    if (fThreadLocalImagesAreEnabled) {
+      auto size = region.GetSize();
+      size[2] = fInputDigiCollections.size();
+      region.SetSize(size);
+      l.fLocalImage = ImageType::New();
+      l.fLocalImage->SetRegions(region);
+      l.fLocalImage->Allocate();
+      if (fSquaredImageIsEnabled) {
+        l.fLocalSquaredImage = ImageType::New();
+        l.fLocalSquaredImage->SetRegions(region);
+        l.fLocalSquaredImage->Allocate();
+      }
+    }
     if (fSquaredImageIsEnabled) {
       l.fSquaredTempImage = ImageType::New();
       l.fLastEventIdImage = ImageIDType::New();
-      l.fSquaredTempImage->SetRegions(fImage->GetLargestPossibleRegion());
-      l.fLastEventIdImage->SetRegions(fImage->GetLargestPossibleRegion());
+      l.fSquaredTempImage->SetRegions(region);
+      l.fLastEventIdImage->SetRegions(region);
       l.fSquaredTempImage->Allocate();
       l.fLastEventIdImage->Allocate();
     }
   }
 
+  if (fThreadLocalImagesAreEnabled) {
+    // (only used to accumulate the counts, no need of the position)
+    l.fLocalImage->FillBuffer(0.0);
+    if (fSquaredImageIsEnabled)
+      l.fLocalSquaredImage->FillBuffer(0.0);
+  }
+
   if (fSquaredImageIsEnabled) {
     // Each Run we need to set the new orientation to all temp images
     AttachImageToVolume<ImageType>(l.fSquaredTempImage, fPhysicalVolumeName,
@@ -116,17 +143,27 @@ void GateDigitizerProjectionActor::BeginOfRunAction(const G4Run *run) {
 }
 
 void GateDigitizerProjectionActor::EndOfEventAction(const G4Event * /*event*/) {
+  if (fThreadLocalImagesAreEnabled) {
+    // no lock: one slice per channel in the images of this thread
+    const auto &l = fThreadLocalData.Get();
+    for (size_t channel = 0; channel < fInputDigiCollections.size(); channel++)
+      ProcessSlice(l.fLocalImage, l.fLocalSquaredImage, channel, channel);
+    return;
+  }
   G4AutoLock mutex(&DigitizerProjectionActorMutex);
   const auto run = G4RunManager::GetRunManager()->GetCurrentRun()->GetRunID();
   for (size_t channel = 0; channel < fInputDigiCollections.size(); channel++) {
     const auto slice = channel + run * fInputDigiCollections.size();
-    ProcessSlice(slice, channel);
+    ProcessSlice(fImage, fSquaredImage, slice, channel);
   }
 }
 
-void GateDigitizerProjectionActor::ProcessSlice(const size_t slice,
-                                                const size_t channel) const {
-  // (Note: this is called during EndOfEventAction and in a mutex scope)
+void GateDigitizerProjectionActor::ProcessSlice(
+    const ImageType::Pointer &image, const ImageType::Pointer &squaredImage,
+    const size_t slice, const size_t channel) const {
+  // (Note: this is called during EndOfEventAction, in a mutex scope if the
+  // image is shared between threads. The position of the shared image is
+  // used to compute the pixel index, the slice is set in the given image.)
   const auto &l = fThreadLocalData.Get();
   const auto *hc = fInputDigiCollections[channel];
   const auto index = hc->GetBeginOfEventIndex();
@@ -156,13 +193,13 @@ void GateDigitizerProjectionActor::ProcessSlice(const size_t slice,
 
       // Take particle weight into account (if in the attribute list)
       if (!weights.empty()) {
-        ImageAddValue<ImageType>(fImage, pindex, weights[i]);
+        ImageAddValue<ImageType>(image, pindex, weights[i]);
         if (fSquaredImageIsEnabled) {
           // like dose: square must be taken after each event, not each "hit"
-          ScoreSquaredValue(pindex, current_event_id, weights[i]);
+          ScoreSquaredValue(squaredImage, pindex, current_event_id, weights[i]);
         }
       } else
-        ImageAddValue<ImageType>(fImage, pindex, 1.0);
+        ImageAddValue<ImageType>(image, pindex, 1.0);
     } else {
       // Should never be here (?)
       /*DDDV(pos);
@@ -177,8 +214,8 @@ void GateDigitizerProjectionActor::ProcessSlice(const size_t slice,
 }
 
 void GateDigitizerProjectionActor::ScoreSquaredValue(
-    const ImageType::IndexType &index, const int current_event_id,
-    const double value) const {
+    const ImageType::Pointer &squaredImage, const ImageType::IndexType &index,
+    const int current_event_id, const double value) const {
   const auto &l = fThreadLocalData.Get();
   auto previous_event_id = l.fLastEventIdImage->GetPixel(index);
   if (previous_event_id == current_event_id) {
@@ -192,26 +229,55 @@ void GateDigitizerProjectionActor::ScoreSquaredValue(
     // and start accumulating for this new event.
     const auto v = l.fSquaredTempImage->GetPixel(index);
     // DDD(v);
-    ImageAddValue<ImageType>(fSquaredImage, index, v * v);
+    ImageAddValue<ImageType>(squaredImage, index, v * v);
     l.fSquaredTempImage->SetPixel(index, value);
     l.fLastEventIdImage->SetPixel(index, current_event_id);
   }
 }
 
 void GateDigitizerProjectionActor::EndOfRunAction(const G4Run *run) {
+  if (fThreadLocalImagesAreEnabled) {
+    const auto &l = fThreadLocalData.Get();
+    if (fSquaredImageIsEnabled)
+      FlushSquaredValues(l.fLocalSquaredImage);
+    MergeThreadLocalImages(run->GetRunID());
+    return;
+  }
   if (fSquaredImageIsEnabled)
-    FlushSquaredValues();
+    FlushSquaredValues(fSquaredImage);
+}
+
+void GateDigitizerProjectionActor::MergeThreadLocalImages(const int run) const {
+  // The slices of a run are contiguous in the shared images
+  const auto &l = fThreadLocalData.Get();
+  const auto n = l.fLocalImage->GetLargestPossibleRegion().GetNumberOfPixels();
+  const auto offset = run * n;
+  G4AutoLock mutex(&DigitizerProjectionActorMutex);
+  auto *counts = fImage->GetBufferPointer() + offset;
+  const auto *local_counts = l.fLocalImage->GetBufferPointer();
+  for (size_t i = 0; i < n; i++)
+    counts[i] += local_counts[i];
+  if (fSquaredImageIsEnabled) {
+    auto *squared = fSquaredImage->GetBufferPointer() + offset;
+    const auto *local_squared = l.fLocalSquaredImage->GetBufferPointer();
+    for (size_t i = 0; i < n; i++)
+      squared[i] += local_squared[i];
+  }
 }
 
-void GateDigitizerProjectionActor::FlushSquaredValues() const {
+void GateDigitizerProjectionActor::FlushSquaredValues(
+    const ImageType::Pointer &squaredImage) const {
   // When multithreading, the order is unclear, so we do it for all the threads,
   // setting to zero once one is done.
   auto &l = fThreadLocalData.Get();
   itk::ImageRegionIterator<ImageType> iter1(
       l.fSquaredTempImage, l.fSquaredTempImage->GetLargestPossibleRegion());
   itk::ImageRegionIterator<ImageType> iter2(
-      fSquaredImage, fSquaredImage->GetLargestPossibleRegion());
-  G4AutoLock mutex(&DigitizerProjectionActorMutex);
+      squaredImage, squaredImage->GetLargestPossibleRegion());
+  // (no lock needed if the squared image is thread local)
+  G4AutoLock mutex(&DigitizerProjectionActorMutex, std::defer_lock);
+  if (squaredImage == fSquaredImage)
+    mutex.lock();
   for (iter1.GoToBegin(), iter2.GoToBegin();
        !iter1.IsAtEnd() && !iter2.IsAtEnd(); ++iter1, ++iter2) {
     if (iter1.Get() != 0.0) {
@@ -52,6 +52,10 @@ public:
 
   void EnableSquaredImage(bool b);
 
+  // If enabled, each thread accumulates the slices of the current run in its
+  // own images, added to the shared images once per run (no lock per event)
+  void EnableThreadLocalImages(bool b);
+
   // Image type is 3D float by default
   typedef itk::Image<double, 3> ImageType;
   typedef itk::Image<int, 3> ImageIDType;
@@ -59,16 +63,21 @@ public:
   ImageType::Pointer fSquaredImage;
   std::string fPhysicalVolumeName;
   bool fSquaredImageIsEnabled;
+  bool fThreadLocalImagesAreEnabled;
 
 protected:
   std::vector<std::string> fInputDigiCollectionNames;
   std::vector<GateDigiCollection *> fInputDigiCollections;
   G4RotationMatrix fDetectorOrientationMatrix;
 
-  void ProcessSlice(size_t slice, size_t channel) const;
-  void ScoreSquaredValue(const ImageType::IndexType &index,
+  void ProcessSlice(const ImageType::Pointer &image,
+                    const ImageType::Pointer &squaredImage, size_t slice,
+                    size_t channel) const;
+  void ScoreSquaredValue(const ImageType::Pointer &squaredImage,
+                         const ImageType::IndexType &index,
                          int current_event_id, double value) const;
-  void FlushSquaredValues() const;
+  void FlushSquaredValues(const ImageType::Pointer &squaredImage) const;
+  void MergeThreadLocalImages(int run) const;
 
   G4ThreeVector fPreviousTranslation;
   G4RotationMatrix fPreviousRotation;
@@ -79,6 +88,9 @@ protected:
     std::vector<std::vector<double> *> fInputWeights;
     ImageType::Pointer fSquaredTempImage;
     ImageIDType::Pointer fLastEventIdImage;
+    // slices (one per channel) of the current run, if thread local images
+    ImageType::Pointer fLocalImage;
+    ImageType::Pointer fLocalSquaredImage;
   };
   G4Cache<threadLocalT> fThreadLocalData;
 };
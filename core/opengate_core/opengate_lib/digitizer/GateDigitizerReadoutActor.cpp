@@ -69,6 +69,7 @@ void GateDigitizerReadoutActor::EndOfEventAction(const G4Event * /*unused*/) {
 
   // create the output digi collection for grouped digi
   for (auto &h : l.fMapOfDigiInVolume) {
+    const auto &key = h.first;
     const auto &digi = h.second;
     // terminate the merge
     digi->Terminate();
@@ -97,6 +98,8 @@ void GateDigitizerReadoutActor::EndOfEventAction(const G4Event * /*unused*/) {
       fOutputEdepAttribute->FillDValue(digi->fFinalEdep);
       fOutputPosAttribute->Fill3Value(digi->fFinalPosition);
       fOutputGlobalTimeAttribute->FillDValue(digi->fFinalTime);
+      if (fGroupVolumeIDAsIntFlag)
+        fOutputGroupVolumeIDAsIntAttribute->FillIValue(key.volumeID);
       lr.fDigiAttributeFiller->Fill(digi->fFinalIndex);
     }
   }
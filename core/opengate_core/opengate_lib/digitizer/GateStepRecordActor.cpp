@@ -0,0 +1,86 @@
+/* --------------------------------------------------
+   Copyright (C): OpenGATE Collaboration
+   This software is distributed under the terms
+   of the GNU Lesser General  Public Licence (LGPL)
+   See LICENSE.md for further details
+   -------------------------------------------------- */
+
+#include "GateStepRecordActor.h"
+#include "../GateHelpersDict.h"
+#include "GateDigiCollectionManager.h"
+
+GateStepRecordActor::GateStepRecordActor(py::dict &user_info)
+    : GateVActor(user_info, true) {
+  // actions
+  fActions.insert("StartSimulationAction");
+  fActions.insert("BeginOfRunAction");
+  fActions.insert("SteppingAction");
+  fActions.insert("EndOfEventAction");
+  fActions.insert("EndOfRunAction");
+  fSteps = nullptr;
+  fCallbackFunction = nullptr;
+  fCallbackEveryNSteps = 100000;
+  fCallbackAtEndOfEvent = false;
+}
+
+GateStepRecordActor::~GateStepRecordActor() = default;
+
+void GateStepRecordActor::InitializeUserInfo(py::dict &user_info) {
+  GateVActor::InitializeUserInfo(user_info);
+  fStepsCollectionName = DictGetStr(user_info, "name");
+  fUserDigiAttributeNames = DictGetVecStr(user_info, "attributes");
+  const auto n = DictGetInt(user_info, "callback_every");
+  if (n < 1) {
+    std::ostringstream oss;
+    oss << "The callback of the actor " << fStepsCollectionName
+        << " must be called every N steps with N >= 1, while it is " << n;
+    Fatal(oss.str());
+  }
+  fCallbackEveryNSteps = n;
+  fCallbackAtEndOfEvent = DictGetBool(user_info, "callback_at_end_of_event");
+}
+
+void GateStepRecordActor::SetCallbackFunction(
+    GateDigiCollection::CallbackFunctionType &f) {
+  fCallbackFunction = f;
+}
+
+void GateStepRecordActor::InitializeCpp() { fSteps = nullptr; }
+
+// Called when the simulation starts
+void GateStepRecordActor::StartSimulationAction() {
+  auto *dcm = GateDigiCollectionManager::GetInstance();
+  fSteps = dcm->NewDigiCollection(fStepsCollectionName);
+  // no output file: the steps are only given to the callback
+  fSteps->SetFilenameAndInitRoot("");
+  fSteps->InitDigiAttributesFromNames(fUserDigiAttributeNames);
+}
+
+void GateStepRecordActor::BeginOfRunAction(const G4Run * /*run*/) {
+  // the values of the attributes are thread local
+  fSteps->Clear();
+}
+
+void GateStepRecordActor::SteppingAction(G4Step *step) {
+  fSteps->FillHits(step);
+  if (fSteps->GetSize() >= fCallbackEveryNSteps)
+    ApplyCallback();
+}
+
+void GateStepRecordActor::EndOfEventAction(const G4Event * /*event*/) {
+  if (fCallbackAtEndOfEvent)
+    ApplyCallback();
+}
+
+void GateStepRecordActor::EndOfRunAction(const G4Run * /*run*/) {
+  // the remaining steps
+  ApplyCallback();
+}
+
+void GateStepRecordActor::ApplyCallback() const {
+  if (fSteps->GetSize() == 0)
+    return;
+  if (fCallbackFunction != nullptr)
+    fCallbackFunction(fSteps);
+  fSteps->Clear();
+}
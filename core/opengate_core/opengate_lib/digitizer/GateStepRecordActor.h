@@ -0,0 +1,66 @@
+/* --------------------------------------------------
+   Copyright (C): OpenGATE Collaboration
+   This software is distributed under the terms
+   of the GNU Lesser General  Public Licence (LGPL)
+   See LICENSE.md for further details
+   -------------------------------------------------- */
+
+#ifndef GateStepRecordActor_h
+#define GateStepRecordActor_h
+
+#include "../GateVActor.h"
+#include "GateDigiCollection.h"
+#include <pybind11/stl.h>
+
+namespace py = pybind11;
+
+/*
+ * Record the given digi attributes of every step in the attached volume(s)
+ * into a (thread local) digi collection, without any output file. The
+ * collection is given to a python callback every N steps (and at the end of
+ * each event if needed), then cleared. The steps are recorded at C++ cost, and
+ * the python function is only called once per batch of steps.
+ */
+
+class GateStepRecordActor : public GateVActor {
+
+public:
+  explicit GateStepRecordActor(py::dict &user_info);
+
+  ~GateStepRecordActor() override;
+
+  void InitializeUserInfo(py::dict &user_info) override;
+
+  void InitializeCpp() override;
+
+  // Called when the simulation starts (master thread only)
+  void StartSimulationAction() override;
+
+  // Called every time a Run starts (all threads)
+  void BeginOfRunAction(const G4Run *run) override;
+
+  // Called every time a batch of steps must be processed
+  void SteppingAction(G4Step * /*unused*/) override;
+
+  // Called every time an Event ends (all threads)
+  void EndOfEventAction(const G4Event *event) override;
+
+  // Called every time a Run ends (all threads)
+  void EndOfRunAction(const G4Run *run) override;
+
+  // set the user callback function (python)
+  void SetCallbackFunction(GateDigiCollection::CallbackFunctionType &f);
+
+protected:
+  std::string fStepsCollectionName;
+  std::vector<std::string> fUserDigiAttributeNames;
+  GateDigiCollection *fSteps;
+  GateDigiCollection::CallbackFunctionType fCallbackFunction;
+  size_t fCallbackEveryNSteps;
+  bool fCallbackAtEndOfEvent;
+
+  // Call the function with the recorded steps (if any), then clear them
+  void ApplyCallback() const;
+};
+
+#endif // GateStepRecordActor_h
@@ -267,6 +267,65 @@ void GateTDigiAttribute<GateUniqueVolumeID::Pointer>::FillToRoot(
   ram->FillNtupleSColumn(fTupleId, fDigiAttributeId, v);
 }
 
+template <class T>
+void GateTDigiAttribute<T>::WriteToColumnFile(std::ofstream & /*file*/) const {
+  DDE(fDigiAttributeType);
+  DDE(fDigiAttributeName);
+  Fatal("Must not be here, WriteToColumnFile must be specialized for this "
+        "type");
+}
+
+// Numbers are written as raw arrays (native endianness), strings are separated
+// by a null character, vectors are written as 3 interleaved doubles.
+template <>
+void GateTDigiAttribute<double>::WriteToColumnFile(std::ofstream &file) const {
+  const auto &values = threadLocalData.Get().fValues;
+  file.write(reinterpret_cast<const char *>(values.data()),
+             values.size() * sizeof(double));
+}
+
+template <>
+void GateTDigiAttribute<int>::WriteToColumnFile(std::ofstream &file) const {
+  const auto &values = threadLocalData.Get().fValues;
+  file.write(reinterpret_cast<const char *>(values.data()),
+             values.size() * sizeof(int));
+}
+
+template <>
+void GateTDigiAttribute<int64_t>::WriteToColumnFile(std::ofstream &file) const {
+  const auto &values = threadLocalData.Get().fValues;
+  file.write(reinterpret_cast<const char *>(values.data()),
+             values.size() * sizeof(int64_t));
+}
+
+template <>
+void GateTDigiAttribute<std::string>::WriteToColumnFile(
+    std::ofstream &file) const {
+  for (const auto &v : threadLocalData.Get().fValues)
+    file.write(v.c_str(), v.size() + 1);
+}
+
+template <>
+void GateTDigiAttribute<G4ThreeVector>::WriteToColumnFile(
+    std::ofstream &file) const {
+  const auto &values = threadLocalData.Get().fValues;
+  std::vector<double> buffer(3 * values.size());
+  for (size_t i = 0; i < values.size(); i++) {
+    buffer[3 * i] = values[i][0];
+    buffer[3 * i + 1] = values[i][1];
+    buffer[3 * i + 2] = values[i][2];
+  }
+  file.write(reinterpret_cast<const char *>(buffer.data()),
+             buffer.size() * sizeof(double));
+}
+
+template <>
+void GateTDigiAttribute<GateUniqueVolumeID::Pointer>::WriteToColumnFile(
+    std::ofstream &file) const {
+  for (const auto &v : threadLocalData.Get().fValues)
+    file.write(v->fID.c_str(), v->fID.size() + 1);
+}
+
 template <> std::vector<double> &GateTDigiAttribute<double>::GetDValues() {
   return threadLocalData.Get().fValues;
 }
@@ -34,6 +34,8 @@ public:
 
   void FillToRoot(size_t index) const override;
 
+  void WriteToColumnFile(std::ofstream &file) const override;
+
   void FillDValue(double v) override;
 
   void FillSValue(std::string v) override;
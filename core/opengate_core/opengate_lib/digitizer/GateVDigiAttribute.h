@@ -10,6 +10,7 @@
 
 #include "../GateHelpers.h"
 #include "../GateUniqueVolumeID.h"
+#include <fstream>
 
 class GateVDigiAttribute {
 public:
@@ -33,6 +34,9 @@ public:
 
   virtual void FillToRoot(size_t) const {}
 
+  // Append all values (one column) to a binary file
+  virtual void WriteToColumnFile(std::ofstream &) const {}
+
   virtual void FillDValue(double) {}
 
   virtual void FillSValue(std::string) {}
@@ -27,6 +27,8 @@ GateVDigitizerWithOutputActor::GateVDigitizerWithOutputActor(
   fInputDigiCollection = nullptr;
   fInitializeRootTupleForMasterFlag = true;
   fClearEveryNEvents = 1e5;
+  fCallbackFunction = nullptr;
+  fCallbackEveryNEvents = 1;
 }
 
 GateVDigitizerWithOutputActor::~GateVDigitizerWithOutputActor() = default;
@@ -46,6 +48,12 @@ void GateVDigitizerWithOutputActor::InitializeUserInfo(py::dict &user_info) {
   fOutputDigiCollectionName = DictGetStr(user_info, "name");
   fUserSkipDigiAttributeNames = DictGetVecStr(user_info, "skip_attributes");
   fClearEveryNEvents = DictGetInt(user_info, "clear_every");
+  fCallbackEveryNEvents = DictGetInt(user_info, "callback_every");
+}
+
+void GateVDigitizerWithOutputActor::SetCallbackFunction(
+    GateDigiCollection::CallbackFunctionType &f) {
+  fCallbackFunction = f;
 }
 
 void GateVDigitizerWithOutputActor::StartSimulationAction() {
@@ -61,12 +69,16 @@ void GateVDigitizerWithOutputActor::StartSimulationAction() {
   } else {
     outputPath = GetOutputPath(fOutputNameRoot);
   }
+  fOutputDigiCollection->SetOutputFormat(GetOutputFormat(fOutputNameRoot));
   fOutputDigiCollection->SetFilenameAndInitRoot(outputPath);
   fOutputDigiCollection->InitDigiAttributesFromCopy(
       fInputDigiCollection, fUserSkipDigiAttributeNames);
 
   if (fInitializeRootTupleForMasterFlag)
     fOutputDigiCollection->RootInitializeTupleForMaster();
+  if (fCallbackFunction != nullptr)
+    fOutputDigiCollection->SetCallbackFunction(fCallbackFunction,
+                                               fCallbackEveryNEvents);
 }
 
 void GateVDigitizerWithOutputActor::BeginOfRunAction(const G4Run *run) {
@@ -101,7 +113,9 @@ void GateVDigitizerWithOutputActor::DigitInitialize(
 }
 
 void GateVDigitizerWithOutputActor::BeginOfEventAction(const G4Event *event) {
-  bool must_clear = event->GetEventID() % fClearEveryNEvents == 0;
+  // (if a callback is set, the digi are kept until it is called)
+  bool must_clear = !fOutputDigiCollection->HasCallbackFunction() &&
+                    event->GetEventID() % fClearEveryNEvents == 0;
   fOutputDigiCollection->FillToRootIfNeeded(must_clear);
 }
 
@@ -53,6 +53,9 @@ public:
 
   void EndOfSimulationWorkerAction(const G4Run * /*unused*/) override;
 
+  // set the user callback function (python), called every N events
+  void SetCallbackFunction(GateDigiCollection::CallbackFunctionType &f);
+
 protected:
   std::string fInputDigiCollectionName;
   std::string fOutputDigiCollectionName;
@@ -60,6 +63,8 @@ protected:
   GateDigiCollection *fInputDigiCollection;
   std::vector<std::string> fUserSkipDigiAttributeNames;
   int fClearEveryNEvents;
+  GateDigiCollection::CallbackFunctionType fCallbackFunction;
+  int fCallbackEveryNEvents;
 
   bool fInitializeRootTupleForMasterFlag;
 
@@ -0,0 +1,36 @@
+/* --------------------------------------------------
+   Copyright (C): OpenGATE Collaboration
+   This software is distributed under the terms
+   of the GNU Lesser General  Public Licence (LGPL)
+   See LICENSE.md for further details
+   -------------------------------------------------- */
+
+#include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
+
+namespace py = pybind11;
+
+#include "GateDigiCollection.h"
+#include "GateDigiCollectionManager.h"
+
+void init_GateDigiCollection(py::module &m) {
+  py::class_<GateDigiCollection,
+             std::unique_ptr<GateDigiCollection, py::nodelete>>(
+      m, "GateDigiCollection")
+      .def("GetDigiCollectionName", &GateDigiCollection::GetDigiCollectionName)
+      .def("GetSize", &GateDigiCollection::GetSize)
+      .def("GetBeginOfEventIndex", &GateDigiCollection::GetBeginOfEventIndex)
+      .def("GetDigiAttributeNames", &GateDigiCollection::GetDigiAttributeNames)
+      .def("GetDigiAttributes", &GateDigiCollection::GetDigiAttributes,
+           py::return_value_policy::reference)
+      .def("GetDigiAttribute", &GateDigiCollection::GetDigiAttribute,
+           py::return_value_policy::reference);
+
+  py::class_<GateDigiCollectionManager,
+             std::unique_ptr<GateDigiCollectionManager, py::nodelete>>(
+      m, "GateDigiCollectionManager")
+      .def_static("GetInstance", &GateDigiCollectionManager::GetInstance,
+                  py::return_value_policy::reference)
+      .def("GetDigiCollection", &GateDigiCollectionManager::GetDigiCollection,
+           py::return_value_policy::reference);
+}
@@ -5,6 +5,7 @@
    See LICENSE.md for further details
    -------------------------------------------------- */
 
+#include <pybind11/functional.h>
 #include <pybind11/pybind11.h>
 
 namespace py = pybind11;
@@ -16,5 +17,7 @@ void init_GateDigitizerEnergyWindowsActor(py::module &m) {
   py::class_<GateDigitizerEnergyWindowsActor,
              std::unique_ptr<GateDigitizerEnergyWindowsActor, py::nodelete>,
              GateVActor>(m, "GateDigitizerEnergyWindowsActor")
-      .def(py::init<py::dict &>());
+      .def(py::init<py::dict &>())
+      .def("SetCallbackFunction",
+           &GateDigitizerEnergyWindowsActor::SetCallbackFunction);
 }
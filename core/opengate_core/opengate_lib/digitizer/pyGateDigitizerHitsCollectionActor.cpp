@@ -5,6 +5,7 @@
    See LICENSE.md for further details
    -------------------------------------------------- */
 
+#include <pybind11/functional.h>
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 
@@ -17,5 +18,7 @@ void init_GateHitsCollectionActor(py::module &m) {
   py::class_<GateDigitizerHitsCollectionActor,
              std::unique_ptr<GateDigitizerHitsCollectionActor, py::nodelete>,
              GateVActor>(m, "GateDigitizerHitsCollectionActor")
-      .def(py::init<py::dict &>());
+      .def(py::init<py::dict &>())
+      .def("SetCallbackFunction",
+           &GateDigitizerHitsCollectionActor::SetCallbackFunction);
 }
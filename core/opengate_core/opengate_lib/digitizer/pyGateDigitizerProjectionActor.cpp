@@ -23,6 +23,8 @@ void init_GateDigitizerProjectionActor(py::module &m) {
                      &GateDigitizerProjectionActor::fSquaredImage)
       .def("EnableSquaredImage",
            &GateDigitizerProjectionActor::EnableSquaredImage)
+      .def("EnableThreadLocalImages",
+           &GateDigitizerProjectionActor::EnableThreadLocalImages)
       .def("SetPhysicalVolumeName",
            &GateDigitizerProjectionActor::SetPhysicalVolumeName);
 }
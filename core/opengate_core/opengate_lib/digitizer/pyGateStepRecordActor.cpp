@@ -0,0 +1,23 @@
+/* --------------------------------------------------
+   Copyright (C): OpenGATE Collaboration
+   This software is distributed under the terms
+   of the GNU Lesser General  Public Licence (LGPL)
+   See LICENSE.md for further details
+   -------------------------------------------------- */
+
+#include <pybind11/functional.h>
+#include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
+
+namespace py = pybind11;
+
+#include "GateStepRecordActor.h"
+
+void init_GateStepRecordActor(py::module &m) {
+
+  py::class_<GateStepRecordActor,
+             std::unique_ptr<GateStepRecordActor, py::nodelete>, GateVActor>(
+      m, "GateStepRecordActor")
+      .def(py::init<py::dict &>())
+      .def("SetCallbackFunction", &GateStepRecordActor::SetCallbackFunction);
+}
@@ -5,7 +5,7 @@
    See LICENSE.md for further details
    -------------------------------------------------- */
 
-#include <pybind11/functional.h>
+#include <pybind11/numpy.h>
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 
@@ -13,14 +13,65 @@ namespace py = pybind11;
 
 #include "GateVDigiAttribute.h"
 
+/*
+ * The views do not copy the values: they are only valid while the vector is
+ * not modified (e.g. during a callback of the digi collection, in the thread
+ * that calls it). The (empty) capsule is the base object of the array, it
+ * tells numpy to not copy nor own the data.
+ */
+
+template <class T> py::array_t<T> DigiValuesView(std::vector<T> &values) {
+  const py::capsule base(&values, [](void *) {});
+  return py::array_t<T>(values.size(), values.data(), base);
+}
+
+py::array_t<double> Digi3ValuesView(std::vector<G4ThreeVector> &values) {
+  // a G4ThreeVector is stored as 3 contiguous doubles
+  static_assert(sizeof(G4ThreeVector) == 3 * sizeof(double),
+                "Unexpected G4ThreeVector memory layout");
+  const py::capsule base(&values, [](void *) {});
+  const std::vector<size_t> shape{values.size(), 3};
+  const std::vector<size_t> strides{sizeof(G4ThreeVector), sizeof(double)};
+  return py::array_t<double>(shape, strides,
+                             reinterpret_cast<double *>(values.data()), base);
+}
+
 void init_GateVDigiAttribute(py::module &m) {
   py::class_<GateVDigiAttribute,
              std::unique_ptr<GateVDigiAttribute, py::nodelete>>(
       m, "GateVDigiAttribute")
       .def("GetDigiAttributeName", &GateVDigiAttribute::GetDigiAttributeName)
       .def("GetDigiAttributeType", &GateVDigiAttribute::GetDigiAttributeType)
+      .def("GetDigiAttributeId", &GateVDigiAttribute::GetDigiAttributeId)
+      .def("GetSize", &GateVDigiAttribute::GetSize)
       .def("FillDValue", &GateVDigiAttribute::FillDValue)
       .def("FillSValue", &GateVDigiAttribute::FillSValue)
       .def("FillIValue", &GateVDigiAttribute::FillIValue)
-      .def("Fill3Value", &GateVDigiAttribute::Fill3Value);
+      .def("Fill3Value", &GateVDigiAttribute::Fill3Value)
+      // views (no copy) of the values of the current thread
+      .def("GetDValuesView",
+           [](GateVDigiAttribute &att) {
+             return DigiValuesView(att.GetDValues());
+           })
+      .def("GetIValuesView",
+           [](GateVDigiAttribute &att) {
+             return DigiValuesView(att.GetIValues());
+           })
+      .def("GetLValuesView",
+           [](GateVDigiAttribute &att) {
+             return DigiValuesView(att.GetLValues());
+           })
+      .def("Get3ValuesView",
+           [](GateVDigiAttribute &att) {
+             return Digi3ValuesView(att.Get3Values());
+           })
+      // strings cannot be viewed, they are copied
+      .def("GetSValues",
+           [](GateVDigiAttribute &att) { return att.GetSValues(); })
+      .def("GetUValuesAsStrings", [](GateVDigiAttribute &att) {
+        std::vector<std::string> ids;
+        for (const auto &id : att.GetUValues())
+          ids.push_back(id->fID);
+        return ids;
+      });
 }
@@ -5,6 +5,7 @@
    See LICENSE.md for further details
    -------------------------------------------------- */
 
+#include <pybind11/functional.h>
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 
@@ -17,5 +18,7 @@ void init_GateVDigitizerWithOutputActor(py::module &m) {
   py::class_<GateVDigitizerWithOutputActor,
              std::unique_ptr<GateVDigitizerWithOutputActor, py::nodelete>,
              GateVActor>(m, "GateVDigitizerWithOutputActor")
-      .def(py::init<py::dict &, bool>());
+      .def(py::init<py::dict &, bool>())
+      .def("SetCallbackFunction",
+           &GateVDigitizerWithOutputActor::SetCallbackFunction);
 }
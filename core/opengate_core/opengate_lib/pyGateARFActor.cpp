@@ -6,6 +6,7 @@
    -------------------------------------------------- */
 
 #include <pybind11/functional.h>
+#include <pybind11/numpy.h>
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 
@@ -13,6 +14,15 @@ namespace py = pybind11;
 
 #include "GateARFActor.h"
 
+// Numpy array owning the values of the vector (moved, no copy)
+static py::array_t<double> MoveVectorToArray(std::vector<double> &&v) {
+  auto *values = new std::vector<double>(std::move(v));
+  const py::capsule owner(
+      values, [](void *p) { delete static_cast<std::vector<double> *>(p); });
+  return py::array_t<double>(static_cast<py::ssize_t>(values->size()),
+                             values->data(), owner);
+}
+
 class PyGateARFActor : public GateARFActor {
 public:
   // Inherit the constructors
@@ -45,5 +55,11 @@ void init_GateARFActor(py::module &m) {
       .def("GetDirectionX", &GateARFActor::GetDirectionX)
       .def("GetDirectionY", &GateARFActor::GetDirectionY)
       .def("GetDirectionZ", &GateARFActor::GetDirectionZ)
-      .def("GetWeights", &GateARFActor::GetWeights);
+      .def("GetWeights", &GateARFActor::GetWeights)
+      .def("TakeBatchArrays", [](GateARFActor &a) {
+        py::dict arrays;
+        for (auto &[name, values] : a.TakeBatch())
+          arrays[py::str(name)] = MoveVectorToArray(std::move(values));
+        return arrays;
+      });
 }
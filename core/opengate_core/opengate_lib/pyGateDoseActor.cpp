@@ -51,6 +51,18 @@ void init_GateDoseActor(py::module &m) {
       .def("SetThreshEdepPerc", &GateDoseActor::SetThreshEdepPerc)
       .def("SetOvershoot", &GateDoseActor::SetOvershoot)
       .def("SetNbEventsFirstCheck", &GateDoseActor::SetNbEventsFirstCheck)
+      .def("SetWallClockTimeBudget", &GateDoseActor::SetWallClockTimeBudget)
+      .def("SetNumberOfEventsBudget", &GateDoseActor::SetNumberOfEventsBudget)
+      .def("GetLastMeanUncertainty", &GateDoseActor::GetLastMeanUncertainty)
+      .def("GetRunTerminationReason", &GateDoseActor::GetRunTerminationReason)
+      .def("GetThreadLocalBuffersFlag",
+           &GateDoseActor::GetThreadLocalBuffersFlag)
+      .def("SetThreadLocalBuffersFlag",
+           &GateDoseActor::SetThreadLocalBuffersFlag)
+      .def("GetThreadLocalBuffersMaxVoxels",
+           &GateDoseActor::GetThreadLocalBuffersMaxVoxels)
+      .def("SetThreadLocalBuffersMaxVoxels",
+           &GateDoseActor::SetThreadLocalBuffersMaxVoxels)
       .def("GetPhysicalVolumeName", &GateDoseActor::GetPhysicalVolumeName)
       .def("SetPhysicalVolumeName", &GateDoseActor::SetPhysicalVolumeName)
       .def_readwrite("NbOfEvent", &GateDoseActor::fNbOfEvent)
@@ -5,6 +5,7 @@
    See LICENSE.md for further details
    -------------------------------------------------- */
 
+#include <pybind11/numpy.h>
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 
@@ -23,5 +24,22 @@ void init_GateImageNestedParameterisation(py::module &m) {
       .def("initialize_image",
            &GateImageNestedParameterisation::initialize_image)
       .def("initialize_material",
-           &GateImageNestedParameterisation::initialize_material);
+           &GateImageNestedParameterisation::initialize_material)
+      // the labels are read from the numpy arrays without copy (if contiguous)
+      .def("set_all_labels",
+           [](GateImageNestedParameterisation &p,
+              const py::array_t<unsigned short,
+                                py::array::c_style | py::array::forcecast>
+                  &labels) { p.SetAllLabels(labels.data(), labels.size()); })
+      .def("set_labels",
+           [](GateImageNestedParameterisation &p,
+              const py::array_t<int64_t, py::array::c_style |
+                                             py::array::forcecast> &indices,
+              const py::array_t<unsigned short,
+                                py::array::c_style | py::array::forcecast>
+                  &labels) {
+             if (indices.size() != labels.size())
+               Fatal("set_labels: indices and labels must have the same size");
+             p.SetLabels(indices.data(), labels.data(), indices.size());
+           });
 }
@@ -18,6 +18,8 @@ void init_GatePhaseSpaceSource(py::module &m) {
       .def(py::init())
       .def("InitializeUserInfo", &GatePhaseSpaceSource::InitializeUserInfo)
       .def("SetGeneratorFunction", &GatePhaseSpaceSource::SetGeneratorFunction)
+      .def("GetNumberOfUsedEntries",
+           &GatePhaseSpaceSource::GetNumberOfUsedEntries)
 
       .def("SetEnergyBatch", &GatePhaseSpaceSource::SetEnergyBatch)
       .def("SetWeightBatch", &GatePhaseSpaceSource::SetWeightBatch)
@@ -20,6 +20,7 @@ void init_GateSPSVoxelsPosDistribution(py::module &m) {
       .def(py::init())
       .def("SetCumulativeDistributionFunction",
            &GateSPSVoxelsPosDistribution::SetCumulativeDistributionFunction)
+      .def("SetAliasTable", &GateSPSVoxelsPosDistribution::SetAliasTable)
       .def("VGenerateOne", &GateSPSVoxelsPosDistribution::VGenerateOne)
       .def_readwrite("cpp_edep_image",
                      &GateSPSVoxelsPosDistribution::cpp_image);
@@ -19,5 +19,9 @@ void init_GateUniqueVolumeIDManager(py::module &m) {
       m, "GateUniqueVolumeIDManager")
       .def("GetInstance", &GateUniqueVolumeIDManager::GetInstance)
       .def("GetVolumeID", &GateUniqueVolumeIDManager::GetVolumeID)
-      .def("GetAllVolumeIDs", &GateUniqueVolumeIDManager::GetAllVolumeIDs);
+      .def("GetAllVolumeIDs", &GateUniqueVolumeIDManager::GetAllVolumeIDs)
+      .def_static("GetNumericIDTables",
+                  &GateUniqueVolumeIDManager::GetNumericIDTables)
+      .def_static("GetUsedNumericIDTables",
+                  &GateUniqueVolumeIDManager::GetUsedNumericIDTables);
 }
@@ -105,6 +105,8 @@ void init_GateVActor(py::module &m) {
       .def("SetOutputPath", &GateVActor::SetOutputPath)
       .def("GetWriteToDisk", &GateVActor::GetWriteToDisk)
       .def("SetWriteToDisk", &GateVActor::SetWriteToDisk)
+      .def("GetOutputFormat", &GateVActor::GetOutputFormat)
+      .def("SetOutputFormat", &GateVActor::SetOutputFormat)
       .def("AddActorOutputInfo", &GateVActor::AddActorOutputInfo)
       .def("SteppingAction", &GateVActor::SteppingAction);
   //      .def("RegisterCallBack", &GateVActor::RegisterCallBack);
@@ -3,6 +3,8 @@ import inspect
 from box import Box
 from typing import Optional
 import sys
+import shutil
+from pathlib import Path
 
 import opengate_core as g4
 from ..base import GateObject, process_cls
@@ -16,6 +18,14 @@ from .dataitems import (
     QuotientMeanItkImage,
     merge_data,
 )
+from .columnar_output import (
+    columnar_output_suffixes,
+    get_column_parts_path,
+    read_column_parts,
+    write_columns,
+    merge_columnar_outputs,
+)
+from .volume_id_table import get_volume_id_table_path, merge_volume_id_tables
 
 
 def get_formatted_docstring_rst(cls, attr_name, begin_of_line="  - "):
@@ -460,6 +470,21 @@ class ActorOutputBase(GateObject):
             f"but it should be implemented in the specific derived class"
         )
 
+    def finalize_output_files(self):
+        """Called by the actor once the files written from the C++ side are closed."""
+        pass
+
+    def inplace_merge_with(self, other):
+        """Merge the data of another instance of this actor output, e.g. coming from
+        another process of Simulation.run_parallel(), into this one.
+        """
+        self.warn_user(
+            f"The user output {self.name} of actor {self.belongs_to} "
+            f"cannot be merged with the output from other processes. "
+            f"Only the data of the first process is kept. "
+        )
+        return self
+
 
 class ActorOutputUsingDataItemContainer(ActorOutputBase):
     # hints for IDE
@@ -783,6 +808,25 @@ class ActorOutputUsingDataItemContainer(ActorOutputBase):
     def merge_data_from_runs(self):
         self.merged_data = merge_data(list(self.data_per_run.values()))
 
+    def inplace_merge_with(self, other):
+        # the data items know how to merge themselves,
+        # e.g. summing images or weighting means by the number of samples
+        if other.merged_data is not None:
+            if self.merged_data is None:
+                self.merged_data = other.merged_data
+                self.merged_data.belongs_to = self
+            else:
+                self.merged_data.inplace_merge_with(other.merged_data)
+        for run_index, data in other.data_per_run.items():
+            if data is None:
+                continue
+            if self.data_per_run.get(run_index, None) is None:
+                self.data_per_run[run_index] = data
+                data.belongs_to = self
+            else:
+                self.data_per_run[run_index].inplace_merge_with(data)
+        return self
+
     def end_of_run(self, run_index):
         if self.merge_data_after_simulation is True:
             self.merged_data.inplace_merge_with(self.data_per_run[run_index])
@@ -899,10 +943,21 @@ class ActorOutputRoot(ActorOutputBase):
                 "read_only": True,
             },
         ),
+        "output_format": (
+            "root",
+            {
+                "doc": "Format of the output: 'root', or one of the columnar formats "
+                "'hdf5' (one file with one table per digi collection) or 'npy' "
+                "(one folder, suffix .npycol, with one sub-folder per digi collection in the "
+                "npy phsp format, readable by the PhaseSpaceSource). "
+                "For columnar formats, the attribute vectors "
+                "are appended by chunks to one file per thread, "
+                "merged at the end of the simulation. ",
+                "allowed_values": ("root", "hdf5", "npy"),
+            },
+        ),
     }
 
-    default_suffix = "root"
-
     @classmethod
     def get_user_info_default_values_interface(cls, **kwargs):
         defaults = super().get_user_info_default_values_interface(**kwargs)
@@ -921,6 +976,14 @@ class ActorOutputRoot(ActorOutputBase):
                 )
         super().set_user_info_default_values_interface(**kwargs)
 
+    @property
+    def default_suffix(self):
+        return columnar_output_suffixes[self.output_format]
+
+    @property
+    def is_columnar(self):
+        return self.output_format != "root"
+
     def get_output_path(self, *args, **kwargs):
         if "which" in kwargs and kwargs["which"] != "merged":
             self.warn_user(
@@ -929,6 +992,56 @@ class ActorOutputRoot(ActorOutputBase):
             )
         return super().get_output_path(which="merged")
 
+    def inplace_merge_with(self, other):
+        # ROOT data are not kept in memory but written from the C++ side,
+        # so the merging is done on the files via merge_output_files()
+        return self
+
+    def merge_output_files(self, paths, remove_parts=True):
+        """Concatenate the trees stored in the ROOT files (or the columnar outputs)
+        listed in paths and write them to the output path of this actor output.
+        The tables of the numeric volume IDs are merged as well.
+        """
+        merge_volume_id_tables(paths, self.get_output_path(), remove_parts)
+        if self.is_columnar:
+            paths = [Path(p) for p in paths if Path(p).exists()]
+            if len(paths) == 0:
+                return
+            merge_columnar_outputs(paths, self.get_output_path(), self.output_format)
+            if remove_parts is True:
+                for p in paths:
+                    if p.is_dir():
+                        shutil.rmtree(p)
+                    else:
+                        p.unlink()
+            return
+
+        import uproot
+        import awkward as ak
+
+        paths = [Path(p) for p in paths if Path(p).is_file()]
+        if len(paths) == 0:
+            return
+        trees = {}
+        for p in paths:
+            with uproot.open(p) as f:
+                for tree_name in f.keys(recursive=False, cycle=False):
+                    if not isinstance(f[tree_name], uproot.TTree):
+                        continue
+                    trees.setdefault(tree_name, []).append(f[tree_name].arrays())
+        with uproot.recreate(self.get_output_path()) as f:
+            for tree_name, arrays in trees.items():
+                # keep at least one (possibly empty) array to preserve the branches
+                arrays = [a for a in arrays if len(a) > 0] or arrays[:1]
+                merged = ak.concatenate(arrays)
+                # explicitly create a TTree (assigning an array creates a RNTuple)
+                f.mktree(tree_name, {k: merged[k].type for k in merged.fields})
+                if len(merged) > 0:
+                    f[tree_name].extend({k: merged[k] for k in merged.fields})
+        if remove_parts is True:
+            for p in paths:
+                p.unlink()
+
     def initialize(self):
         # Warning, for the moment, MT and root output does not work on windows machine
         if sys.platform.startswith("nt"):
@@ -941,20 +1054,51 @@ class ActorOutputRoot(ActorOutputBase):
         # for ROOT output, not output_filename means no output to disk (legacy Gate 9 behavior)
         if self.output_filename == "" or self.output_filename is None:
             self.write_to_disk = False
+        # the C++ side writes the columns in an empty folder.
+        # A previous hdf5 file is removed, several actors may then add
+        # their table to the same file (npy collection folders are replaced)
+        if self.is_columnar and self.write_to_disk is True:
+            output_path = self.get_output_path()
+            if self.output_format == "hdf5" and output_path.is_file():
+                output_path.unlink()
+            parts_path = get_column_parts_path(output_path)
+            shutil.rmtree(parts_path, ignore_errors=True)
+            parts_path.mkdir(parents=True)
+        # the table of the numeric volume IDs is (re)written at the end
+        if self.write_to_disk is True:
+            get_volume_id_table_path(self.get_output_path()).unlink(missing_ok=True)
         self.initialize_cpp_parameters()
         super().initialize()
 
     def initialize_cpp_parameters(self):
         self.belongs_to_actor.AddActorOutputInfo(self.name)
         self.belongs_to_actor.SetWriteToDisk(self.name, self.write_to_disk)
+        self.belongs_to_actor.SetOutputFormat(self.name, self.output_format)
         if self.output_filename == "" or self.output_filename is None:
             # this test avoid a warning in get_output_path when it is None
             self.belongs_to_actor.SetOutputPath(self.name, "None")
+        elif self.is_columnar:
+            self.belongs_to_actor.SetOutputPath(
+                self.name,
+                ensure_filename_is_str(get_column_parts_path(self.get_output_path())),
+            )
         else:
             self.belongs_to_actor.SetOutputPath(
                 self.name, self.get_output_path_as_string()
             )
 
+    def finalize_output_files(self):
+        """Merge the column files written by all threads into the final output."""
+        if not self.is_columnar or self.write_to_disk is False:
+            return
+        parts_path = get_column_parts_path(self.get_output_path())
+        if not parts_path.is_dir():
+            return
+        write_columns(
+            self.get_output_path(), read_column_parts(parts_path), self.output_format
+        )
+        shutil.rmtree(parts_path)
+
 
 process_cls(ActorOutputBase)
 process_cls(ActorOutputUsingDataItemContainer)
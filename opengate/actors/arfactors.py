@@ -1,6 +1,7 @@
 from box import Box
 import numpy as np
 import itk
+import queue
 import threading
 
 import opengate_core as g4
@@ -14,6 +15,7 @@ from .actoroutput import ActorOutputSingleImage, ActorOutputRoot
 from ..base import process_cls
 
 garf = LazyModuleLoader("garf")
+torch = LazyModuleLoader("torch")
 
 
 def check_channel_overlap(ch1, ch2):
@@ -144,6 +146,88 @@ def _setter_hook_image_spacing(self, image_spacing):
     return [float(s) for s in image_spacing]
 
 
+class ARFInferenceEngine:
+    """
+    Applies the ARF model of an ARFActor in a dedicated thread.
+    The simulation threads hand their batches of hits to a queue (numpy arrays
+    that own the C++ buffers, without copy) and keep on tracking while the model runs.
+    The batches of all threads waiting in the queue are coalesced into larger model
+    calls. Only this thread accumulates the results in the output arrays of the actor.
+    """
+
+    def __init__(self, actor, batch_size, queue_size, num_threads=None):
+        self.actor = actor
+        self.batch_size = int(batch_size)
+        self.num_threads = num_threads
+        # bounded: the simulation threads wait if the model is too slow
+        self.queue = queue.Queue(maxsize=int(queue_size))
+        self.thread = None
+        self.error = None
+
+    def start(self):
+        if self.num_threads is not None:
+            torch.set_num_threads(int(self.num_threads))
+        self.thread = threading.Thread(
+            target=self._run, name=f"ARF_{self.actor.name}", daemon=True
+        )
+        self.thread.start()
+
+    def submit(self, run_id, hits):
+        # called by the simulation threads
+        self.queue.put((run_id, hits))
+
+    def flush(self):
+        """Wait until all the submitted batches are processed."""
+        self.queue.join()
+        if self.error is not None:
+            fatal(
+                f"Error during the ARF inference of '{self.actor.name}': {self.error}"
+            )
+
+    def stop(self):
+        if self.thread is None:
+            return
+        self.queue.put(None)
+        self.thread.join()
+        self.thread = None
+
+    def _next_batches(self):
+        # wait for a batch, then take the ones already in the queue
+        items = [self.queue.get()]
+        n = 0 if items[0] is None else len(items[0][1]["Energy"])
+        while items[-1] is not None and n < self.batch_size:
+            try:
+                items.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+            if items[-1] is not None:
+                n += len(items[-1][1]["Energy"])
+        return items
+
+    def _run(self):
+        while True:
+            items = self._next_batches()
+            try:
+                # after an error, the queue is still emptied to not block the simulation
+                if self.error is None:
+                    self._process([item for item in items if item is not None])
+            except Exception as e:
+                self.error = e
+            finally:
+                for _ in items:
+                    self.queue.task_done()
+            if items[-1] is None:
+                return
+
+    def _process(self, items):
+        runs = {}
+        for run_id, hits in items:
+            runs.setdefault(run_id, []).append(hits)
+        for run_id, batches in runs.items():
+            hits = {k: np.concatenate([b[k] for b in batches]) for k in batches[0]}
+            self.actor.apply_arf_to_hits(run_id, hits)
+
+
 class ARFActor(ActorBase, g4.GateARFActor):
     """
     The ARF Actor is attached to a volume.
@@ -210,6 +294,37 @@ class ARFActor(ActorBase, g4.GateARFActor):
             "auto",
             {"doc": "FIXME", "allowed_values": ("cpu", "gpu", "auto")},
         ),
+        "async_inference": (
+            True,
+            {
+                "doc": "If True, the model is applied in a dedicated thread: the simulation "
+                "threads hand their batches (of batch_size hits) without copy and keep on tracking. "
+                "Otherwise, the model is applied by each thread in turn, with a lock.",
+            },
+        ),
+        "inference_batch_size": (
+            None,
+            {
+                "doc": "Maximum number of hits of one model call (async_inference only): the "
+                "batches of all threads waiting in the queue are coalesced up to this size. "
+                "By default, batch_size times the number of threads.",
+            },
+        ),
+        "inference_queue_size": (
+            None,
+            {
+                "doc": "Maximum number of batches waiting for the model (async_inference only), "
+                "the simulation threads wait when it is reached (bounded memory). "
+                "By default, twice the number of threads.",
+            },
+        ),
+        "inference_threads": (
+            None,
+            {
+                "doc": "Number of threads used by torch for the model (torch.set_num_threads). "
+                "By default, torch is not modified.",
+            },
+        ),
     }
 
     user_output_config = {
@@ -235,6 +350,7 @@ class ARFActor(ActorBase, g4.GateARFActor):
         self.detected_particles = 0
         # need a lock when the ARF is applied
         self.lock = None
+        self.inference_engine = None
         # local variables
         self.image_plane_spacing = None
         self.image_plane_size_pixel = None
@@ -265,6 +381,7 @@ class ARFActor(ActorBase, g4.GateARFActor):
         return_dict = super().__getstate__()
         return_dict["nn"] = None
         return_dict["lock"] = None
+        return_dict["inference_engine"] = None
         return_dict["model"] = None
         return return_dict
 
@@ -290,6 +407,7 @@ class ARFActor(ActorBase, g4.GateARFActor):
         self.InitializeUserInfo(self.user_info)
         self.InitializeCpp()
         self.SetARFFunction(self.apply)
+        self.initialize_inference_engine()
 
     def initialize_model(self):
         # load the pth file
@@ -320,6 +438,23 @@ class ARFActor(ActorBase, g4.GateARFActor):
         self.model_data["current_gpu_mode"] = current_gpu_mode
         self.model.to(current_gpu_device)
 
+    def initialize_inference_engine(self):
+        if not self.async_inference:
+            if self.inference_threads is not None:
+                torch.set_num_threads(int(self.inference_threads))
+            return
+        n = max(1, self.simulation.number_of_threads)
+        batch_size = self.inference_batch_size
+        if batch_size is None:
+            batch_size = self.batch_size * n
+        queue_size = self.inference_queue_size
+        if queue_size is None:
+            queue_size = 2 * n
+        self.inference_engine = ARFInferenceEngine(
+            self, batch_size, queue_size, self.inference_threads
+        )
+        self.inference_engine.start()
+
     def initialize_params(self):
         # output image: nb of energy windows times nb of runs (for rotation)
         self.nb_ene = self.model_data["n_ene_win"]
@@ -344,22 +479,32 @@ class ARFActor(ActorBase, g4.GateARFActor):
         self.output_image = np.zeros(self.output_size, dtype=np.float64)
 
     def apply(self, actor):
+        # the batch of hits of the current thread is moved from the cpp side (no copy)
+        run_id = actor.GetCurrentRunId()
+        hits = actor.TakeBatchArrays()
+        if self.inference_engine is not None:
+            self.inference_engine.submit(run_id, hits)
         # we need a lock when the ARF is applied
-        if self.simulation.use_multithread:
+        elif self.simulation.use_multithread:
             with self.lock:
-                self.arf_build_image_from_projected_points(actor)
+                self.apply_arf_to_hits(run_id, hits)
         else:
-            self.arf_build_image_from_projected_points(actor)
+            self.apply_arf_to_hits(run_id, hits)
 
     def arf_build_image_from_projected_points(self, actor):
         # get values from the cpp side
-        energy = np.array(actor.GetEnergy())
-        pos_x = np.array(actor.GetPositionX())
-        pos_y = np.array(actor.GetPositionY())
-        dir_x = np.array(actor.GetDirectionX())
-        dir_y = np.array(actor.GetDirectionY())
-        dir_z = np.array(actor.GetDirectionZ())
-        weights = np.array(actor.GetWeights())
+        self.apply_arf_to_hits(actor.GetCurrentRunId(), actor.TakeBatchArrays())
+
+    def apply_arf_to_hits(self, run_id, hits):
+        """Apply the ARF model to the hits (dict of arrays, see GateARFActor::TakeBatch)
+        and add the resulting counts to the image of the run."""
+        energy = hits["Energy"]
+        pos_x = hits["PositionX"]
+        pos_y = hits["PositionY"]
+        dir_x = hits["DirectionX"]
+        dir_y = hits["DirectionY"]
+        dir_z = hits["DirectionZ"]
+        weights = hits["Weights"]
 
         # do nothing if no hits
         if energy.size == 0:
@@ -394,7 +539,6 @@ class ARFActor(ActorBase, g4.GateARFActor):
 
         # do nothing if there is no hit in the image
         if u.shape[0] != 0:
-            run_id = actor.GetCurrentRunId()
             s = self.nb_ene * run_id
             img = self.output_array[s : s + self.nb_ene]
             garf.image_from_coordinates_add_numpy(
@@ -412,6 +556,10 @@ class ARFActor(ActorBase, g4.GateARFActor):
     def EndOfRunActionMasterThread(self, run_index):
         nb_slice = self.nb_ene
 
+        # all the batches of the run must be processed
+        if self.inference_engine is not None:
+            self.inference_engine.flush()
+
         # convert to itk image
         # FIXME: this should probably go into EndOfRunAction
         output_image = itk.image_from_array(self.output_array)
@@ -450,6 +598,9 @@ class ARFActor(ActorBase, g4.GateARFActor):
         return 0
 
     def EndSimulationAction(self):
+        if self.inference_engine is not None:
+            self.inference_engine.stop()
+            self.inference_engine = None
         g4.GateARFActor.EndSimulationAction(self)
         ActorBase.EndSimulationAction(self)
         # process the remaining elements in the batch
@@ -615,5 +615,12 @@ class ActorBase(GateObject):
         """Default virtual method for inheritance"""
         pass
 
+    def finalize_output_files(self):
+        """Called once the EndSimulationAction of all actors have been executed,
+        i.e. when the files written from the C++ side (ROOT) are closed.
+        Default virtual method for inheritance"""
+        for v in self.user_output.values():
+            v.finalize_output_files()
+
 
 process_cls(ActorBase)
@@ -288,6 +288,12 @@ class ActorOutputScatterSplittingFreeFlightActor(ActorOutputBase):
         self.split_info.compton_splitting_factor = 1
         self.split_info.rayleigh_splitting_factor = 1
 
+    def inplace_merge_with(self, other):
+        for k, v in other.split_info.items():
+            if k.startswith("nb_"):
+                self.split_info[k] += v
+        return self
+
     def get_processed_output(
         self, infos, compton_splitting_factor, rayleigh_splitting_factor
     ):
@@ -1,4 +1,6 @@
 from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import heapq
 from itertools import chain
 
 import awkward as ak
@@ -13,6 +15,24 @@ from opengate.contrib.root_helpers import *
 
 logger = logging.getLogger(__name__)
 
+# branches of the singles tree needed to sort the coincidences
+coincidences_required_branches = {
+    "EventID",
+    "GlobalTime",
+    "TotalEnergyDeposit",
+    "PostPosition_X",
+    "PostPosition_Y",
+    "PostPosition_Z",
+}
+
+# default branches identifying the volume of the singles, the first one present
+# is used. The integer IDs are unique over the whole geometry and are compared
+# directly, which is faster than hashing the strings
+coincidences_default_volume_id_branches = [
+    "PreStepUniqueVolumeIDAsInt",
+    "PreStepUniqueVolumeID",
+]
+
 
 class ChunkSizeTooSmallError(Exception):
     pass
@@ -24,6 +44,7 @@ class CoincidenceOutputFile:
         self.file_path = file_path
         self.format = file_format
         self.empty = True
+        self.num_rows = 0
 
         if self.format == "root":
             # recreate() deletes the file that may already exist with the same name.
@@ -57,16 +78,13 @@ class CoincidenceOutputFile:
                     coincidences_to_write_data,
                 )
             else:
-                coincidences_tree = self.file[table_name]
-                coincidences_data = root_tree_get_branch_data(coincidences_tree)
-                coincidences_types = root_tree_get_branch_types(coincidences_data)
-                root_write_tree(
-                    self.file,
-                    table_name,
-                    coincidences_types,
-                    coincidences_data + coincidences_to_write_data,
-                )
+                # append the batch to the tree created with the first batch
+                self.file[table_name].extend(coincidences_to_write_data)
         elif self.format == "hdf5":
+            # continuous index over the batches, as for a single DataFrame
+            coincidences.index = pd.RangeIndex(
+                self.num_rows, self.num_rows + len(coincidences)
+            )
             coincidences.to_hdf(
                 self.file_path,
                 key=table_name,
@@ -75,6 +93,7 @@ class CoincidenceOutputFile:
                 append=True,
                 index=False,
             )
+        self.num_rows += len(coincidences)
         self.empty = False
 
     def close(self):
@@ -93,6 +112,10 @@ def coincidences_sorter(
     return_type="dict",
     output_file_path=None,
     output_file_format="root",
+    engine="pandas",
+    output_branches=None,
+    n_workers=1,
+    volume_id_branch=None,
 ):
     """
     Sort singles and detect coincidences.
@@ -112,6 +135,19 @@ def coincidences_sorter(
     :param return_type: "dict" or "pd"
     :param output_file_path: if provided, the coincidences will be saved to the given file path
     :param output_file_format: "root" or "hdf5"
+    :param engine: "pandas" (default) restarts with a doubled chunk size when the singles are
+            too much out of time order, "numpy" streams the singles through a time-ordered buffer
+            and never restarts. Both give the same coincidences.
+    :param output_branches: list of the branches of the singles to copy into the coincidences
+            (default: all branches). Only used by the "numpy" engine.
+    :param n_workers: number of processes sorting GlobalTime partitions of the singles in parallel
+            (only with the "numpy" engine). The result does not depend on n_workers.
+            Each process opens the file again, so the tree must be read from a local file,
+            otherwise a single process is used.
+    :param volume_id_branch: branch identifying the volume of the singles, coincidences between
+            singles in the same volume are removed. By default, PreStepUniqueVolumeIDAsInt if present,
+            otherwise PreStepUniqueVolumeID. Integer IDs (e.g. GroupVolumeIDAsInt of the adder)
+            are compared directly, which is faster than hashing the strings.
     :return: if output_file_path is given, the return value is None, otherwise the coincidences are returned
              as a dict of events (return_type "dict") or a pandas DataFrame (return_type "pd")
 
@@ -122,16 +158,8 @@ def coincidences_sorter(
     """
 
     # Check the availability of the necessary branches in the root file
-    required_branches = {
-        "EventID",
-        "GlobalTime",
-        "PreStepUniqueVolumeID",
-        "TotalEnergyDeposit",
-        "PostPosition_X",
-        "PostPosition_Y",
-        "PostPosition_Z",
-    }
-    missing_branches = required_branches - set(singles_tree.keys())
+    volume_id_branch = get_volume_id_branch(singles_tree.keys(), volume_id_branch)
+    missing_branches = coincidences_required_branches - set(singles_tree.keys())
     if missing_branches:
         if len(missing_branches) == 1:
             raise ValueError(
@@ -178,6 +206,63 @@ def coincidences_sorter(
         if not output_file_path:
             raise ValueError(f"Output file path has not been provided")
 
+    known_engines = ["numpy", "pandas"]
+    if engine not in known_engines:
+        raise ValueError(f"Unknown engine '{engine}', must be one of {known_engines}")
+    if n_workers > 1 and engine != "numpy":
+        raise ValueError(f"n_workers > 1 is only supported with the 'numpy' engine")
+
+    if engine == "numpy":
+        output_file = None
+        if output_file_path:
+            output_file = CoincidenceOutputFile(output_file_path, output_file_format)
+        coincidences_to_return = []
+        kwargs = dict(
+            policy=policy,
+            min_transaxial_distance=min_transaxial_distance,
+            transaxial_plane=transaxial_plane,
+            max_axial_distance=max_axial_distance,
+            output_branches=output_branches,
+            volume_id_branch=volume_id_branch,
+        )
+        if n_workers > 1 and get_singles_tree_local_path(singles_tree) is None:
+            # the workers open the file again: not possible for remote or in-memory trees
+            logger.warning(
+                f"The singles tree is not in a local file, n_workers={n_workers} "
+                f"is ignored and the coincidences are sorted in a single process"
+            )
+            n_workers = 1
+        if n_workers > 1:
+            batches = parallel_stream_coincidences(
+                singles_tree, time_window, n_workers, chunk_size=chunk_size, **kwargs
+            )
+        else:
+            batches = stream_coincidences(
+                singles_tree, time_window, chunk_size=chunk_size, **kwargs
+            )
+        try:
+            for coincidences in batches:
+                coincidences = pd.DataFrame(coincidences)
+                if output_file_path:
+                    output_file.add(coincidences)
+                else:
+                    coincidences_to_return.append(coincidences)
+        finally:
+            if output_file_path:
+                output_file.close()
+        if output_file_path is None:
+            if len(coincidences_to_return) == 0:
+                coincidences_to_return = pd.DataFrame()
+            else:
+                coincidences_to_return = pd.concat(
+                    coincidences_to_return, axis=0, ignore_index=True
+                )
+            if return_type == "dict":
+                return coincidences_to_return.to_dict(orient="list")
+            elif return_type == "pd":
+                return coincidences_to_return
+        return None
+
     # Since singles in the root file are not guaranteed to be sorted by GlobalTime
     # (especially in the case of multithreaded simulation), singles in one chunk
     # may be more recent than the singles in the next chunk.
@@ -215,7 +300,7 @@ def coincidences_sorter(
                 queue.append(chunk_pd)
                 # Process a chunk, unless only one has been read so far
                 if len(queue) > 1:
-                    coincidences = process_chunk(queue, time_window)
+                    coincidences = process_chunk(queue, time_window, volume_id_branch)
                     # Before filtering coincidences, we want to make sure that we have all
                     # coincidences that belong to the same time window (same SingleIndex1 value).
                     # When processing the next chunk of singles, we may still find one or more
@@ -258,7 +343,7 @@ def coincidences_sorter(
                 num_singles += num_singles_in_chunk
 
             # At this point, all chunks have been read. Now process the last chunk.
-            coincidences_to_filter = process_chunk(queue, time_window)
+            coincidences_to_filter = process_chunk(queue, time_window, volume_id_branch)
             if coincidences_to_transfer is not None:
                 coincidences_to_filter = pd.concat(
                     [coincidences_to_transfer, coincidences_to_filter],
@@ -314,7 +399,429 @@ def coincidences_sorter(
             return coincidences_to_return
 
 
-def process_chunk(queue, time_window):
+def get_volume_id_branch(branches, volume_id_branch=None):
+    """
+    Returns the branch identifying the volume of the singles: volume_id_branch if given,
+    otherwise the first of coincidences_default_volume_id_branches present in branches.
+    """
+    branches = set(branches)
+    if volume_id_branch is None:
+        volume_id_branch = next(
+            (b for b in coincidences_default_volume_id_branches if b in branches),
+            coincidences_default_volume_id_branches[-1],
+        )
+    if volume_id_branch not in branches:
+        raise ValueError(
+            f"Volume ID branch {volume_id_branch} is missing in singles tree"
+        )
+    return volume_id_branch
+
+
+def get_volume_id_keys(volume_ids):
+    """
+    Integer keys identifying the volumes, to exclude the coincidences between singles
+    in the same volume: the integer IDs are used as is, the strings are hashed
+    (calculating and comparing hash values is much faster than comparing strings).
+    """
+    volume_ids = np.asarray(volume_ids)
+    if volume_ids.dtype.kind in "iu":
+        return volume_ids.astype(np.int64, copy=False)
+    return pd.util.hash_array(np.asarray(volume_ids, dtype=object))
+
+
+def stream_coincidences(
+    singles_tree,
+    time_window,
+    policy,
+    min_transaxial_distance,
+    transaxial_plane,
+    max_axial_distance,
+    chunk_size=100000,
+    output_branches=None,
+    time_range=None,
+    chunks=None,
+    volume_id_branch=None,
+):
+    """
+    Generator yielding the coincidences, as a dict of NumPy arrays, batch by batch.
+
+    A first, light pass reads only the GlobalTime branch to know the earliest time
+    of each chunk. The chunks are split into runs of consecutive chunks whose earliest
+    times do not decrease (e.g. one run per file for concatenated time-sorted files),
+    and the runs are read with a k-way merge: the next chunk read is always the one
+    with the earliest time among the next chunks of all runs. The singles are merged
+    into a buffer sorted by time. Singles that are earlier than the earliest time of
+    the next chunks minus the time window cannot form a coincidence with a future single,
+    so all the coincidences they open are complete: they are detected, filtered with
+    the policy and yielded, and the singles are removed from the buffer.
+    The buffer therefore only holds about one chunk per run plus the out of order singles,
+    and the sorting never restarts, whatever the time ordering of the singles.
+
+    If time_range (t_start, t_stop) is given, only the coincidences opened by a single
+    with t_start <= GlobalTime < t_stop are yielded. The chunks (as returned by
+    scan_singles_times) can be given to skip the first pass.
+    The volume of the singles is identified by volume_id_branch (see get_volume_id_branch).
+    """
+    if policy not in numpy_policy_functions:
+        raise ValueError(
+            f"Unknown policy '{policy}', must be one of {numpy_policy_functions.keys()}"
+        )
+    if time_range is None:
+        time_range = (-np.inf, np.inf)
+    t_start, t_stop = time_range
+
+    # pass 1: time extent of each chunk
+    if chunks is None:
+        chunks, _ = scan_singles_times(singles_tree, chunk_size)
+    # only the chunks with singles in [t_start, t_stop + time_window] are needed
+    chunks = [c for c in chunks if c[3] >= t_start and c[2] <= t_stop + time_window]
+    # earliest time of the (needed) singles in each chunk
+    chunk_min_times = [max(c[2], t_start) for c in chunks]
+    # heap of the next chunk of each run: (earliest time, chunk index, last chunk of the run)
+    next_chunks = [
+        (chunk_min_times[first], first, last)
+        for first, last in split_chunks_in_sorted_runs(chunk_min_times)
+    ]
+    heapq.heapify(next_chunks)
+
+    # pass 2: only read the branches that are needed
+    all_branches = list(singles_tree.keys())
+    volume_id_branch = get_volume_id_branch(all_branches, volume_id_branch)
+    if output_branches is None:
+        output_branches = all_branches
+    else:
+        output_branches = [b for b in all_branches if b in set(output_branches)]
+    branches = [
+        b
+        for b in all_branches
+        if b in set(output_branches)
+        or b in coincidences_required_branches
+        or b == volume_id_branch
+    ]
+
+    buffer = None
+    while len(next_chunks) > 0:
+        _, i, last = heapq.heappop(next_chunks)
+        if i < last:
+            heapq.heappush(next_chunks, (chunk_min_times[i + 1], i + 1, last))
+        entry_start, entry_stop = chunks[i][0], chunks[i][1]
+        chunk = singles_tree.arrays(
+            branches, entry_start=entry_start, entry_stop=entry_stop, library="np"
+        )
+        # index of the singles in the tree, used to identify the time windows
+        chunk["SingleIndex"] = np.arange(entry_start, entry_stop)
+        if t_start > -np.inf or t_stop < np.inf:
+            t = chunk["GlobalTime"]
+            in_range = (t >= t_start) & (t <= t_stop + time_window)
+            chunk = {k: v[in_range] for k, v in chunk.items()}
+        # integer keys of the volume IDs, much faster to compare than the strings
+        chunk["VolumeIDHash"] = get_volume_id_keys(chunk[volume_id_branch])
+        buffer = merge_sorted_singles(buffer, chunk)
+
+        # singles before this time open only complete time windows
+        future_min_time = next_chunks[0][0] if len(next_chunks) > 0 else np.inf
+        horizon = min(future_min_time - time_window, t_stop)
+        num_complete = int(np.searchsorted(buffer["GlobalTime"], horizon, side="left"))
+        if num_complete == 0:
+            continue
+        yield detect_coincidences_in_sorted_singles(
+            buffer,
+            num_complete,
+            time_window,
+            policy,
+            min_transaxial_distance,
+            transaxial_plane,
+            max_axial_distance,
+            output_branches,
+        )
+        buffer = {k: v[num_complete:] for k, v in buffer.items()}
+
+
+def split_chunks_in_sorted_runs(chunk_min_times):
+    """
+    Splits the chunks into runs of consecutive chunks whose earliest times do not
+    decrease, so that the earliest time of the next chunk of a run is a lower bound
+    of the times of all the singles still to come in this run.
+    Returns the list of (first, last) chunk indices of the runs.
+    """
+    if len(chunk_min_times) == 0:
+        return []
+    starts = np.flatnonzero(np.diff(chunk_min_times) < 0) + 1
+    firsts = np.concatenate(([0], starts))
+    lasts = np.concatenate((starts - 1, [len(chunk_min_times) - 1]))
+    return list(zip(firsts.tolist(), lasts.tolist()))
+
+
+def scan_singles_times(singles_tree, chunk_size, sample_size=0):
+    """
+    Reads only the GlobalTime branch and returns the list of chunks as tuples
+    (entry_start, entry_stop, min time, max time), and a sample of about
+    sample_size times (to estimate the time distribution).
+    """
+    chunks = []
+    samples = []
+    num_entries = int(singles_tree.num_entries)
+    stride = max(1, num_entries // sample_size) if sample_size > 0 else 0
+    entry_start = 0
+    for chunk in singles_tree.iterate(
+        ["GlobalTime"], step_size=chunk_size, library="np"
+    ):
+        t = chunk["GlobalTime"]
+        entry_stop = entry_start + len(t)
+        if len(t) > 0:
+            chunks.append((entry_start, entry_stop, np.min(t), np.max(t)))
+            if stride > 0:
+                samples.append(t[(-entry_start) % stride :: stride])
+        entry_start = entry_stop
+    if len(samples) > 0:
+        samples = np.concatenate(samples)
+    else:
+        samples = np.zeros(0)
+    return chunks, samples
+
+
+def sort_coincidences_in_time_range(file_path, tree_path, time_range, chunks, kwargs):
+    """
+    Worker of the parallel coincidences sorter: opens the singles tree and returns
+    all the coincidences opened in the time range, as one dict of NumPy arrays.
+    """
+    with uproot.open(file_path) as f:
+        batches = list(
+            stream_coincidences(
+                f[tree_path], time_range=time_range, chunks=chunks, **kwargs
+            )
+        )
+    if len(batches) == 0:
+        return None
+    return {k: np.concatenate([b[k] for b in batches]) for k in batches[0]}
+
+
+def parallel_stream_coincidences(
+    singles_tree, time_window, n_workers, chunk_size=100000, **kwargs
+):
+    """
+    Generator yielding the coincidences, as a dict of NumPy arrays, partition by partition.
+    The singles are split into GlobalTime partitions, with about the same number of singles,
+    each one sorted by a process of the pool. Each worker also reads the singles up to
+    time_window after its partition, so the time windows at the boundaries are complete
+    and each coincidence is found by exactly one worker. The partitions are yielded
+    in time order, so the result is identical to stream_coincidences.
+    """
+    file_path = get_singles_tree_local_path(singles_tree)
+    if file_path is None:
+        raise ValueError(
+            "The parallel coincidences sorter needs a singles tree read from a local file, "
+            "since each worker opens the file again"
+        )
+    # more partitions than workers to balance the load and bound the memory
+    n_partitions = 4 * n_workers
+    chunks, samples = scan_singles_times(
+        singles_tree, chunk_size, sample_size=100 * n_partitions
+    )
+    if len(samples) == 0:
+        return
+    boundaries = np.unique(np.quantile(samples, np.linspace(0, 1, n_partitions + 1)))
+    boundaries[0] = -np.inf
+    boundaries[-1] = np.inf
+    time_ranges = list(zip(boundaries[:-1], boundaries[1:]))
+
+    kwargs["time_window"] = time_window
+    kwargs["chunk_size"] = chunk_size
+    tree_path = singles_tree.object_path
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        futures = deque()
+        for time_range in time_ranges:
+            futures.append(
+                executor.submit(
+                    sort_coincidences_in_time_range,
+                    file_path,
+                    tree_path,
+                    time_range,
+                    chunks,
+                    kwargs,
+                )
+            )
+            # results are consumed in the order of the partitions,
+            # with a bounded number of partitions waiting in memory
+            while len(futures) >= 2 * n_workers or (
+                time_range is time_ranges[-1] and len(futures) > 0
+            ):
+                coincidences = futures.popleft().result()
+                if coincidences is not None:
+                    yield coincidences
+
+
+def get_singles_tree_local_path(singles_tree):
+    """
+    Path of the local file of the singles tree, or None if the tree is not read
+    from a local file (e.g. remote file or in-memory file object).
+    """
+    file = getattr(singles_tree, "file", None)
+    file_path = getattr(file, "file_path", None)
+    if not isinstance(file_path, (str, os.PathLike)) or not os.path.isfile(file_path):
+        return None
+    return file_path
+
+
+def merge_sorted_singles(buffer, chunk):
+    """
+    Merges a chunk of singles into the buffer of singles already sorted by time.
+    Singles with the same time are kept in the order of the tree.
+    """
+    if buffer is not None:
+        chunk = {k: np.concatenate((buffer[k], chunk[k])) for k in buffer}
+    order = np.lexsort((chunk["SingleIndex"], chunk["GlobalTime"]))
+    return {k: v[order] for k, v in chunk.items()}
+
+
+def detect_coincidences_in_sorted_singles(
+    singles,
+    num_first,
+    time_window,
+    policy,
+    min_transaxial_distance,
+    transaxial_plane,
+    max_axial_distance,
+    output_branches,
+):
+    """
+    Finds the coincidences opened by the first num_first singles of the time-sorted
+    singles, applies the policy and returns the selected coincidences as a dict of
+    NumPy arrays with the branches name1, name2 for each branch in output_branches.
+    """
+    t = singles["GlobalTime"]
+    # pairs (i, i + offset), for increasing offsets. Since the singles are sorted,
+    # a single that has no partner at a given offset has none at larger offsets.
+    first = []
+    candidates = np.arange(num_first)
+    offset = 1
+    while len(candidates) > 0:
+        candidates = candidates[candidates + offset < len(t)]
+        candidates = candidates[t[candidates + offset] - t[candidates] <= time_window]
+        first.append(candidates)
+        offset += 1
+    second = [f + k + 1 for k, f in enumerate(first)]
+    first = np.concatenate(first)
+    second = np.concatenate(second)
+    # group the pairs by time window (opening single), in time order
+    order = np.lexsort((second, first))
+    first = first[order]
+    second = second[order]
+    # remove the coincidences between singles in the same volume
+    different_volumes = (
+        singles["VolumeIDHash"][first] != singles["VolumeIDHash"][second]
+    )
+    first = first[different_volumes]
+    second = second[different_volumes]
+
+    # apply the policy
+    selected = numpy_policy_functions[policy](
+        singles,
+        first,
+        second,
+        min_transaxial_distance,
+        transaxial_plane,
+        max_axial_distance,
+    )
+    first = first[selected]
+    second = second[selected]
+
+    coincidences = {}
+    for name in output_branches:
+        coincidences[f"{name}1"] = singles[name][first]
+        coincidences[f"{name}2"] = singles[name][second]
+    return coincidences
+
+
+def numpy_goods_mask(
+    singles,
+    first,
+    second,
+    min_transaxial_distance,
+    transaxial_plane,
+    max_axial_distance,
+):
+    if transaxial_plane not in ("xy", "yz", "xz"):
+        raise ValueError(
+            f"Invalid transaxial_plane: '{transaxial_plane}'. Expected one of 'xy', 'yz' or 'xz'."
+        )
+    a, b = [singles[f"PostPosition_{c.upper()}"] for c in transaxial_plane]
+    axial_coordinate = (set("xyz") - set(transaxial_plane)).pop().upper()
+    z = singles[f"PostPosition_{axial_coordinate}"]
+    td = np.sqrt((a[first] - a[second]) ** 2 + (b[first] - b[second]) ** 2)
+    ad = np.abs(z[first] - z[second])
+    return (td >= min_transaxial_distance) & (ad <= max_axial_distance)
+
+
+def numpy_window_sizes(first, mask=None):
+    """
+    Number of (masked) coincidences in the time window of each coincidence.
+    """
+    if mask is None:
+        mask = np.ones(len(first), dtype=bool)
+    windows, inverse = np.unique(first, return_inverse=True)
+    counts = np.bincount(inverse, weights=mask, minlength=len(windows))
+    return counts[inverse].astype(int)
+
+
+def numpy_winners(singles, first, second, mask):
+    """
+    Mask of the coincidences with the highest total energy in their time window,
+    among the masked ones. In case of equality, the first coincidence is the winner.
+    """
+    indices = np.nonzero(mask)[0]
+    energy = singles["TotalEnergyDeposit"]
+    e = energy[first[indices]] + energy[second[indices]]
+    order = np.lexsort((indices, -e, first[indices]))
+    f = first[indices][order]
+    is_winner = np.ones(len(order), dtype=bool)
+    is_winner[1:] = f[1:] != f[:-1]
+    winners = np.zeros(len(first), dtype=bool)
+    winners[indices[order][is_winner]] = True
+    return winners
+
+
+def numpy_remove_multiples(singles, first, second, *args):
+    alone = numpy_window_sizes(first) == 1
+    return alone & numpy_goods_mask(singles, first, second, *args)
+
+
+def numpy_take_all_goods(singles, first, second, *args):
+    return numpy_goods_mask(singles, first, second, *args)
+
+
+def numpy_take_winner_of_goods(singles, first, second, *args):
+    goods = numpy_goods_mask(singles, first, second, *args)
+    return numpy_winners(singles, first, second, goods)
+
+
+def numpy_take_if_only_one_good(singles, first, second, *args):
+    goods = numpy_goods_mask(singles, first, second, *args)
+    return goods & (numpy_window_sizes(first, goods) == 1)
+
+
+def numpy_take_winner_if_is_good(singles, first, second, *args):
+    winners = numpy_winners(singles, first, second, np.ones(len(first), dtype=bool))
+    return winners & numpy_goods_mask(singles, first, second, *args)
+
+
+def numpy_take_winner_if_all_are_goods(singles, first, second, *args):
+    goods = numpy_goods_mask(singles, first, second, *args)
+    all_goods = numpy_window_sizes(first, goods) == numpy_window_sizes(first)
+    return numpy_winners(singles, first, second, goods & all_goods)
+
+
+numpy_policy_functions = {
+    "removeMultiples": numpy_remove_multiples,
+    "takeAllGoods": numpy_take_all_goods,
+    "takeWinnerOfGoods": numpy_take_winner_of_goods,
+    "takeIfOnlyOneGood": numpy_take_if_only_one_good,
+    "takeWinnerIfIsGood": numpy_take_winner_if_is_good,
+    "takeWinnerIfAllAreGoods": numpy_take_winner_if_all_are_goods,
+}
+
+
+def process_chunk(queue, time_window, volume_id_branch=None):
     """
     Processes singles in the chunk queue[0],
     possibly transferring some of those singles to the next chunk queue[1].
@@ -336,7 +843,9 @@ def process_chunk(queue, time_window):
             raise ChunkSizeTooSmallError
 
     # Find coincidences in the current chunk
-    coincidences = run_coincidence_detection_in_chunk(chunk, time_window)
+    coincidences = run_coincidence_detection_in_chunk(
+        chunk, time_window, volume_id_branch
+    )
 
     if next_chunk is not None:
         # If there are singles in the current chunk that are beyond t_min
@@ -357,17 +866,16 @@ def process_chunk(queue, time_window):
     return coincidences
 
 
-def run_coincidence_detection_in_chunk(chunk, time_window):
+def run_coincidence_detection_in_chunk(chunk, time_window, volume_id_branch=None):
     """
     Detects coincidences between singles in the given chunk, excluding coincidences
-    between singles in the same volume.
+    between singles in the same volume (see get_volume_id_branch).
     """
-    # Add a temporary column containing hash values of the strings identifying the volumes,
-    # to assist in excluding coincidences between singles in the same volume
-    # (calculating and comparing hash values is much faster than comparing strings).
-    chunk["VolumeIDHash"] = pd.util.hash_pandas_object(
-        chunk["PreStepUniqueVolumeID"], index=False
-    )
+    volume_id_branch = get_volume_id_branch(chunk.columns, volume_id_branch)
+    # Add a temporary column containing integer keys of the volumes (the integer IDs,
+    # or hash values of the strings identifying the volumes), to assist in excluding
+    # coincidences between singles in the same volume.
+    chunk["VolumeIDHash"] = get_volume_id_keys(chunk[volume_id_branch].to_numpy())
     time_np = chunk["GlobalTime"].to_numpy()
     # Sort the time values chronologically (singles in the chunk may not be in chronological order).
     time_np_sorted_indices = np.argsort(time_np)
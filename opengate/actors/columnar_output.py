@@ -0,0 +1,286 @@
+"""
+Columnar output of the digitizers and phase space actors.
+
+During the simulation, the C++ side (GateDigiCollection) appends whole attribute
+vectors to binary files, one file per attribute and per thread, in a "parts" folder:
+<collection>.<attribute id>.<attribute>.<type>.<thread>.bin
+At the end of the simulation, these files are merged into the final output:
+- hdf5: one file with one table per digi collection
+- npy: one folder (suffix .npycol) with one sub-folder per digi collection,
+  in the npy phsp layout: a header and one .npy file per column,
+  so that a phase space can be read by the PhaseSpaceSource.
+As in ROOT, the 3D vectors are split into three columns with the suffix _X, _Y, _Z.
+"""
+
+import shutil
+from pathlib import Path
+
+import numpy as np
+import tables
+
+from ..exception import fatal
+from .npy_phsp import (
+    NpyPhaseSpace,
+    is_npy_phsp,
+    npy_phsp_header_filename,
+    write_npy_phsp_header,
+)
+
+columnar_output_suffixes = {"root": "root", "hdf5": "h5", "npy": "npycol"}
+
+# types of the attributes, see GateTDigiAttribute::WriteToColumnFile
+column_part_dtypes = {"D": np.float64, "I": np.int32, "L": np.int64, "3": np.float64}
+
+
+def get_column_parts_path(output_path):
+    """Folder where the C++ side writes the column files of an output."""
+    output_path = Path(output_path)
+    return output_path.with_name(f"{output_path.name}.parts")
+
+
+def _map_column_part(path, dtype):
+    # (an empty file cannot be memory-mapped)
+    if path.stat().st_size == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r")
+
+
+def _read_string_column_part(path):
+    # each value is terminated by a null character
+    return np.array(path.read_bytes().split(b"\0")[:-1], dtype=bytes)
+
+
+def _thread_sort_key(thread):
+    return -1 if thread == "master" else int(thread)
+
+
+def read_column_parts(parts_path):
+    """
+    Read the column files written by the C++ side in the given folder.
+    Return a dict: collection name -> list of segments (one per thread),
+    a segment being a dict: column name -> array.
+    The numerical columns are memory-mapped.
+    """
+    files = {}
+    for p in Path(parts_path).glob("*.bin"):
+        collection, index, attribute, t, thread = p.name[: -len(".bin")].rsplit(".", 4)
+        files.setdefault(collection, {}).setdefault(thread, []).append(
+            (int(index), attribute, t, p)
+        )
+    collections = {}
+    for collection, threads in files.items():
+        segments = []
+        for thread in sorted(threads, key=_thread_sort_key):
+            segment = {}
+            for index, attribute, t, p in sorted(threads[thread]):
+                if t in ("S", "U"):
+                    segment[attribute] = _read_string_column_part(p)
+                elif t == "3":
+                    a = _map_column_part(p, column_part_dtypes[t]).reshape(-1, 3)
+                    for i, axis in enumerate(("X", "Y", "Z")):
+                        segment[f"{attribute}_{axis}"] = a[:, i]
+                elif t in column_part_dtypes:
+                    segment[attribute] = _map_column_part(p, column_part_dtypes[t])
+                else:
+                    fatal(f"Unknown type '{t}' for the column file {p}")
+            segments.append(segment)
+        collections[collection] = segments
+    return collections
+
+
+def _get_segment_length(segment, name):
+    lengths = set(len(a) for a in segment.values())
+    if len(lengths) > 1:
+        fatal(f"The columns of {name} do not have the same length: {lengths}")
+    return lengths.pop() if len(lengths) > 0 else 0
+
+
+def _get_merged_column_dtypes(segments, name, string_kind):
+    """Column dtypes of all segments, strings are as wide as the longest one."""
+    dtypes = {}
+    for segment in segments:
+        if len(dtypes) > 0 and set(segment.keys()) != set(dtypes.keys()):
+            fatal(f"The parts of {name} do not have the same columns")
+        for k, a in segment.items():
+            dtype = np.dtype(a.dtype)
+            if dtype.kind not in ("S", "U"):
+                dtypes.setdefault(k, dtype)
+                continue
+            width = dtype.itemsize // (4 if dtype.kind == "U" else 1)
+            if k in dtypes:
+                width = max(
+                    width, dtypes[k].itemsize // (4 if string_kind == "U" else 1)
+                )
+            dtypes[k] = np.dtype(f"{string_kind}{max(width, 1)}")
+    return dtypes
+
+
+def _convert_strings(a, kind):
+    a = np.asarray(a)
+    if a.dtype.kind == "S" and kind == "U":
+        return np.char.decode(a, "utf-8")
+    if a.dtype.kind == "U" and kind == "S":
+        return np.char.encode(a, "utf-8")
+    return a
+
+
+def write_columns_hdf5(path, collections, chunk_size=1000000):
+    """
+    Write the collections (see read_column_parts) in a HDF5 file,
+    one table per collection. An existing table with the same name is replaced,
+    the other ones are kept (several actors may share the same file).
+    """
+    chunk_size = int(chunk_size)
+    with tables.open_file(path, mode="a") as f:
+        for name, segments in collections.items():
+            dtypes = _get_merged_column_dtypes(segments, name, "S")
+            description = np.dtype(list(dtypes.items()))
+            lengths = [_get_segment_length(s, name) for s in segments]
+            if f"/{name}" in f:
+                f.remove_node("/", name)
+            table = f.create_table(
+                "/", name, description=description, expectedrows=max(sum(lengths), 1)
+            )
+            for segment, length in zip(segments, lengths):
+                for start in range(0, length, chunk_size):
+                    stop = min(start + chunk_size, length)
+                    rows = np.empty(stop - start, dtype=description)
+                    for k, dtype in dtypes.items():
+                        rows[k] = _convert_strings(segment[k][start:stop], dtype.kind)
+                    table.append(rows)
+            table.flush()
+
+
+def write_npy_phsp_columns(folder, segments, name, chunk_size=1000000):
+    """
+    Write the segments of a collection (see read_column_parts) in a folder
+    in the npy phsp layout: one .npy file per column and a header.
+    The columns keep their type (the strings are stored as unicode).
+    """
+    chunk_size = int(chunk_size)
+    folder = Path(folder)
+    if folder.exists():
+        shutil.rmtree(folder)
+    folder.mkdir(parents=True)
+    dtypes = _get_merged_column_dtypes(segments, name, "U")
+    lengths = [_get_segment_length(s, name) for s in segments]
+    num_entries = sum(lengths)
+    for k, dtype in dtypes.items():
+        if num_entries == 0:
+            np.save(folder / f"{k}.npy", np.empty(0, dtype=dtype))
+            continue
+        output = np.lib.format.open_memmap(
+            folder / f"{k}.npy", mode="w+", dtype=dtype, shape=(num_entries,)
+        )
+        offset = 0
+        for segment, length in zip(segments, lengths):
+            for start in range(0, length, chunk_size):
+                stop = min(start + chunk_size, length)
+                output[offset + start : offset + stop] = _convert_strings(
+                    segment[k][start:stop], dtype.kind
+                )
+            offset += length
+        output.flush()
+        del output
+    write_npy_phsp_header(folder, num_entries, dtypes)
+
+
+def write_columns_npy(path, collections, chunk_size=1000000):
+    """
+    Write the collections (see read_column_parts) in a folder: one sub-folder
+    per collection, in the npy phsp layout.
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    for name, segments in collections.items():
+        write_npy_phsp_columns(path / name, segments, name, chunk_size)
+
+
+def write_columns(path, collections, output_format, chunk_size=1000000):
+    if output_format == "hdf5":
+        write_columns_hdf5(path, collections, chunk_size)
+    elif output_format == "npy":
+        write_columns_npy(path, collections, chunk_size)
+    else:
+        fatal(f"Unknown columnar output format '{output_format}'")
+
+
+def _read_npy_output_collections(path):
+    collections = {}
+    for header_path in sorted(Path(path).glob(f"*/{npy_phsp_header_filename}")):
+        collections[header_path.parent.name] = NpyPhaseSpace(header_path.parent).columns
+    return collections
+
+
+def merge_columnar_outputs(paths, output_path, output_format, chunk_size=1000000):
+    """
+    Concatenate the columnar outputs (hdf5 files or npy folders) listed in paths,
+    collection by collection, and write them to output_path.
+    """
+    collections = {}
+    files = []
+    try:
+        for p in paths:
+            if output_format == "hdf5":
+                f = tables.open_file(p, mode="r")
+                files.append(f)
+                for table in f.iter_nodes("/", classname="Table"):
+                    collections.setdefault(table.name, []).append(
+                        {k: table.colinstances[k] for k in table.colnames}
+                    )
+            else:
+                for name, columns in _read_npy_output_collections(p).items():
+                    collections.setdefault(name, []).append(columns)
+        write_columns(output_path, collections, output_format, chunk_size)
+    finally:
+        for f in files:
+            f.close()
+
+
+def convert_hdf5_output_to_npy_phsp(path, name, npy_phsp_path=None, chunk_size=1000000):
+    """
+    Write the digi collection 'name' of a hdf5 output in the npy phsp layout,
+    by chunks. By default, the output is the hdf5 filename with the suffix .npyphsp.
+    Returns the path of the npy phsp.
+    """
+    path = Path(path)
+    if npy_phsp_path is None:
+        npy_phsp_path = path.with_suffix(".npyphsp")
+    with tables.open_file(path, mode="r") as f:
+        if f"/{name}" not in f:
+            fatal(f"No digi collection {name} in {path}")
+        table = f.get_node("/", name)
+        segment = {k: table.colinstances[k] for k in table.colnames}
+        write_npy_phsp_columns(npy_phsp_path, [segment], name, chunk_size)
+    return Path(npy_phsp_path)
+
+
+def read_columnar_output(path, name=None):
+    """
+    Read a columnar output (hdf5 file or npy folder) of a digitizer or a phase space actor.
+    A single npy phsp folder (e.g. one collection of a npy output) can also be read.
+    Return a dict: column name -> numpy array, for the digi collection 'name'
+    (by default, the first one). The columns of a npy output are memory-mapped.
+    """
+    path = Path(path)
+    if is_npy_phsp(path):
+        return NpyPhaseSpace(path).columns
+    if path.is_dir():
+        collections = _read_npy_output_collections(path)
+        if len(collections) == 0:
+            fatal(f"No digi collection found in {path}")
+        if name is None:
+            name = next(iter(collections))
+        if name not in collections:
+            fatal(f"No digi collection {name} in {path}: {list(collections.keys())}")
+        return collections[name]
+    with tables.open_file(path, mode="r") as f:
+        names = [t.name for t in f.iter_nodes("/", classname="Table")]
+        if len(names) == 0:
+            fatal(f"No digi collection found in {path}")
+        if name is None:
+            name = names[0]
+        if name not in names:
+            fatal(f"No digi collection {name} in {path}: {names}")
+        data = f.get_node("/", name).read()
+    return {k: data[k] for k in data.dtype.names}
@@ -1,4 +1,5 @@
 from typing import List
+import threading
 import numpy as np
 from scipy.spatial.transform import Rotation
 import opengate_core as g4
@@ -13,6 +14,9 @@ from ..image import (
     get_py_image_from_cpp_image,
 )
 from .actoroutput import ActorOutputRoot, ActorOutputSingleImage
+from .npy_phsp import convert_root_phsp_to_npy
+from .columnar_output import convert_hdf5_output_to_npy_phsp
+from .volume_id_table import get_volume_id_table_path, write_volume_id_table
 
 
 def ene_win_peak(name, energy, energy_width_percent):
@@ -278,8 +282,148 @@ class DigitizerWithRootOutput(DigitizerBase):
         },
     }
 
+    @property
+    def output_format(self):
+        """Format of the output: 'root' (default), 'hdf5' or 'npy' (columnar formats).
+        See the output_format parameter of the root_output.
+        """
+        return self.user_output.root_output.output_format
+
+    @output_format.setter
+    def output_format(self, output_format):
+        self.user_output.root_output.output_format = output_format
+
+    def get_digi_collection_names(self):
+        """Names of the digi collections stored in the output."""
+        return [self.name]
+
+    def get_volume_id_table_volumes(self):
+        """Logical volumes (with their daughters) of the numeric volume IDs of the output."""
+        if isinstance(self.attached_to, (list, tuple)):
+            return list(self.attached_to)
+        return [self.attached_to]
+
+    def write_volume_id_table(self):
+        """
+        If the output contains volume IDs, write the table numeric ID -> string ID
+        of the volumes next to the output (see volume_id_table): all the touchables
+        of the attached volumes, and all the volumes whose numeric ID was computed.
+        Needs the geometry, so only done in the process running the simulation.
+        """
+        if self.actor_engine is None or self.write_to_disk is False:
+            return
+        dcm = g4.GateDigiCollectionManager.GetInstance()
+        attributes = set()
+        for name in self.get_digi_collection_names():
+            attributes.update(dcm.GetDigiCollection(name).GetDigiAttributeNames())
+        if not any(
+            "UniqueVolumeID" in a or a == "GroupVolumeIDAsInt" for a in attributes
+        ):
+            return
+        tables = {}
+        for volume in self.get_volume_id_table_volumes():
+            tables.update(g4.GateUniqueVolumeIDManager.GetNumericIDTables(volume))
+        # the IDs may also be those of other volumes (e.g. PostStep volumes)
+        for lv, table in g4.GateUniqueVolumeIDManager.GetUsedNumericIDTables().items():
+            tables.setdefault(lv, {}).update(table)
+        write_volume_id_table(get_volume_id_table_path(self.get_output_path()), tables)
+
+    def finalize_output_files(self):
+        super().finalize_output_files()
+        self.write_volume_id_table()
+
+
+def get_digi_collection_arrays(digi_collection):
+    """
+    Return the digi of a digi collection, for the current thread, as a dict:
+    attribute name -> numpy array. As in the root output, the 3D attributes are
+    split into three arrays with the suffix _X, _Y, _Z.
+    The numerical arrays are views of the C++ values (no copy): they are only
+    valid until the collection is modified (e.g. during a callback),
+    use np.copy to keep them. The strings are copied.
+    """
+    arrays = {}
+    for att in digi_collection.GetDigiAttributes():
+        name = att.GetDigiAttributeName()
+        t = att.GetDigiAttributeType()
+        if t == "D":
+            arrays[name] = att.GetDValuesView()
+        elif t == "I":
+            arrays[name] = att.GetIValuesView()
+        elif t == "L":
+            arrays[name] = att.GetLValuesView()
+        elif t == "3":
+            values = att.Get3ValuesView()
+            for i, axis in enumerate(("X", "Y", "Z")):
+                arrays[f"{name}_{axis}"] = values[:, i]
+        elif t == "S":
+            arrays[name] = np.array(att.GetSValues(), dtype=str)
+        elif t == "U":
+            arrays[name] = np.array(att.GetUValuesAsStrings(), dtype=str)
+        else:
+            fatal(f"Unknown type '{t}' for the digi attribute {name}")
+    return arrays
+
+
+class DigitizerWithCallback(DigitizerWithRootOutput):
+    """
+    Digitizer whose digi can be processed during the simulation by a user function,
+    without writing and reading back a file (e.g. online histograms).
+    """
 
-class DigitizerAdderActor(DigitizerWithRootOutput, g4.GateDigitizerAdderActor):
+    # hints for IDE
+    callback: callable
+    callback_every: int
+
+    user_info_defaults = {
+        "callback": (
+            None,
+            {
+                "doc": "Function f(actor, collection_name, digi) called every 'callback_every' "
+                "events, by each thread, with the digi of these events. 'digi' is a dict: "
+                "attribute name -> numpy array (see get_digi_collection_arrays). "
+                "The numerical arrays are views of the C++ values, only valid during the call. "
+                "The digi are then written (if the output is enabled) and cleared. "
+                "The function is called by one thread at a time.",
+            },
+        ),
+        "callback_every": (
+            1000,
+            {
+                "doc": "Number of events (per thread) between two calls of the callback. "
+                "The digi of these events are kept in memory, clear_every is ignored.",
+            },
+        ),
+    }
+
+    def __getstate__(self):
+        return_dict = super().__getstate__()
+        return_dict["callback_lock"] = None
+        return return_dict
+
+    def initialize_callback(self):
+        # must be called before StartSimulationAction (digi collection creation)
+        if self.callback is None:
+            return
+        if not callable(self.callback):
+            fatal(
+                f"The callback of the actor '{self.name}' must be a function, "
+                f"while it is {self.callback}"
+            )
+        self.callback_lock = threading.Lock()
+        self.SetCallbackFunction(self.apply_callback)
+
+    def apply_callback(self, digi_collection):
+        # called by the C++ side (all threads), one thread at a time
+        with self.callback_lock:
+            self.callback(
+                self,
+                digi_collection.GetDigiCollectionName(),
+                get_digi_collection_arrays(digi_collection),
+            )
+
+
+class DigitizerAdderActor(DigitizerWithCallback, g4.GateDigitizerAdderActor):
     """Equivalent to Gate "adder": gather all hits of an event in the same volume.
     Input: a HitsCollection, need aat least TotalEnergyDeposit and PostPosition attributes
     Output: a Single collections
@@ -348,6 +492,15 @@ class DigitizerAdderActor(DigitizerWithRootOutput, g4.GateDigitizerAdderActor):
                 "doc": "FIXME",
             },
         ),
+        "group_volume_id_as_int": (
+            False,
+            {
+                "doc": "Add the attribute GroupVolumeIDAsInt: the numeric ID of the volume "
+                "the digi are grouped by (group_volume, or the volume of the hits), "
+                "unique within its logical volume. See the table of the numeric volume IDs "
+                "written next to the output.",
+            },
+        ),
     }
 
     def __init__(self, *args, **kwargs):
@@ -371,6 +524,7 @@ class DigitizerAdderActor(DigitizerWithRootOutput, g4.GateDigitizerAdderActor):
         DigitizerBase.initialize(self)
         self.InitializeUserInfo(self.user_info)
         self.InitializeCpp()
+        self.initialize_callback()
 
     def set_group_by_depth(self):
         depth = -1
@@ -380,6 +534,13 @@ class DigitizerAdderActor(DigitizerWithRootOutput, g4.GateDigitizerAdderActor):
             ).volume_depth_in_tree
         self.SetGroupVolumeDepth(depth)
 
+    def get_volume_id_table_volumes(self):
+        # the group volume may be a mother of the attached volume
+        volumes = super().get_volume_id_table_volumes()
+        if self.group_volume is not None:
+            volumes.append(self.group_volume)
+        return volumes
+
     def StartSimulationAction(self):
         self.set_group_by_depth()
         DigitizerBase.StartSimulationAction(self)
@@ -389,7 +550,7 @@ class DigitizerAdderActor(DigitizerWithRootOutput, g4.GateDigitizerAdderActor):
         g4.GateDigitizerAdderActor.EndSimulationAction(self)
 
 
-class DigitizerBlurringActor(DigitizerWithRootOutput, g4.GateDigitizerBlurringActor):
+class DigitizerBlurringActor(DigitizerWithCallback, g4.GateDigitizerBlurringActor):
     """
     Digitizer module for blurring an attribute (single value only, not a vector).
     Usually for energy or time.
@@ -479,6 +640,7 @@ class DigitizerBlurringActor(DigitizerWithRootOutput, g4.GateDigitizerBlurringAc
         DigitizerBase.initialize(self)
         self.InitializeUserInfo(self.user_info)
         self.InitializeCpp()
+        self.initialize_callback()
 
     def initialize_blurring_parameters(self):
         if self.blur_method == "Gaussian":
@@ -535,7 +697,7 @@ class DigitizerBlurringActor(DigitizerWithRootOutput, g4.GateDigitizerBlurringAc
 
 
 class DigitizerSpatialBlurringActor(
-    DigitizerWithRootOutput, g4.GateDigitizerSpatialBlurringActor
+    DigitizerWithCallback, g4.GateDigitizerSpatialBlurringActor
 ):
     """
     Digitizer module for blurring a (global) spatial position.
@@ -639,6 +801,7 @@ class DigitizerSpatialBlurringActor(
         DigitizerBase.initialize(self)
         self.InitializeUserInfo(self.user_info)
         self.InitializeCpp()
+        self.initialize_callback()
 
     def StartSimulationAction(self):
         DigitizerBase.StartSimulationAction(self)
@@ -648,9 +811,7 @@ class DigitizerSpatialBlurringActor(
         g4.GateDigitizerSpatialBlurringActor.EndSimulationAction(self)
 
 
-class DigitizerEfficiencyActor(
-    DigitizerWithRootOutput, g4.GateDigitizerEfficiencyActor
-):
+class DigitizerEfficiencyActor(DigitizerWithCallback, g4.GateDigitizerEfficiencyActor):
     """
     Digitizer module for simulating efficiency.
     """
@@ -709,6 +870,7 @@ class DigitizerEfficiencyActor(
         DigitizerBase.initialize(self)
         self.InitializeUserInfo(self.user_info)
         self.InitializeCpp()
+        self.initialize_callback()
 
     def StartSimulationAction(self):
         DigitizerBase.StartSimulationAction(self)
@@ -719,7 +881,7 @@ class DigitizerEfficiencyActor(
 
 
 class DigitizerEnergyWindowsActor(
-    DigitizerWithRootOutput, g4.GateDigitizerEnergyWindowsActor
+    DigitizerWithCallback, g4.GateDigitizerEnergyWindowsActor
 ):
     """
     Consider a list of hits and arrange them according to energy intervals.
@@ -773,6 +935,10 @@ class DigitizerEnergyWindowsActor(
         DigitizerBase.initialize(self)
         self.InitializeUserInfo(self.user_info)
         self.InitializeCpp()
+        self.initialize_callback()
+
+    def get_digi_collection_names(self):
+        return [c["name"] for c in self.channels]
 
     def StartSimulationAction(self):
         DigitizerBase.StartSimulationAction(self)
@@ -784,7 +950,7 @@ class DigitizerEnergyWindowsActor(
 
 
 class DigitizerHitsCollectionActor(
-    DigitizerWithRootOutput, g4.GateDigitizerHitsCollectionActor
+    DigitizerWithCallback, g4.GateDigitizerHitsCollectionActor
 ):
     """
     Build a list of hits in a given volume.
@@ -832,6 +998,7 @@ class DigitizerHitsCollectionActor(
         DigitizerBase.initialize(self)
         self.InitializeUserInfo(self.user_info)
         self.InitializeCpp()
+        self.initialize_callback()
 
     def StartSimulationAction(self):
         DigitizerBase.StartSimulationAction(self)
@@ -842,6 +1009,86 @@ class DigitizerHitsCollectionActor(
         g4.GateDigitizerHitsCollectionActor.EndSimulationAction(self)
 
 
+class StepRecordActor(DigitizerBase, g4.GateStepRecordActor):
+    """
+    Record the given attributes (same as the hits collection) of every step in a volume,
+    in C++ per-thread columns, and process them in python by batches of steps.
+    Much faster than a python SteppingAction, and there is no output file.
+    """
+
+    # hints for IDE
+    attributes: List[str]
+    callback: callable
+    callback_every: int
+    callback_at_end_of_event: bool
+
+    user_info_defaults = {
+        "attributes": (
+            [],
+            {
+                "doc": "Attributes to be recorded for each step (see the hits collection).",
+            },
+        ),
+        "callback": (
+            None,
+            {
+                "doc": "Function f(actor, steps) called by each thread with a batch of steps. "
+                "'steps' is a dict: attribute name -> numpy array (see get_digi_collection_arrays). "
+                "The numerical arrays are views of the C++ values, only valid during the call. "
+                "The function is called by one thread at a time.",
+            },
+        ),
+        "callback_every": (
+            100000,
+            {
+                "doc": "Number of steps (per thread) given to each call of the callback. "
+                "The remaining steps are given at the end of the run.",
+            },
+        ),
+        "callback_at_end_of_event": (
+            False,
+            {
+                "doc": "If True, the callback is also called at the end of each event "
+                "(when there are recorded steps), so that a batch never mixes several events.",
+            },
+        ),
+    }
+
+    def __init__(self, *args, **kwargs):
+        DigitizerBase.__init__(self, *args, **kwargs)
+        self.__initcpp__()
+
+    def __initcpp__(self):
+        g4.GateStepRecordActor.__init__(self, self.user_info)
+        self.AddActions({"StartSimulationAction"})
+
+    def __getstate__(self):
+        return_dict = super().__getstate__()
+        return_dict["callback_lock"] = None
+        return return_dict
+
+    def initialize(self):
+        DigitizerBase.initialize(self)
+        if not callable(self.callback):
+            fatal(
+                f"The callback of the actor '{self.name}' must be a function, "
+                f"while it is {self.callback}"
+            )
+        self.InitializeUserInfo(self.user_info)
+        self.InitializeCpp()
+        self.callback_lock = threading.Lock()
+        self.SetCallbackFunction(self.apply_callback)
+
+    def apply_callback(self, digi_collection):
+        # called by the C++ side (all threads), one thread at a time
+        with self.callback_lock:
+            self.callback(self, get_digi_collection_arrays(digi_collection))
+
+    def StartSimulationAction(self):
+        DigitizerBase.StartSimulationAction(self)
+        g4.GateStepRecordActor.StartSimulationAction(self)
+
+
 class DigitizerProjectionActor(DigitizerBase, g4.GateDigitizerProjectionActor):
     """
     This actor takes as input HitsCollections and performed binning in 2D images.
@@ -856,6 +1103,8 @@ class DigitizerProjectionActor(DigitizerBase, g4.GateDigitizerProjectionActor):
     physical_volume_index: int
     origin_as_image_center: bool
     detector_orientation_matrix: np.ndarray
+    thread_local_images: bool
+    max_thread_local_images_memory_mb: float
 
     user_info_defaults = {
         # FIXME: implement a setter hook so the user can provided digitizer instances instead of their name,
@@ -892,6 +1141,22 @@ class DigitizerProjectionActor(DigitizerBase, g4.GateDigitizerProjectionActor):
                 "doc": "FIXME",
             },
         ),
+        "thread_local_images": (
+            True,
+            {
+                "doc": "If True, each thread bins the hits of the current run in its own images "
+                "(one slice per input digi collection), added to the output once per run, "
+                "instead of locking the shared image at every event. The squared counts "
+                "are the same in both modes.",
+            },
+        ),
+        "max_thread_local_images_memory_mb": (
+            1024,
+            {
+                "doc": "Maximum memory (in MB) of the thread local images, for all threads. "
+                "If more is needed, the hits are binned in the shared image (one lock per event).",
+            },
+        ),
     }
 
     user_output_config = {
@@ -978,6 +1243,26 @@ class DigitizerProjectionActor(DigitizerBase, g4.GateDigitizerProjectionActor):
         thickness = (pMax[imax] - pMin[imax]) / channels
         return thickness
 
+    def use_thread_local_images(self, size):
+        """
+        Thread local images contain the slices of one run (one per channel),
+        one image per thread (two with the squared counts).
+        """
+        if not self.thread_local_images:
+            return False
+        n = max(1, self.simulation.number_of_threads)
+        if self.user_output.squared_counts.get_active():
+            n *= 2
+        mb = n * size[0] * size[1] * len(self.input_digi_collections) * 8 / 1024**2
+        if mb > self.max_thread_local_images_memory_mb:
+            self.warn_user(
+                f"The thread local images of {self.name} would need {mb:.1f} MB, more than "
+                f"max_thread_local_images_memory_mb={self.max_thread_local_images_memory_mb}. "
+                f"The shared image is used instead (slower with many threads)."
+            )
+            return False
+        return True
+
     def StartSimulationAction(self):
         DigitizerBase.StartSimulationAction(self)
         # for the moment, we cannot use this actor with several volumes
@@ -1050,6 +1335,9 @@ class DigitizerProjectionActor(DigitizerBase, g4.GateDigitizerProjectionActor):
             )
             self.EnableSquaredImage(True)
 
+        # thread local images ?
+        self.EnableThreadLocalImages(self.use_thread_local_images(size))
+
         # keep the initial origin
         self.start_output_origin = list(
             self.user_output.counts.data_per_run[0].get_image_properties()[0].origin
@@ -1169,6 +1457,16 @@ class PhaseSpaceActor(DigitizerWithRootOutput, g4.GatePhaseSpaceActor):
                 # "allowed_values": ["entering", "exiting", "first", "all"], # can be multiple
             },
         ),
+        "write_npy_phsp": (
+            False,
+            {
+                "doc": "If True, the root (or hdf5) output is also converted, at the end of the "
+                "simulation, into the native npy phsp format: a folder with the same name and "
+                "the suffix .npyphsp that contains one memory-mappable .npy file per attribute. "
+                "It can be read much faster by the PhaseSpaceSource. "
+                "With the 'npy' output_format, the output is already in this format. ",
+            },
+        ),
     }
 
     def __init__(self, *args, **kwargs):
@@ -1207,6 +1505,15 @@ class PhaseSpaceActor(DigitizerWithRootOutput, g4.GatePhaseSpaceActor):
             )
         g4.GatePhaseSpaceActor.EndSimulationAction(self)
 
+    def finalize_output_files(self):
+        super().finalize_output_files()
+        if self.write_npy_phsp is True and self.write_to_disk is True:
+            if self.output_format == "root":
+                convert_root_phsp_to_npy(self.get_output_path())
+            elif self.output_format == "hdf5":
+                convert_hdf5_output_to_npy_phsp(self.get_output_path(), self.name)
+            # (the npy output of the digi collection is already a npy phsp)
+
 
 class DigiAttributeProcessDefinedStepInVolumeActor(
     ActorBase, g4.GateDigiAttributeProcessDefinedStepInVolumeActor
@@ -1274,12 +1581,14 @@ class ProcessDefinedStepInVolumeAttribute:
 
 process_cls(DigitizerBase)
 process_cls(DigitizerWithRootOutput)
+process_cls(DigitizerWithCallback)
 process_cls(DigitizerAdderActor)
 process_cls(DigitizerBlurringActor)
 process_cls(DigitizerSpatialBlurringActor)
 process_cls(DigitizerEfficiencyActor)
 process_cls(DigitizerEnergyWindowsActor)
 process_cls(DigitizerHitsCollectionActor)
+process_cls(StepRecordActor)
 process_cls(DigitizerProjectionActor)
 process_cls(DigitizerReadoutActor)
 process_cls(PhaseSpaceActor)
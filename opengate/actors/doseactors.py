@@ -408,6 +408,22 @@ class DoseActor(VoxelDepositActor, g4.GateDoseActor):
                 "doc": "Only applies if uncertainty_goal is set True: Factor multiplying the estimated N events needed to achieve the uncertainty goal, to ensure convergence.",
             },
         ),
+        "wall_clock_time_budget": (
+            None,
+            {
+                "doc": "If set, the run is stopped once this wall clock time has elapsed since its start "
+                "(e.g. 10 * g4_units.min), even if the uncertainty_goal is not reached. "
+                "Can be used with or without uncertainty_goal.",
+            },
+        ),
+        "number_of_events_budget": (
+            None,
+            {
+                "doc": "If set, the run is stopped once this number of events has been simulated "
+                "(all threads together), even if the uncertainty_goal is not reached. "
+                "Can be used with or without uncertainty_goal.",
+            },
+        ),
         "dose_calc_on_the_fly": (
             False,
             {
@@ -415,6 +431,39 @@ class DoseActor(VoxelDepositActor, g4.GateDoseActor):
                 "deactivated": True,
             },
         ),
+        "thread_local_buffers": (
+            False,
+            {
+                "doc": "If True, each worker thread scores edep, dose, counts and squared values "
+                "into its own flat buffers, without locking the shared images at every step. "
+                "The buffers are reduced into the shared images at the end of the run "
+                "(or every thread_local_flush_interval events). "
+                "This is faster with many threads, but uses one image-sized buffer "
+                "per scored quantity and per thread (see thread_local_buffers_max_memory_mb). "
+                "Cannot be used with uncertainty_goal.",
+            },
+        ),
+        "thread_local_flush_interval": (
+            0,
+            {
+                "doc": "Only applies if thread_local_buffers is True: number of events "
+                "(per thread) after which the thread local buffers are reduced into the shared images. "
+                "The default value 0 means that the buffers are only reduced at the end of the run. "
+                "The reduction only visits the voxels touched since the previous one. "
+                "This only changes how often the buffers are reduced: "
+                "it does not lower the memory usage (see thread_local_buffers_max_memory_mb).",
+            },
+        ),
+        "thread_local_buffers_max_memory_mb": (
+            None,
+            {
+                "doc": "Only applies if thread_local_buffers is True: memory (in MB, per thread) "
+                "allowed for the thread local buffers. If the image-sized buffers need more, "
+                "each thread only stores the voxels it touched, and reduces them into the "
+                "shared images as soon as this memory is used (so several times per run "
+                "for large images). None means no limit (image-sized buffers).",
+            },
+        ),
     }
 
     user_output_config = {
@@ -509,6 +558,15 @@ class DoseActor(VoxelDepositActor, g4.GateDoseActor):
         """
         self.check_user_input()
 
+        # the uncertainty is evaluated by one thread on the shared images,
+        # which do not contain what the other threads hold in their buffers
+        if self.uncertainty_goal is not None and self.thread_local_buffers is True:
+            fatal(
+                f"The DoseActor {self.name} cannot use uncertainty_goal with "
+                f"thread_local_buffers=True. The budgets (number_of_events_budget, "
+                f"wall_clock_time_budget) can be used with thread local buffers."
+            )
+
         VoxelDepositActor.initialize(self)
 
         # the edep component has to be active in any case
@@ -578,11 +636,48 @@ class DoseActor(VoxelDepositActor, g4.GateDoseActor):
         self.SetThreshEdepPerc(self.uncertainty_voxel_edep_threshold)
         self.SetOvershoot(self.uncertainty_overshoot_factor_N_events)
         self.SetNbEventsFirstCheck(int(self.uncertainty_first_check_after_n_events))
+        if self.wall_clock_time_budget is None:
+            self.SetWallClockTimeBudget(0)
+        else:
+            self.SetWallClockTimeBudget(self.wall_clock_time_budget)
+        if self.number_of_events_budget is None:
+            self.SetNumberOfEventsBudget(0)
+        else:
+            self.SetNumberOfEventsBudget(int(self.number_of_events_budget))
+        if self.thread_local_buffers is True:
+            self.SetThreadLocalBuffersMaxVoxels(
+                self.get_thread_local_buffers_max_voxels()
+            )
 
         # Set the physical volume name on the C++ side
         self.SetPhysicalVolumeName(self.get_physical_volume_name())
         self.InitializeCpp()
 
+    def get_thread_local_buffers_max_voxels(self):
+        """
+        Number of voxels stored in the sparse thread local buffers, or 0 if the
+        image-sized buffers fit in thread_local_buffers_max_memory_mb.
+        Must be called after the C++ flags are set.
+        """
+        if self.thread_local_buffers_max_memory_mb is None:
+            return 0
+        # image-sized buffers: one double per scored quantity and a flag per voxel
+        n_quantities = 1 + sum(
+            [
+                self.GetDoseFlag(),
+                self.GetCountsFlag(),
+                self.GetEdepSquaredFlag(),
+                self.GetDoseSquaredFlag(),
+            ]
+        )
+        n_voxels = int(np.prod(self.size))
+        mb = n_voxels * (8 * n_quantities + 1) / 1024**2
+        if mb <= self.thread_local_buffers_max_memory_mb:
+            return 0
+        # sparse buffers: about 64 bytes per voxel (sums and hash map node)
+        max_voxels = int(self.thread_local_buffers_max_memory_mb * 1024**2 / 64)
+        return max(1, max_voxels)
+
     def BeginOfRunActionMasterThread(self, run_index):
         self.prepare_output_for_run("edep_with_uncertainty", run_index)
         self.push_to_cpp_image(
@@ -618,6 +713,16 @@ class DoseActor(VoxelDepositActor, g4.GateDoseActor):
         self.user_output.edep_with_uncertainty.store_meta_data(
             run_index, number_of_samples=self.NbOfEvent
         )
+        # keep track of why the run has ended
+        if self.uncertainty_goal is not None:
+            self.user_output.edep_with_uncertainty.store_meta_data(
+                run_index, mean_uncertainty=self.GetLastMeanUncertainty()
+            )
+        run_termination_reason = self.GetRunTerminationReason()
+        if run_termination_reason != "":
+            self.user_output.edep_with_uncertainty.store_meta_data(
+                run_index, run_termination_reason=run_termination_reason
+            )
 
         if self.user_output.dose_with_uncertainty.get_active(item="any"):
             self.fetch_from_cpp_image(
@@ -664,9 +769,8 @@ class DoseActor(VoxelDepositActor, g4.GateDoseActor):
 
         VoxelDepositActor.EndOfRunActionMasterThread(self, run_index)
 
-        # FIXME: should check if uncertainty goal is reached (return value: 0),
-        # but the current mechanism is quite hacky and it is therefore temporarily not in use!
-        return 0
+        # 1 if the run was stopped because the uncertainty goal was reached
+        return g4.GateDoseActor.EndOfRunActionMasterThread(self, run_index)
 
     def EndSimulationAction(self):
         g4.GateDoseActor.EndSimulationAction(self)
@@ -724,6 +828,8 @@ class TLEDoseActor(DoseActor, g4.GateTLEDoseActor):
             fatal(
                 f"TLEDoseActor cannot score in {self.score_in}, only 'material' is allowed."
             )
+        if self.thread_local_buffers is True:
+            fatal("TLEDoseActor does not support thread_local_buffers=True.")
         super().initialize(args)
 
 
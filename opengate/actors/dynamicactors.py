@@ -1,5 +1,6 @@
 from typing import Optional
 
+import numpy as np
 import opengate_core as g4
 from ..definitions import __world_name__
 from ..base import GateObject, process_cls
@@ -141,6 +142,8 @@ class VolumeImageChanger(GeometryChanger):
     # hints for IDE
     images: Optional[list]
     label_image: Optional[dict]
+    label_stack: Optional[str]
+    label_stack_images: Optional[list]
 
     user_info_defaults = {
         "images": (
@@ -156,12 +159,79 @@ class VolumeImageChanger(GeometryChanger):
                 "stored in the user info 'images'.",
             },
         ),
+        "label_stack": (
+            None,
+            {
+                "doc": "Path to a .npy file with the label images of all phases, "
+                "of shape (number of phases, z, y, x), see ImageVolume.create_label_stack(). "
+                "The file is memory-mapped: a phase is read when needed, "
+                "and only the voxels which differ from the previous phase are updated. "
+                "If set, 'label_image' is not used.",
+            },
+        ),
+        "label_stack_images": (
+            None,
+            {
+                "doc": "Names of the images (as in the user info 'images') "
+                "of the phases of the label stack, in the same order.",
+            },
+        ),
     }
 
-    def apply_change(self, run_id):
-        self.attached_to_volume.update_label_image(
-            self.label_image[self.images[run_id]]
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.label_stack_array = None
+        self.label_stack_phases = None
+        # labels of the phase currently in the parametrisation
+        self.current_labels = None
+
+    def close(self):
+        self.label_stack_array = None
+        self.current_labels = None
+        super().close()
+
+    def __getstate__(self):
+        return_dict = super().__getstate__()
+        return_dict["label_stack_array"] = None
+        return_dict["current_labels"] = None
+        return return_dict
+
+    def initialize(self):
+        if self.label_stack is None:
+            return
+        self.label_stack_array = np.load(self.label_stack, mmap_mode="r")
+        self.label_stack_phases = dict(
+            (name, i) for i, name in enumerate(self.label_stack_images)
         )
+        missing = set(self.images).difference(self.label_stack_phases)
+        if len(missing) > 0 or len(self.label_stack_images) != len(
+            self.label_stack_array
+        ):
+            fatal(
+                f"The label stack {self.label_stack} of the changer {self.name} "
+                f"has {len(self.label_stack_array)} phases for the images "
+                f"{self.label_stack_images}, and does not contain the images {missing}."
+            )
+        # the parametrisation initially contains the label image of the volume
+        self.current_labels = None
+
+    def apply_change(self, run_id):
+        if self.label_stack is None:
+            self.attached_to_volume.update_label_image(
+                self.label_image[self.images[run_id]]
+            )
+            return
+        # read the phase from the file
+        labels = np.asarray(
+            self.label_stack_array[self.label_stack_phases[self.images[run_id]]]
+        ).ravel()
+        if self.current_labels is None:
+            self.attached_to_volume.update_labels(labels)
+        else:
+            changed = np.flatnonzero(labels != self.current_labels)
+            if len(changed) > 0:
+                self.attached_to_volume.update_labels(labels[changed], changed)
+        self.current_labels = labels
 
 
 class VolumeTranslationChanger(GeometryChanger):
@@ -1,5 +1,6 @@
 from box import Box
 import platform
+from typing import Union
 import opengate_core as g4
 from .base import ActorBase
 from ..utility import g4_units, g4_best_unit_tuple
@@ -12,6 +13,8 @@ from ..base import process_cls
     It is feasible to get callback every Run, Event, Track, Step in the python side.
     However, it is VERY time consuming. For SteppingAction, expect large performance drop.
     It could be however useful for prototyping or tests.
+    To analyse the steps in python, prefer the StepRecordActor: the steps are recorded
+    on the cpp side and given to a python function by batches, as numpy arrays.
 
     it requires "trampoline functions" on the cpp side.
 
@@ -119,6 +122,23 @@ class ActorOutputStatisticsActor(ActorOutputBase):
     def store_data(self, data, **kwargs):
         self.merged_data.update(data)
 
+    def inplace_merge_with(self, other):
+        # counts add up, the processes ran concurrently so the durations do not
+        for k in ("runs", "events", "tracks", "steps", "nb_threads"):
+            self.merged_data[k] += other.merged_data[k]
+        for k in ("duration", "init"):
+            self.merged_data[k] = max(self.merged_data[k], other.merged_data[k])
+        for t, n in other.merged_data.track_types.items():
+            self.merged_data.track_types[t] = self.merged_data.track_types.get(t, 0) + n
+        self.merged_data.sim_start_time = min(
+            self.merged_data.sim_start_time, other.merged_data.sim_start_time
+        )
+        self.merged_data.sim_stop_time = max(
+            self.merged_data.sim_stop_time, other.merged_data.sim_stop_time
+        )
+        self.merged_data.stop_time = other.merged_data.stop_time
+        return self
+
     def get_data(self, **kwargs):
         if "which" in kwargs and kwargs["which"] != "merged":
             warning(
@@ -289,6 +309,10 @@ class ActorOutputKillAccordingProcessesActor(ActorOutputBase):
         super().__init__(*args, **kwargs)
         self.number_of_killed_particles = 0
 
+    def inplace_merge_with(self, other):
+        self.number_of_killed_particles += other.number_of_killed_particles
+        return self
+
     def get_processed_output(self):
         d = {}
         d["particles killed"] = self.number_of_killed_particles
@@ -401,13 +425,14 @@ class AttenuationImageActor(ActorBase, g4.GateAttenuationImageActor):
 
     - image_volume: Input volume from which the attenuation map is generated.
     - energy: The energy level for which to generate the attenuation image.
+      If it is a list, the output is a vector image with one component per energy.
     - database: The database source for attenuation coefficients, either 'EPDL' or 'NIST'.
     """
 
     # IDE hints
-    image_volume = str
-    energy = float
-    database = str
+    image_volume: str
+    energy: Union[float, list]
+    database: str
 
     user_info_defaults = {
         "image_volume": (  # FIXME name or not name
@@ -418,7 +443,11 @@ class AttenuationImageActor(ActorBase, g4.GateAttenuationImageActor):
         ),
         "energy": (
             None,
-            {"doc": "The energy level for which to generate the attenuation image"},
+            {
+                "doc": "The energy level for which to generate the attenuation image. "
+                "If it is a list of energies (e.g. several emission peaks), the output is "
+                "a vector image with one component (attenuation map) per energy."
+            },
         ),
         "database": (
             "EPDL",
@@ -0,0 +1,214 @@
+"""
+Native npy format of the phase spaces, read by the PhaseSpaceSource.
+
+A npy phsp is a folder (suffix .npyphsp) with a header.json file and one
+.npy file per column, so that the columns can be memory-mapped.
+"""
+
+import json
+import shutil
+from pathlib import Path
+
+import numpy as np
+import uproot
+
+from ..exception import fatal, warning
+
+npy_phsp_format_name = "opengate_npy_phsp"
+npy_phsp_format_version = 1
+npy_phsp_header_filename = "header.json"
+
+
+def is_npy_phsp(path):
+    """
+    True if path is a phase space in the native npy format, i.e. a folder
+    with a header file and one .npy file per column.
+    """
+    return (Path(path) / npy_phsp_header_filename).is_file()
+
+
+def find_npy_phsp(path):
+    """
+    Return the path of the npy phsp in path: path itself, or the digi collection
+    of a columnar npy output (a folder of npy phsp, see the output_format of the
+    PhaseSpaceActor) if it contains only one. Return None if there is none.
+    """
+    path = Path(path)
+    if is_npy_phsp(path):
+        return path
+    if not path.is_dir():
+        return None
+    collections = sorted(p for p in path.iterdir() if is_npy_phsp(p))
+    if len(collections) > 1:
+        fatal(
+            f"The npy output {path} contains several digi collections "
+            f"{[p.name for p in collections]}, use the folder of one of them."
+        )
+    return collections[0] if len(collections) > 0 else None
+
+
+def npy_phsp_column_dtype(dtype):
+    """
+    Columns are stored with the types used by the PhaseSpaceSource,
+    so that batches can be used without any conversion.
+    Return None for the columns that cannot be stored (e.g. strings).
+    """
+    dtype = np.dtype(dtype)
+    if np.issubdtype(dtype, np.floating):
+        return np.dtype(np.float32)
+    if np.issubdtype(dtype, np.integer) or np.issubdtype(dtype, np.bool_):
+        return np.dtype(np.int32)
+    return None
+
+
+def write_npy_phsp_header(path, num_entries, columns):
+    """Write the header of a npy phsp; columns is a dict: column name -> dtype."""
+    header = {
+        "format": npy_phsp_format_name,
+        "version": npy_phsp_format_version,
+        "num_entries": int(num_entries),
+        "columns": {k: np.dtype(v).str for k, v in columns.items()},
+    }
+    with open(Path(path) / npy_phsp_header_filename, "w") as f:
+        json.dump(header, f, indent=2)
+
+
+def _create_npy_phsp_folder(path):
+    path = Path(path)
+    if path.exists():
+        if not is_npy_phsp(path):
+            fatal(f"Cannot write the phsp {path}: it exists and is not a npy phsp.")
+        shutil.rmtree(path)
+    path.mkdir(parents=True)
+    return path
+
+
+def write_npy_phsp(path, data):
+    """
+    Write a phase space in the native npy format.
+    data is a dict (or any mapping) of 1D arrays with the same length.
+    Columns that cannot be stored as numbers (e.g. particle names) are ignored.
+    """
+    path = _create_npy_phsp_folder(path)
+    columns = {}
+    num_entries = None
+    for key in data.keys():
+        a = np.asarray(data[key])
+        dtype = npy_phsp_column_dtype(a.dtype)
+        if dtype is None or a.ndim != 1:
+            warning(
+                f"The column {key} cannot be stored in the npy phsp {path}, ignored."
+            )
+            continue
+        if num_entries is None:
+            num_entries = len(a)
+        if len(a) != num_entries:
+            fatal(
+                f"Cannot write the npy phsp {path}: the column {key} has "
+                f"{len(a)} elements while the previous ones have {num_entries}."
+            )
+        np.save(path / f"{key}.npy", a.astype(dtype, copy=False))
+        columns[key] = dtype
+    write_npy_phsp_header(path, num_entries or 0, columns)
+    return path
+
+
+def convert_root_phsp_to_npy(
+    root_filename, npy_phsp_path=None, tree_name=None, chunk_size=1000000
+):
+    """
+    Convert a phase space stored in a root file into the native npy format.
+    The root file is read by chunks, so the phsp does not need to fit in memory.
+    By default, the output is the root filename with the suffix .npyphsp.
+    Returns the path of the npy phsp.
+    """
+    root_filename = Path(root_filename)
+    if npy_phsp_path is None:
+        npy_phsp_path = root_filename.with_suffix(".npyphsp")
+    with uproot.open(root_filename) as f:
+        if tree_name is None:
+            trees = [
+                k
+                for k in f.keys(recursive=False, cycle=False)
+                if isinstance(f[k], uproot.TTree)
+            ]
+            if len(trees) == 0:
+                fatal(f"No tree in the root file {root_filename}.")
+            tree_name = trees[0]
+        tree = f[tree_name]
+        num_entries = int(tree.num_entries)
+
+        # select the numerical columns
+        columns = {}
+        for key, branch in tree.items():
+            try:
+                dtype = npy_phsp_column_dtype(branch.interpretation.to_dtype)
+            except AttributeError:
+                dtype = None
+            if dtype is None:
+                warning(
+                    f"The branch {key} of {root_filename} cannot be stored "
+                    f"in the npy phsp, ignored."
+                )
+                continue
+            columns[key] = dtype
+
+        # write the columns chunk by chunk
+        path = _create_npy_phsp_folder(npy_phsp_path)
+        outputs = {
+            key: np.lib.format.open_memmap(
+                path / f"{key}.npy", mode="w+", dtype=dtype, shape=(num_entries,)
+            )
+            for key, dtype in columns.items()
+        }
+        start = 0
+        for batch in tree.iterate(
+            list(columns.keys()), step_size=int(chunk_size), library="np"
+        ):
+            n = 0
+            for key, a in batch.items():
+                n = len(a)
+                outputs[key][start : start + n] = a
+            start += n
+        for o in outputs.values():
+            o.flush()
+        del outputs
+    write_npy_phsp_header(path, num_entries, columns)
+    return path
+
+
+class NpyPhaseSpace:
+    """
+    Read-only access to a phase space in the native npy format.
+    The columns are memory-mapped: reading a batch is a slice of the files,
+    without decompression or copy. The interface mimics the one of the
+    uproot trees used by the PhaseSpaceSourceGenerator.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        if not is_npy_phsp(self.path):
+            fatal(f"The folder {self.path} is not a phsp in the npy format.")
+        with open(self.path / npy_phsp_header_filename) as f:
+            header = json.load(f)
+        if header.get("format") != npy_phsp_format_name:
+            fatal(f"Unknown phsp format in {self.path}: {header.get('format')}")
+        if header.get("version", 0) > npy_phsp_format_version:
+            fatal(
+                f"The phsp {self.path} has the format version {header['version']}, "
+                f"this version of opengate only reads up to {npy_phsp_format_version}."
+            )
+        self.num_entries = int(header["num_entries"])
+        self.columns = {}
+        for key, dtype in header["columns"].items():
+            self.columns[key] = np.load(self.path / f"{key}.npy", mmap_mode="r")
+            if self.columns[key].dtype != np.dtype(dtype) or (
+                len(self.columns[key]) != self.num_entries
+            ):
+                fatal(f"The column {key} of the phsp {self.path} is corrupted.")
+
+    def keys(self):
+        return list(self.columns.keys())
+
+    def arrays(self, entry_start=0, entry_stop=None, **kwargs):
+        return {key: c[entry_start:entry_stop] for key, c in self.columns.items()}
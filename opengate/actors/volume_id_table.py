@@ -0,0 +1,70 @@
+"""
+Table of the numeric volume IDs of the digitizers and phase space outputs.
+
+The numeric volume IDs (PreStepUniqueVolumeIDAsInt, PostStepUniqueVolumeIDAsInt,
+GroupVolumeIDAsInt of the adder) are unique over the whole geometry: each logical
+volume has a range of IDs (one per possible touchable, the ranges follow the order of
+the logical volume store), its touchables are numbered in the order of their string IDs:
+<physical volume>-<copy numbers from the world>.
+The correspondence is written next to the output, in a json file:
+{logical volume name: {numeric ID: string ID}}.
+"""
+
+import json
+from pathlib import Path
+
+volume_id_table_suffix = ".volume_ids.json"
+
+
+def get_volume_id_table_path(output_path):
+    """Path of the table of the numeric volume IDs of an output."""
+    output_path = Path(output_path)
+    return output_path.with_name(f"{output_path.name}{volume_id_table_suffix}")
+
+
+def read_volume_id_table(path):
+    """
+    Read a table of numeric volume IDs.
+    Return a dict: logical volume name -> {numeric ID (int): string ID}.
+    """
+    with open(path) as f:
+        tables = json.load(f)
+    return {lv: {int(k): v for k, v in table.items()} for lv, table in tables.items()}
+
+
+def write_volume_id_table(path, tables):
+    """
+    Write the tables (logical volume name -> {numeric ID: string ID}).
+    The tables already in the file are kept (several actors may share the same output).
+    """
+    path = Path(path)
+    merged = read_volume_id_table(path) if path.is_file() else {}
+    for lv, table in tables.items():
+        merged.setdefault(lv, {}).update({int(k): v for k, v in table.items()})
+    with open(path, "w") as f:
+        json.dump(
+            {
+                lv: {str(k): v for k, v in sorted(table.items())}
+                for lv, table in sorted(merged.items())
+            },
+            f,
+            indent=1,
+        )
+
+
+def merge_volume_id_tables(paths, output_path, remove_parts=True):
+    """
+    Merge the tables of the outputs listed in paths (e.g. one per process)
+    into the table of output_path.
+    """
+    tables = {}
+    for p in paths:
+        p = get_volume_id_table_path(p)
+        if not p.is_file():
+            continue
+        for lv, table in read_volume_id_table(p).items():
+            tables.setdefault(lv, {}).update(table)
+        if remove_parts is True:
+            p.unlink()
+    if len(tables) > 0:
+        write_volume_id_table(get_volume_id_table_path(output_path), tables)
@@ -37,6 +37,12 @@ CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
     default=None,
     help="Gate material database (if needed)",
 )
+@click.option(
+    "--direct",
+    is_flag=True,
+    default=False,
+    help="Compute mu with the NIST tables, without Geant4 simulation (NIST database only)",
+)
 @click.option("--verbose", "-v", is_flag=True, default=False, help="Verbose output")
 @click.option(
     "--mm",
@@ -53,6 +59,7 @@ def go(
     spacing,
     material_database,
     database,
+    direct,
     verbose,
     mm,
 ):
@@ -67,6 +74,7 @@ def go(
     - size: Attenuation image size (if resample)
     - spacing: Attenuation image spacing  (if resample)
     - database: Specifies the database to be used, either "NIST" or "EPDL". Default is "NIST".
+    - direct: Compute the mu from the NIST tables and the material compositions, without simulation.
     - verbose: Flag to toggle verbose output, defaults to False.
 
     The function performs the following operations:
@@ -103,6 +111,7 @@ def go(
         material_database=material_database,
         database=database,
         verbose=verbose,
+        direct=direct,
     )
     if mm:
         arr = itk.array_view_from_image(image)
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import click
+from opengate.actors.npy_phsp import convert_root_phsp_to_npy
+
+CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
+
+
+@click.command(context_settings=CONTEXT_SETTINGS)
+@click.argument("root_filename", nargs=1)
+@click.option(
+    "--output",
+    "-o",
+    default=None,
+    help="output folder (default: the root filename with the suffix .npyphsp)",
+)
+@click.option("--tree", "-t", default=None, help="tree name (default: the first one)")
+@click.option(
+    "--chunk_size", "-c", default=1000000, help="number of entries read at once"
+)
+def go(root_filename, output, tree, chunk_size):
+    """
+    Convert a phase space stored in a root file into the native npy format
+    (one memory-mapped .npy file per attribute) read faster by the PhaseSpaceSource.
+    """
+    path = convert_root_phsp_to_npy(root_filename, output, tree, chunk_size)
+    print(f"Phase space written in {path}")
+
+
+# --------------------------------------------------------------------------
+if __name__ == "__main__":
+    go()
@@ -184,6 +184,7 @@ def get_files_to_run():
         "test040_gan_phsp_pet_gan.py",
         "test043_garf.py",
         "test043_garf_mt.py",
+        "test043_garf_async.py",
         "test045_speedup_all_wip.py",
         "test047_gan_vox_source_cond.py",
         "test081_simulation_optigan_with_random_seed.py",
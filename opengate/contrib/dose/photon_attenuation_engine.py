@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Attenuation (mu) images computed directly from the label image of an ImageVolume
+and the composition of its materials, without running a simulation.
+The mass attenuation coefficients of the elements are the NIST tables
+(J. Hubbell and S.M. Seltzer) of opengate.data.PhotonAttenuation, interpolated
+for all energies at once. The mu of a material is its density times the mass
+fraction weighted sum of the coefficients of its elements: all materials and
+energies are computed with one matrix product, then gathered for all voxels.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+from scipy.interpolate import pchip_interpolate
+
+from opengate.data import PhotonAttenuation as nist
+from opengate.exception import fatal
+from opengate.image import label_lut_to_mu_image
+from opengate.utility import g4_units
+
+
+@lru_cache(maxsize=None)
+def _get_element_log_table(z):
+    """
+    The log-log table (energy, mu/rho) of the element with atomic number z,
+    with the absorption edges, and the flag of the points close to an edge
+    (like in PhotonAttenuationEl).
+    """
+    x = np.log(nist.energy)
+    y = np.log(nist.mac[z - 1, :])
+    w = np.zeros(len(x))
+    ed = nist.edges[nist.edges[:, 0] == z, :]
+    if len(ed) > 0:
+        e = ed[:, 1]
+        d = 4 * np.spacing(e)
+        xx = np.log(np.concatenate([e - d, e + d]))
+        yy = np.log(np.concatenate([ed[:, 2], ed[:, 3]]))
+        x = np.append(x, xx)
+        y = np.append(y, yy)
+        w = np.append(w, np.ones(len(xx)))
+        ix = np.argsort(x)
+        x = x[ix]
+        y = y[ix]
+        # the neighbors of the edges are also flagged
+        w = (np.convolve(w[ix], [1, 1, 1], "same") > 0).astype(float)
+    return x, y, w
+
+
+def get_element_mass_attenuation(z, energies):
+    """
+    Mass attenuation coefficients (cm2/g) of the element with atomic number z
+    for an array of energies (in Geant4 units, between 1 keV and 20 MeV).
+    Log-log pchip interpolation, linear close to the absorption edges.
+    """
+    energies = np.atleast_1d(energies) / g4_units.MeV
+    if z < 1 or z > len(nist.mac):
+        fatal(f"No attenuation data for the element Z={z}, only Z=1..{len(nist.mac)}")
+    if np.any(energies < nist.energy[0]) or np.any(energies > nist.energy[-1]):
+        fatal(
+            f"The energies {energies} MeV are out of the range of the attenuation tables "
+            f"[{nist.energy[0]}, {nist.energy[-1]}] MeV"
+        )
+    x, y, w = _get_element_log_table(z)
+    log_e = np.log(energies)
+    a = pchip_interpolate(x, y, log_e)
+    if np.any(w > 0):
+        # smoothly merge the curves using linear near edges and cubic otherwise
+        v = np.interp(log_e, x, w)
+        a = a * (1 - v) + np.interp(log_e, x, y) * v
+    return np.exp(a)
+
+
+def get_g4_material_composition(g4_material):
+    """
+    Density (g/cm3), atomic numbers and mass fractions of the elements of a G4Material.
+    """
+    density = g4_material.GetDensity() / g4_units.g_cm3
+    elements = g4_material.GetElementVector()
+    z = np.array([int(round(el.GetZ())) for el in elements])
+    fractions = np.array(
+        [g4_material.GetElementFraction(i) for i in range(len(elements))]
+    )
+    return density, z, fractions
+
+
+def get_materials_attenuation(material_database, material_names, energies):
+    """
+    Linear attenuation coefficients (cm^-1) of the materials for all energies,
+    as an array (energies x materials). The materials are found (or built) in the
+    MaterialDatabase, no Geant4 run is needed.
+    """
+    energies = np.atleast_1d(energies).astype(float)
+    compositions = [
+        get_g4_material_composition(material_database.FindOrBuildMaterial(name))
+        for name in material_names
+    ]
+    # matrix (materials x elements) of the density times the mass fractions
+    all_z = np.unique(np.concatenate([c[1] for c in compositions]))
+    weights = np.zeros((len(material_names), len(all_z)))
+    for i, (density, z, fractions) in enumerate(compositions):
+        np.add.at(weights[i], np.searchsorted(all_z, z), density * fractions)
+    # matrix (elements x energies) of the mass attenuation coefficients
+    mac = np.array([get_element_mass_attenuation(z, energies) for z in all_z])
+    return (weights @ mac).T
+
+
+def create_label_to_mu_lut(material_to_label_lut, material_database, energies):
+    """Return an array (energies x labels) with the mu of the material of each label."""
+    n_labels = max(material_to_label_lut.values()) + 1
+    names = list(material_to_label_lut.keys())
+    labels = [material_to_label_lut[name] for name in names]
+    lut = np.zeros((len(np.atleast_1d(energies)), n_labels), dtype=np.float32)
+    lut[:, labels] = get_materials_attenuation(material_database, names, energies)
+    return lut
+
+
+def create_attenuation_image_from_labels(
+    label_image, material_to_label_lut, material_database, energy
+):
+    """
+    Create the attenuation (mu) image (cm^-1) of a label image, see
+    ImageVolume.create_label_image(). Like the AttenuationImageActor, if energy
+    is a list, the output is a vector image with one component per energy.
+    """
+    lut = create_label_to_mu_lut(material_to_label_lut, material_database, energy)
+    return label_lut_to_mu_image(label_image, lut, energy)
@@ -3,6 +3,10 @@
 
 import opengate as gate
 from pathlib import Path
+from opengate.exception import fatal
+from opengate.contrib.dose.photon_attenuation_engine import (
+    create_attenuation_image_from_labels,
+)
 
 
 def create_photon_attenuation_image(
@@ -14,7 +18,21 @@ def create_photon_attenuation_image(
     verbose=False,
     density_tol=None,
     progress_bar=False,
+    direct=False,
 ):
+    """
+    Create the attenuation (mu) image (cm^-1) of a CT image.
+    By default, a simulation with an AttenuationImageActor is run (in a new process).
+    With direct=True, the mu are computed from the NIST tables of
+    opengate.data.PhotonAttenuation and the composition of the materials,
+    without simulation (the database must be 'NIST').
+    """
+    if direct and database != "NIST":
+        fatal(
+            f"Only the NIST database is available to compute the attenuation image "
+            f"without simulation, while the database is {database}"
+        )
+
     # create a temporary simulation
     sim = gate.Simulation()
     sim.verbose_level = gate.logger.NONE
@@ -47,6 +65,16 @@ def create_photon_attenuation_image(
     if material_database is not None:
         sim.volume_manager.add_material_database(material_database)
 
+    # no simulation: labels and materials are enough
+    if direct:
+        label_image = image_volume.create_label_image()
+        return create_attenuation_image_from_labels(
+            label_image,
+            image_volume.material_to_label_lut,
+            sim.volume_manager.material_database,
+            energy,
+        )
+
     # mu map actor (process at the first begin of run only)
     mumap = sim.add_actor("AttenuationImageActor", "mumap")
     mumap.image_volume = image_volume
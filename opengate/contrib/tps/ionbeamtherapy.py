@@ -772,7 +772,18 @@ class TreatmentPlanSource:
     def set_beamline_model(self, beamline):
         self.beamline_model = beamline
 
-    def initialize_tpsource(self, flat_generation=False, activity=False):
+    def initialize_tpsource(
+        self, flat_generation=False, activity=False, single_source=False
+    ):
+        # one source for the whole plan: all spots are held by a single
+        # TreatmentPlanPBSource instead of one source per spot
+        if single_source:
+            if activity:
+                raise ValueError(
+                    "single_source requires a number of particles, not an activity"
+                )
+            return self._initialize_single_tpsource(flat_generation)
+
         # some alias
         Bq = gate.g4_units.Bq
         spots_array = self.spots
@@ -860,20 +871,31 @@ class TreatmentPlanSource:
 
         self.actual_sim_particles = tot_sim_particles
 
+    def _initialize_single_tpsource(self, flat_generation=False):
+        # the spots are generated one after the other, as with one source per
+        # spot, and the number of particles of each spot is sampled in C++
+        source = self.sim.add_source("TreatmentPlanPBSource", self.name)
+        source.beam_model = self.beamline_model
+        source.beam_data_dict = {"spots": self.spots, "rotation": self.rotation}
+        source.position.translation = self.translation
+        source.particle = self.spots[0].particle_name
+        source.flat_generation = flat_generation
+        source.sorted_spot_generation = True
+        source.n = int(self.n_sim)
+        self.actual_sim_particles = int(self.n_sim)
+        return source
+
     def _sample_n_particles_spots(self, flat_generation=False):
         if flat_generation:
-            pdf = [1 / len(self.spots) for spot in self.spots]
+            pdf = np.ones(len(self.spots))
         else:
-            pdf = [spot.beamFraction for spot in self.spots]
+            pdf = np.array([spot.beamFraction for spot in self.spots], dtype=float)
 
         # normalize vector, to assure the probabilities sum up to 1
         pdf = pdf / np.sum(pdf)
 
-        n_spots = len(self.spots)
-        n_part_spots_V = np.zeros(n_spots)
-        for i in range(int(self.n_sim)):
-            bin = np.random.choice(np.arange(0, n_spots), p=pdf)
-            n_part_spots_V[bin] += 1
+        # same distribution as drawing a spot for each particle
+        n_part_spots_V = np.random.multinomial(int(self.n_sim), pdf)
 
         return n_part_spots_V
 
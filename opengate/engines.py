@@ -658,6 +658,9 @@ class ActorEngine(EngineBase):
         # consider the priority value of the actors
         for actor in self.actor_manager.sorted_actors:
             actor.EndSimulationAction()
+        # the ROOT files are only closed when all actors are done
+        for actor in self.actor_manager.sorted_actors:
+            actor.finalize_output_files()
 
 
 class FilterEngine(EngineBase):
@@ -1,4 +1,7 @@
 import os
+import json
+import hashlib
+from pathlib import Path
 import numpy as np
 import re
 from box import Box
@@ -8,6 +11,9 @@ import opengate_core as g4
 from ..utility import fatal, g4_units, g4_best_unit
 from ..definitions import elements_name_symbol
 
+# to be incremented when the format of the cached HU to material conversion changes
+HU_to_material_cache_version = 1
+
 
 def read_voxel_materials(filename, def_mat="G4_AIR"):
     p = os.path.abspath(filename)
@@ -144,25 +150,48 @@ def HU_find_max_density_difference(hu_min, hu_max, d_min, d_max, densities):
     return d_max - d_min
 
 
-def HounsfieldUnit_to_material(simulation, density_tolerance, file_mat, file_density):
+def HU_linear_interpolate_densities_array(hu, hu_table, density_table):
     """
-    Same function than in GateHounsfieldToMaterialsBuilder class.
-    Probably far from optimal, put we keep the compatibility
+    Vectorized version of HU_linear_interpolate_densities, for an array of HU
+    and the density table given as two sorted arrays (HU, density).
     """
+    hu = np.asarray(hu, dtype=float)
+    n = len(hu_table)
+    # index of the last table HU strictly lower than hu
+    i = np.searchsorted(hu_table, hu, side="left") - 1
+    j = np.clip(i, 0, max(n - 2, 0))
+    k = np.minimum(j + 1, n - 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        v = ((hu - hu_table[j]) / (hu_table[k] - hu_table[j])) * (
+            density_table[k] - density_table[j]
+        ) + density_table[j]
+    v = np.where(i < 0, density_table[0], v)
+    v = np.where(i >= n - 1, density_table[n - 1], v)
+    return v
 
+
+def HounsfieldUnit_to_material_definitions(density_tolerance, file_mat, file_density):
+    """
+    Compute the HU intervals and the definitions of the materials corresponding
+    to the material and density tables (like GateHounsfieldToMaterialsBuilder),
+    without creating the materials.
+    Return the list of [HU min, HU max, material name] and the list of
+    material definitions [name, element symbols, element weights, density].
+    """
     materials, elements = HU_read_materials_table(file_mat)
     densities = HU_read_density_table(file_density)
     voxel_materials = []
-    created_materials = []
+    material_definitions = []
     gcm3 = g4_units.g_cm3
 
     elems = elements[1 : len(elements) - 1]
     elems_symbol = [elements_name_symbol[x] for x in elems]
+    hu_table = np.array([x["HU"] for x in densities], dtype=float)
+    density_table = np.array([x["density"] for x in densities], dtype=float)
 
-    i = 0
     num = 0
     last_i = len(materials) - 1
-    for mat in materials:
+    for i, mat in enumerate(materials):
         # get HU interval
         hu_min = mat["HU"]
         if i == last_i:
@@ -175,13 +204,13 @@ def HounsfieldUnit_to_material(simulation, density_tolerance, file_mat, file_den
             fatal(f"Error, HU interval not valid: {mat}")
 
         # get densities interval
-        dmin = HU_linear_interpolate_densities(hu_min, densities)
-        dmax = HU_linear_interpolate_densities(hu_max, densities)
+        dmin, dmax = HU_linear_interpolate_densities_array(
+            [hu_min, hu_max], hu_table, density_table
+        )
         ddiff = HU_find_max_density_difference(hu_min, hu_max, dmin, dmax, densities)
 
         # nb of bins
         n = max(1, ddiff * gcm3 / density_tolerance)
-        # n_naive = max(1, (dmax - dmin) * gcm3 / density_tolerance)
 
         # check if AIR
         if "Air" in mat["name"] or "AIR" in mat["name"]:
@@ -191,40 +220,104 @@ def HounsfieldUnit_to_material(simulation, density_tolerance, file_mat, file_den
         htol = (hu_max - hu_min) / n
 
         # like in Gate
-        if n != 1:
-            n = int(np.ceil(n))
-
-        # loop on density interval
-        for j in range(n):
-            h1 = hu_min + j * htol
-            h2 = min(hu_min + (j + 1) * htol, hu_max)
-            d = HU_linear_interpolate_densities(h1 + (h2 - h1) / 2.0, densities)
-            # create a new material with the interpolated density
-            weights = [mat[x] for x in elems]
-            weights_nz = []
-            elems_symbol_nz = []
-            # remove the weight equal to zero
-            sum_of_weights = 0
-            for a, e in zip(weights, elems_symbol):
-                if a > 0:
-                    weights_nz.append(a)
-                    elems_symbol_nz.append(e)
-                    sum_of_weights += a
-            # normalise weight
-            for k in range(len(weights_nz)):
-                weights_nz[k] = weights_nz[k] / sum_of_weights
-            # define a new material (will be created later at MaterialDatabase initialize)
+        n = int(np.ceil(n))
+
+        # all density sub-intervals at once
+        j = np.arange(n)
+        h1 = hu_min + j * htol
+        h2 = np.minimum(hu_min + (j + 1) * htol, hu_max)
+        d = HU_linear_interpolate_densities_array(
+            h1 + (h2 - h1) / 2.0, hu_table, density_table
+        )
+
+        # the (normalized) weights without zeros are the same for all sub-intervals
+        weights = [mat[x] for x in elems]
+        elems_symbol_nz = [e for a, e in zip(weights, elems_symbol) if a > 0]
+        weights_nz = [a for a in weights if a > 0]
+        sum_of_weights = sum(weights_nz)
+        weights_nz = [a / sum_of_weights for a in weights_nz]
+
+        for k in range(n):
+            # define a new material with the interpolated density
             name = f'{mat["name"]}_{num}'
-            simulation.volume_manager.material_database.add_material_weights(
-                name, elems_symbol_nz, weights_nz, d * gcm3
+            material_definitions.append(
+                [name, elems_symbol_nz, weights_nz, float(d[k]) * gcm3]
             )
             # get the final correspondence
-            c = [h1, h2, name]
-            voxel_materials.append(c)
-            created_materials.append(name)
+            voxel_materials.append([float(h1[k]), float(h2[k]), name])
             num = num + 1
-        #
-        i = i + 1
+    return voxel_materials, material_definitions
+
+
+def HounsfieldUnit_to_material_cache_key(density_tolerance, file_mat, file_density):
+    """
+    Key of the HU to material conversion: it depends on the content of the
+    two tables and on the density tolerance.
+    """
+    h = hashlib.sha256()
+    h.update(f"version={HU_to_material_cache_version};".encode())
+    for f in (file_mat, file_density):
+        with open(f, "rb") as fd:
+            h.update(hashlib.sha256(fd.read()).digest())
+    h.update(f"tolerance={float(density_tolerance)!r}".encode())
+    return h.hexdigest()
+
+
+def HounsfieldUnit_to_material(
+    simulation, density_tolerance, file_mat, file_density, cache_folder=None
+):
+    """
+    Same function than in GateHounsfieldToMaterialsBuilder class.
+    The materials are defined in the material database of the simulation
+    (they will be created at initialization).
+
+    If cache_folder is given, the result is stored in this folder and read back
+    by the next calls with the same material table, density table (same content)
+    and density_tolerance.
+    """
+    cache_file = None
+    voxel_materials = None
+    if cache_folder is not None:
+        key = HounsfieldUnit_to_material_cache_key(
+            density_tolerance, file_mat, file_density
+        )
+        cache_file = Path(cache_folder) / f"hu_to_material_{key}.json"
+        if cache_file.is_file():
+            try:
+                with open(cache_file, "r") as f:
+                    cached = json.load(f)
+                voxel_materials = cached["voxel_materials"]
+                material_definitions = cached["materials"]
+            except (OSError, ValueError, KeyError):
+                # corrupted (or being written) cache file: compute it again
+                voxel_materials = None
+
+    if voxel_materials is None:
+        voxel_materials, material_definitions = HounsfieldUnit_to_material_definitions(
+            density_tolerance, file_mat, file_density
+        )
+        if cache_file is not None:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            # write then rename, so that concurrent simulations never read a partial file
+            tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_file, "w") as f:
+                json.dump(
+                    {
+                        "voxel_materials": voxel_materials,
+                        "materials": material_definitions,
+                    },
+                    f,
+                )
+            os.replace(tmp_file, cache_file)
+
+    # define the new materials (will be created later at MaterialDatabase initialize)
+    material_database = simulation.volume_manager.material_database
+    created_materials = []
+    for name, elems_symbol_nz, weights_nz, density in material_definitions:
+        material_database.add_material_weights(
+            name, elems_symbol_nz, weights_nz, density
+        )
+        created_materials.append(name)
     return voxel_materials, created_materials
 
 
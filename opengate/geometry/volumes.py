@@ -1,5 +1,7 @@
 import re
 import os
+import hashlib
+from pathlib import Path
 from typing import List
 
 import numpy as np
@@ -14,7 +16,7 @@ from ..base import DynamicGateObject, process_cls
 from . import solids
 from ..utility import ensure_filename_is_str
 from ..exception import fatal, warning
-from ..image import write_itk_image
+from ..image import write_itk_image, label_lut_to_mu_image
 from ..image import update_image_py_to_cpp
 from .utility import (
     vec_np_as_g4,
@@ -839,6 +841,8 @@ class ImageVolume(VolumeBase, solids.ImageSolid):
     voxel_materials: List
     image: str
     dump_label_image: str
+    label_image_cache: str
+    label_stack: bool
 
     user_info_defaults = {
         "voxel_materials": (
@@ -863,6 +867,26 @@ class ImageVolume(VolumeBase, solids.ImageSolid):
                 "Set to None to dump no image."
             },
         ),
+        "label_image_cache": (
+            None,
+            {
+                "doc": "Folder where the label images are cached, keyed on the content of the "
+                "image and on the voxel_materials, so that the following runs with the same image "
+                "skip the labeling. A relative path is relative to the simulation output_dir. "
+                "True means the folder 'label_image_cache' in the output_dir. "
+                "Set to None (default) to disable the cache."
+            },
+        ),
+        "label_stack": (
+            False,
+            {
+                "doc": "For a dynamic parametrisation with several images (e.g. 4D CT), "
+                "store the label images of all phases in one memory-mapped file "
+                "(label_stack_<volume name>.npy in the output_dir) instead of in memory. "
+                "The phases are read on demand, and at each run only the voxels which differ "
+                "from the previous phase are sent to the parametrisation."
+            },
+        ),
     }
 
     def __init__(self, *args, **kwargs):
@@ -1121,26 +1145,43 @@ class ImageVolume(VolumeBase, solids.ImageSolid):
         return itk_image
 
     def create_attenuation_image(self, database, energy):
-        # convert all materials to mu
-        label_to_mu = {}
+        """Create the attenuation (mu) image of the label image for the given energy.
+        If energy is a list, the mu of all energies are computed in one pass and
+        the returned image is a vector image with one component per energy.
+        """
+        energies = np.atleast_1d(energy).astype(float)
+        lut = self.create_label_to_mu_lut(database, energies)
+        itk_mu_img = label_lut_to_mu_image(self.label_image, lut, energy)
+        # the label image may be centered at 0 (see save_label_image)
+        itk_mu_img.SetOrigin(self.itk_image.GetOrigin())
+        return itk_mu_img
+
+    def create_label_to_mu_lut(self, database, energies):
+        """Return an array (energies x labels) with the mu of the material of each label."""
+        n_labels = max(self.material_to_label_lut.values()) + 1
+        lut = np.zeros((len(energies), n_labels), dtype=np.float32)
         mu_handler = g4.GateMaterialMuHandler.GetInstance(
             database, 200 * g4_units.MeV
         )  # max in MeV
         prod_cuts_table = g4.G4ProductionCutsTable.GetProductionCutsTable()
+        # the mu only depends on the material of the couple, so the couples that
+        # share a material (e.g. with different production cuts) are computed once
+        mu_per_material = {}
         for i in range(prod_cuts_table.GetTableSize()):
             couple = prod_cuts_table.GetMaterialCutsCouple(i)
             mat_name = str(couple.GetMaterial().GetName())
-            label = self.material_to_label_lut[mat_name]
-            mu = mu_handler.GetMu(couple, energy / g4_units.MeV)
-            label_to_mu[label] = mu
-
-        arr = itk.GetArrayViewFromImage(self.label_image)
-        mu_arr = arr.copy().astype("float32")
-        for label, mu in label_to_mu.items():
-            mu_arr[mu_arr == label] = mu
-        itk_mu_img = itk.GetImageFromArray(mu_arr)
-        itk_mu_img.CopyInformation(self.itk_image)
-        return itk_mu_img
+            if mat_name not in self.material_to_label_lut:
+                fatal(
+                    f"Cannot create the attenuation image of the volume {self.name}: "
+                    f"the material {mat_name} is not in its material to label table "
+                    f"{list(self.material_to_label_lut.keys())}"
+                )
+            if mat_name not in mu_per_material:
+                mu_per_material[mat_name] = [
+                    mu_handler.GetMu(couple, e / g4_units.MeV) for e in energies
+                ]
+            lut[:, self.material_to_label_lut[mat_name]] = mu_per_material[mat_name]
+        return lut
 
     def create_label_image(self, itk_image=None):
         # read image
@@ -1179,14 +1220,74 @@ class ImageVolume(VolumeBase, solids.ImageSolid):
         # get numpy array view of input itk image
         input_image = itk.array_view_from_image(itk_image)
 
-        label_image_arr = np.array(labels_sorted, dtype=np.ushort)[
-            np.digitize(input_image, bins=bins_sorted)
-        ]
+        # reuse the labels computed by a previous run with the same image, if any
+        label_image_arr = None
+        cache_path = None
+        if self.label_image_cache:
+            cache_path = self.get_label_image_cache_path(
+                input_image, voxel_materials_sorted
+            )
+            label_image_arr = self.read_label_image_cache(cache_path)
+
+        if label_image_arr is None:
+            label_image_arr = np.array(labels_sorted, dtype=np.ushort)[
+                np.digitize(input_image, bins=bins_sorted)
+            ]
+            if cache_path is not None:
+                self.write_label_image_cache(cache_path, label_image_arr)
 
         label_image = itk.image_from_array(label_image_arr)
         label_image.CopyInformation(itk_image)
         return label_image
 
+    def get_label_image_cache_path(self, image_array, voxel_materials_sorted):
+        """Path (without suffix) of the cached label image, keyed on the
+        content of the image, the voxel_materials and the material LUT."""
+        if self.label_image_cache is True:
+            folder = "label_image_cache"
+        else:
+            folder = self.label_image_cache
+        if self.volume_manager is not None:
+            folder = self.volume_manager.simulation.get_output_path(
+                folder, is_file_or_directory="dir"
+            )
+        else:
+            folder = Path(folder)
+            folder.mkdir(parents=True, exist_ok=True)
+        h = hashlib.blake2b(digest_size=20)
+        image_array = np.ascontiguousarray(image_array)
+        h.update(f"{image_array.dtype.str};{image_array.shape};".encode())
+        h.update(memoryview(image_array).cast("B"))
+        vm = [[float(v[0]), float(v[1]), str(v[2])] for v in voxel_materials_sorted]
+        h.update(repr(vm).encode())
+        h.update(json.dumps(self.material_to_label_lut).encode())
+        return Path(folder) / f"labels_{h.hexdigest()}"
+
+    def read_label_image_cache(self, cache_path):
+        npy_path = cache_path.with_suffix(".npy")
+        json_path = cache_path.with_suffix(".json")
+        if not npy_path.is_file() or not json_path.is_file():
+            return None
+        try:
+            with open(json_path) as f:
+                lut = json.load(f)
+            label_image_arr = np.load(npy_path)
+        except (OSError, ValueError):
+            # incomplete or corrupted cache, the labels are computed again
+            return None
+        if lut != self.material_to_label_lut or label_image_arr.dtype != np.ushort:
+            return None
+        return label_image_arr
+
+    def write_label_image_cache(self, cache_path, label_image_arr):
+        # write into temporary files then rename, so concurrent runs never read a partial file
+        tmp_path = cache_path.parent / f"{cache_path.name}.{os.getpid()}.tmp"
+        np.save(tmp_path.with_suffix(".npy"), label_image_arr)
+        with open(tmp_path.with_suffix(".json"), "w") as f:
+            json.dump(self.material_to_label_lut, f)
+        os.replace(tmp_path.with_suffix(".json"), cache_path.with_suffix(".json"))
+        os.replace(tmp_path.with_suffix(".npy"), cache_path.with_suffix(".npy"))
+
     def create_image_parametrisation(self, label_image=None):
         if label_image is None:
             if self.label_image is None:
@@ -1208,6 +1309,63 @@ class ImageVolume(VolumeBase, solids.ImageSolid):
         update_image_py_to_cpp(label_image, self.g4_voxel_param.cpp_edep_image, True)
         self.g4_voxel_param.initialize_image()
 
+    def update_labels(self, labels, indices=None):
+        """Needed for dynamic image parametrisation with a label stack.
+        Set the labels of the voxels given by their flat indices (z, y, x order),
+        or of all voxels if indices is None. The geometry of the image does not change.
+        """
+        labels = np.ascontiguousarray(labels, dtype=np.ushort).ravel()
+        if indices is None:
+            self.g4_voxel_param.set_all_labels(labels)
+        else:
+            self.g4_voxel_param.set_labels(indices, labels)
+
+    def create_label_stack(self, paths_to_images):
+        """Write the label images of the given images in a single .npy file,
+        of shape (number of images, z, y, x). The images are labeled one at a time.
+        All images must have the same size, spacing, origin and direction,
+        as only the labels are stored. Return the path of the file.
+        """
+        path = self.volume_manager.simulation.get_output_path(
+            f"label_stack_{self.name}.npy"
+        )
+        stack = None
+        geometry = None
+        for i, path_to_image in enumerate(paths_to_images):
+            itk_image = self.load_input_image(path_to_image)
+            image_geometry = {
+                "spacing": np.array(itk_image.GetSpacing()),
+                "origin": np.array(itk_image.GetOrigin()),
+                "direction": np.array(itk_image.GetDirection()),
+            }
+            label_image_arr = itk.array_view_from_image(
+                self.create_label_image(itk_image)
+            )
+            if stack is None:
+                stack = np.lib.format.open_memmap(
+                    path,
+                    mode="w+",
+                    dtype=np.ushort,
+                    shape=(len(paths_to_images),) + label_image_arr.shape,
+                )
+                geometry = image_geometry
+            elif label_image_arr.shape != stack.shape[1:]:
+                fatal(
+                    f"The images of the dynamic parametrisation of the volume {self.name} "
+                    f"must have the same size, while {path_to_image} has the shape "
+                    f"{label_image_arr.shape} and the previous ones {stack.shape[1:]}."
+                )
+            for k, v in image_geometry.items():
+                if not np.allclose(v, geometry[k]):
+                    fatal(
+                        f"The images of the dynamic parametrisation of the volume {self.name} "
+                        f"must have the same {k}, while {path_to_image} has the {k} "
+                        f"{v.tolist()} and the previous ones {geometry[k].tolist()}."
+                    )
+            stack[i] = label_image_arr
+        stack.flush()
+        return path
+
     def save_label_image(self, path=None):
         # dump label image ?
         if path is None:
@@ -1245,7 +1403,20 @@ class ImageVolume(VolumeBase, solids.ImageSolid):
         counter = 0
         for dp in self.dynamic_params.values():
             if dp["extra_params"]["auto_changer"] is True:
-                if "image" in dp:
+                if "image" in dp and self.label_stack is True:
+                    # the label images are written in a file, read during the runs
+                    label_stack_images = list(dict.fromkeys(dp["image"]))
+                    new_changer = VolumeImageChanger(
+                        name=f"{self.name}_volume_image_changer_{len(changers)}",
+                        attached_to=self,
+                        simulation=self.simulation,
+                        images=dp["image"],
+                        label_stack=str(self.create_label_stack(label_stack_images)),
+                        label_stack_images=label_stack_images,
+                    )
+                    changers.append(new_changer)
+                    counter += 1
+                elif "image" in dp:
                     # create a LUT of image parametrisations
                     label_image = {}
                     for path_to_image in set(dp["image"]):
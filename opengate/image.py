@@ -302,6 +302,56 @@ def compute_image_3D_CDF(image):
     return cdf_x, cdf_y, cdf_z
 
 
+def compute_image_alias_table(image):
+    """
+    Compute an alias table (Walker/Vose method) over the non-zero voxels of the
+    image, to sample a voxel in constant time: a column c is drawn uniformly,
+    it is kept with probability probabilities[c], otherwise aliases[c] is used.
+    The voxels are given by their flat index (numpy order ZYX).
+
+    :param image: itk image
+    :return: indices, probabilities, aliases (flat numpy arrays)
+    """
+    # (copy, see compute_image_3D_CDF)
+    weights = itk.array_from_image(image).ravel()
+    if weights.size >= 2**32:
+        fatal(f"The image is too large for an alias table ({weights.size} voxels)")
+    indices = np.flatnonzero(weights > 0).astype(np.uint32)
+    n = len(indices)
+    if n == 0:
+        fatal("The image has no voxel with a positive value")
+
+    # mean weight is 1
+    q = weights[indices].astype(np.float64)
+    q *= n / np.sum(q)
+    probabilities = np.ones(n)
+    aliases = np.arange(n, dtype=np.uint32)
+
+    # Vose method, vectorized: the small columns (q < 1) are processed in order
+    # and completed by the current large one, until its weight is below 1. It
+    # then becomes a column completed by the next large one. The current large
+    # one is given by the cumulated deficits and surpluses.
+    small = np.flatnonzero(q < 1)
+    large = np.flatnonzero(q >= 1)
+    if len(small) > 0 and len(large) > 0:
+        deficits = 1 - q[small]
+        cum_deficits = np.cumsum(deficits)
+        cum_surpluses = np.cumsum(q[large] - 1)
+        probabilities[small] = q[small]
+        donor = np.searchsorted(cum_surpluses, cum_deficits - deficits, side="left")
+        aliases[small] = large[np.minimum(donor, len(large) - 1)]
+        # large columns exhausted by a small one
+        c = np.searchsorted(cum_deficits, cum_surpluses, side="right")
+        exhausted = c < len(small)
+        probabilities[large[exhausted]] = 1 - (
+            cum_deficits[c[exhausted]] - cum_surpluses[exhausted]
+        )
+        next_large = np.minimum(np.flatnonzero(exhausted) + 1, len(large) - 1)
+        aliases[large[exhausted]] = large[next_large]
+
+    return indices, probabilities, aliases
+
+
 def scale_itk_image(img, scale):
     imgarr = itk.array_from_image(img)
     imgarr = imgarr * scale
@@ -443,6 +493,28 @@ def write_itk_image(img, file_path):
     itk.imwrite(img, str(file_path))
 
 
+def label_lut_to_mu_image(label_image, lut, energy):
+    """
+    Create the attenuation (mu) image of a label image, lut being the array
+    (energies x labels) of the mu of each label. If energy is a list, the output
+    is a vector image with one component per energy, otherwise a scalar image.
+    """
+    # gather the mu of the label of each voxel, for all energies at once
+    arr = itk.array_view_from_image(label_image)
+    mu_arr = lut[:, arr]
+    if np.ndim(energy) == 0:
+        mu_image = itk.image_from_array(mu_arr[0])
+        mu_image.CopyInformation(label_image)
+        return mu_image
+    mu_image = itk.image_from_array(
+        np.ascontiguousarray(np.moveaxis(mu_arr, 0, -1)), is_vector=True
+    )
+    mu_image.SetOrigin(label_image.GetOrigin())
+    mu_image.SetSpacing(label_image.GetSpacing())
+    mu_image.SetDirection(label_image.GetDirection())
+    return mu_image
+
+
 def images_have_same_domain(image1, image2, tolerance=1e-5):
     # Check if the sizes and origins of the images are the same,
     # and if the spacing values are close within the given tolerance
@@ -6,6 +6,8 @@ import shutil
 import weakref
 from pathlib import Path
 import io
+import random
+import numpy as np
 
 import opengate_core as g4
 from .base import (
@@ -35,7 +37,7 @@ from .physics import (
     translate_particle_name_gate_to_geant4,
 )
 from .serialization import dump_json, dumps_json, loads_json, load_json
-from .processing import dispatch_to_subprocess
+from .processing import dispatch_to_subprocess, dispatch_to_subprocesses
 
 from .sources.generic import SourceBase, GenericSource
 from .sources.phspsources import PhaseSpaceSource
@@ -76,6 +78,7 @@ from .geometry.volumes import (
 )
 from .actors.filters import get_filter_class, FilterBase, filter_classes
 from .actors.base import ActorBase
+from .actors.actoroutput import ActorOutputRoot
 
 from .actors.doseactors import (
     DoseActor,
@@ -112,6 +115,7 @@ from .actors.digitizers import (
     DigitizerProjectionActor,
     DigitizerEnergyWindowsActor,
     DigitizerHitsCollectionActor,
+    StepRecordActor,
     PhaseSpaceActor,
     DigiAttributeProcessDefinedStepInVolumeActor,
 )
@@ -153,6 +157,7 @@ actor_types = {
     "DigitizerProjectionActor": DigitizerProjectionActor,
     "DigitizerEnergyWindowsActor": DigitizerEnergyWindowsActor,
     "DigitizerHitsCollectionActor": DigitizerHitsCollectionActor,
+    "StepRecordActor": StepRecordActor,
     "DigiAttributeProcessDefinedStepInVolumeActor": DigiAttributeProcessDefinedStepInVolumeActor,
     # biasing
     "BremsstrahlungSplittingActor": BremsstrahlungSplittingActor,
@@ -1666,6 +1671,10 @@ class Simulation(GateObject):
         # read-only info
         self._current_random_seed = None
 
+        # position of this simulation among the processes of run_parallel
+        self.parallel_process_index = 0
+        self.number_of_parallel_processes = 1
+
         self.expected_number_of_events = None
 
     def __str__(self):
@@ -1918,6 +1927,9 @@ class Simulation(GateObject):
             # because everything is already in place.
             output = self._run_simulation_engine(False)
 
+        self._finalize_run(output)
+
+    def _finalize_run(self, output):
         # replace warnings by the one of the subprocess
         self._user_warnings = output.warnings
 
@@ -1957,6 +1969,166 @@ class Simulation(GateObject):
         # but this cleans for all. Trust me, bro.
         g4.GateGammaFreeFlightOptrActor.ClearOperators()
 
+    def run_parallel(self, n_processes=None, split="primaries"):
+        """Run the simulation in n_processes subprocesses and merge their output.
+
+        Each process runs its own Geant4 engine (possibly multithreaded) with a
+        distinct random seed and a share of the primaries. With split="primaries",
+        the number of primaries (source.n) or the activity of each source is divided
+        among the processes.
+        With split="time", each run timing interval is divided into n_processes
+        contiguous sub-intervals, one per process.
+
+        The actor outputs of all processes are merged in this process,
+        e.g. images are summed and mean values are weighted by their number of samples,
+        ROOT files are concatenated, and they are then written to disk as requested.
+
+        Returns:
+            obj:SimulationOutput : The merged output of the simulation processes.
+        """
+        if os.name == "nt" and self.multithreaded:
+            fatal(
+                "Error, the multi-thread option is not available for Windows now. "
+                "Run the simulation with one thread."
+            )
+        if n_processes is None:
+            n_processes = max(1, os.cpu_count() // self.number_of_threads)
+        n_processes = int(n_processes)
+        if n_processes < 1:
+            fatal(f"run_parallel: n_processes must be at least 1, not {n_processes}.")
+        if split not in ("primaries", "time"):
+            fatal(
+                f"run_parallel: unknown split '{split}'. "
+                f"Valid values are 'primaries' and 'time'. "
+            )
+
+        # ROOT output is written by each process to its own folder,
+        # this only works if the output path depends on the output_dir
+        for actor in self.actor_manager.actors.values():
+            for uo in actor.user_output.values():
+                if (
+                    isinstance(uo, ActorOutputRoot)
+                    and uo.write_to_disk is True
+                    and uo.output_filename not in ("", None)
+                    and Path(uo.output_filename).is_absolute()
+                ):
+                    fatal(
+                        f"run_parallel: the ROOT output {uo.name} of actor {actor.name} "
+                        f"has an absolute output_filename {uo.output_filename}. "
+                        f"Use a filename relative to Simulation.output_dir instead. "
+                    )
+
+        # one distinct seed per process, drawn here to be reproducible
+        if self.random_seed == "auto":
+            base_seed = random.randrange(sys.maxsize)
+        else:
+            base_seed = self.random_seed
+        seeds = [base_seed + k for k in range(n_processes)]
+
+        logger.info(f"Dispatching simulation to {n_processes} subprocesses ...")
+        outputs = dispatch_to_subprocesses(
+            self._run_parallel_process,
+            [(k, n_processes, split, seeds[k]) for k in range(n_processes)],
+        )
+
+        # keep the actor outputs of the first process and merge the others into them
+        for actor in self.actor_manager.actors.values():
+            keep_data_in_memory = {
+                name: uo.keep_data_in_memory for name, uo in actor.user_output.items()
+            }
+            actor.recover_user_output(outputs[0].get_actor(actor.name))
+            for other in outputs[1:]:
+                other_actor = other.get_actor(actor.name)
+                for name, uo in actor.user_output.items():
+                    uo.inplace_merge_with(other_actor.user_output[name])
+            for name, uo in actor.user_output.items():
+                if isinstance(uo, ActorOutputRoot):
+                    if uo.write_to_disk is True:
+                        uo.merge_output_files(
+                            [
+                                self._get_parallel_process_output_path(
+                                    uo.get_output_path(), k
+                                )
+                                for k in range(n_processes)
+                            ]
+                        )
+                else:
+                    try:
+                        uo.write_data_if_requested()
+                    except NotImplementedError:
+                        # this output has nothing to write to disk
+                        pass
+                    uo.keep_data_in_memory = keep_data_in_memory[name]
+                    uo.close()
+            actor.finalize_output_files()
+        for k in range(n_processes):
+            shutil.rmtree(self._get_parallel_process_output_dir(k), ignore_errors=True)
+
+        output = outputs[0]
+        output.actors = self.actor_manager.actors
+        output.warnings = [w for o in outputs for w in (o.warnings or [])]
+        output.log_output = "".join(o.log_output for o in outputs)
+        try:
+            output.expected_number_of_events = sum(
+                o.expected_number_of_events for o in outputs
+            )
+        except TypeError:
+            # at least one process does not know its expected number of events
+            output.expected_number_of_events = "unknown"
+        output.user_hook_log = [h for o in outputs for h in o.user_hook_log]
+        output.current_random_seed = [o.current_random_seed for o in outputs]
+        self._finalize_run(output)
+        return output
+
+    def _get_parallel_process_output_dir(self, process_index):
+        return Path(self.output_dir) / f"run_parallel_process_{process_index}"
+
+    def _get_parallel_process_output_path(self, path, process_index):
+        relative_path = Path(path).relative_to(Path(self.output_dir))
+        return self._get_parallel_process_output_dir(process_index) / relative_path
+
+    def _run_parallel_process(self, process_index, n_processes, split, seed):
+        """Executed in the subprocess: adapt this copy of the simulation
+        to its share of the work and run it.
+        """
+        self.random_seed = seed
+        self.output_dir = self._get_parallel_process_output_dir(process_index)
+        self.parallel_process_index = process_index
+        self.number_of_parallel_processes = n_processes
+
+        if split == "time":
+            intervals = []
+            for t_start, t_stop in self.run_timing_intervals:
+                dt = (t_stop - t_start) / n_processes
+                intervals.append(
+                    [t_start + process_index * dt, t_start + (process_index + 1) * dt]
+                )
+            self.run_timing_intervals = intervals
+
+        for source in self.source_manager.sources.values():
+            n = np.atleast_1d(np.asarray(source.n, dtype=int))
+            if np.any(n > 0):
+                # the first (n % n_processes) processes simulate one more primary
+                n_process = n // n_processes + (process_index < n % n_processes)
+                if np.all(n_process == 0):
+                    fatal(
+                        f"run_parallel: source {source.name} has fewer primaries "
+                        f"than the number of processes ({n_processes})."
+                    )
+                source.n = (
+                    n_process.tolist() if len(n_process) > 1 else int(n_process[0])
+                )
+            elif split == "primaries":
+                source.activity = source.activity / n_processes
+
+        # the merge happens in the main process, so the data must be sent back
+        for actor in self.actor_manager.actors.values():
+            for uo in actor.user_output.values():
+                if not isinstance(uo, ActorOutputRoot):
+                    uo.keep_data_in_memory = True
+
+        return self._run_simulation_engine(True)
+
     def voxelize_geometry(
         self,
         extent="auto",
@@ -2,6 +2,7 @@ from anytree import LoopError
 from pathlib import Path
 import tables
 from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 import inspect
 
 import opengate.postprocessors
@@ -26,6 +27,7 @@ class ProcessingGroupBase(GateObject):
         self._need_tree_update = True  # flag to store state of processing unit tree
 
     def close(self):
+        super().close()
         for r in self.tree_roots:
             r.close()
         self._need_tree_update = True
@@ -144,11 +146,59 @@ class ProcessingGroupBase(GateObject):
 
 
 class PostProcessor(ProcessingGroupBase):
+    user_info_defaults = {
+        "chunk_size": (
+            None,
+            {
+                "doc": "If None, each processing unit processes whole tables in memory. "
+                "Otherwise, tables are streamed in blocks of chunk_size rows "
+                "through the row-local units (one read/write per block) "
+                "and the projections are accumulated block by block, "
+                "so that tables larger than the memory can be processed. ",
+            },
+        ),
+        "use_cache": (
+            False,
+            {
+                "doc": "If True, the output file of the previous run is kept, "
+                "and the units whose parameters and inputs did not change are not recomputed: "
+                "their output is read from the file. The cache key of a unit is a hash of "
+                "its user info and of the keys of its input units (and of the input files). ",
+            },
+        ),
+        "number_of_processes": (
+            1,
+            {
+                "doc": "If larger than 1, the independent processing trees (one per tree root) "
+                "are processed in parallel in a pool of processes. Each tree is stored in "
+                "its own file output_<name>_<tree root>.h5, linked from the main output file. ",
+            },
+        ),
+    }
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.output_file_handle = None
         self.extra_file_handles = {}
+        # if set, only this processing tree is processed (in a sub-process)
+        self.tree_root_name = None
+
+    @property
+    def selected_tree_roots(self):
+        if self.tree_root_name is None:
+            return self.tree_roots
+        return tuple(tr for tr in self.tree_roots if tr.name == self.tree_root_name)
+
+    def get_tree_root_of_unit(self, unit):
+        # units of processing sequences belong to the tree of their sequence
+        while unit.processing_group is not self:
+            unit = unit.processing_group
+        return unit.root
+
+    def get_output_filename(self, tree_root_name=None):
+        if tree_root_name is None:
+            return f"output_{self.name}.h5"
+        return f"output_{self.name}_{tree_root_name}.h5"
 
     def initialize(self):
         self.update_processing_tree()
@@ -163,8 +213,10 @@ class PostProcessor(ProcessingGroupBase):
     def initialize_output_file(self):
         if self.output_file_handle is None:
             self.output_file_handle = tables.open_file(
-                self.simulation.get_output_path(f"output_{self.name}.h5"),
-                mode="w",
+                self.simulation.get_output_path(
+                    self.get_output_filename(self.tree_root_name)
+                ),
+                mode="a" if self.use_cache else "w",
                 title=f"Output post-processor {self.name}",
             )
         ensure_directory_exists(self.output_directory_external_files)
@@ -262,14 +314,44 @@ class PostProcessor(ProcessingGroupBase):
         self.release_file_handles()
 
     def run(self):
+        if (
+            self.number_of_processes > 1
+            and self.tree_root_name is None
+            and len(self.tree_roots) > 1
+        ):
+            self.run_in_subprocesses()
+            return
         try:
             self.initialize()
-            for tr in self.tree_roots:
+            for tr in self.selected_tree_roots:
                 tr.update_output()
             self.output_file_handle.flush()
         finally:
             self.close()
 
+    def run_in_subprocesses(self):
+        names = [tr.name for tr in self.tree_roots]
+        with ProcessPoolExecutor(max_workers=self.number_of_processes) as executor:
+            futures = [
+                executor.submit(run_processing_tree_in_subprocess, self, n)
+                for n in names
+            ]
+            # raise the errors of the sub-processes, if any
+            for f in futures:
+                f.result()
+        # link the output of each tree in the main output file
+        try:
+            self.initialize_output_file()
+            for n in names:
+                if n in self.output_file_handle.root:
+                    self.output_file_handle.remove_node("/", n, recursive=True)
+                self.output_file_handle.create_external_link(
+                    "/", n, f"{self.get_output_filename(n)}:/{n}"
+                )
+            self.output_file_handle.flush()
+        finally:
+            self.close()
+
     @property
     def hdf5_group(self):
         if self.output_file_handle is not None:
@@ -278,18 +360,26 @@ class PostProcessor(ProcessingGroupBase):
             return None
 
     def initialize_hdf5_groups(self):
+        tree_roots = self.selected_tree_roots
         for u in self.all_processing_units:
-            u.initialize_hdf5_group_in_output_file()
+            if self.get_tree_root_of_unit(u) in tree_roots:
+                u.initialize_hdf5_group_in_output_file()
 
     @property
     def all_initial_units(self):
         """Get all"""
         initial_units = []
-        for tr in self.tree_roots:
+        for tr in self.selected_tree_roots:
             initial_units.extend(tr.leaves)
         return initial_units
 
 
+def run_processing_tree_in_subprocess(post_processor, tree_root_name):
+    """Process a single tree of the post-processor, in its own output file."""
+    post_processor.tree_root_name = tree_root_name
+    post_processor.run()
+
+
 class ManagedExternalLink(tables.linkextension.ExternalLink, tables.link.Link):
     """Variant of the ExternalLink class from PyTables."""
 
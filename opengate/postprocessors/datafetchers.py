@@ -71,6 +71,13 @@ class DataFetcherBase(ProcessingUnitBase):
         else:
             return None
 
+    def get_input_signature(self):
+        input_path = self._get_input_path()
+        if input_path is None or not Path(input_path).is_file():
+            return str(input_path)
+        stat = Path(input_path).stat()
+        return [str(input_path), stat.st_size, stat.st_mtime_ns]
+
     def close(self):
         super().close()
         self._input_path = None
@@ -32,6 +32,15 @@ class ProjectionListMode(ProcessingUnitBase):
         ),
     }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # projections (counts) being accumulated in chunked mode, per table name
+        self._accumulated_counts = {}
+
+    @property
+    def accumulates_chunks(self):
+        return True
+
     def get_input_data(self):
         def has_position_column(table):
             return "position" in get_table_column_names(table)
@@ -48,20 +57,62 @@ class ProjectionListMode(ProcessingUnitBase):
         for i, t in enumerate(input_tables):
             positions = get_table_column(t, "position")
             projection = create_projection_from_positions(
-                positions.read(), self.size, self.spacing
-            )  # read() returns an array
-            output_name = f"projection_{get_node_name(t)}"
-            # create a link to the root group in an external image file
-            output_group_link = self.get_or_create_output_group(
-                "/", link_name=output_name, external_file=True
+                positions[:], self.user_info["size"], self.spacing
+            )  # [:] returns an array
+            self.write_projection(get_node_name(t), projection)
+
+    def write_projection(self, table_name, projection):
+        output_name = f"projection_{table_name}"
+        # create a link to the root group in an external image file
+        output_group_link = self.get_or_create_output_group(
+            "/", link_name=output_name, external_file=True
+        )
+        # ... and store it in this unit's registry so other units can access it
+        output_group = self.register_output_data_handle(output_group_link)
+        # write the image into that group
+        write_image_with_pytables(projection, group=output_group)
+
+    def initialize_chunks(self, table):
+        if "position" in get_table_column_names(table):
+            self._accumulated_counts[get_node_name(table)] = None
+
+    def process_chunk(self, table, rows):
+        name = get_node_name(table)
+        if name in self._accumulated_counts:
+            counts = bin_positions(
+                rows["position"], self.user_info["size"], self.spacing
             )
-            # ... and store it in this unit's registry so other units can access it
-            output_group = self.register_output_data_handle(output_group_link)
-            # write the image into that group
-            write_image_with_pytables(projection, group=output_group)
+            if self._accumulated_counts[name] is not None:
+                counts += self._accumulated_counts[name]
+            self._accumulated_counts[name] = counts
+        return rows
+
+    def finalize_chunks(self, table):
+        name = get_node_name(table)
+        if name not in self._accumulated_counts:
+            return
+        counts = self._accumulated_counts.pop(name)
+        if counts is None:
+            # empty table
+            counts = bin_positions(
+                np.zeros((0, 3)), self.user_info["size"], self.spacing
+            )
+        self.write_projection(
+            name, create_image_from_counts(counts, self.spacing, [0, 0, 0])
+        )
 
 
 def create_projection_from_positions(positions, size, spacing, origin=None):
+    if origin is None:
+        origin = [0, 0, 0]
+    binned_image = bin_positions(positions, size, spacing, origin)
+    return create_image_from_counts(binned_image, spacing, origin)
+
+
+def bin_positions(positions, size, spacing, origin=None):
+    """Counts of the positions in the 2D grid, as array in ITK order: z (=1), y, x.
+    Counts of several sets of positions (e.g. blocks of a table) can be added.
+    """
     if origin is None:
         origin = [0, 0, 0]
 
@@ -86,8 +137,10 @@ def create_projection_from_positions(positions, size, spacing, origin=None):
 
     # create image in ITK order: z, y, x
     counts_2d = counts_1d.reshape(bins_y.size + 1, bins_x.size + 1)
-    binned_image = counts_2d[np.newaxis, 1:-1, 1:-1]
+    return counts_2d[np.newaxis, 1:-1, 1:-1]
+
 
+def create_image_from_counts(binned_image, spacing, origin):
     binned_image_itk = itk.image_view_from_array(binned_image.astype(np.int32))
     binned_image_itk.SetSpacing(spacing)
     binned_image_itk.SetOrigin(origin)
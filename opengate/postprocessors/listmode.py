@@ -1,4 +1,5 @@
 import numpy as np
+import tables
 
 from .unitbase import ProcessingUnitBase
 from ..exception import fatal
@@ -21,16 +22,36 @@ class ListModeSingleAttribute(ProcessingUnitBase):
         if len(self.children) != self._required_number_of_input_units:
             fatal(f"Too many input units. This unit accepts only one. ")
 
-    def initialize_output_data_handle(self):
-        input_data_handle = self.input_units[0].output_data_handle
-        self.output_data_handle = input_data_handle.copy(
-            newparent=self.hdf5_group
-        )  # , newname=get_node_name(input_data_handle))
+    def get_input_tables(self):
+        return [
+            t
+            for t in self.input_units[0].output_data_handles.values()
+            if isinstance(t, tables.Table)
+        ]
 
-    def get_table_column_to_work_on(self):
-        if self.output_data_handle is None:
-            self.initialize_output_data_handle()
-        return get_table_column(self.output_data_handle, self.attribute)
+    def do_your_job(self):
+        # same operation as process_chunk(), on a copy of each whole input table
+        for table in self.get_input_tables():
+            output_table = self.register_output_data_handle(
+                table.copy(newparent=self.hdf5_group)
+            )
+            column = get_table_column(output_table, self.attribute)
+            # with [:], we get an array
+            column[:] += self.get_values_to_add(column.shape)
+
+    @property
+    def is_row_local(self):
+        return True
+
+    def process_chunk(self, table, rows):
+        if self.attribute not in rows.dtype.names:
+            fatal(f"No column found for attribute {self.attribute}")
+        rows[self.attribute] += self.get_values_to_add(rows[self.attribute].shape)
+        return rows
+
+    def get_values_to_add(self, shape):
+        """Implement this in the concrete class."""
+        raise NotImplementedError
 
 
 class GaussianBlurringSingleAttribute(ListModeSingleAttribute):
@@ -43,10 +64,10 @@ class GaussianBlurringSingleAttribute(ListModeSingleAttribute):
         ),
     }
 
-    def do_your_job(self):
-        column = self.get_table_column_to_work_on()
+    def get_values_to_add(self, shape):
+        number_of_rows = shape[0]
         try:
-            attribute_size = column.shape[1]
+            attribute_size = shape[1]
         except IndexError:
             attribute_size = 1
         try:
@@ -54,20 +75,22 @@ class GaussianBlurringSingleAttribute(ListModeSingleAttribute):
         except TypeError:
             sigma_size = 1
         if sigma_size == 1:
-            sigma = np.array([self.sigma] * attribute_size)
+            sigma = np.array([self.sigma] * attribute_size).flatten()
             # perturbation = np.random.randn(len(column)) * self.sigma
         elif sigma_size == attribute_size:
-            sigma = np.array([self.sigma])
+            sigma = np.array(self.sigma)
         else:
             fatal(
                 f"User inout sigma={self.sigma} incompatible with the attribute of length {attribute_size}."
             )
 
         perturbation = np.multiply(
-            np.random.randn(len(column) * len(sigma)).reshape(len(column), len(sigma)),
+            np.random.randn(number_of_rows * len(sigma)).reshape(
+                number_of_rows, len(sigma)
+            ),
             sigma,
-        ).squeeze()
-        column[:] += perturbation
+        )
+        return perturbation.reshape(shape)
 
 
 class OffsetSingleAttribute(ListModeSingleAttribute):
@@ -80,6 +103,5 @@ class OffsetSingleAttribute(ListModeSingleAttribute):
         ),
     }
 
-    def do_your_job(self):
-        column = self.get_table_column_to_work_on()  # this is a column object
-        column[:] += self.offset  # with [:], we get an array
+    def get_values_to_add(self, shape):
+        return self.offset
@@ -1,3 +1,5 @@
+import hashlib
+import json
 import tables
 from anytree import NodeMixin
 from pathlib import Path
@@ -62,6 +64,60 @@ class ProcessingUnitBase(GateObject, NodeMixin):
     def is_processing_unit(self):
         return True
 
+    @property
+    def is_row_local(self):
+        """Row-local units transform each row of a table independently of the other rows.
+        In chunked mode, they process the tables block by block via process_chunk().
+        """
+        return False
+
+    @property
+    def accumulates_chunks(self):
+        """Units which reduce the tables (e.g. projections) and can be updated
+        block by block in chunked mode via the *_chunks() methods.
+        """
+        return False
+
+    @property
+    def chunk_size(self):
+        try:
+            return self.post_processor.chunk_size
+        except AttributeError:
+            return None
+
+    @property
+    def use_cache(self):
+        try:
+            return self.post_processor.use_cache
+        except AttributeError:
+            return False
+
+    def get_input_signature(self):
+        """Description of the input data which is not provided by input units, e.g. input files.
+        Units reading data from outside the processing tree (data fetchers) should override this.
+        """
+        return None
+
+    def get_cache_key(self):
+        """Content hash of the parameters of this unit
+        and of all the units and input data it depends on.
+        """
+        h = hashlib.sha256()
+        h.update(json.dumps(self.to_dictionary(), sort_keys=True, default=str).encode())
+        h.update(json.dumps(self.get_input_signature(), default=str).encode())
+        for key in sorted(u.get_cache_key() for u in self.input_units):
+            h.update(key.encode())
+        return h.hexdigest()
+
+    def is_up_to_date(self):
+        """True if the output file already contains the output of this unit
+        computed with the same parameters and inputs (only if use_cache is set).
+        """
+        if not self.use_cache or self.hdf5_group is None:
+            return False
+        attrs = self.hdf5_group._v_attrs
+        return "cache_key" in attrs and attrs.cache_key == self.get_cache_key()
+
     @property
     def can_be_initial_unit(self):
         """Generally, processing units cannot be the initial units in a processing tree.
@@ -229,9 +285,40 @@ class ProcessingUnitBase(GateObject, NodeMixin):
         if self.hdf5_group is None:
             if self.processing_group.hdf5_group is None:
                 self.processing_group.initialize_hdf5_group_in_output_file()
-            self.hdf5_group = self.output_file_handle.create_group(
-                self.processing_group.hdf5_group, self.name
-            )
+            try:
+                # output of a previous run (see use_cache)
+                self.hdf5_group = self.output_file_handle.get_node(
+                    self.processing_group.hdf5_group, self.name
+                )
+                if not isinstance(self.hdf5_group, tables.Group):
+                    self.hdf5_group._f_remove(recursive=True)
+                    raise tables.NoSuchNodeError
+            except tables.NoSuchNodeError:
+                self.hdf5_group = self.output_file_handle.create_group(
+                    self.processing_group.hdf5_group, self.name
+                )
+            if not self.is_up_to_date():
+                self.clear_unit_output_group()
+
+    def get_output_nodes_in_group(self):
+        """Nodes of the hdf5 group of this unit, except the groups of its own processing units."""
+        unit_names = getattr(self, "processing_units", {}).keys()
+        return [
+            n
+            for n in self.hdf5_group._f_iter_nodes()
+            if get_node_name(n) not in unit_names
+        ]
+
+    def clear_unit_output_group(self):
+        for n in self.get_output_nodes_in_group():
+            n._f_remove(recursive=True)
+        if "cache_key" in self.hdf5_group._v_attrs:
+            del self.hdf5_group._v_attrs.cache_key
+
+    def restore_output_data_handles(self):
+        """Register the outputs stored in the file by a previous run."""
+        for n in self.get_output_nodes_in_group():
+            self.register_output_data_handle(n)
 
     def get_unit_output_group(self):
         return self.hdf5_group
@@ -240,22 +327,118 @@ class ProcessingUnitBase(GateObject, NodeMixin):
         attrs = self.get_unit_output_group()._v_attrs
         for k, v in self.to_dictionary().items():
             setattr(attrs, k, v)
+        # written last: an interrupted unit is never considered as up to date
+        self.hdf5_group._v_attrs.cache_key = self.get_cache_key()
 
     def close(self):
         super().close()
         for k in self.input_data_handles.keys():
             self.input_data_handles[k] = None
+        # the handles are not valid once the file is closed
+        self.output_data_handles = {}
+        self.hdf5_group = None
         for child in self.children:
             child.close()
 
     def update_output(self):
         # do not override this method in derived classes
+        if self.is_up_to_date():
+            self.restore_output_data_handles()
+            print(f"{self.name} is up to date")
+            return
+        if self.chunk_size is not None and (
+            self.is_row_local or self.accumulates_chunks
+        ):
+            self.update_output_in_chunks()
+            return
         for child in self.children:
             child.update_output()
         self.do_your_job()
         self.store_user_attributes()
         print(f"updated {self.name}")
 
+    def get_chunk_chain(self):
+        """This unit and the row-local units below it (single input each).
+        They are fused: the blocks are read once from the input of the last unit of the chain
+        and go through all units in memory.
+        """
+        chain = [self]
+        while len(chain[-1].children) == 1 and chain[-1].children[0].is_row_local:
+            chain.append(chain[-1].children[0])
+        return chain
+
+    def update_output_in_chunks(self):
+        chain = self.get_chunk_chain()
+        for child in chain[-1].children:
+            child.update_output()
+        if len(chain[-1].input_units) != 1:
+            fatal(
+                f"Processing unit {chain[-1].name} needs exactly one input unit "
+                f"in chunked mode, while it has {len(chain[-1].input_units)}."
+            )
+        input_tables = [
+            t
+            for t in chain[-1].input_units[0].output_data_handles.values()
+            if isinstance(t, tables.Table)
+        ]
+        # units are applied from the input (end of the chain) to this unit
+        chain = chain[::-1]
+        for table in input_tables:
+            # only the output of this unit is stored, the intermediate ones are not needed
+            output_table = None
+            if self.is_row_local:
+                output_table = self.create_chunked_output_table(table)
+            for u in chain:
+                if u.accumulates_chunks:
+                    u.initialize_chunks(table)
+            for start in range(0, table.nrows, self.chunk_size):
+                rows = table.read(start, min(start + self.chunk_size, table.nrows))
+                for u in chain:
+                    rows = u.process_chunk(table, rows)
+                if output_table is not None:
+                    output_table.append(rows)
+            for u in chain:
+                if u.accumulates_chunks:
+                    u.finalize_chunks(table)
+            if output_table is not None:
+                output_table.flush()
+        # the other units of the chain have no stored output, so no cache key:
+        # they are recomputed when their output is needed
+        self.store_user_attributes()
+        for u in chain:
+            print(f"updated {u.name} (chunks of {self.chunk_size} rows)")
+
+    def create_chunked_output_table(self, input_table):
+        """Empty table with the same description as the input, filled block by block."""
+        output_table = self.output_file_handle.create_table(
+            self.hdf5_group,
+            get_node_name(input_table),
+            description=input_table.description,
+            title=input_table.title,
+            filters=input_table.filters,
+            expectedrows=input_table.nrows,
+        )
+        input_table.attrs._f_copy(output_table)
+        # the attributes of the columns (e.g. units) are not copied by _f_copy
+        for name in input_table.attrs._v_attrnamessys:
+            if "_ATTR_" in name:
+                output_table.attrs[name] = input_table.attrs[name]
+        return self.register_output_data_handle(output_table)
+
+    def process_chunk(self, table, rows):
+        """Process a block of rows (numpy structured array) of the input table.
+        Implement this in row-local and accumulating units.
+        """
+        return rows
+
+    def initialize_chunks(self, table):
+        """Called before the first block of a table (accumulating units)."""
+        pass
+
+    def finalize_chunks(self, table):
+        """Called after the last block of a table (accumulating units)."""
+        pass
+
     def do_your_job(self):
         """Implement this in the concrete class."""
         pass
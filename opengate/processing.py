@@ -9,7 +9,11 @@ def target_func(q, f, *args, **kwargs):
     q.put(f(*args, **kwargs))
 
 
-def dispatch_to_subprocess(func, *args, **kwargs):
+def target_func_indexed(q, index, f, *args, **kwargs):
+    q.put((index, f(*args, **kwargs)))
+
+
+def _set_start_method():
     if os.name == "nt":
         # Windows: 'spawn' is required
         start_method = "spawn"
@@ -22,6 +26,10 @@ def dispatch_to_subprocess(func, *args, **kwargs):
     except RuntimeError:
         pass
 
+
+def dispatch_to_subprocess(func, *args, **kwargs):
+    _set_start_method()
+
     # Queue is faster than Manager().Queue() but fails with fork
     # q = multiprocessing.Queue()
     q = multiprocessing.Manager().Queue()
@@ -36,3 +44,40 @@ def dispatch_to_subprocess(func, *args, **kwargs):
     except queue.Empty:
         fatal("The queue is empty. The spawned process probably died.")
         return None
+
+
+def dispatch_to_subprocesses(func, list_of_args, **kwargs):
+    """Run func(*args, **kwargs) for each args tuple in list_of_args,
+    each in its own subprocess, all processes running concurrently.
+    The results are returned in the same order as list_of_args.
+    """
+    _set_start_method()
+
+    q = multiprocessing.Manager().Queue()
+    processes = []
+    for index, args in enumerate(list_of_args):
+        p = multiprocessing.Process(
+            target=target_func_indexed, args=(q, index, func, *args), kwargs=kwargs
+        )
+        p.start()
+        processes.append(p)
+
+    # empty the queue while waiting, so that large outputs do not block the workers
+    results = {}
+    while len(results) < len(processes):
+        try:
+            index, result = q.get(timeout=1)
+            results[index] = result
+        except queue.Empty:
+            if not any(p.is_alive() for p in processes) and q.empty():
+                break
+    for p in processes:
+        p.join()
+
+    missing = [i for i in range(len(processes)) if i not in results]
+    if len(missing) > 0:
+        fatal(
+            f"No output received from the subprocess(es) {missing}. "
+            f"The spawned process probably died."
+        )
+    return [results[i] for i in range(len(processes))]
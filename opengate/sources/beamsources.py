@@ -154,7 +154,8 @@ class TreatmentPlanPBSource(SourceBase, g4.GateTreatmentPlanPBSource):
             {
                 "doc": "If a plan path is not provided, the source can be initialized "
                 "by providing custom or plan derived spot data. Check opengate.contrib.tps.ionbeamtherapy.spots_info_from_txt() "
-                "for more details on the structure of this dictionary."
+                "for more details on the structure of this dictionary. Instead of the 'gantry_angle', "
+                "a scipy Rotation of the beam can be given with the 'rotation' key."
             },
         ),
         "beam_nr": (1, {"doc": "Which beam to simulate. Numbering starts from 1."}),
@@ -279,18 +280,11 @@ class TreatmentPlanPBSource(SourceBase, g4.GateTreatmentPlanPBSource):
         return self.g4_source.GetGeneratedPrimaries()
 
     def _set_pbs_param_all_spots(self):
-        # initialize vectors every time, otherwise issues with MT
-        positions = []
-        rotations = []
-        energies = []
-        energy_sigmas = []
-        weights = []
-        partPhSp_xV = []
-        partPhSp_yV = []
         beam_nr = self.beam_nr
         plan_path = self.plan_path
         gantry_rot_axis = self.gantry_rot_axis
         gantry_angle = None
+        rotation = None
 
         # get data from plan if provided
         if plan_path:
@@ -308,10 +302,13 @@ class TreatmentPlanPBSource(SourceBase, g4.GateTreatmentPlanPBSource):
                 )
         elif self.beam_data_dict:
             self.spots = self.beam_data_dict["spots"]
-            gantry_angle = self.beam_data_dict["gantry_angle"]
+            gantry_angle = self.beam_data_dict.get("gantry_angle")
+            rotation = self.beam_data_dict.get("rotation")
 
         # set variables for spots, to initialize pbs sources on the cpp side
-        self.rotation = Rotation.from_euler(gantry_rot_axis, gantry_angle, degrees=True)
+        if rotation is None:
+            rotation = Rotation.from_euler(gantry_rot_axis, gantry_angle, degrees=True)
+        self.rotation = rotation
         self.translation = self.position.translation
         beamline = self.beam_model
         self.d_nozzle_to_iso = beamline.distance_nozzle_iso
@@ -330,94 +327,98 @@ class TreatmentPlanPBSource(SourceBase, g4.GateTreatmentPlanPBSource):
         # probability density function
         self.pdf = self._define_pdf(flat_generation=self.flat_generation)
 
-        for i, spot in enumerate(self.spots):
-            # set energy
-            energies.append(beamline.get_energy(nominal_energy=spot.energy))
-            energy_sigmas.append(beamline.get_sigma_energy(nominal_energy=spot.energy))
-
-            # position:
-            positions.append(self._get_pbs_position(spot))
-
-            # rotation:
-            rotations.append(self._get_pbs_rotation(spot))
-
-            # add weight
-            if self.flat_generation:
-                weights.append(spot.beamFraction * len(self.spots))
-            else:
-                weights.append(1.0)
-
-            # set optics parameters
-            partPhSp_xV.append(
-                [
-                    beamline.get_sigma_x(spot.energy),
-                    beamline.get_theta_x(spot.energy),
-                    beamline.get_epsilon_x(spot.energy),
-                    beamline.conv_x,
-                ]
-            )
-            partPhSp_yV.append(
-                [
-                    beamline.get_sigma_y(spot.energy),
-                    beamline.get_theta_y(spot.energy),
-                    beamline.get_epsilon_y(spot.energy),
-                    beamline.conv_y,
-                ]
-            )
-        # set vectors to user info
-        self.positions = positions
-        self.rotations = rotations
-        self.energies = energies
-        self.energy_sigmas = energy_sigmas
-        self.weights = weights
-        self.partPhSp_xV = partPhSp_xV
-        self.partPhSp_yV = partPhSp_yV
+        # all spots are computed at once, as arrays
+        # (new vectors every time, otherwise issues with MT)
+        n_spots = len(self.spots)
+        xiec = np.array([spot.xiec for spot in self.spots], dtype=float)
+        yiec = np.array([spot.yiec for spot in self.spots], dtype=float)
+        nominal_energies = np.array([spot.energy for spot in self.spots], dtype=float)
+        ones = np.ones(n_spots)
+
+        # energy
+        self.energies = (ones * beamline.get_energy(nominal_energies)).tolist()
+        self.energy_sigmas = (
+            ones * beamline.get_sigma_energy(nominal_energies)
+        ).tolist()
+
+        # position and rotation
+        self.positions = self._get_pbs_positions(xiec, yiec).tolist()
+        self.rotations = list(self._get_pbs_rotations(xiec, yiec))
+
+        # weight
+        if self.flat_generation:
+            fractions = np.array([spot.beamFraction for spot in self.spots])
+            self.weights = (fractions * n_spots).tolist()
+        else:
+            self.weights = ones.tolist()
+
+        # optics parameters, one [sigma, theta, epsilon, conv] per spot
+        self.partPhSp_xV = np.stack(
+            [
+                ones * beamline.get_sigma_x(nominal_energies),
+                ones * beamline.get_theta_x(nominal_energies),
+                ones * beamline.get_epsilon_x(nominal_energies),
+                ones * beamline.conv_x,
+            ],
+            axis=1,
+        ).tolist()
+        self.partPhSp_yV = np.stack(
+            [
+                ones * beamline.get_sigma_y(nominal_energies),
+                ones * beamline.get_theta_y(nominal_energies),
+                ones * beamline.get_epsilon_y(nominal_energies),
+                ones * beamline.conv_y,
+            ],
+            axis=1,
+        ).tolist()
 
     def _define_pdf(self, flat_generation=False):
         if flat_generation:
-            pdf = [1.0 / len(self.spots) for spot in self.spots]
+            pdf = np.ones(len(self.spots))
         else:
-            pdf = [spot.beamFraction for spot in self.spots]
+            pdf = np.array([spot.beamFraction for spot in self.spots], dtype=float)
 
         # normalize vector, to assure the probabilities sum up to 1
         pdf = pdf / np.sum(pdf)
 
-        return list(pdf)
+        return pdf.tolist()
 
-    def _get_pbs_position(self, spot):
+    def _get_pbs_positions(self, xiec, yiec):
         # (x,y) refer to isocenter plane.
         # Need to be corrected to refer to nozzle plane
-        pos = [
-            spot.xiec * self.proportion_factor_x,
-            spot.yiec * self.proportion_factor_y,
-            self.d_nozzle_to_iso,
-        ]
+        pos = np.stack(
+            [
+                xiec * self.proportion_factor_x,
+                yiec * self.proportion_factor_y,
+                np.full(len(xiec), self.d_nozzle_to_iso, dtype=float),
+            ],
+            axis=1,
+        )
         # Gantry angle = 0 -> source comes from +y and is positioned along negative side of y-axis
         # https://opengate.readthedocs.io/en/latest/source_and_particle_management.html
 
-        position = list(
-            (self.rotation * Rotation.from_euler("x", np.pi / 2)).apply(pos)
-            + self.translation
-        )
+        positions = (self.rotation * Rotation.from_euler("x", np.pi / 2)).apply(
+            pos
+        ) + np.asarray(self.translation, dtype=float)
 
-        return position
+        return positions
 
-    def _get_pbs_rotation(self, spot):
+    def _get_pbs_rotations(self, xiec, yiec):
         # by default the source points in direction z+.
         # Need to account for SM direction deviation and rotation toward isocenter (270 deg around x)
         # then rotate of gantry angle
-        rotation = [0.0, 0.0, 0.0]
-        beta = np.arctan(spot.yiec / self.d_stear_mag_to_iso_y)
-        alpha = np.arctan(spot.xiec / self.d_stear_mag_to_iso_x)
-        rotation[0] = -np.pi / 2 + beta
-        rotation[2] = -alpha
+        rotation = np.zeros((len(xiec), 3))
+        beta = np.arctan(yiec / self.d_stear_mag_to_iso_y)
+        alpha = np.arctan(xiec / self.d_stear_mag_to_iso_x)
+        rotation[:, 0] = -np.pi / 2 + beta
+        rotation[:, 2] = -alpha
 
         # apply gantry angle
-        spot_rotation = (
+        spot_rotations = (
             self.rotation * Rotation.from_euler("xyz", rotation)
         ).as_matrix()
 
-        return spot_rotation
+        return spot_rotations
 
 
 process_cls(IonPencilBeamSource)
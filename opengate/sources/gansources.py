@@ -4,6 +4,7 @@ import scipy
 from scipy.spatial.transform import Rotation
 import numpy as np
 import threading
+import queue
 from box import Box
 import itk
 import bisect
@@ -17,7 +18,6 @@ from ..image import compute_image_3D_CDF
 from ..utility import LazyModuleLoader
 from ..base import process_cls
 
-
 #
 torch = LazyModuleLoader("torch")
 gaga = LazyModuleLoader("gaga_phsp")
@@ -383,6 +383,24 @@ class GANSource(GenericSource, g4.GateGANSource):
                 "allowed_values": ("auto", "cpu", "gpu"),
             },
         ),
+        "async_queue_depth": (
+            0,
+            {
+                "doc": "If larger than 0, the batches of particles are generated in advance by a "
+                "single inference thread (GAN, backward move and preparation of the arrays), "
+                "and the Geant4 threads only take the next ready batch. This is the maximum number "
+                "of batches generated in advance. 0 means that each batch is generated when needed "
+                "by the thread that needs it.",
+            },
+        ),
+        "async_torch_threads": (
+            None,
+            {
+                "doc": "Number of threads used by torch for the inference "
+                "(torch.set_num_threads, it applies to the whole process). "
+                "Only used with async_queue_depth > 0. None means the torch default.",
+            },
+        ),
     }
 
     def __init__(self, *args, **kwargs):
@@ -412,6 +430,12 @@ class GANSource(GenericSource, g4.GateGANSource):
         # set the parameters to the cpp side
         self.SetGeneratorInfo(gen.gan_info)
 
+    def prepare_output(self):
+        # the inference thread is not needed anymore once the run is terminated
+        if isinstance(self.user_info.generator, GANSourceDefaultGenerator):
+            self.user_info.generator.stop_async_generation()
+        GenericSource.prepare_output(self)
+
     def set_default_generator(self):
         # non-conditional generator
         if self.cond_image is None:
@@ -473,6 +497,10 @@ class GANSourceDefaultGenerator:
 
     - 'copy_generated_particle_to_g4' function: copy all the particles (pos, dir, time, energy) to the cpp part.
 
+    - 'generate_batch' function: generate a batch of particles, ready to be copied to the cpp part. When
+    'user_info.async_queue_depth' is larger than 0, it is called by an inference thread that fills a queue of
+    batches, while the Geant4 threads only take the batches from the queue (see 'get_next_batch').
+
     """
 
     def __init__(self, user_info):
@@ -484,11 +512,18 @@ class GANSourceDefaultGenerator:
         self.keys_output = None
         self.gan_info = None
         self.gpu_mode = None
+        # used when the batches are generated by an inference thread
+        self.async_queue = None
+        self.async_thread = None
+        self.async_stop_event = None
 
     def __getstate__(self):
         self.lock = None
         # self.gaga = None
         self.gan_info = None
+        self.async_queue = None
+        self.async_thread = None
+        self.async_stop_event = None
         return self.__dict__
 
     def initialize(self):
@@ -647,6 +682,72 @@ class GANSourceDefaultGenerator:
         Once created here, the particles are copied to cpp.
         (Yes maybe the copy could be avoided, but I did not manage to do it)
         """
+        particles = self.get_next_batch()
+        for k, v in particles.items():
+            setattr(source, k, v)
+
+    def get_next_batch(self):
+        """
+        Return the next batch of particles, either generated now or taken
+        from the queue filled by the inference thread.
+        """
+        if self.user_info.async_queue_depth < 1:
+            return self.generate_batch()
+        with self.lock:
+            if self.async_thread is None:
+                self.start_async_generation()
+        item = self.async_queue.get()
+        if isinstance(item, Exception):
+            # let the other threads waiting for a batch get the error too
+            try:
+                self.async_queue.put_nowait(item)
+            except queue.Full:
+                pass
+            raise item
+        return item
+
+    def start_async_generation(self):
+        self.async_queue = queue.Queue(maxsize=int(self.user_info.async_queue_depth))
+        self.async_stop_event = threading.Event()
+        self.async_thread = threading.Thread(
+            target=self._async_generation_loop,
+            name=f"{self.user_info.name}_inference",
+            daemon=True,
+        )
+        self.async_thread.start()
+
+    def _async_generation_loop(self):
+        if self.user_info.async_torch_threads is not None:
+            torch.set_num_threads(int(self.user_info.async_torch_threads))
+        while not self.async_stop_event.is_set():
+            try:
+                item = self.generate_batch()
+            except Exception as e:
+                # the exception is raised in the threads calling generator()
+                item = e
+            # wait for a free slot, but do not block when asked to stop
+            while not self.async_stop_event.is_set():
+                try:
+                    self.async_queue.put(item, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            if isinstance(item, Exception):
+                return
+
+    def stop_async_generation(self):
+        if self.async_thread is None:
+            return
+        self.async_stop_event.set()
+        self.async_thread.join()
+        self.async_thread = None
+        self.async_queue = None
+
+    def generate_batch(self):
+        """
+        Generate a batch of particles with the GAN and return the arrays
+        to copy to the cpp side (fPositionX, fEnergy, etc.).
+        """
         # get the info
         g = self.gan_info
         n = self.user_info.batch_size
@@ -674,14 +775,17 @@ class GANSourceDefaultGenerator:
         # move particle backward ?
         self.move_backward(g, fake)
 
-        # copy to cpp
-        self.copy_generated_particle_to_g4(source, g, fake)
+        # prepare the copy to cpp
+        particles = Box()
+        self.copy_generated_particle_to_g4(particles, g, fake)
 
         # verbose
         if self.user_info.verbose_generator:
             end = time.time()
             print(f"in {end - start:0.1f} sec (GPU={g.params.current_gpu_mode})")
 
+        return particles
+
     def copy_generated_particle_to_g4(self, source, g, fake):
         # get the index of from the GAN vector
         # (or some fixed values)
@@ -764,11 +868,6 @@ class GANSourceDefaultPairsGenerator(GANSourceDefaultGenerator):
         super().__init__(user_info)
         self.is_paired = True
 
-    def __getstate__(self):
-        self.lock = None
-        self.gan_info = None
-        return self.__dict__
-
     def check_parameters(self, g):
         # position
         if g.position_is_set_by_GAN and len(self.user_info.position_keys) != 6:
@@ -809,12 +908,10 @@ class GANSourceDefaultPairsGenerator(GANSourceDefaultGenerator):
             self.fatal(f"you must provide 2 values for weight, while it was {dim}")
         g.weight_gan_index = [the_keys.index(ek[0]), the_keys.index(ek[1])]
 
-    def generator(self, source):
+    def generate_batch(self):
         """
-        Main function that will be called from the cpp side every time a batch
-        of particles should be created.
-        Once created here, the particles are copied to cpp.
-        (Yes maybe the copy could be avoided, but I did not manage to do it)
+        Generate a batch of pairs of particles with the GAN and return the arrays
+        to copy to the cpp side (fPositionX, fPositionX2, fEnergy, etc.).
         """
         # get the info
         g = self.gan_info
@@ -843,14 +940,17 @@ class GANSourceDefaultPairsGenerator(GANSourceDefaultGenerator):
         # move particle backward ?
         self.move_backward(g, fake)
 
-        # copy to cpp
-        self.copy_generated_particle_to_g4(source, g, fake)
+        # prepare the copy to cpp
+        particles = Box()
+        self.copy_generated_particle_to_g4(particles, g, fake)
 
         # verbose
         if self.user_info.verbose_generator:
             end = time.time()
             print(f"in {end - start:0.1f} sec (device={g.params.current_gpu_device})")
 
+        return particles
+
     def copy_generated_particle_to_g4(self, source, g, fake):
         # position
         if g.position_is_set_by_GAN:
@@ -951,7 +1051,7 @@ class GANSourceConditionalGenerator(GANSourceDefaultGenerator):
         )
         return None
 
-    def generator(self, source):
+    def generate_batch(self):
         """
         Generate particles with a GAN, considering conditional vectors.
         """
@@ -995,14 +1095,17 @@ class GANSourceConditionalGenerator(GANSourceDefaultGenerator):
         # move particle backward ?
         self.move_backward(g, fake)
 
-        # copy to cpp (g4)
-        self.copy_generated_particle_to_g4(source, g, fake)
+        # prepare the copy to cpp (g4)
+        particles = Box()
+        self.copy_generated_particle_to_g4(particles, g, fake)
 
         # verbose
         if self.user_info.verbose_generator:
             end = time.time()
             print(f"in {end - start:0.2f} sec (GPU={g.params.current_gpu_mode})")
 
+        return particles
+
 
 class GANSourceConditionalPairsGenerator(GANSourceDefaultPairsGenerator):
     """
@@ -1022,8 +1125,7 @@ class GANSourceConditionalPairsGenerator(GANSourceDefaultPairsGenerator):
         # needed to not pickle. Need to reset some attributes
         self.gan = None
         self.generate_condition = None
-        self.lock = None
-        return self.__dict__
+        return super().__getstate__()
 
     def generate_condition(self, n):
         fatal(
@@ -1033,7 +1135,7 @@ class GANSourceConditionalPairsGenerator(GANSourceDefaultPairsGenerator):
         )
         return None
 
-    def generator(self, source):
+    def generate_batch(self):
         # get the info
         g = self.gan_info
         n = self.user_info.batch_size
@@ -1074,8 +1176,9 @@ class GANSourceConditionalPairsGenerator(GANSourceDefaultPairsGenerator):
         # back from torch to numpy
         fake = fake.cpu().data.numpy()
 
-        # copy to cpp
-        self.copy_generated_particle_to_g4(source, g, fake)
+        # prepare the copy to cpp
+        particles = Box()
+        self.copy_generated_particle_to_g4(particles, g, fake)
 
         # verbose
         if self.user_info.verbose_generator:
@@ -1084,6 +1187,8 @@ class GANSourceConditionalPairsGenerator(GANSourceDefaultPairsGenerator):
                 f"in {end - start_time:0.1f} sec (device={g.params.current_gpu_device})"
             )
 
+        return particles
+
 
 process_cls(GANSource)
 process_cls(GANPairsSource)
@@ -1,6 +1,8 @@
 import uproot
 import numpy as np
 import numbers
+import queue
+import threading
 from scipy.spatial.transform import Rotation
 from box import Box
 import sys
@@ -9,6 +11,7 @@ import opengate_core as g4
 from ..exception import fatal, warning
 from .generic import SourceBase
 from ..base import process_cls
+from ..actors.npy_phsp import NpyPhaseSpace, find_npy_phsp
 
 
 class PhaseSpaceSourceGenerator:
@@ -23,12 +26,23 @@ class PhaseSpaceSourceGenerator:
         self.root_file = None
         self.num_entries = 0
         self.cycle_count = 0
+        self.read_cycle_count = 0
         self.cycle_changed_flag = False
         # used during generation
         self.batch = None
         self.points = None
         self.current_index = 0
         self.w = None
+        # contiguous range of entries (first, size) read by this thread when sharding
+        self.shard = None
+        self.shard_position = 0
+        # number of entries used by the cpp side to generate primaries
+        # (set once the simulation is terminated, see PhaseSpaceSource.prepare_output)
+        self.num_used_entries = 0
+        # used when batches are prefetched by a reader thread
+        self.prefetch_queue = None
+        self.prefetch_thread = None
+        self.prefetch_stop_event = None
 
     def initialize(self, phsp_source):
         self.phsp_source = phsp_source
@@ -41,31 +55,49 @@ class PhaseSpaceSourceGenerator:
         self.phsp_source.batch_size = int(self.phsp_source.batch_size)
         if self.phsp_source.batch_size < 1:
             fatal("PhaseSpaceSourceGenerator: Batch size should be > 0")
+        self.phsp_source.prefetch_queue_depth = int(
+            self.phsp_source.prefetch_queue_depth
+        )
+        if self.phsp_source.prefetch_queue_depth < 0:
+            fatal("PhaseSpaceSourceGenerator: prefetch_queue_depth should be >= 0")
 
         if g4.IsMultithreadedApplication() and g4.G4GetThreadId() == -1:
             # do nothing for master thread
             return
 
-        # open root file and get the first branch
-        # FIXME could have an option to select the branch
-        self.root_file = uproot.open(self.phsp_source.phsp_file)
-        branches = self.root_file.keys()
-        if len(branches) > 0:
-            self.root_file = self.root_file[branches[0]]
+        # the native npy phsp is memory-mapped, with the same interface as a root tree
+        # (or the digi collection of a columnar npy output)
+        npy_phsp_path = find_npy_phsp(self.phsp_source.phsp_file)
+        if npy_phsp_path is not None:
+            self.root_file = NpyPhaseSpace(npy_phsp_path)
         else:
-            fatal(
-                f"PhaseSpaceSourceGenerator: No usable branches in the root file {self.phsp_source.phsp_file}. Aborting."
-            )
-            sys.exit()
+            # open root file and get the first branch
+            # FIXME could have an option to select the branch
+            self.root_file = uproot.open(self.phsp_source.phsp_file)
+            branches = self.root_file.keys()
+            if len(branches) > 0:
+                self.root_file = self.root_file[branches[0]]
+            else:
+                fatal(
+                    f"PhaseSpaceSourceGenerator: No usable branches in the root file {self.phsp_source.phsp_file}. Aborting."
+                )
+                sys.exit()
 
         self.num_entries = int(self.root_file.num_entries)
 
         # initialize the index to start
-        tid = g4.G4GetThreadId()
-        self.current_index = self.get_entry_start(self.phsp_source.entry_start)
+        if self.phsp_source.entry_sharding:
+            self.shard = self.get_shard(self.phsp_source.entry_start)
+            self.shard_position = 0
+            self.current_index = self.shard[0]
+        else:
+            self.current_index = self.get_entry_start(self.phsp_source.entry_start)
 
         # initialize counters
         self.cycle_count = 0
+        self.num_used_entries = 0
+        # the reader may be ahead of the batches already used (see prefetch_queue_depth)
+        self.read_cycle_count = 0
 
     def get_entry_start(self, entry_start):
         if not g4.IsMultithreadedApplication():
@@ -103,6 +135,41 @@ class PhaseSpaceSourceGenerator:
             )
         return n
 
+    def get_shard(self, entry_start):
+        """
+        The entries [entry_start, num_entries) followed by [0, entry_start) are split
+        into contiguous disjoint ranges, one per thread and per process (run_parallel).
+        Return the (first entry, number of entries) of the range of this thread.
+        The range may wrap around the end of the phsp.
+        """
+        if entry_start is None:
+            entry_start = 0
+        if not isinstance(entry_start, numbers.Number):
+            fatal(
+                f"In source {self.name}, entry_start must be a simple number "
+                f"when entry_sharding is True, while it is {entry_start}"
+            )
+        first = int(entry_start % self.num_entries)
+        if g4.IsMultithreadedApplication():
+            n_threads = g4.GetNumberOfRunningWorkerThreads()
+            thread_index = g4.G4GetThreadId()
+        else:
+            n_threads = 1
+            thread_index = 0
+        simulation = self.phsp_source.simulation
+        n_shards = simulation.number_of_parallel_processes * n_threads
+        shard_index = simulation.parallel_process_index * n_threads + thread_index
+        if n_shards > self.num_entries:
+            fatal(
+                f"In source {self.name}, the phsp contains {self.num_entries} entries, "
+                f"it cannot be split into {n_shards} ranges (threads x processes)."
+            )
+        # the first (num_entries % n_shards) ranges have one more entry
+        size, remainder = divmod(self.num_entries, n_shards)
+        first += shard_index * size + min(shard_index, remainder)
+        size += shard_index < remainder
+        return first % self.num_entries, size
+
     def generate(self, source, pid):
         """
         Main function that will be called from the cpp side every time a batch
@@ -111,46 +178,117 @@ class PhaseSpaceSourceGenerator:
         (Yes maybe the copy could be avoided, but I did not manage to do it)
         """
 
+        # get the next batch, either read now or already prepared by the reader thread
+        if source.prefetch_queue_depth > 0:
+            if self.prefetch_thread is None:
+                self.start_prefetching()
+            item = self.prefetch_queue.get()
+            if isinstance(item, Exception):
+                raise item
+        else:
+            item = self.read_next_batch()
+        batch, current_batch_size, cycle_restarted, self.cycle_count = item
+
         # warn phsp is recycled
-        if self.cycle_changed_flag:
-            warning(
-                f"End of the phase-space {self.num_entries} elements, "
-                f"restart from beginning. Cycle count = {self.cycle_count}"
-            )
-            self.cycle_changed_flag = False
-            self.current_index = 0
+        if cycle_restarted:
+            if self.shard is not None:
+                warning(
+                    f"End of the range of {self.shard[1]} elements (starting at "
+                    f"{self.shard[0]}) of the phase-space for thread {self.tid}, "
+                    f"restart from the beginning of the range. Cycle count = {self.cycle_count}"
+                )
+            else:
+                warning(
+                    f"End of the phase-space {self.num_entries} elements, "
+                    f"restart from beginning. Cycle count = {self.cycle_count}"
+                )
 
-        # read data from root tree
-        current_batch_size = source.batch_size
-        if self.current_index + source.batch_size >= self.num_entries:
-            current_batch_size = self.num_entries - self.current_index
-            self.cycle_count += 1
-            self.cycle_changed_flag = True
+        # keep the reference
+        self.batch = batch
+
+        # send to cpp
+        # set position
+        source.SetPositionXBatch(batch[source.position_key_x])
+        source.SetPositionYBatch(batch[source.position_key_y])
+        source.SetPositionZBatch(batch[source.position_key_z])
+
+        # set direction
+        source.SetDirectionXBatch(batch[source.direction_key_x])
+        source.SetDirectionYBatch(batch[source.direction_key_y])
+        source.SetDirectionZBatch(batch[source.direction_key_z])
+
+        # set energy
+        source.SetEnergyBatch(batch[source.energy_key])
+
+        # set PDGCode
+        if source.PDGCode_key in batch:
+            source.SetPDGCodeBatch(batch[source.PDGCode_key])
+        # set weight
+        source.SetWeightBatch(batch[source.weight_key])
+
+        if source.verbose:
+            print("PhaseSpaceSourceGenerator: batch generated: ")
+            print("particle name: ", source.particle)
+            if source.PDGCode_key in batch:
+                print("source.fPDGCode: ", batch[source.PDGCode_key])
+            print("source.fEnergy: ", batch[source.energy_key])
+            print("source.fWeight: ", batch[source.weight_key])
+            print("source.fPositionX: ", batch[source.position_key_x])
+            print("source.fPositionY: ", batch[source.position_key_y])
+            print("source.fPositionZ: ", batch[source.position_key_z])
+            print("source.fDirectionX: ", batch[source.direction_key_x])
+            print("source.fDirectionY: ", batch[source.direction_key_y])
+            print("source.fDirectionZ: ", batch[source.direction_key_z])
+            print("source.fEnergy dtype: ", batch[source.energy_key].dtype)
+
+        return current_batch_size
+
+    def read_next_batch(self):
+        """
+        Read the next batch of particles in the phsp and decode it into
+        ready-to-use float32/int32 arrays (translation, rotation and weights applied).
+        Returns the batch, its size, a flag telling if the phsp restarted
+        from the beginning with this batch, and the cycle count.
+        """
+        source = self.phsp_source
+        cycle_restarted = self.cycle_changed_flag
+        if self.shard is not None:
+            current_batch_size = self.next_batch_size_in_shard()
+        else:
+            if self.cycle_changed_flag:
+                self.cycle_changed_flag = False
+                self.current_index = 0
+
+            # read data from root tree
+            current_batch_size = source.batch_size
+            if self.current_index + source.batch_size >= self.num_entries:
+                current_batch_size = self.num_entries - self.current_index
+                self.read_cycle_count += 1
+                self.cycle_changed_flag = True
 
         if source.verbose_batch:
             print(
-                f"Thread {g4.G4GetThreadId()} "
+                f"Thread {self.tid} "
                 f"generate {current_batch_size} starting {self.current_index} "
                 f" (phsp as n = {self.num_entries} entries)"
             )
 
-        # read a batch of particles in the phsp (keep the reference)
-        self.batch = self.root_file.arrays(
+        # read a batch of particles in the phsp
+        batch = self.root_file.arrays(
             entry_start=self.current_index,
             entry_stop=self.current_index + current_batch_size,
             library="numpy",
         )
-        batch = self.batch
         self.current_index += current_batch_size
 
-        # ensure encoding is float32
+        # ensure encoding is float32 (no copy if already the case, e.g. npy phsp)
         for key in batch:
             # Convert to float32 if the array contains floating-point values
             if np.issubdtype(batch[key].dtype, np.floating):
-                batch[key] = batch[key].astype(np.float32)
+                batch[key] = batch[key].astype(np.float32, copy=False)
             else:
                 if np.issubdtype(batch[key].dtype, np.integer):
-                    batch[key] = batch[key].astype(np.int32)
+                    batch[key] = batch[key].astype(np.int32, copy=False)
 
         # set particle type
         if source.particle == "" or source.particle is None:
@@ -163,10 +301,14 @@ class PhaseSpaceSourceGenerator:
 
         # if translate_position is set to True, the position
         # supplied will be added to the phsp file position
+        # (not in place: the arrays of a npy phsp are read-only)
         if source.translate_position:
-            batch[source.position_key_x] += float(source.position.translation[0])
-            batch[source.position_key_y] += float(source.position.translation[1])
-            batch[source.position_key_z] += float(source.position.translation[2])
+            t = source.position.translation
+            for key, tr in zip(
+                [source.position_key_x, source.position_key_y, source.position_key_z],
+                t,
+            ):
+                batch[key] = batch[key] + np.float32(tr)
 
         # direction is a rotation of the stored direction
         # if rotate_direction is set to True, the direction
@@ -201,43 +343,70 @@ class PhaseSpaceSourceGenerator:
             self.w = np.ones(current_batch_size, dtype=np.float32)
             batch[source.weight_key] = self.w.astype(np.float32)
 
-        # send to cpp
-        # set position
-        source.SetPositionXBatch(batch[source.position_key_x])
-        source.SetPositionYBatch(batch[source.position_key_y])
-        source.SetPositionZBatch(batch[source.position_key_z])
-
-        # set direction
-        source.SetDirectionXBatch(batch[source.direction_key_x])
-        source.SetDirectionYBatch(batch[source.direction_key_y])
-        source.SetDirectionZBatch(batch[source.direction_key_z])
-
-        # set energy
-        source.SetEnergyBatch(batch[source.energy_key])
-
-        # set PDGCode
-        if source.PDGCode_key in batch:
-            source.SetPDGCodeBatch(batch[source.PDGCode_key])
-        # set weight
-        source.SetWeightBatch(batch[source.weight_key])
-
-        if source.verbose:
-            print("PhaseSpaceSourceGenerator: batch generated: ")
-            print("particle name: ", source.particle)
-            if source.PDGCode_key in batch:
-                print("source.fPDGCode: ", batch[source.PDGCode_key])
-            print("source.fEnergy: ", batch[source.energy_key])
-            print("source.fWeight: ", batch[source.weight_key])
-            print("source.fPositionX: ", batch[source.position_key_x])
-            print("source.fPositionY: ", batch[source.position_key_y])
-            print("source.fPositionZ: ", batch[source.position_key_z])
-            print("source.fDirectionX: ", batch[source.direction_key_x])
-            print("source.fDirectionY: ", batch[source.direction_key_y])
-            print("source.fDirectionZ: ", batch[source.direction_key_z])
-            print("source.fEnergy dtype: ", batch[source.energy_key].dtype)
+        return batch, current_batch_size, cycle_restarted, self.read_cycle_count
 
+    def next_batch_size_in_shard(self):
+        """
+        Set current_index to the next entry to read in the range of this thread
+        and return the number of entries to read. A batch stops at the end of the
+        phsp file (the range continues at the first entry) and at the end of the
+        range (the next batch starts a new pass over the range).
+        """
+        first, size = self.shard
+        if self.cycle_changed_flag:
+            self.cycle_changed_flag = False
+            self.shard_position = 0
+        self.current_index = (first + self.shard_position) % self.num_entries
+        current_batch_size = min(
+            self.phsp_source.batch_size,
+            size - self.shard_position,
+            self.num_entries - self.current_index,
+        )
+        self.shard_position += current_batch_size
+        if self.shard_position >= size:
+            self.read_cycle_count += 1
+            self.cycle_changed_flag = True
         return current_batch_size
 
+    def start_prefetching(self):
+        """
+        Start a reader thread that reads and decodes the next batches
+        while the current one is tracked by Geant4.
+        """
+        self.prefetch_queue = queue.Queue(maxsize=self.phsp_source.prefetch_queue_depth)
+        self.prefetch_stop_event = threading.Event()
+        self.prefetch_thread = threading.Thread(
+            target=self._prefetch_loop,
+            name=f"{self.name}_prefetch_{self.tid}",
+            daemon=True,
+        )
+        self.prefetch_thread.start()
+
+    def _prefetch_loop(self):
+        while not self.prefetch_stop_event.is_set():
+            try:
+                item = self.read_next_batch()
+            except Exception as e:
+                # the exception is raised in the thread calling generate()
+                item = e
+            # wait for a free slot, but do not block when asked to stop
+            while not self.prefetch_stop_event.is_set():
+                try:
+                    self.prefetch_queue.put(item, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            if isinstance(item, Exception):
+                return
+
+    def stop_prefetching(self):
+        if self.prefetch_thread is None:
+            return
+        self.prefetch_stop_event.set()
+        self.prefetch_thread.join()
+        self.prefetch_thread = None
+        self.prefetch_queue = None
+
 
 class PhaseSpaceSource(SourceBase, g4.GatePhaseSpaceSource):
     """
@@ -259,6 +428,8 @@ class PhaseSpaceSource(SourceBase, g4.GatePhaseSpaceSource):
     translate_position: bool
     rotate_direction: bool
     batch_size: int
+    prefetch_queue_depth: int
+    entry_sharding: bool
     position_key: str
     position_key_x: str
     position_key_y: str
@@ -278,7 +449,11 @@ class PhaseSpaceSource(SourceBase, g4.GatePhaseSpaceSource):
     user_info_defaults = {
         "phsp_file": (
             None,
-            {"doc": "Filename of the phase-space file (root). This is required"},
+            {
+                "doc": "Filename of the phase-space file (root), or folder of a phase-space "
+                "in the npy format (see convert_root_phsp_to_npy), or npy output folder "
+                "of a PhaseSpaceActor (with a single digi collection). This is required"
+            },
         ),
         "entry_start": (
             None,
@@ -286,6 +461,16 @@ class PhaseSpaceSource(SourceBase, g4.GatePhaseSpaceSource):
                 "doc": "Starting particle in the phase-space (for MT, provide a list of entries, one for each thread)"
             },
         ),
+        "entry_sharding": (
+            False,
+            {
+                "doc": "If True, the entries of the phsp, from entry_start (a single number, 0 by default) "
+                "to the end and then from the beginning to entry_start, are split into disjoint "
+                "contiguous ranges, one per thread (and per process with Simulation.run_parallel). "
+                "Each thread reads its own range sequentially and starts a new pass over "
+                "the same range when it is exhausted.",
+            },
+        ),
         "particle": ("", {"doc": "FIXME"}),
         "global_flag": (
             False,
@@ -320,6 +505,14 @@ class PhaseSpaceSource(SourceBase, g4.GatePhaseSpaceSource):
                 "doc": "Batch size to read the phsp",
             },
         ),
+        "prefetch_queue_depth": (
+            0,
+            {
+                "doc": "If larger than 0, a reader thread reads and decodes the next batches of the phsp "
+                "while the current one is being tracked. This is the maximum number of batches "
+                "prepared in advance (per thread). 0 means that each batch is read when needed.",
+            },
+        ),
         "position_key": (
             "PrePositionLocal",
             {
@@ -448,7 +641,13 @@ class PhaseSpaceSource(SourceBase, g4.GatePhaseSpaceSource):
         all_pg = self.particle_generators
         self.particle_generators = {}
         for k, pg in all_pg.items():
-            self.particle_generators[k] = Box({"cycle_count": pg.cycle_count})
+            self.particle_generators[k] = Box(
+                {
+                    "cycle_count": pg.cycle_count,
+                    "num_used_entries": pg.num_used_entries,
+                    "shard": pg.shard,
+                }
+            )
         state_dict = super().__getstate__()
         return state_dict
 
@@ -489,7 +688,8 @@ class PhaseSpaceSource(SourceBase, g4.GatePhaseSpaceSource):
                 )
 
         # if not set, initialize the entry_start to 0 or to a list for multithreading
-        if self.entry_start is None:
+        # (with entry_sharding, the threads start at the beginning of their range)
+        if self.entry_start is None and not self.entry_sharding:
             if not g4.IsMultithreadedApplication():
                 self.entry_start = 0
             else:
@@ -510,6 +710,32 @@ class PhaseSpaceSource(SourceBase, g4.GatePhaseSpaceSource):
         # set the function pointer to the cpp side
         self.SetGeneratorFunction(self.particle_generators[tid].generate)
 
+    def prepare_output(self):
+        # the reader threads are not needed anymore once the run is terminated
+        for tid, pg in self.particle_generators.items():
+            pg.stop_prefetching()
+            # the batches read (or prefetched) may not be fully used
+            pg.num_used_entries = self.GetNumberOfUsedEntries(tid)
+        SourceBase.prepare_output(self)
+
+    @property
+    def entries_consumption(self):
+        """
+        Per thread: range of entries read by the thread (first entry and number
+        of entries, or None without entry_sharding), number of entries used to
+        generate primaries and number of completed passes.
+        """
+        return {
+            tid: Box(
+                {
+                    "shard": pg.shard,
+                    "num_used_entries": pg.num_used_entries,
+                    "cycle_count": pg.cycle_count,
+                }
+            )
+            for tid, pg in self.particle_generators.items()
+        }
+
     @property
     def cycle_count(self):
         if not g4.IsMultithreadedApplication():
@@ -5,7 +5,7 @@ from .generic import GenericSource
 from ..image import (
     read_image_info,
     update_image_py_to_cpp,
-    compute_image_3D_CDF,
+    compute_image_alias_table,
 )
 from ..utility import ensure_filename_is_str
 from ..base import process_cls
@@ -14,7 +14,7 @@ from ..base import process_cls
 class VoxelSource(GenericSource, g4.GateVoxelSource):
     """
     VoxelSource = 3D activity distribution.
-    Sampled with cumulative distribution functions.
+    Sampled with an alias table over the non-zero voxels.
     """
 
     # hints for IDE
@@ -36,6 +36,8 @@ class VoxelSource(GenericSource, g4.GateVoxelSource):
         super().__init__(self, *args, **kwargs)
         # the loaded image
         self.itk_image = None
+        # alias table of the image (shared by all threads)
+        self.alias_table = None
 
     def __initcpp__(self):
         g4.GateVoxelSource.__init__(self)
@@ -57,26 +59,26 @@ class VoxelSource(GenericSource, g4.GateVoxelSource):
         )
         pg.cpp_edep_image.set_origin(c)
 
-    def cumulative_distribution_functions(self):
+    def initialize_alias_table(self):
         """
-        Compute the Cumulative Distribution Function of the image
-        Composed of: CDF_Z = 1D, CDF_Y = 2D, CDF_X = 3D
+        Compute the alias table of the image, only once for all threads.
+        The position generator keeps a reference to the arrays (no copy).
         """
-        cdf_x, cdf_y, cdf_z = compute_image_3D_CDF(self.itk_image)
-
-        # set CDF to the position generator
+        if self.alias_table is None:
+            self.alias_table = compute_image_alias_table(self.itk_image)
         pg = self.GetSPSVoxelPosDistribution()
-        pg.SetCumulativeDistributionFunction(cdf_z, cdf_y, cdf_x)
+        pg.SetAliasTable(*self.alias_table)
 
     def initialize(self, run_timing_intervals):
-        # read source image
-        self.itk_image = itk.imread(ensure_filename_is_str(self.image))
+        # read source image (only once for all threads)
+        if self.itk_image is None:
+            self.itk_image = itk.imread(ensure_filename_is_str(self.image))
 
         # compute position
         self.set_transform_from_user_info()
 
-        # create Cumulative Distribution Function
-        self.cumulative_distribution_functions()
+        # create the alias table
+        self.initialize_alias_table()
 
         # FIXME -> check other option in position not used here
 
@@ -85,5 +87,11 @@ class VoxelSource(GenericSource, g4.GateVoxelSource):
         # the GenericSource verification
         GenericSource.initialize(self, run_timing_intervals)
 
+    def __getstate__(self):
+        # the image and its alias table are not pickled
+        self.itk_image = None
+        self.alias_table = None
+        return super().__getstate__()
+
 
 process_cls(VoxelSource)
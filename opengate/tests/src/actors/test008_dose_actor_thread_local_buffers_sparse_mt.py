@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import itk
+import numpy as np
+
+import opengate as gate
+from opengate.tests import utility
+
+
+def create_simulation(paths, name, thread_local_buffers, max_memory_mb=None):
+    sim = gate.Simulation()
+
+    # main options
+    sim.g4_verbose = False
+    sim.visu = False
+    sim.number_of_threads = 4
+    sim.random_seed = 987654
+    sim.output_dir = paths.output
+
+    # shortcuts to units
+    mm = gate.g4_units.mm
+    cm = gate.g4_units.cm
+    m = gate.g4_units.m
+    MeV = gate.g4_units.MeV
+    Bq = gate.g4_units.Bq
+    sec = gate.g4_units.second
+
+    #  change world size
+    world = sim.world
+    world.size = [1 * m, 1 * m, 1 * m]
+
+    # waterbox
+    waterbox = sim.add_volume("Box", "waterbox")
+    waterbox.size = [10 * cm, 10 * cm, 10 * cm]
+    waterbox.material = "G4_WATER"
+
+    # two runs
+    sim.run_timing_intervals = [[0, 0.5 * sec], [0.5 * sec, 1 * sec]]
+
+    # source
+    source = sim.add_source("GenericSource", "mysource")
+    source.energy.mono = 120 * MeV
+    source.particle = "proton"
+    source.position.type = "disc"
+    source.position.radius = 5 * mm
+    source.position.translation = [0, 0, -20 * cm]
+    source.direction.type = "momentum"
+    source.direction.momentum = [0, 0, 1]
+    source.activity = 4e3 / sim.number_of_threads * Bq
+
+    # dose actor
+    dose_actor = sim.add_actor("DoseActor", "dose_actor")
+    dose_actor.output_filename = f"test008_thread_local_buffers_{name}.mhd"
+    dose_actor.attached_to = waterbox
+    dose_actor.size = [99, 99, 99]
+    dose_actor.spacing = [1 * mm, 1 * mm, 1 * mm]
+    dose_actor.edep_squared.active = True
+    dose_actor.dose.active = True
+    dose_actor.counts.active = True
+    dose_actor.thread_local_buffers = thread_local_buffers
+    dose_actor.thread_local_buffers_max_memory_mb = max_memory_mb
+
+    stats = sim.add_actor("SimulationStatisticsActor", "Stats")
+
+    return sim, dose_actor, stats
+
+
+def read_image(path):
+    return itk.array_from_image(itk.imread(str(path)))
+
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, None, output_folder="test008")
+
+    # shared images (locked), image-sized thread local buffers, and sparse
+    # thread local buffers: about 1600 voxels per thread (0.1 MB), much less
+    # than the voxels hit in a run, so they are reduced many times per run
+    outputs = {}
+    all_stats = {}
+    for name, thread_local_buffers, max_memory_mb in [
+        ("shared", False, None),
+        ("dense", True, None),
+        ("sparse", True, 0.1),
+    ]:
+        sim, dose_actor, stats = create_simulation(
+            paths, name, thread_local_buffers, max_memory_mb
+        )
+        sim.run(start_new_process=True)
+        print(stats)
+        all_stats[name] = stats
+        outputs[name] = {
+            "edep": read_image(dose_actor.edep.get_output_path()),
+            "edep_squared": read_image(dose_actor.edep_squared.get_output_path()),
+            "dose": read_image(dose_actor.dose.get_output_path()),
+            "counts": read_image(dose_actor.counts.get_output_path()),
+        }
+
+    ref = outputs["shared"]
+    is_ok = ref["edep"].sum() > 0
+    n = np.count_nonzero(ref["counts"])
+    utility.print_test(is_ok, f"Edep {ref['edep'].sum()} MeV in {n} voxels")
+    b = n > 10 * 1600
+    utility.print_test(b, "The sparse buffers are reduced several times per run")
+    is_ok = is_ok and b
+
+    # same seed: the same events, only the order of the sums differs
+    for name in ["dense", "sparse"]:
+        b = utility.assert_stats(all_stats[name], all_stats["shared"], 0)
+        is_ok = is_ok and b
+        b = np.array_equal(outputs[name]["counts"], ref["counts"])
+        utility.print_test(b, f"Same counts with the {name} and the shared images")
+        is_ok = is_ok and b
+        for quantity in ["edep", "edep_squared", "dose"]:
+            b = np.allclose(outputs[name][quantity], ref[quantity], rtol=1e-9)
+            utility.print_test(
+                b, f"Same {quantity} with the {name} and the shared images"
+            )
+            is_ok = is_ok and b
+
+    utility.test_ok(is_ok)
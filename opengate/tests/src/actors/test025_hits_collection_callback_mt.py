@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import opengate as gate
+from opengate.tests import utility
+import numpy as np
+import uproot
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, output_folder="test025")
+
+    # create the simulation
+    sim = gate.Simulation()
+
+    # main options
+    sim.g4_verbose = False
+    sim.visu = False
+    sim.number_of_threads = 2
+    sim.random_seed = 654321
+    sim.output_dir = paths.output
+
+    # units
+    m = gate.g4_units.m
+    cm = gate.g4_units.cm
+    keV = gate.g4_units.keV
+    Bq = gate.g4_units.Bq
+
+    # world size
+    sim.world.size = [1 * m, 1 * m, 1 * m]
+    sim.world.material = "G4_AIR"
+
+    # detector
+    crystal = sim.add_volume("Box", "crystal")
+    crystal.size = [20 * cm, 20 * cm, 2 * cm]
+    crystal.translation = [0, 0, 10 * cm]
+    crystal.material = "G4_SODIUM_IODIDE"
+
+    source = sim.add_source("GenericSource", "source")
+    source.particle = "gamma"
+    source.energy.mono = 140.5 * keV
+    source.position.type = "sphere"
+    source.position.radius = 2 * cm
+    source.direction.type = "momentum"
+    source.direction.momentum = [0, 0, 1]
+    source.activity = 20000 * Bq / sim.number_of_threads
+
+    stats = sim.add_actor("SimulationStatisticsActor", "Stats")
+
+    # the hits are processed during the simulation, and also stored in root
+    hc = sim.add_actor("DigitizerHitsCollectionActor", "Hits")
+    hc.attached_to = crystal
+    hc.attributes = ["TotalEnergyDeposit", "PostPosition", "EventID"]
+    hc.output_filename = "test025_callback_hits.root"
+    hc.callback_every = 100
+
+    # online histogram and copies of the hits
+    bins = np.linspace(0, 150 * keV, 51)
+    histo = np.zeros(len(bins) - 1)
+    received = []
+    events_per_call = []
+
+    def process_hits(actor, collection_name, digi):
+        h, _ = np.histogram(digi["TotalEnergyDeposit"], bins=bins)
+        histo[:] += h
+        # the arrays are only valid during the call: copy them
+        received.append({k: np.copy(v) for k, v in digi.items()})
+        events_per_call.append(len(np.unique(digi["EventID"])))
+
+    hc.callback = process_hits
+
+    sim.run()
+    print(stats)
+
+    # compare with the root output
+    ref = uproot.open(hc.get_output_path())["Hits"].arrays(library="np")
+    data = {k: np.concatenate([r[k] for r in received]) for k in received[0]}
+    print(f"Number of calls: {len(received)}, hits: {len(data['EventID'])}")
+
+    is_ok = len(ref["EventID"]) > 1000
+    b = set(data.keys()) == set(ref.keys())
+    utility.print_test(b, f"Same attributes: {list(data.keys())}")
+    is_ok = is_ok and b
+
+    # the threads do not call the callback in the same order
+    order_ref = np.lexsort([ref[k] for k in sorted(ref)])
+    order_data = np.lexsort([data[k] for k in sorted(ref)])
+    b = len(order_ref) == len(order_data)
+    for k in ref:
+        b = b and np.all(data[k][order_data] == ref[k][order_ref])
+    utility.print_test(b, f"Same {len(order_ref)} hits as in the root output")
+    is_ok = is_ok and b
+
+    h_ref, _ = np.histogram(ref["TotalEnergyDeposit"], bins=bins)
+    b = np.all(h_ref == histo)
+    utility.print_test(b, "Same online and offline edep histograms")
+    is_ok = is_ok and b
+
+    # memory is bounded: never more than callback_every events in a call
+    b = max(events_per_call) <= hc.callback_every and len(received) > 2
+    utility.print_test(b, f"Max number of events per call: {max(events_per_call)}")
+    is_ok = is_ok and b
+
+    utility.test_ok(is_ok)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import opengate as gate
+from opengate.tests import utility
+from opengate.actors.columnar_output import read_columnar_output
+from opengate.actors.npy_phsp import is_npy_phsp, find_npy_phsp
+import numpy as np
+import uproot
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, output_folder="test025")
+
+    # create the simulation
+    sim = gate.Simulation()
+
+    # main options
+    sim.g4_verbose = False
+    sim.visu = False
+    sim.number_of_threads = 2
+    sim.random_seed = 321654
+    sim.output_dir = paths.output
+
+    # units
+    m = gate.g4_units.m
+    cm = gate.g4_units.cm
+    keV = gate.g4_units.keV
+    Bq = gate.g4_units.Bq
+
+    # world size
+    sim.world.size = [1 * m, 1 * m, 1 * m]
+    sim.world.material = "G4_AIR"
+
+    # detector
+    crystal = sim.add_volume("Box", "crystal")
+    crystal.size = [20 * cm, 20 * cm, 2 * cm]
+    crystal.translation = [0, 0, 10 * cm]
+    crystal.material = "G4_SODIUM_IODIDE"
+
+    source = sim.add_source("GenericSource", "source")
+    source.particle = "gamma"
+    source.energy.mono = 140.5 * keV
+    source.position.type = "sphere"
+    source.position.radius = 2 * cm
+    source.direction.type = "momentum"
+    source.direction.momentum = [0, 0, 1]
+    source.activity = 20000 * Bq / sim.number_of_threads
+
+    stats = sim.add_actor("SimulationStatisticsActor", "Stats")
+
+    # the same hits are stored in ROOT and in the columnar formats
+    attributes = [
+        "TotalEnergyDeposit",
+        "PostPosition",
+        "GlobalTime",
+        "EventID",
+        "TrackCreatorProcess",
+        "PreStepUniqueVolumeID",
+    ]
+    hits = {}
+    for output_format in ["root", "hdf5", "npy"]:
+        hc = sim.add_actor("DigitizerHitsCollectionActor", f"Hits_{output_format}")
+        hc.attached_to = crystal
+        hc.attributes = attributes
+        hc.output_format = output_format
+        hits[output_format] = hc
+
+    # same for the phase space
+    phsp = {}
+    for output_format in ["root", "hdf5", "npy"]:
+        p = sim.add_actor("PhaseSpaceActor", f"Phsp_{output_format}")
+        p.attached_to = crystal
+        p.attributes = ["KineticEnergy", "PrePosition", "ParticleName", "EventID"]
+        p.output_format = output_format
+        phsp[output_format] = p
+
+    sim.run()
+    print(stats)
+
+    def read(actor, tree_name):
+        path = actor.get_output_path()
+        print(f"{actor.name}: {path}")
+        if actor.output_format == "root":
+            return uproot.open(path)[tree_name].arrays(library="np")
+        return read_columnar_output(path, tree_name)
+
+    def sorted_columns(data):
+        # the threads do not write in the same order: sort by the float columns
+        keys = [k for k in sorted(data) if data[k].dtype.kind == "f"]
+        order = np.lexsort([data[k] for k in keys])
+        columns = {}
+        for k, v in data.items():
+            v = np.asarray(v)[order]
+            if v.dtype.kind == "S":
+                v = np.char.decode(v)
+            columns[k] = v.astype(str) if v.dtype.kind == "O" else v
+        return columns
+
+    def compare(data, ref, name):
+        data = sorted_columns(data)
+        ref = sorted_columns(ref)
+        b = set(data.keys()) == set(ref.keys())
+        for k in ref:
+            b = b and len(data[k]) == len(ref[k]) and np.all(data[k] == ref[k])
+        n = len(ref["EventID"])
+        utility.print_test(b, f"{name}: same {len(ref)} columns and {n} rows")
+        return b
+
+    ref = read(hits["root"], "Hits_root")
+    is_ok = len(ref["EventID"]) > 1000
+    for output_format in ["hdf5", "npy"]:
+        h = hits[output_format]
+        data = read(h, h.name)
+        is_ok = compare(data, ref, h.name) and is_ok
+
+    # the temporary column files are removed
+    parts = list(paths.output.glob("*.parts"))
+    b = len(parts) == 0
+    utility.print_test(b, f"No remaining column files: {parts}")
+    is_ok = b and is_ok
+
+    ref = read(phsp["root"], "Phsp_root")
+    for output_format in ["hdf5", "npy"]:
+        p = phsp[output_format]
+        data = read(p, p.name)
+        is_ok = compare(data, ref, p.name) and is_ok
+
+    # each digi collection of a npy output is a npy phsp (PhaseSpaceSource input)
+    path = phsp["npy"].get_output_path()
+    b = path.suffix == ".npycol" and is_npy_phsp(path / "Phsp_npy")
+    b = b and find_npy_phsp(path) == path / "Phsp_npy"
+    utility.print_test(b, f"The npy output {path} contains a npy phsp")
+    is_ok = b and is_ok
+
+    utility.test_ok(is_ok)
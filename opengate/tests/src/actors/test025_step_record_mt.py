@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import opengate as gate
+from opengate.tests import utility
+import numpy as np
+import uproot
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, output_folder="test025")
+
+    # create the simulation
+    sim = gate.Simulation()
+
+    # main options
+    sim.g4_verbose = False
+    sim.visu = False
+    sim.number_of_threads = 2
+    sim.random_seed = 987654
+    sim.output_dir = paths.output
+
+    # units
+    m = gate.g4_units.m
+    cm = gate.g4_units.cm
+    keV = gate.g4_units.keV
+    Bq = gate.g4_units.Bq
+
+    # world size
+    sim.world.size = [1 * m, 1 * m, 1 * m]
+    sim.world.material = "G4_AIR"
+
+    # detector
+    crystal = sim.add_volume("Box", "crystal")
+    crystal.size = [20 * cm, 20 * cm, 2 * cm]
+    crystal.translation = [0, 0, 10 * cm]
+    crystal.material = "G4_SODIUM_IODIDE"
+
+    source = sim.add_source("GenericSource", "source")
+    source.particle = "gamma"
+    source.energy.mono = 140.5 * keV
+    source.position.type = "sphere"
+    source.position.radius = 2 * cm
+    source.direction.type = "momentum"
+    source.direction.momentum = [0, 0, 1]
+    source.activity = 20000 * Bq / sim.number_of_threads
+
+    stats = sim.add_actor("SimulationStatisticsActor", "Stats")
+
+    # reference: all the steps, stored in root
+    hc = sim.add_actor("DigitizerHitsCollectionActor", "Hits")
+    hc.attached_to = crystal
+    hc.attributes = ["TotalEnergyDeposit", "PrePosition", "EventID"]
+    hc.keep_zero_edep = True
+    hc.output_filename = "test025_step_record_hits.root"
+
+    # the same steps, given to a python function by batches
+    bins = np.linspace(9 * cm, 11 * cm, 21)
+    histo = np.zeros(len(bins) - 1)
+    steps_per_call = []
+    received = []
+
+    def score(actor, steps):
+        h, _ = np.histogram(
+            steps["PrePosition_Z"], bins=bins, weights=steps["TotalEnergyDeposit"]
+        )
+        histo[:] += h
+        steps_per_call.append(len(steps["EventID"]))
+        received.append({k: np.copy(v) for k, v in steps.items()})
+
+    rec = sim.add_actor("StepRecordActor", "Steps")
+    rec.attached_to = crystal
+    rec.attributes = hc.attributes
+    rec.callback = score
+    rec.callback_every = 1000
+
+    sim.run()
+    print(stats)
+
+    ref = uproot.open(hc.get_output_path())["Hits"].arrays(library="np")
+    data = {k: np.concatenate([r[k] for r in received]) for k in received[0]}
+    print(f"Number of calls: {len(received)}, steps: {len(data['EventID'])}")
+
+    # the threads do not call the function in the same order
+    is_ok = len(ref["EventID"]) > 1000
+    order_ref = np.lexsort([ref[k] for k in sorted(ref)])
+    order_data = np.lexsort([data[k] for k in sorted(ref)])
+    b = set(data.keys()) == set(ref.keys()) and len(order_ref) == len(order_data)
+    for k in ref:
+        b = b and np.all(data[k][order_data] == ref[k][order_ref])
+    utility.print_test(b, f"Same {len(order_ref)} steps as in the hits collection")
+    is_ok = is_ok and b
+
+    h_ref, _ = np.histogram(
+        ref["PrePosition_Z"], bins=bins, weights=ref["TotalEnergyDeposit"]
+    )
+    b = np.allclose(h_ref, histo)
+    utility.print_test(b, "Same online and offline edep profiles")
+    is_ok = is_ok and b
+
+    # batches of callback_every steps (except the last ones of each thread/run)
+    b = max(steps_per_call) == rec.callback_every and len(received) > 2
+    utility.print_test(b, f"Max number of steps per call: {max(steps_per_call)}")
+    is_ok = is_ok and b
+
+    utility.test_ok(is_ok)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import itk
+import numpy as np
+
+import opengate as gate
+from opengate.tests import utility
+
+
+def create_simulation(paths, thread_local_images, max_memory_mb=1024):
+    sim = gate.Simulation()
+
+    # main options
+    sim.g4_verbose = False
+    sim.number_of_threads = 4
+    sim.random_seed = 654923
+    sim.output_dir = paths.output
+
+    sim.physics_manager.physics_list_name = "G4EmStandardPhysics_option4"
+    sim.volume_manager.add_material_database(paths.data / "GateMaterials.db")
+
+    # units
+    m = gate.g4_units.m
+    mm = gate.g4_units.mm
+    keV = gate.g4_units.keV
+    Bq = gate.g4_units.Bq
+    sec = gate.g4_units.second
+
+    # world
+    world = sim.world
+    world.size = [1 * m, 1 * m, 1 * m]
+    world.material = "G4_AIR"
+
+    # phantom and detector
+    patient = sim.add_volume("Box", "patient")
+    patient.material = "G4_WATER"
+    patient.size = [200 * mm, 200 * mm, 200 * mm]
+
+    det = sim.add_volume("Box", "detector")
+    det.material = "NaI"
+    det.size = [400 * mm, 400 * mm, 40 * mm]
+    det.translation = [0, 0, 150 * mm]
+
+    # two runs
+    sim.run_timing_intervals = [[0, 0.5 * sec], [0.5 * sec, 1 * sec]]
+
+    # source
+    source = sim.add_source("GenericSource", "source")
+    source.energy.mono = 140.5 * keV
+    source.particle = "gamma"
+    source.position.type = "box"
+    source.position.size = [20 * mm, 100 * mm, 20 * mm]
+    source.activity = 2e5 * Bq / sim.number_of_threads
+    source.direction.type = "iso"
+
+    stats = sim.add_actor("SimulationStatisticsActor", "Stats")
+
+    # several hits per event: the squared counts are accumulated per event
+    hc = sim.add_actor("DigitizerHitsCollectionActor", "Hits")
+    hc.attached_to = det
+    hc.attributes = ["PostPosition", "TotalEnergyDeposit", "GlobalTime"]
+    hc.write_to_disk = False
+
+    cc = sim.add_actor("DigitizerEnergyWindowsActor", "EnergyWindows")
+    cc.attached_to = hc.attached_to
+    cc.input_digi_collection = hc.name
+    cc.channels = [
+        {"name": "scatter", "min": 108.58 * keV, "max": 129.59 * keV},
+        {"name": "peak140", "min": 129.59 * keV, "max": 150.61 * keV},
+    ]
+    cc.write_to_disk = False
+
+    # projection: one slice per collection and per run
+    proj = sim.add_actor("DigitizerProjectionActor", "Projection")
+    proj.attached_to = det
+    proj.input_digi_collections = ["Hits", "scatter", "peak140"]
+    proj.spacing = [4 * mm, 4 * mm]
+    proj.size = [96, 96]
+    proj.output_filename = f"test036_proj_tli_{thread_local_images}_{max_memory_mb}.mha"
+    proj.squared_counts.active = True
+    proj.thread_local_images = thread_local_images
+    proj.max_thread_local_images_memory_mb = max_memory_mb
+
+    return sim, proj, stats
+
+
+def read_image(path):
+    return itk.array_from_image(itk.imread(str(path)))
+
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, None, "test036")
+
+    # shared image (locked), thread local images, and thread local images
+    # requested but over the memory limit (fallback to the shared image)
+    outputs = {}
+    for name, thread_local_images, max_memory_mb in [
+        ("shared", False, 1024),
+        ("local", True, 1024),
+        ("fallback", True, 0),
+    ]:
+        sim, proj, stats = create_simulation(paths, thread_local_images, max_memory_mb)
+        sim.run(start_new_process=True)
+        print(stats)
+        outputs[name] = (
+            read_image(proj.get_output_path("counts")),
+            read_image(proj.get_output_path("squared_counts")),
+        )
+
+    counts, squared = outputs["shared"]
+    is_ok = counts.shape[0] == 3 * 2 and counts.sum() > 0
+    utility.print_test(is_ok, f"Shape {counts.shape}, {counts.sum()} counts")
+    b = np.any(squared > counts)
+    utility.print_test(b, "Some events have several counts in the same pixel")
+    is_ok = is_ok and b
+
+    # the counts and squared counts are sums of integers: identical in all modes
+    for name in ["local", "fallback"]:
+        b = np.array_equal(outputs[name][0], counts)
+        utility.print_test(b, f"Same counts with the {name} and the shared images")
+        is_ok = is_ok and b
+        b = np.array_equal(outputs[name][1], squared)
+        utility.print_test(
+            b, f"Same squared counts with the {name} and the shared images"
+        )
+        is_ok = is_ok and b
+
+    utility.test_ok(is_ok)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import itk
+import numpy as np
+
+import opengate.contrib.spect.ge_discovery_nm670 as gate_spect
+import opengate as gate
+import test043_garf_helpers_wip as test43
+from opengate.tests import utility
+
+
+def create_simulation(async_inference):
+    sim = gate.Simulation()
+
+    # main options
+    sim.g4_verbose = False
+    sim.number_of_threads = 3
+    sim.visu = False
+    sim.random_seed = 321654987
+    sim.output_dir = test43.paths.output
+
+    # units
+    nm = gate.g4_units.nm
+    mm = gate.g4_units.mm
+    cm = gate.g4_units.cm
+    Bq = gate.g4_units.Bq
+    sec = gate.g4_units.s
+
+    # add a material database
+    sim.volume_manager.add_material_database(test43.paths.data / "GateMaterials.db")
+
+    # init world
+    test43.sim_set_world(sim)
+
+    # fake spect head
+    head = gate_spect.add_fake_spect_head(sim, "spect")
+    head.translation = [0, 0, -15 * cm]
+
+    # detector input plane (+ 1nm to avoid overlap)
+    pos, crystal_dist, psd = gate_spect.get_plane_position_and_distance_to_crystal(
+        "lehr"
+    )
+    pos += 1 * nm
+    det_plane = test43.sim_add_detector_plane(sim, head.name, pos)
+
+    # physics
+    test43.sim_phys(sim)
+
+    # sources
+    test43.sim_source_test(sim, 2e5 * Bq / sim.number_of_threads)
+
+    # two runs: the batches of the threads are grouped per run
+    sim.run_timing_intervals = [[0, 0.5 * sec], [0.5 * sec, 1 * sec]]
+
+    # arf actor, with small batches so that the async mode coalesces them
+    arf = sim.add_actor("ARFActor", "arf")
+    arf.attached_to = det_plane.name
+    arf.output_filename = f"test043_projection_garf_async_{async_inference}.mhd"
+    arf.batch_size = 5000
+    arf.image_size = [128, 128]
+    arf.image_spacing = [4.41806 * mm, 4.41806 * mm]
+    arf.distance_to_crystal = 74.625 * mm
+    arf.pth_filename = test43.paths.gate_data / "pth" / "arf_Tc99m_v034.pth"
+    arf.enable_hit_slice = True
+    arf.flip_plane = True
+    arf.gpu_mode = utility.get_gpu_mode_for_tests()
+    arf.async_inference = async_inference
+    arf.inference_queue_size = 4
+
+    stats = sim.add_actor("SimulationStatisticsActor", "stats")
+
+    return sim, arf, stats
+
+
+if __name__ == "__main__":
+    # same seed, the model applied in a dedicated thread or by each thread in turn
+    projections = {}
+    all_stats = {}
+    for async_inference in [False, True]:
+        sim, arf, stats = create_simulation(async_inference)
+        sim.run(start_new_process=True)
+        print(stats)
+        all_stats[async_inference] = stats
+        img = itk.imread(str(arf.get_output_path("counts")))
+        projections[async_inference] = itk.array_view_from_image(img).copy()
+
+    # the same events reach the detector plane
+    is_ok = utility.assert_stats(all_stats[True], all_stats[False], 0)
+
+    # the same projections: only the order of the sums and the composition of
+    # the batches given to the model differ
+    sync, asyn = projections[False], projections[True]
+    print(f"Counts: {sync.sum()} (sync) vs {asyn.sum()} (async)")
+    b = sync.shape == asyn.shape and sync.sum() > 0
+    b = b and np.allclose(sync, asyn, rtol=1e-4, atol=1e-6)
+    utility.print_test(b, "Same projection with and without async inference")
+    is_ok = is_ok and b
+
+    utility.test_ok(is_ok)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import opengate as gate
+from opengate.tests import utility
+
+
+def create_simulation(paths, uncertainty_goal, n_budget):
+    # create the simulation
+    sim = gate.Simulation()
+
+    # main options
+    sim.g4_verbose = False
+    sim.visu = False
+    sim.random_seed = 983456
+    sim.number_of_threads = 3
+    sim.output_dir = paths.output
+
+    # units
+    m = gate.g4_units.m
+    mm = gate.g4_units.mm
+    cm = gate.g4_units.cm
+    MeV = gate.g4_units.MeV
+    Bq = gate.g4_units.Bq
+
+    #  change world size
+    sim.world.size = [1 * m, 1 * m, 1 * m]
+
+    # waterbox
+    waterbox = sim.add_volume("Box", "waterbox")
+    waterbox.size = [10 * cm, 10 * cm, 10 * cm]
+    waterbox.material = "G4_WATER"
+
+    # default source for tests
+    source = sim.add_source("GenericSource", "mysource")
+    source.energy.mono = 90 * MeV
+    source.particle = "proton"
+    source.position.type = "disc"
+    source.position.radius = 5 * mm
+    source.direction.type = "momentum"
+    source.direction.momentum = [0, 0, 1]
+    source.activity = 10 * n_budget * Bq
+
+    # dose actor with thread local buffers
+    dose = sim.add_actor("DoseActor", "dose")
+    dose.attached_to = "waterbox"
+    dose.size = [40, 40, 40]
+    dose.spacing = [2.5 * mm, 2.5 * mm, 2.5 * mm]
+    dose.edep_uncertainty.active = True
+    dose.thread_local_buffers = True
+    dose.uncertainty_goal = uncertainty_goal
+    dose.number_of_events_budget = n_budget
+    dose.edep.keep_data_per_run = True
+    dose.write_to_disk = False
+
+    # add a stat actor
+    stat = sim.add_actor("SimulationStatisticsActor", "Stats")
+    stat.write_to_disk = False
+
+    return sim, dose, stat
+
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, None, "test066")
+    n_budget = 5000
+
+    # the budgets only count the events: they can be used with thread local buffers
+    sim, dose, stat = create_simulation(paths, None, n_budget)
+    sim.run(start_new_process=True)
+    print(stat)
+
+    meta_data = dose.user_output.edep_with_uncertainty.data_per_run[0].meta_data
+    if isinstance(meta_data, list):
+        meta_data = meta_data[0]
+    reason = meta_data.get("run_termination_reason", "")
+    n_effective = stat.counts.events
+    is_ok = reason == "number_of_events_budget"
+    utility.print_test(is_ok, f"Run termination reason: {reason}")
+    # each thread may finish its current event, and start the next one
+    # before it sees the end of the run
+    b = n_budget <= n_effective < n_budget + 2 * sim.number_of_threads
+    utility.print_test(b, f"Stopped after {n_effective} events (budget {n_budget})")
+    is_ok = is_ok and b
+
+    # the uncertainty is evaluated on the shared images, which do not contain
+    # the buffers of the other threads: this combination is rejected
+    sim, dose, stat = create_simulation(paths, 0.05, n_budget)
+    try:
+        sim.run()
+        b = False
+    except Exception as e:
+        print(f"Expected error: {e}")
+        b = "thread_local_buffers" in str(e)
+    utility.print_test(b, "uncertainty_goal with thread_local_buffers is rejected")
+    is_ok = is_ok and b
+
+    utility.test_ok(is_ok)
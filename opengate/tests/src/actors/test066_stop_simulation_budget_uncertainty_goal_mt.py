@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import opengate as gate
+from scipy.spatial.transform import Rotation
+from opengate.tests import utility
+
+
+def get_run_termination_reason(dose_actor, run_index=0):
+    meta_data = dose_actor.user_output.edep_with_uncertainty.data_per_run[
+        run_index
+    ].meta_data
+    if isinstance(meta_data, list):
+        meta_data = meta_data[0]
+    return meta_data.get("run_termination_reason", "")
+
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(
+        __file__, "gate_test029_volume_time_rotation", "test066"
+    )
+
+    n_planned = 650000
+    n_threads = 3
+
+    # reachable goal, with budgets that are not reached before it
+    unc_goal = 0.05
+    n_budget = n_planned * n_threads
+    sec = gate.g4_units.s
+    time_budget = 3600 * sec
+
+    # create the simulation
+    sim = gate.Simulation()
+
+    # main options
+    sim.g4_verbose = False
+    sim.visu = False
+    sim.random_seed = 983456
+    sim.number_of_threads = n_threads
+
+    # units
+    m = gate.g4_units.m
+    mm = gate.g4_units.mm
+    cm = gate.g4_units.cm
+    um = gate.g4_units.um
+    MeV = gate.g4_units.MeV
+    Bq = gate.g4_units.Bq
+
+    #  change world size
+    sim.world.size = [1 * m, 1 * m, 1 * m]
+
+    # waterbox
+    waterbox = sim.add_volume("Box", "waterbox")
+    waterbox.size = [10 * cm, 10 * cm, 10 * cm]
+    waterbox.rotation = Rotation.from_euler("y", -20, degrees=True).as_matrix()
+    waterbox.material = "G4_WATER"
+
+    # physics
+    sim.physics_manager.set_production_cut("world", "all", 700 * um)
+
+    # default source for tests
+    source = sim.add_source("GenericSource", "mysource")
+    source.energy.mono = 90 * MeV
+    source.particle = "proton"
+    source.position.type = "disc"
+    source.position.radius = 5 * mm
+    source.direction.type = "momentum"
+    source.direction.momentum = [0, 0, 1]
+    source.activity = n_planned * Bq  # 1 part/s
+
+    # add dose actor
+    dose = sim.add_actor("DoseActor", "dose")
+    dose.attached_to = "waterbox"
+    dose.size = [40, 40, 40]
+    dose.spacing = [2.5 * mm, 2.5 * mm, 2.5 * mm]
+    dose.edep_uncertainty.active = True
+    dose.uncertainty_goal = unc_goal
+    dose.uncertainty_first_check_after_n_events = 100
+    dose.uncertainty_voxel_edep_threshold = 0.7
+    dose.number_of_events_budget = n_budget
+    dose.wall_clock_time_budget = time_budget
+    dose.edep.keep_data_per_run = True
+    dose.write_to_disk = False
+
+    # add a stat actor
+    stat = sim.add_actor("SimulationStatisticsActor", "Stats")
+    stat.write_to_disk = False
+
+    # start simulation
+    sim.run()
+
+    # print results at the end
+    print(stat)
+
+    # the run must have been stopped by the uncertainty goal, not by the budgets
+    reason = get_run_termination_reason(dose)
+    n_effective = stat.counts.events
+    print(f"{n_budget = }")
+    print(f"{n_effective = }")
+    ok = reason == "uncertainty_goal"
+    utility.print_test(ok, f"Run termination reason: {reason}")
+    b = n_effective < n_budget
+    utility.print_test(b, "Stopped before the number of events budget")
+    ok = ok and b
+
+    # the mean uncertainty of the last evaluation satisfies the goal
+    meta_data = dose.user_output.edep_with_uncertainty.data_per_run[0].meta_data
+    if isinstance(meta_data, list):
+        meta_data = meta_data[0]
+    unc_mean = meta_data["mean_uncertainty"]
+    b = unc_mean <= unc_goal
+    utility.print_test(b, f"Mean uncertainty {unc_mean:.4f} <= {unc_goal}")
+    ok = ok and b
+
+    utility.test_ok(ok)
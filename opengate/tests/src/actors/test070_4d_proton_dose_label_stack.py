@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import itk
+import numpy as np
+import opengate as gate
+from opengate.tests import utility
+
+
+def create_simulation(paths, label_stack):
+    path_to_4d_ct = paths.data / "test070" / "4d_ct"
+
+    # create the simulation
+    sim = gate.Simulation()
+
+    # main options
+    sim.g4_verbose = False
+    sim.visu = False
+    sim.random_seed = 12345678
+    sim.output_dir = paths.output / "test070"
+
+    # add a material database
+    sim.volume_manager.add_material_database(paths.data / "GateMaterials.db")
+
+    # units
+    m = gate.g4_units.m
+    cm = gate.g4_units.cm
+    MeV = gate.g4_units.MeV
+    Bq = gate.g4_units.Bq
+    mm = gate.g4_units.mm
+    gcm3 = gate.g4_units.g_cm3
+    sec = gate.g4_units.second
+
+    #  change world size
+    sim.world.size = [1 * m, 1 * m, 1 * m]
+
+    # image
+    patient = sim.add_volume("Image", "patient")
+    patient.image = path_to_4d_ct / "0.0.mhd"
+    patient.load_input_image()
+    patient.material = "G4_AIR"  # material used by default
+    f1 = str(paths.gate_data / "Schneider2000MaterialsTable.txt")
+    f2 = str(paths.gate_data / "Schneider2000DensitiesTable.txt")
+    tol = 0.05 * gcm3
+    (
+        patient.voxel_materials,
+        materials,
+    ) = gate.geometry.materials.HounsfieldUnit_to_material(sim, tol, f1, f2)
+    patient.set_production_cut(particle_name="electron", value=3 * mm)
+    patient.label_stack = label_stack
+
+    # inhale then exhale: the phases are used twice, except the extreme ones
+    phases = [0, 1, 2, 3, 4, 5, 4, 3, 2, 1]
+    sim.run_timing_intervals = [
+        (i * 0.1 * sec, (i + 1) * 0.1 * sec) for i in range(len(phases))
+    ]
+    paths_4d_ct = [path_to_4d_ct / f"{10 * i}.0.mhd" for i in phases]
+    patient.add_dynamic_parametrisation(image=paths_4d_ct)
+
+    # default source for tests
+    source = sim.add_source("GenericSource", "proton_source")
+    source.energy.mono = 100 * MeV
+    source.particle = "proton"
+    source.position.type = "sphere"
+    source.position.radius = 10 * mm
+    source.position.translation = [40 * cm, 0, 0 * cm]
+    source.activity = 5000 * Bq
+    source.direction.type = "momentum"
+    source.direction.momentum = [-1, 0, 0]
+
+    # add dose actor
+    dose = sim.add_actor("DoseActor", "dose")
+    dose.output_filename = f"test070_label_stack_{label_stack}.mhd"
+    dose.attached_to = "patient"
+    dose.size = patient.size_pix
+    dose.spacing = patient.spacing
+    dose.output_coordinate_system = "attached_to_image"
+    dose.hit_type = "random"
+
+    # add stat actor
+    stats = sim.add_actor("SimulationStatisticsActor", "Stats")
+
+    return sim, dose, stats
+
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, "gate_test009_voxels")
+
+    # the label images of the phases in memory, or in a memory-mapped file
+    doses = {}
+    all_stats = {}
+    for label_stack in [False, True]:
+        sim, dose, stats = create_simulation(paths, label_stack)
+        sim.run(start_new_process=True)
+        print(stats)
+        all_stats[label_stack] = stats
+        doses[label_stack] = itk.array_from_image(
+            itk.imread(str(dose.get_output_path("edep")))
+        )
+
+    # same seed and same geometry in each run: identical simulations
+    is_ok = utility.assert_stats(all_stats[True], all_stats[False], 0)
+    b = doses[False].sum() > 0 and np.array_equal(doses[True], doses[False])
+    utility.print_test(b, "Same edep with and without the label stack")
+    is_ok = is_ok and b
+
+    # the stack contains each phase once
+    label_stack = np.load(
+        paths.output / "test070" / "label_stack_patient.npy", mmap_mode="r"
+    )
+    b = len(label_stack) == 6
+    utility.print_test(b, f"The label stack has {len(label_stack)} phases")
+    is_ok = is_ok and b
+
+    utility.test_ok(is_ok)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import opengate as gate
+from opengate.tests import utility
+from opengate.actors.coincidences import coincidences_sorter
+import uproot
+import os
+import sys
+import pandas as pd
+
+
+def main(dependency="test072_coinc_sorter_step1.py"):
+
+    # If output_singles.root does not exist, run a simulation to generate it
+    paths = utility.get_default_test_paths(__file__, output_folder="test072")
+    root_filename = paths.output / "output_singles.root"
+    if not os.path.exists(root_filename):
+        print(f"Simulating singles to create {root_filename} ...")
+        subdir = os.path.dirname(__file__)
+        os.system(f"python {str(paths.current / subdir / dependency)}")
+
+    # open root file
+    singles_tree = uproot.open(root_filename)["Singles_crystal"]
+    n = int(singles_tree.num_entries)
+    print(f"There are {n} singles")
+
+    # small chunks: the coincidences are written to the file in several batches
+    ns = gate.g4_units.nanosecond
+    mm = gate.g4_units.mm
+    kwargs = dict(
+        time_window=3 * ns,
+        policy="takeAllGoods",
+        min_transaxial_distance=0 * mm,
+        transaxial_plane="xy",
+        max_axial_distance=32 * mm,
+        chunk_size=n // 5,
+    )
+    output_formats = ["root"]
+    # Coincidence sorter output to HDF5 is supported only in Python 3.10 and higher
+    if sys.version_info[1] > 9:
+        output_formats.append("hdf5")
+
+    is_ok = True
+    for engine in ["pandas", "numpy"]:
+        coincidences_pd = coincidences_sorter(
+            singles_tree, engine=engine, return_type="pd", **kwargs
+        )
+        for output_format in output_formats:
+            path = paths.output / f"coincidences_batches_{engine}.{output_format}"
+            coincidences_sorter(
+                singles_tree,
+                engine=engine,
+                output_file_path=path,
+                output_file_format=output_format,
+                **kwargs,
+            )
+            # read back the coincidences, in the order of the batches
+            if output_format == "root":
+                with uproot.open(path) as file:
+                    coincidences = pd.DataFrame(
+                        file["Coincidences"].arrays(library="np")
+                    )
+            else:
+                coincidences = pd.read_hdf(path)
+            os.remove(path)
+            try:
+                pd.testing.assert_frame_equal(
+                    coincidences,
+                    coincidences_pd,
+                    check_dtype=False,
+                    check_categorical=False,
+                    check_exact=True,
+                )
+                b = len(coincidences) > 0
+            except AssertionError as e:
+                print(e)
+                b = False
+            utility.print_test(
+                b,
+                f"{engine} engine, {output_format} file written by batches: "
+                f"{len(coincidences)} coincidences",
+            )
+            is_ok = is_ok and b
+
+    utility.test_ok(is_ok)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import opengate as gate
+from opengate.tests import utility
+from opengate.actors.coincidences import coincidences_sorter
+import uproot
+import io
+import os
+import sys
+
+
+def main(dependency="test072_coinc_sorter_step1.py"):
+    # test paths
+    paths = utility.get_default_test_paths(__file__, output_folder="test072")
+
+    # open root file
+    root_filename = paths.output / "output_singles.root"
+
+    # this test need output/test072/output_singles.root
+    if not os.path.exists(root_filename):
+        # ignore on windows
+        if os.name == "nt":
+            utility.test_ok(True)
+            sys.exit(0)
+        subdir = os.path.dirname(__file__)
+        cmd = "python " + str(paths.current / subdir / dependency)
+        r = os.system(cmd)
+
+    # open root file
+    print(f"Opening {root_filename} ...")
+    singles_tree = uproot.open(root_filename)["Singles_crystal"]
+    n = int(singles_tree.num_entries)
+    print(f"There are {n} singles")
+
+    ns = gate.g4_units.nanosecond
+    mm = gate.g4_units.mm
+    kwargs = dict(
+        time_window=3 * ns,
+        min_transaxial_distance=0 * mm,
+        transaxial_plane="xy",
+        max_axial_distance=32 * mm,
+        return_type="pd",
+        engine="numpy",
+        chunk_size=10000,
+    )
+    policies = ["removeMultiples", "takeAllGoods", "takeWinnerOfGoods"]
+
+    # several workers give the same coincidences, in the same order, as one worker
+    is_ok = True
+    for policy in policies:
+        coinc_1 = coincidences_sorter(
+            singles_tree, policy=policy, n_workers=1, **kwargs
+        )
+        coinc_3 = coincidences_sorter(
+            singles_tree, policy=policy, n_workers=3, **kwargs
+        )
+        b = len(coinc_1) > 0 and coinc_3.equals(coinc_1)
+        utility.print_test(
+            b, f"{policy}: {len(coinc_3)} (3 workers) vs {len(coinc_1)} (1 worker)"
+        )
+        is_ok = is_ok and b
+
+    # a tree read from an in-memory file cannot be opened again by the workers:
+    # the sorter falls back to a single process
+    with open(root_filename, "rb") as f:
+        memory_file = uproot.open(io.BytesIO(f.read()))
+    memory_tree = memory_file["Singles_crystal"]
+    policy = "takeAllGoods"
+    coinc_memory = coincidences_sorter(
+        memory_tree, policy=policy, n_workers=3, **kwargs
+    )
+    coinc_1 = coincidences_sorter(singles_tree, policy=policy, n_workers=1, **kwargs)
+    b = coinc_memory.equals(coinc_1)
+    utility.print_test(
+        b, f"In-memory tree with 3 workers: {len(coinc_memory)} coincidences"
+    )
+    is_ok = is_ok and b
+
+    utility.test_ok(is_ok)
+
+
+if __name__ == "__main__":
+    main()
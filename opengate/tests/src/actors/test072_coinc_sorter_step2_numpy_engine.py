@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import opengate as gate
+from opengate.tests import utility
+from opengate.actors.coincidences import coincidences_sorter
+from opengate.contrib.root_helpers import root_write_trees
+import uproot
+import os
+import numpy as np
+import sys
+
+
+def sort_rows(coincidences):
+    # the engines may return the coincidences of a time window in a different order
+    columns = sorted(coincidences.columns)
+    return coincidences[columns].sort_values(columns).reset_index(drop=True)
+
+
+def main(dependency="test072_coinc_sorter_step1.py"):
+    # test paths
+    paths = utility.get_default_test_paths(__file__, output_folder="test072")
+
+    # open root file
+    root_filename = paths.output / "output_singles.root"
+
+    # this test need output/test072/output_singles.root
+    if not os.path.exists(root_filename):
+        # ignore on windows
+        if os.name == "nt":
+            utility.test_ok(True)
+            sys.exit(0)
+        subdir = os.path.dirname(__file__)
+        cmd = "python " + str(paths.current / subdir / dependency)
+        r = os.system(cmd)
+
+    # open root file
+    print(f"Opening {root_filename} ...")
+    singles_tree = uproot.open(root_filename)["Singles_crystal"]
+    n = int(singles_tree.num_entries)
+    print(f"There are {n} singles")
+
+    ns = gate.g4_units.nanosecond
+    mm = gate.g4_units.mm
+    kwargs = dict(
+        time_window=3 * ns,
+        min_transaxial_distance=0 * mm,
+        transaxial_plane="xy",
+        max_axial_distance=32 * mm,
+        return_type="pd",
+    )
+    policies = [
+        "removeMultiples",
+        "takeAllGoods",
+        "takeWinnerOfGoods",
+        "takeIfOnlyOneGood",
+        "takeWinnerIfIsGood",
+        "takeWinnerIfAllAreGoods",
+    ]
+
+    # the numpy engine gives the same coincidences as the pandas engine, for all policies
+    # (small chunks, to have many chunks and out of order singles between them)
+    is_ok = True
+    for policy in policies:
+        coinc_np = coincidences_sorter(
+            singles_tree, policy=policy, engine="numpy", chunk_size=10000, **kwargs
+        )
+        coinc_pd = coincidences_sorter(
+            singles_tree, policy=policy, engine="pandas", chunk_size=10000, **kwargs
+        )
+        b = len(coinc_np) > 0 and sort_rows(coinc_np).equals(sort_rows(coinc_pd))
+        utility.print_test(
+            b, f"{policy}: {len(coinc_np)} (numpy) vs {len(coinc_pd)} (pandas)"
+        )
+        is_ok = is_ok and b
+
+    # singles made of two time-sorted halves, concatenated (like merged outputs):
+    # same coincidences as for the time-sorted singles, without restart
+    singles = singles_tree.arrays(library="np")
+    order = np.argsort(singles["GlobalTime"], kind="stable")
+    halves = [order[0::2], order[1::2]]
+    concatenated = {
+        k: np.concatenate([v[h] for h in halves]) for k, v in singles.items()
+    }
+    concatenated_filename = paths.output / "output_singles_concatenated.root"
+    root_write_trees(concatenated_filename, ["Singles"], [concatenated])
+    concatenated_tree = uproot.open(concatenated_filename)["Singles"]
+    policy = "takeAllGoods"
+    coinc_concatenated = coincidences_sorter(
+        concatenated_tree, policy=policy, engine="numpy", chunk_size=10000, **kwargs
+    )
+    coinc = coincidences_sorter(
+        singles_tree, policy=policy, engine="numpy", chunk_size=10000, **kwargs
+    )
+    b = sort_rows(coinc_concatenated).equals(sort_rows(coinc))
+    utility.print_test(
+        b, f"Concatenated time-sorted singles: {len(coinc_concatenated)} coincidences"
+    )
+    is_ok = is_ok and b
+
+    utility.test_ok(is_ok)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import opengate as gate
+from opengate.tests import utility
+from opengate.actors.coincidences import coincidences_sorter, get_volume_id_branch
+from opengate.actors.volume_id_table import (
+    get_volume_id_table_path,
+    read_volume_id_table,
+)
+import numpy as np
+import uproot
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, output_folder="test072")
+
+    sim = gate.Simulation()
+
+    # options
+    sim.visu = False
+    sim.random_seed = 741852
+    sim.number_of_threads = 2
+    sim.output_dir = paths.output
+
+    # units
+    mm = gate.g4_units.mm
+    sec = gate.g4_units.s
+    ns = gate.g4_units.ns
+    keV = gate.g4_units.keV
+    Bq = gate.g4_units.Bq
+    deg = gate.g4_units.deg
+
+    # world
+    world = sim.world
+    world.size = [450 * mm, 450 * mm, 70 * mm]
+    world.material = "G4_AIR"
+
+    # ring of 40 blocks of 2x2 crystals, of two logical volumes (BGO and LYSO)
+    pet = sim.add_volume("Tubs", "pet")
+    pet.rmax = 200 * mm
+    pet.rmin = 127 * mm
+    pet.dz = 32 * mm
+    pet.material = "G4_AIR"
+
+    block = sim.add_volume("Box", "block")
+    block.mother = pet.name
+    block.size = [30 * mm, 20 * mm, 20 * mm]
+    translations, rotations = gate.geometry.utility.get_circular_repetition(
+        40, [160 * mm, 0, 0], start_angle_deg=180, axis=[0, 0, 1]
+    )
+    block.translation = translations
+    block.rotation = rotations
+    block.material = "G4_AIR"
+
+    crystal = sim.add_volume("Box", "crystal")
+    crystal.mother = block.name
+    crystal.size = [30 * mm, 10 * mm, 10 * mm]
+    crystal.translation = gate.geometry.utility.get_grid_repetition(
+        [1, 2, 1], [0, 10 * mm, 0], start=[0, -5 * mm, -5 * mm]
+    )
+    crystal.material = "G4_BGO"
+
+    crystal_b = sim.add_volume("Box", "crystal_b")
+    crystal_b.mother = block.name
+    crystal_b.size = [30 * mm, 10 * mm, 10 * mm]
+    crystal_b.translation = gate.geometry.utility.get_grid_repetition(
+        [1, 2, 1], [0, 10 * mm, 0], start=[0, -5 * mm, 5 * mm]
+    )
+    crystal_b.material = "G4_LYSO"
+
+    source = sim.add_source("GenericSource", "b2b")
+    source.particle = "back_to_back"
+    source.activity = 20000000 * Bq / sim.number_of_threads
+    source.position.type = "sphere"
+    source.position.radius = 1 * mm
+    source.energy.mono = 511 * keV
+    source.direction.theta = [90 * deg, 90 * deg]
+    source.direction.phi = [0, 360 * deg]
+
+    # hits with both the string and the integer volume IDs
+    hc = sim.add_actor("DigitizerHitsCollectionActor", "Hits")
+    hc.attached_to = [crystal.name, crystal_b.name]
+    hc.authorize_repeated_volumes = True
+    hc.output_filename = "test072_volume_id_as_int.root"
+    hc.attributes = [
+        "EventID",
+        "PostPosition",
+        "TotalEnergyDeposit",
+        "PreStepUniqueVolumeID",
+        "PreStepUniqueVolumeIDAsInt",
+        "GlobalTime",
+    ]
+
+    # singles grouped per block, with the integer ID of the block
+    sc = sim.add_actor("DigitizerAdderActor", "Singles")
+    sc.attached_to = hc.attached_to
+    sc.authorize_repeated_volumes = True
+    sc.input_digi_collection = hc.name
+    sc.policy = "EnergyWinnerPosition"
+    sc.group_volume = block.name
+    sc.group_volume_id_as_int = True
+    sc.output_filename = hc.output_filename
+
+    sim.run_timing_intervals = [[0, 0.0002 * sec]]
+    sim.run()
+
+    singles_tree = uproot.open(sc.get_output_path())["Singles"]
+    singles = singles_tree.arrays(library="np")
+    n = len(singles["EventID"])
+    is_ok = n > 1000
+    utility.print_test(is_ok, f"Number of singles: {n}")
+
+    # the table of the numeric IDs is written next to the output
+    tables = read_volume_id_table(get_volume_id_table_path(sc.get_output_path()))
+    b = len(tables["crystal"]) == 80 and len(tables["crystal_b"]) == 80
+    b = b and len(tables["block"]) == 40
+    utility.print_test(
+        b,
+        f"Numeric IDs of {len(tables['crystal'])} + {len(tables['crystal_b'])} "
+        f"crystals and {len(tables['block'])} blocks",
+    )
+    is_ok = is_ok and b
+
+    # the numeric IDs are unique over the whole geometry
+    all_ids = [i for table in tables.values() for i in table]
+    b = len(all_ids) == len(set(all_ids))
+    utility.print_test(b, f"The {len(all_ids)} numeric IDs of the tables are unique")
+    is_ok = is_ok and b
+
+    # the table gives back the string IDs, whatever the logical volume
+    ids_to_string = {i: s for table in tables.values() for i, s in table.items()}
+    string_ids = singles["PreStepUniqueVolumeID"].astype(str)
+    is_b = np.char.startswith(string_ids, crystal_b.name)
+    crystal_ids = [ids_to_string[i] for i in singles["PreStepUniqueVolumeIDAsInt"]]
+    b = np.any(is_b) and np.any(~is_b)
+    b = b and np.all(np.array(crystal_ids) == string_ids)
+    utility.print_test(b, "Integer crystal IDs of both volumes match the string IDs")
+    is_ok = is_ok and b
+
+    # so the sorter uses them by default
+    b = get_volume_id_branch(singles_tree.keys()) == "PreStepUniqueVolumeIDAsInt"
+    utility.print_test(b, "The sorter uses the integer IDs by default")
+    is_ok = is_ok and b
+
+    # the block of a crystal: same copy numbers, except the last one
+    block_ids = [tables["block"][i] for i in singles["GroupVolumeIDAsInt"]]
+    b = all(
+        c.rsplit("-", 1)[1].rsplit("_", 1)[0] == g.rsplit("-", 1)[1]
+        for c, g in zip(crystal_ids, block_ids)
+    )
+    utility.print_test(b, "Integer block IDs match the crystal IDs")
+    is_ok = is_ok and b
+
+    # the integer IDs give the same coincidences as the string IDs,
+    # for the crystals (of two logical volumes) and for the blocks
+    kwargs = dict(
+        time_window=3 * ns,
+        policy="takeAllGoods",
+        min_transaxial_distance=0,
+        transaxial_plane="xy",
+        max_axial_distance=32 * mm,
+        return_type="pd",
+    )
+    block_singles = {
+        k: v.astype(str) if v.dtype == object else v for k, v in singles.items()
+    }
+    block_singles["GroupVolumeID"] = np.array(block_ids)
+    block_singles_path = paths.output / "test072_volume_id_as_int_blocks.root"
+    with uproot.recreate(block_singles_path) as f:
+        f["Singles"] = block_singles
+    block_singles_tree = uproot.open(block_singles_path)["Singles"]
+    for engine in ["numpy", "pandas"]:
+        for int_branch, str_branch in [
+            (None, "PreStepUniqueVolumeID"),
+            ("GroupVolumeIDAsInt", "GroupVolumeID"),
+        ]:
+            coinc_int = coincidences_sorter(
+                block_singles_tree,
+                engine=engine,
+                volume_id_branch=int_branch,
+                **kwargs,
+            )
+            coinc_str = coincidences_sorter(
+                block_singles_tree,
+                engine=engine,
+                volume_id_branch=str_branch,
+                **kwargs,
+            )
+            b = len(coinc_int) > 100 and coinc_int.equals(coinc_str)
+            utility.print_test(
+                b,
+                f"{engine}: same {len(coinc_int)} coincidences with "
+                f"{int_branch or 'the default'} and {str_branch}",
+            )
+            is_ok = is_ok and b
+
+    utility.test_ok(is_ok)
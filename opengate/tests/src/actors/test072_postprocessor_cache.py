@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import tables
+import numpy as np
+from pathlib import Path
+
+from opengate.postprocessors.base import PostProcessor
+from opengate.tests import utility
+from opengate import Simulation
+
+
+def create_list_mode_data(path, n_rows, seed):
+    class Attributes(tables.IsDescription):
+        event_id = tables.Int64Col(pos=1)
+        energy = tables.FloatCol(pos=2)
+        position = tables.FloatCol(shape=(3,), pos=3)
+
+    rng = np.random.default_rng(seed)
+    with tables.open_file(path, mode="w") as h5file:
+        group = h5file.create_group("/", "merged_data")
+        table = h5file.create_table(group, "singles", description=Attributes)
+        positions = np.column_stack(
+            (rng.normal(0, 20, n_rows), rng.normal(0, 20, n_rows), np.ones(n_rows))
+        )
+        table.append([np.arange(n_rows), np.full(n_rows, 0.3), positions])
+
+
+def add_projection_tree(post_processor, name, input_path, offset):
+    # fetcher -> offset -> projection; the offset and the projection are
+    # fused in chunked mode, only the projection is stored
+    post_processor.add_processing_unit(
+        "DataFetcherHdf5",
+        name=f"datafetcher_{name}",
+        input_path=input_path,
+        input_name="singles",
+        input_hdf5_group="/merged_data",
+    )
+    post_processor.add_processing_unit(
+        "OffsetSingleAttribute",
+        name=f"offset_{name}",
+        attribute="position",
+        offset=offset,
+    )
+    projector = post_processor.add_processing_unit(
+        "ProjectionListMode",
+        name=f"projector_{name}",
+        size=[100, 80, 1],
+        spacing=[1.2, 0.9, 1],
+    )
+    return projector
+
+
+def get_projection_path(sim, output_filename, projector):
+    # the projections are written in external image files
+    return (
+        sim.get_output_path(f"{Path(output_filename).stem}_external_files")
+        / projector.name
+        / "projection_singles.h5"
+    )
+
+
+def read_projection(path):
+    with tables.open_file(path, mode="r") as f:
+        return f.get_node("/ITKImage/0/VoxelData").read()
+
+
+def read_cache_keys(path, unit_names):
+    with tables.open_file(path, mode="r") as f:
+        attrs = [f.get_node("/", n)._v_attrs for n in unit_names]
+        return [a.cache_key if "cache_key" in a else None for a in attrs]
+
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, output_folder="test072")
+
+    sim = Simulation()
+    sim.output_dir = paths.output
+
+    n_rows = 50000
+    input_paths = []
+    for i in range(2):
+        input_paths.append(paths.output / f"test072_postprocessor_cache_{i}.h5")
+        create_list_mode_data(input_paths[-1], n_rows, 123 + i)
+
+    # first run with the cache: all the units are computed
+    post_processor = PostProcessor(
+        name="post_processor_cache", simulation=sim, chunk_size=7777, use_cache=True
+    )
+    projector = add_projection_tree(post_processor, "a", input_paths[0], [1, 2, 0])
+    output_path = sim.get_output_path(post_processor.get_output_filename())
+    projection_path = get_projection_path(sim, output_path, projector)
+    post_processor.run()
+    counts = read_projection(projection_path)
+    is_ok = counts.sum() > 0.9 * n_rows
+    utility.print_test(is_ok, f"First run: {counts.sum()} counts")
+
+    # the offset is not stored in chunked mode: no cache key
+    keys = read_cache_keys(output_path, ["datafetcher_a", "offset_a", "projector_a"])
+    b = keys[0] is not None and keys[1] is None and keys[2] is not None
+    utility.print_test(b, "Cache keys only for the stored units")
+    is_ok = is_ok and b
+
+    # second run, nothing changed: the projection is not computed again,
+    # so its file (marked here) is not written again
+    with tables.open_file(projection_path, mode="a") as f:
+        f.root._v_attrs.test_marker = True
+    post_processor.run()
+    with tables.open_file(projection_path, mode="r") as f:
+        b = "test_marker" in f.root._v_attrs
+    b = b and np.array_equal(read_projection(projection_path), counts)
+    utility.print_test(b, "Second run: the projection is read from the cache")
+    is_ok = is_ok and b
+
+    # a new offset: the projection is computed again
+    post_processor.get_processing_unit("offset_a").offset = [5, 2, 0]
+    post_processor.run()
+    b = not np.array_equal(read_projection(projection_path), counts)
+    utility.print_test(b, "New offset: the projection is computed again")
+    is_ok = is_ok and b
+
+    # two independent trees, processed sequentially and in two processes
+    projections = {}
+    for number_of_processes in [1, 2]:
+        post_processor = PostProcessor(
+            name=f"post_processor_trees_{number_of_processes}",
+            simulation=sim,
+            chunk_size=7777,
+            number_of_processes=number_of_processes,
+        )
+        projectors = [
+            add_projection_tree(post_processor, "a", input_paths[0], [1, 2, 0])
+        ]
+        projectors.append(
+            add_projection_tree(post_processor, "b", input_paths[1], [-3, 0, 0])
+        )
+        # the trees are independent
+        projectors[0].yields_to = None
+        post_processor.run()
+        output_filenames = [post_processor.get_output_filename()] * 2
+        if number_of_processes > 1:
+            # each tree is stored in its own file, linked from the main output file
+            output_filenames = [
+                post_processor.get_output_filename(p.name) for p in projectors
+            ]
+            main_output_path = sim.get_output_path(post_processor.get_output_filename())
+            with tables.open_file(main_output_path, mode="r") as f:
+                targets = [f.get_node("/", p.name).target for p in projectors]
+            b = targets == [
+                f"{n}:/{p.name}" for n, p in zip(output_filenames, projectors)
+            ]
+            utility.print_test(b, f"One output file per tree: {targets}")
+            is_ok = is_ok and b
+        projections[number_of_processes] = [
+            read_projection(get_projection_path(sim, n, p))
+            for n, p in zip(output_filenames, projectors)
+        ]
+
+    for i, name in enumerate(["a", "b"]):
+        b = np.array_equal(projections[1][i], projections[2][i])
+        b = b and projections[1][i].sum() > 0.9 * n_rows
+        utility.print_test(b, f"Tree {name}: same projection with 1 and 2 processes")
+        is_ok = is_ok and b
+
+    utility.test_ok(is_ok)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import tables
+import numpy as np
+
+from opengate.postprocessors.base import PostProcessor
+from opengate.tests import utility
+from opengate import Simulation
+
+
+def create_list_mode_data(path, n_rows):
+    class Attributes(tables.IsDescription):
+        event_id = tables.Int64Col(pos=1)
+        energy = tables.FloatCol(pos=2)
+        position = tables.FloatCol(shape=(3,), pos=3)
+
+    rng = np.random.default_rng(123456)
+    with tables.open_file(path, mode="w") as h5file:
+        group = h5file.create_group("/", "merged_data")
+        table = h5file.create_table(group, "singles", description=Attributes)
+        positions = np.column_stack(
+            (rng.normal(0, 20, n_rows), rng.normal(0, 20, n_rows), np.ones(n_rows))
+        )
+        table.append([np.arange(n_rows), np.full(n_rows, 0.3), positions])
+
+
+def run_projection(sim, input_path, chunk_size):
+    post_processor = PostProcessor(
+        name=f"post_processor_{chunk_size}", simulation=sim, chunk_size=chunk_size
+    )
+    post_processor.add_processing_unit(
+        "DataFetcherHdf5",
+        name="datafetcher",
+        input_path=input_path,
+        input_name="singles",
+        input_hdf5_group="/merged_data",
+    )
+    post_processor.add_processing_unit(
+        "ProjectionListMode",
+        name="projector",
+        size=[100, 80, 1],
+        spacing=[1.2, 0.9, 1],
+    )
+    post_processor.run()
+
+    # the projection is written in an external image file
+    path = (
+        sim.get_output_path(f"output_{post_processor.name}_external_files")
+        / "projector"
+        / "projection_singles.h5"
+    )
+    with tables.open_file(path, mode="r") as f:
+        image = f.get_node("/ITKImage/0")
+        return image.VoxelData.read(), image.Spacing.read()
+
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, output_folder="test072")
+
+    sim = Simulation()
+    sim.output_dir = paths.output
+
+    n_rows = 100000
+    input_path = paths.output / "test072_postprocessor_singles.h5"
+    create_list_mode_data(input_path, n_rows)
+
+    # whole table in memory
+    counts, spacing = run_projection(sim, input_path, None)
+    is_ok = counts.shape == (1, 80, 100) and 0.9 * n_rows < counts.sum() <= n_rows
+    utility.print_test(is_ok, f"Projection {counts.shape} with {counts.sum()} counts")
+
+    # blocks of rows, the last one being smaller
+    for chunk_size in [7777, n_rows, 10 * n_rows]:
+        counts_chunks, spacing_chunks = run_projection(sim, input_path, chunk_size)
+        b = np.array_equal(counts_chunks, counts)
+        b = b and np.array_equal(spacing_chunks, spacing)
+        utility.print_test(b, f"Same projection with chunks of {chunk_size} rows")
+        is_ok = is_ok and b
+
+    utility.test_ok(is_ok)
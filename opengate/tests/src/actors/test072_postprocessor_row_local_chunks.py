@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import tables
+import numpy as np
+
+from opengate.postprocessors.base import PostProcessor
+from opengate.tests import utility
+from opengate import Simulation
+
+
+def create_list_mode_data(path, n_rows):
+    class Attributes(tables.IsDescription):
+        event_id = tables.Int64Col(pos=1)
+        energy = tables.FloatCol(pos=2)
+        position = tables.FloatCol(shape=(3,), pos=3)
+
+    rng = np.random.default_rng(654321)
+    with tables.open_file(path, mode="w") as h5file:
+        group = h5file.create_group("/", "merged_data")
+        table = h5file.create_table(group, "singles", description=Attributes)
+        positions = np.column_stack(
+            (rng.normal(0, 20, n_rows), rng.normal(0, 20, n_rows), np.ones(n_rows))
+        )
+        table.append([np.arange(n_rows), rng.uniform(0.1, 0.6, n_rows), positions])
+
+
+def run_row_local_chain(sim, input_path, chunk_size):
+    # fetcher -> offset -> blurring: in chunked mode, the two row-local
+    # units are fused, only the output of the last one is stored
+    post_processor = PostProcessor(
+        name=f"post_processor_row_local_{chunk_size}",
+        simulation=sim,
+        chunk_size=chunk_size,
+    )
+    post_processor.add_processing_unit(
+        "DataFetcherHdf5",
+        name="datafetcher",
+        input_path=input_path,
+        input_name="singles",
+        input_hdf5_group="/merged_data",
+    )
+    post_processor.add_processing_unit(
+        "OffsetSingleAttribute",
+        name="offset",
+        attribute="position",
+        offset=[1, -2, 3],
+    )
+    post_processor.add_processing_unit(
+        "GaussianBlurringSingleAttribute",
+        name="position_blurring",
+        attribute="position",
+        sigma=[0.5, 0.5, 0],
+    )
+    # same random numbers: the blocks are blurred in the order of the rows
+    # (a single random unit, otherwise the draws of the blocks would interleave)
+    np.random.seed(852963)
+    post_processor.run()
+
+    path = sim.get_output_path(post_processor.get_output_filename())
+    with tables.open_file(path, mode="r") as f:
+        return f.get_node("/position_blurring/singles").read()
+
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, output_folder="test072")
+
+    sim = Simulation()
+    sim.output_dir = paths.output
+
+    n_rows = 100000
+    input_path = paths.output / "test072_postprocessor_row_local_singles.h5"
+    create_list_mode_data(input_path, n_rows)
+    with tables.open_file(input_path, mode="r") as f:
+        singles = f.get_node("/merged_data/singles").read()
+
+    # whole table in memory
+    output = run_row_local_chain(sim, input_path, None)
+    b = len(output) == n_rows
+    b = b and np.array_equal(output["event_id"], singles["event_id"])
+    is_ok = b
+    utility.print_test(b, f"Output table with {len(output)} rows")
+    shift = output["position"] - singles["position"]
+    b = np.allclose(shift.mean(axis=0), [1, -2, 3], atol=0.01)
+    b = b and np.allclose(shift.std(axis=0), [0.5, 0.5, 0], atol=0.01)
+    b = b and np.array_equal(output["energy"], singles["energy"])
+    utility.print_test(b, f"Offset and blurring applied: mean shift {shift.mean(0)}")
+    is_ok = is_ok and b
+
+    # blocks of rows, the last one being smaller: the same table
+    for chunk_size in [7777, n_rows, 10 * n_rows]:
+        output_chunks = run_row_local_chain(sim, input_path, chunk_size)
+        b = output_chunks.dtype == output.dtype
+        b = b and all(
+            np.array_equal(output_chunks[name], output[name])
+            for name in output.dtype.names
+        )
+        utility.print_test(b, f"Same table with chunks of {chunk_size} rows")
+        is_ok = is_ok and b
+
+    utility.test_ok(is_ok)
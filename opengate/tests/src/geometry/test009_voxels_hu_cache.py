@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import shutil
+import opengate as gate
+from opengate.geometry.materials import HounsfieldUnit_to_material
+from opengate.tests import utility
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, "gate_test009_voxels")
+
+    gcm3 = gate.g4_units.g_cm3
+    f1 = str(paths.gate_data / "Schneider2000MaterialsTable.txt")
+    f2 = str(paths.gate_data / "Schneider2000DensitiesTable.txt")
+    cache_folder = paths.output / "test009_hu_cache"
+    shutil.rmtree(cache_folder, ignore_errors=True)
+
+    is_ok = True
+    for tol in [0.1 * gcm3, 0.05 * gcm3, 0.01 * gcm3]:
+        # without cache, first call with cache (computed) and second call (read)
+        results = []
+        for cache in [None, cache_folder, cache_folder]:
+            sim = gate.Simulation()
+            vm, materials = HounsfieldUnit_to_material(
+                sim, tol, f1, f2, cache_folder=cache
+            )
+            db = sim.volume_manager.material_database
+            definitions = [db.new_materials_weights[m] for m in materials]
+            results.append((vm, materials, definitions))
+        print(f"tol = {tol / gcm3} g/cm3: {len(results[0][0])} materials")
+        b = results[0] == results[1] == results[2]
+        utility.print_test(b, "Same intervals and materials with and without cache")
+        is_ok = is_ok and b
+
+    n = len(list(cache_folder.glob("*.json")))
+    b = n == 3
+    utility.print_test(b, f"One cache file per density tolerance: {n}")
+    is_ok = is_ok and b
+
+    utility.test_ok(is_ok)
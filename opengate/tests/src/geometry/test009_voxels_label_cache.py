@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import shutil
+import time
+import itk
+import numpy as np
+import opengate as gate
+from opengate.tests import utility
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, "gate_test009_voxels", "test009")
+
+    # create the simulation
+    sim = gate.Simulation()
+    sim.output_dir = paths.output
+    gcm3 = gate.g4_units.g_cm3
+
+    # image
+    patient = sim.add_volume("Image", "patient")
+    patient.image = paths.data / "patient-4mm.mhd"
+    patient.material = "G4_AIR"
+    f1 = str(paths.gate_data / "Schneider2000MaterialsTable.txt")
+    f2 = str(paths.gate_data / "Schneider2000DensitiesTable.txt")
+    tol = 0.05 * gcm3
+    (
+        patient.voxel_materials,
+        materials,
+    ) = gate.geometry.materials.HounsfieldUnit_to_material(sim, tol, f1, f2)
+    patient.label_image_cache = "test009_label_cache"
+    cache_folder = paths.output / "test009_label_cache"
+    shutil.rmtree(cache_folder, ignore_errors=True)
+
+    # reference without cache, then first (computed) and second (read) call with cache
+    patient.load_input_image()
+    patient.material_to_label_lut = patient.create_material_to_label_lut()
+    labels = []
+    for cache in [None, "test009_label_cache", "test009_label_cache"]:
+        patient.label_image_cache = cache
+        t = time.time()
+        labels.append(itk.array_from_image(patient.create_label_image()))
+        print(f"Label image with cache={cache} in {time.time() - t:0.3f} sec")
+
+    is_ok = True
+    for i in [1, 2]:
+        b = np.array_equal(labels[0], labels[i]) and labels[i].dtype == np.ushort
+        utility.print_test(b, f"Same label image (call {i})")
+        is_ok = is_ok and b
+
+    n = len(list(cache_folder.glob("labels_*.npy")))
+    m = len(list(cache_folder.glob("labels_*.json")))
+    b = n == 1 and m == 1
+    utility.print_test(b, f"One cached label image and LUT: {n} {m}")
+    is_ok = is_ok and b
+
+    # another voxel_materials gives another cache entry
+    patient.voxel_materials = patient.voxel_materials[:-1]
+    patient.material_to_label_lut = patient.create_material_to_label_lut()
+    patient.label_image_cache = "test009_label_cache"
+    patient.create_label_image()
+    n = len(list(cache_folder.glob("labels_*.npy")))
+    b = n == 2
+    utility.print_test(b, f"New cache entry when voxel_materials changes: {n}")
+    is_ok = is_ok and b
+
+    utility.test_ok(is_ok)
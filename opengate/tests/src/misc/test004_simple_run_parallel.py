@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import opengate as gate
+from opengate.utility import g4_units
+import opengate.tests.utility as utility
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(
+        __file__, "gate_test004_simulation_stats_actor", output_folder="test004"
+    )
+    sim = gate.Simulation()
+    sim.random_seed = 123654
+    sim.output_dir = paths.output / "run_parallel"
+
+    m = g4_units.m
+    cm = g4_units.cm
+    keV = g4_units.keV
+
+    waterbox = sim.add_volume("Box", "Waterbox")
+    waterbox.size = [40 * cm, 40 * cm, 40 * cm]
+    waterbox.translation = [0 * cm, 0 * cm, 25 * cm]
+    waterbox.material = "G4_WATER"
+
+    source = sim.add_source("GenericSource", "Default")
+    source.particle = "gamma"
+    source.energy.mono = 80 * keV
+    source.direction.type = "momentum"
+    source.direction.momentum = [0, 0, 1]
+    source.n = 200000
+
+    stats = sim.add_actor("SimulationStatisticsActor", "Stats")
+    stats.track_types_flag = True
+    stats.output_filename = "stats.txt"
+
+    # run: the primaries are shared among 4 processes, the outputs are merged
+    n_processes = 4
+    output = sim.run_parallel(n_processes=n_processes)
+    print(stats)
+
+    # one seed per process
+    print(f"Seeds: {output.current_random_seed}")
+    is_ok = len(set(output.current_random_seed)) == n_processes
+    utility.print_test(is_ok, f"Distinct seeds for the {n_processes} processes")
+
+    # all primaries have been simulated
+    b = stats.counts.events == source.n
+    utility.print_test(b, f"Number of events {stats.counts.events} == {source.n}")
+    is_ok = b and is_ok
+
+    # Comparison with gate simulation
+    # gate_test4_simulation_stats_actor
+    # Gate mac/main.mac
+    stats_ref = utility.read_stats_file(paths.gate_output / "stat.txt")
+    stats.counts.runs = 1  # because ref had only 1 run
+    is_ok = utility.assert_stats(stats, stats_ref, tolerance=0.01) and is_ok
+
+    utility.test_ok(is_ok)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import itk
+import numpy as np
+import opengate as gate
+from opengate.tests import utility
+from opengate.sources.utility import get_spectrum
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, "", output_folder="test084")
+
+    # create the simulation
+    sim = gate.Simulation()
+
+    # main options
+    sim.output_dir = paths.output
+
+    # units
+    m = gate.g4_units.m
+    cm = gate.g4_units.cm
+    MeV = gate.g4_units.MeV
+    keV = gate.g4_units.keV
+    Bq = gate.g4_units.Bq
+    mm = gate.g4_units.mm
+    gcm3 = gate.g4_units.g_cm3
+
+    #  change world size
+    world = sim.world
+    world.size = [1 * m, 1 * m, 1 * m]
+
+    # add a material database
+    sim.volume_manager.add_material_database(paths.data / "GateMaterials.db")
+
+    # image
+    patient = sim.add_volume("Image", "patient")
+    patient.image = paths.data / "patient-4mm.mhd"
+    patient.material = "G4_AIR"  # material used by default
+    f1 = str(paths.data / "Schneider2000MaterialsTable.txt")
+    f2 = str(paths.data / "Schneider2000DensitiesTable.txt")
+    tol = 0.01 * gcm3
+    print(f"HU density tolerance: {tol/gcm3} gcm3")
+    patient.voxel_materials, materials = (
+        gate.geometry.materials.HounsfieldUnit_to_material(sim, tol, f1, f2)
+    )
+    print(f"Number of materials: {len(materials)}")
+
+    # mu map actor (process at the first "begin of run" only)
+    mumap = sim.add_actor("AttenuationImageActor", "mumap")
+    mumap.image_volume = patient  # FIXME volume for the moment, not the name
+    mumap.output_filename = "mumap3.mhd"
+    energies = get_spectrum("Lu177", "gamma", "radar").energies
+    # several peaks at once: one component per energy
+    mumap.energy = [energies[1], energies[3]]  # 113 and 208 keV
+    mumap.database = "EPDL"  # NIST or EPDL
+    print(f"Energies are {np.array(mumap.energy)/keV} keV")
+    print(f"Database is {mumap.database}")
+
+    # remove verbose
+    sim.verbose_level = "NONE"
+    sim.run(start_new_process=True)
+
+    # the 208 keV component is the single energy mu map of test084 2
+    ref = itk.array_from_image(itk.imread(paths.output_ref / "mumap2.mhd"))
+    img = itk.imread(mumap.get_output_path())
+    mu = itk.array_from_image(img)
+    print(f"Output image: {mu.shape} (one component per energy)")
+    is_ok = mu.shape == ref.shape + (2,)
+    utility.print_test(is_ok, f"Number of components: {mu.shape[-1]}")
+    b = np.allclose(mu[..., 1], ref, rtol=1e-5)
+    utility.print_test(b, "Same mu map as the reference for 208 keV")
+    is_ok = is_ok and b
+
+    # mu is larger at lower energy
+    b = np.all(mu[..., 0] >= mu[..., 1])
+    utility.print_test(b, "Larger mu at 113 keV")
+    is_ok = is_ok and b
+
+    utility.test_ok(is_ok)
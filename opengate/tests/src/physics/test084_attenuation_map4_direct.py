@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import time
+import itk
+import numpy as np
+import opengate as gate
+from opengate.tests import utility
+from opengate.contrib.dose.photon_attenuation_image_helpers import (
+    create_photon_attenuation_image,
+)
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, "", output_folder="test084")
+
+    # units
+    keV = gate.g4_units.keV
+    gcm3 = gate.g4_units.g_cm3
+
+    # same CT and HU conversion for both methods
+    image_filename = paths.data / "patient-4mm.mhd"
+    energy = 140.5 * keV
+    kwargs = dict(database="NIST", density_tol=0.05 * gcm3)
+
+    # mu map with a simulation (AttenuationImageActor)
+    t = time.time()
+    img_sim = create_photon_attenuation_image(
+        image_filename, None, energy, direct=False, **kwargs
+    )
+    print(f"Mu map with a simulation: {time.time() - t:.2f} s")
+
+    # mu map without simulation (NIST tables)
+    t = time.time()
+    img_direct = create_photon_attenuation_image(
+        image_filename, None, energy, direct=True, **kwargs
+    )
+    print(f"Mu map without simulation: {time.time() - t:.2f} s")
+    itk.imwrite(img_direct, paths.output / "mumap4_direct.mhd")
+
+    # compare: same NIST data, different interpolations
+    mu_sim = itk.array_from_image(img_sim)
+    mu_direct = itk.array_from_image(img_direct)
+    is_ok = mu_sim.shape == mu_direct.shape
+    utility.print_test(is_ok, f"Same image size: {mu_direct.shape}")
+    rel = np.abs(mu_direct - mu_sim) / mu_sim
+    b = np.mean(rel) < 0.01 and np.max(rel) < 0.03
+    utility.print_test(
+        b,
+        f"Relative differences with the simulation: "
+        f"mean {np.mean(rel) * 100:.3f} % max {np.max(rel) * 100:.3f} %",
+    )
+    is_ok = is_ok and b
+
+    # several energies at once: one component per energy
+    img_multi = create_photon_attenuation_image(
+        image_filename, None, [energy, 364.5 * keV], direct=True, **kwargs
+    )
+    mu_multi = itk.array_from_image(img_multi)
+    b = mu_multi.shape == mu_direct.shape + (2,)
+    b = b and np.allclose(mu_multi[..., 0], mu_direct)
+    b = b and np.all(mu_multi[..., 0] > mu_multi[..., 1])
+    utility.print_test(b, f"Multiple energies: {mu_multi.shape}")
+    is_ok = is_ok and b
+
+    utility.test_ok(is_ok)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import opengate as gate
+import numpy as np
+import uproot
+from opengate.tests import utility
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, output_folder="test010")
+
+    # create the simulation
+    sim = gate.Simulation()
+
+    # main options
+    sim.g4_verbose = False
+    sim.check_volumes_overlap = False
+    sim.number_of_threads = 1
+    sim.random_seed = 123456
+    sim.output_dir = paths.output
+
+    # units
+    m = gate.g4_units.m
+    cm = gate.g4_units.cm
+    nm = gate.g4_units.nm
+    keV = gate.g4_units.keV
+    ms = gate.g4_units.ms
+    ns = gate.g4_units.ns
+    sec = gate.g4_units.s
+    Bq = gate.g4_units.Bq
+
+    # world
+    world = sim.world
+    world.size = [1 * m, 1 * m, 1 * m]
+    world.material = "G4_Galactic"
+
+    plane = sim.add_volume("Box", "plane")
+    plane.material = "G4_Galactic"
+    plane.size = [1 * m, 1 * m, 1 * nm]
+    plane.translation = [0, 0, 10 * cm]
+
+    # many sources with a fixed number of events (like the spots of a
+    # treatment plan), several of them starting at the same time.
+    # The energy is used to know which source shot the particle.
+    n_sources = 400
+    n = 5
+    start_times = (np.arange(n_sources) // 4) * 7 * ms
+    for i in range(n_sources):
+        source = sim.add_source("GenericSource", f"spot_{i}")
+        source.particle = "gamma"
+        source.energy.mono = 100 * keV + i * 0.1 * keV
+        source.position.type = "point"
+        source.direction.type = "momentum"
+        source.direction.momentum = [0, 0, 1]
+        source.start_time = start_times[i]
+        source.n = n
+
+    # a source with an activity, shooting during the same time
+    source = sim.add_source("GenericSource", "background")
+    source.particle = "gamma"
+    source.energy.mono = 50 * keV
+    source.position.type = "point"
+    source.direction.type = "momentum"
+    source.direction.momentum = [0, 0, 1]
+    source.activity = 2000 * Bq
+
+    phsp = sim.add_actor("PhaseSpaceActor", "phsp")
+    phsp.attached_to = plane
+    phsp.attributes = ["EventID", "KineticEnergy", "GlobalTime"]
+    phsp.output_filename = "test010_scheduler.root"
+
+    stats = sim.add_actor("SimulationStatisticsActor", "stats")
+
+    sim.run_timing_intervals = [[0, 1 * sec]]
+    sim.run()
+    print(stats)
+
+    data = uproot.open(phsp.get_output_path())["phsp"].arrays(library="np")
+    order = np.argsort(data["EventID"])
+    energy = data["KineticEnergy"][order]
+    time = data["GlobalTime"][order]
+
+    # all events of the fixed n sources
+    spot = energy > 75 * keV
+    index = np.round((energy[spot] - 100 * keV) / (0.1 * keV)).astype(int)
+    is_ok = len(index) == n_sources * n
+    utility.print_test(is_ok, f"Number of events of the fixed n sources: {len(index)}")
+
+    # they are shot in the order of their start time, then in the order they
+    # were added, all events of a source before the next one
+    expected = np.repeat(np.lexsort((np.arange(n_sources), start_times)), n)
+    b = np.array_equal(index, expected)
+    utility.print_test(b, "Fixed n sources are shot in the expected order")
+    is_ok = is_ok and b
+
+    # at their start time (+ time of flight to the plane)
+    dt = np.abs(time[spot] - start_times[index])
+    b = np.all(dt < 1 * ns)
+    utility.print_test(b, f"Fixed n sources shoot at their start time: {dt.max()}")
+    is_ok = is_ok and b
+
+    # the activity source is interleaved in time
+    b = np.all(np.diff(time) > -1 * ns)
+    utility.print_test(b, "Events are ordered in time")
+    is_ok = is_ok and b
+    n_bg = np.count_nonzero(~spot)
+    b = abs(n_bg - 2000) < 5 * np.sqrt(2000)
+    utility.print_test(b, f"Events of the activity source: {n_bg}")
+    is_ok = is_ok and b
+
+    utility.test_ok(is_ok)
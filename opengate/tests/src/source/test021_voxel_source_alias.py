@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import opengate as gate
+from opengate.tests import utility
+import itk
+import numpy as np
+import uproot
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, output_folder="test021")
+
+    # create the simulation
+    sim = gate.Simulation()
+
+    # main options
+    sim.g4_verbose = False
+    sim.visu = False
+    sim.number_of_threads = 2
+    sim.random_seed = 123456
+    sim.output_dir = paths.output
+
+    # units
+    m = gate.g4_units.m
+    mm = gate.g4_units.mm
+    keV = gate.g4_units.keV
+
+    # world
+    sim.world.size = [1 * m, 1 * m, 1 * m]
+    sim.world.material = "G4_Galactic"
+
+    # a sparse activity image: a few hot voxels and a uniform region
+    size = np.array([20, 15, 10])
+    spacing = np.array([2.0, 3.0, 4.0]) * mm
+    arr = np.zeros(size[::-1], dtype=np.float32)
+    arr[2:5, 3:8, 10:16] = 1
+    arr[7, 11, 3] = 80
+    arr[1, 2, 17] = 40
+    arr[9, 14, 0] = 20
+    img = itk.image_from_array(arr)
+    img.SetSpacing(spacing.tolist())
+    activity_filename = paths.output / "test021_alias_activity.mhd"
+    itk.imwrite(img, str(activity_filename))
+
+    # a box with the same extent as the image, the source is centered on it
+    box = sim.add_volume("Box", "box")
+    box.size = (size * spacing).tolist()
+    box.material = "G4_Galactic"
+
+    source = sim.add_source("VoxelSource", "vox_source")
+    source.attached_to = box
+    source.particle = "gamma"
+    source.n = 100000 / sim.number_of_threads
+    source.image = activity_filename
+    source.direction.type = "iso"
+    source.energy.mono = 100 * keV
+
+    # store the first step of the primaries: the sampled positions
+    phsp = sim.add_actor("PhaseSpaceActor", "phsp")
+    phsp.attached_to = box
+    phsp.attributes = ["PrePosition"]
+    phsp.steps_to_store = "first"
+    phsp.output_filename = "test021_alias.root"
+
+    stats = sim.add_actor("SimulationStatisticsActor", "Stats")
+
+    # start simulation
+    sim.run()
+    print(stats)
+
+    # histogram of the sampled positions in the image voxels
+    data = uproot.open(phsp.get_output_path())["phsp"].arrays(library="np")
+    pos = np.stack(
+        [data["PrePosition_X"], data["PrePosition_Y"], data["PrePosition_Z"]],
+        axis=1,
+    )
+    index = np.floor((pos + size * spacing / 2) / spacing).astype(int)
+    index = np.clip(index, 0, size - 1)
+    counts = np.zeros(arr.shape)
+    np.add.at(counts, (index[:, 2], index[:, 1], index[:, 0]), 1)
+    n = len(pos)
+
+    is_ok = n == 100000
+    utility.print_test(is_ok, f"Number of sampled positions: {n}")
+
+    # no position in a voxel without activity
+    b = np.all(counts[arr == 0] == 0)
+    utility.print_test(b, "No position outside the active voxels")
+    is_ok = is_ok and b
+
+    # number of positions per active voxel, compared with the activity
+    expected = arr / arr.sum() * n
+    active = arr > 0
+    z = (counts[active] - expected[active]) / np.sqrt(expected[active])
+    b = np.max(np.abs(z)) < 5
+    utility.print_test(
+        b, f"Positions follow the activity: max |z| = {np.max(np.abs(z)):.2f}"
+    )
+    is_ok = is_ok and b
+    chi2 = np.sum(z**2) / np.count_nonzero(active)
+    b = chi2 < 1.6
+    utility.print_test(b, f"Reduced chi2 = {chi2:.2f}")
+    is_ok = is_ok and b
+
+    utility.test_ok(is_ok)
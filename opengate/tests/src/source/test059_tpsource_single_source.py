@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from opengate.tests import utility
+import opengate as gate
+from opengate.contrib.beamlines.ionbeamline import BeamlineModel
+from opengate.contrib.tps.ionbeamtherapy import spots_info_from_txt, TreatmentPlanSource
+from scipy.spatial.transform import Rotation
+import numpy as np
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(
+        __file__, "gate_test044_pbs", output_folder="test059"
+    )
+    output_path = paths.output
+    ref_path = paths.output_ref
+
+    # create the simulation
+    sim = gate.Simulation()
+
+    # main options
+    sim.g4_verbose = False
+    sim.g4_verbose_level = 1
+    sim.visu = False
+    sim.random_seed = 123654789
+    sim.random_engine = "MersenneTwister"
+    sim.number_of_threads = 1
+    sim.output_dir = output_path
+
+    # units
+    km = gate.g4_units.km
+    cm = gate.g4_units.cm
+    mm = gate.g4_units.mm
+
+    # add a material database
+    sim.volume_manager.add_material_database(paths.data / "GateMaterials.db")
+
+    #  change world size
+    world = sim.world
+    world.size = [600 * cm, 500 * cm, 500 * cm]
+
+    ## TWO DETECTORS ##
+    # the same plan is simulated with one source per spot (first box) and
+    # with a single source for the whole plan (second box)
+    m = Rotation.identity().as_matrix()
+    dose_actors = []
+    for i, x in enumerate([0 * cm, 40 * cm]):
+        box = sim.add_volume("Box", f"box{i + 1}")
+        box.size = [200 * mm, 200 * mm, 1050 * mm]
+        box.translation = [x, 0 * cm, 52.5 * cm]
+        box.material = "Vacuum"
+        box.color = [0, 0, 1, 1]
+
+        phantom = sim.add_volume("Box", f"phantom{i + 1}")
+        phantom.mother = box.name
+        phantom.size = [200 * mm, 100 * mm, 50 * mm]
+        phantom.translation = [0 * mm, 0 * mm, -500 * mm]
+        phantom.rotation = m
+        phantom.material = "G4_WATER"
+        phantom.color = [1, 0, 1, 1]
+
+        dose = sim.add_actor("DoseActor", f"edep_{i + 1}")
+        dose.output_filename = f"phantom_single_source_{i + 1}.mhd"
+        dose.attached_to = phantom
+        dose.size = [50, 25, 1]
+        dose.spacing = [4.0, 4.0, 50.0]
+        dose.hit_type = "random"
+        dose_actors.append(dose)
+
+    ## TPS SOURCE ##
+    # beamline model
+    beamline = BeamlineModel()
+    beamline.name = None
+    beamline.radiation_types = "proton"
+
+    # polinomial coefficients
+    beamline.energy_mean_coeffs = [1, 0]
+    beamline.energy_spread_coeffs = [0.4417036946562556]
+    beamline.sigma_x_coeffs = [2.3335754]
+    beamline.theta_x_coeffs = [2.3335754e-3]
+    beamline.epsilon_x_coeffs = [0.00078728e-3]
+    beamline.sigma_y_coeffs = [1.96433431]
+    beamline.theta_y_coeffs = [0.00079118e-3]
+    beamline.epsilon_y_coeffs = [0.00249161e-3]
+
+    beam_data = spots_info_from_txt(
+        ref_path / "TreatmentPlan2Spots_flat_gen_test.txt", "proton", 1
+    )
+    rotation = Rotation.from_euler("x", beam_data["gantry_angle"], degrees=True)
+
+    # tps, one source per spot
+    nSim = 40000  # particles to simulate per beam
+    tps_spots = TreatmentPlanSource("spots", sim)
+    tps_spots.set_beamline_model(beamline)
+    tps_spots.set_particles_to_simulate(nSim)
+    tps_spots.set_spots(beam_data["spots"])
+    tps_spots.rotation = rotation
+    tps_spots.translation = [0 * cm, 0 * cm, -30 * cm]
+    tps_spots.initialize_tpsource()
+    n_spots = len(sim.source_manager.sources)
+    print(f"Sources for the plan with one source per spot: {n_spots}")
+
+    # tps, a single source for the whole plan
+    tps_single = TreatmentPlanSource("single", sim)
+    tps_single.set_beamline_model(beamline)
+    tps_single.set_particles_to_simulate(nSim)
+    tps_single.set_spots(beam_data["spots"])
+    tps_single.rotation = rotation
+    tps_single.translation = [40 * cm, 0 * cm, -30 * cm]
+    source = tps_single.initialize_tpsource(single_source=True)
+    print(f"Sources for the plan with a single source: {source.type_name}")
+
+    # add stat actor
+    stats = sim.add_actor("SimulationStatisticsActor", "Stats")
+
+    # physics
+    sim.physics_manager.physics_list_name = "FTFP_INCLXX_EMZ"
+    sim.physics_manager.set_production_cut("world", "all", 1000 * km)
+
+    # start simulation
+    sim.run()
+
+    # print results at the end
+    print(stats)
+
+    # ----------------------------------------------------------------------------------------------------------------
+    # tests
+    test = len(sim.source_manager.sources) == n_spots + 1
+    utility.print_test(test, "One source for the whole plan")
+
+    # the number of particles of each spot is sampled at once
+    n = tps_spots._sample_n_particles_spots()
+    b = np.sum(n) == nSim and len(n) == len(beam_data["spots"])
+    utility.print_test(b, f"Number of particles per spot: {n}")
+    test = test and b
+
+    # the dose of both sources should be the same
+    print("--- Dose image ---")
+    test = (
+        utility.assert_images(
+            dose_actors[0].get_output_path("edep"),
+            dose_actors[1].get_output_path("edep"),
+            stats,
+            tolerance=70,
+            ignore_value_data2=0,
+        )
+        and test
+    )
+
+    utility.test_ok(test)
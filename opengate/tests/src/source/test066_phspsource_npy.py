@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import opengate as gate
+import uproot
+import numpy as np
+from opengate.tests import utility
+from opengate.actors.npy_phsp import convert_root_phsp_to_npy, NpyPhaseSpace
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(
+        __file__, "test066_PhsSource_Activity", output_folder="test066"
+    )
+
+    # create the simulation
+    sim = gate.Simulation()
+
+    # main options
+    sim.g4_verbose = False
+    sim.check_volumes_overlap = False
+    sim.number_of_threads = 1
+    sim.random_seed = 987654321
+    sim.output_dir = paths.output
+
+    # units
+    m = gate.g4_units.m
+    mm = gate.g4_units.mm
+    nm = gate.g4_units.nm
+
+    #  adapt world size
+    world = sim.world
+    world.size = [1 * m, 1 * m, 2 * m]
+    world.material = "G4_Galactic"
+
+    plane_1 = sim.add_volume("Box", "plan_1")
+    plane_1.material = "G4_Galactic"
+    plane_1.size = [1 * m, 1 * m, 1 * nm]
+
+    # convert the root phsp into the (memory-mapped) npy format
+    root_phsp = paths.output_ref.parent / "test019" / "test019_hits.root"
+    npy_phsp = convert_root_phsp_to_npy(
+        root_phsp, paths.output / "test066_hits.npyphsp", chunk_size=1000
+    )
+    print(f"Converted {root_phsp} into {npy_phsp}")
+
+    # the phsp is read several times (cycles) with small batches
+    source = sim.add_source("PhaseSpaceSource", "phsp_source")
+    source.attached_to = plane_1.name
+    source.position_key = "PrePosition"
+    source.direction_key = "PreDirection"
+    source.weight_key = "Weight"
+    source.global_flag = False
+    source.particle = "gamma"
+    source.batch_size = 333
+    source.translate_position = True
+    source.position.translation = [0, 0, 300]
+    source.n = 5000
+
+    phsp_plane = sim.add_volume("Box", "phase_space_plane_1")
+    phsp_plane.material = "G4_Galactic"
+    phsp_plane.size = [1 * m, 1 * m, 1 * nm]
+    phsp_plane.translation = [0, 0, -1000 * nm]
+
+    phsp_actor = sim.add_actor("PhaseSpaceActor", "PhaseSpace")
+    phsp_actor.attached_to = phsp_plane
+    phsp_actor.attributes = ["KineticEnergy", "PrePosition", "PreDirection"]
+    phsp_actor.write_npy_phsp = True
+
+    stats = sim.add_actor("SimulationStatisticsActor", "Stats")
+    sim.physics_manager.physics_list_name = "G4EmStandardPhysics_option3"
+
+    # run with the root and the npy phsp, the output must be identical
+    outputs = {}
+    for name, phsp_file in [("root", root_phsp), ("npy", npy_phsp)]:
+        source.phsp_file = phsp_file
+        phsp_actor.output_filename = f"test066_npy_{name}.root"
+        sim.run(start_new_process=True)
+        print(stats)
+        with uproot.open(phsp_actor.get_output_path()) as f:
+            outputs[name] = f["PhaseSpace"].arrays(library="np")
+
+    is_ok = len(outputs["root"]["KineticEnergy"]) > 0
+    for k in outputs["root"]:
+        b = np.array_equal(outputs["root"][k], outputs["npy"][k])
+        utility.print_test(b, f"Same values of {k} with the root and the npy phsp")
+        is_ok = is_ok and b
+
+    # the actor also wrote its output in the npy format
+    npy_output = NpyPhaseSpace(paths.output / "test066_npy_npy.npyphsp").arrays()
+    for k in outputs["npy"]:
+        b = np.array_equal(outputs["npy"][k].astype(np.float32), npy_output[k])
+        utility.print_test(b, f"Same values of {k} in the root and npy actor output")
+        is_ok = is_ok and b
+
+    # the columnar npy output of the actor is read by the source
+    # like the root output of the same simulation
+    phsp_actor.attributes = ["KineticEnergy", "PrePosition", "PreDirection", "Weight"]
+    phsp_actor.write_npy_phsp = False
+    source.phsp_file = root_phsp
+    actor_outputs = {}
+    for output_format, suffix in [("root", "root"), ("npy", "npycol")]:
+        phsp_actor.output_format = output_format
+        phsp_actor.output_filename = f"test066_npy_actor_output.{suffix}"
+        sim.run(start_new_process=True)
+        actor_outputs[output_format] = phsp_actor.get_output_path()
+    outputs = {}
+    phsp_actor.output_format = "root"
+    for name, phsp_file in actor_outputs.items():
+        source.phsp_file = phsp_file
+        phsp_actor.output_filename = f"test066_npy_from_{name}_actor_output.root"
+        sim.run(start_new_process=True)
+        with uproot.open(phsp_actor.get_output_path()) as f:
+            outputs[name] = f["PhaseSpace"].arrays(library="np")
+    b = len(outputs["root"]["KineticEnergy"]) > 0
+    for k in outputs["root"]:
+        b = b and np.array_equal(outputs["root"][k], outputs["npy"][k])
+    utility.print_test(
+        b, "Same output with the root and the npy output of the actor as source"
+    )
+    is_ok = is_ok and b
+
+    utility.test_ok(is_ok)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import opengate as gate
+import uproot
+import numpy as np
+from opengate.tests import utility
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(
+        __file__, "test066_PhsSource_Activity", output_folder="test066"
+    )
+
+    # create the simulation
+    sim = gate.Simulation()
+
+    # main options
+    sim.g4_verbose = False
+    sim.check_volumes_overlap = False
+    sim.number_of_threads = 1
+    sim.random_seed = 987654321
+    sim.output_dir = paths.output
+
+    # units
+    m = gate.g4_units.m
+    mm = gate.g4_units.mm
+    nm = gate.g4_units.nm
+
+    #  adapt world size
+    world = sim.world
+    world.size = [1 * m, 1 * m, 2 * m]
+    world.material = "G4_Galactic"
+
+    plane_1 = sim.add_volume("Box", "plan_1")
+    plane_1.material = "G4_Galactic"
+    plane_1.size = [1 * m, 1 * m, 1 * nm]
+
+    # the phsp is read several times (cycles) with small batches
+    source = sim.add_source("PhaseSpaceSource", "phsp_source")
+    source.attached_to = plane_1.name
+    source.phsp_file = paths.output_ref.parent / "test019" / "test019_hits.root"
+    source.position_key = "PrePosition"
+    source.direction_key = "PreDirection"
+    source.weight_key = "Weight"
+    source.global_flag = False
+    source.particle = "gamma"
+    source.batch_size = 333
+    source.translate_position = True
+    source.position.translation = [0, 0, 300]
+    source.n = 5000
+
+    phsp_plane = sim.add_volume("Box", "phase_space_plane_1")
+    phsp_plane.material = "G4_Galactic"
+    phsp_plane.size = [1 * m, 1 * m, 1 * nm]
+    phsp_plane.translation = [0, 0, -1000 * nm]
+
+    phsp_actor = sim.add_actor("PhaseSpaceActor", "PhaseSpace")
+    phsp_actor.attached_to = phsp_plane
+    phsp_actor.attributes = ["KineticEnergy", "PrePosition", "PreDirection"]
+
+    stats = sim.add_actor("SimulationStatisticsActor", "Stats")
+    sim.physics_manager.physics_list_name = "G4EmStandardPhysics_option3"
+
+    # run without and with prefetching, the output must be identical
+    outputs = {}
+    num_used_entries = {}
+    for depth in [0, 3]:
+        source.prefetch_queue_depth = depth
+        phsp_actor.output_filename = f"test066_prefetch_{depth}.root"
+        sim.run(start_new_process=True)
+        print(stats)
+        with uproot.open(phsp_actor.get_output_path()) as f:
+            outputs[depth] = f["PhaseSpace"].arrays(library="np")
+        num_used_entries[depth] = sum(
+            c.num_used_entries for c in source.entries_consumption.values()
+        )
+
+    is_ok = len(outputs[0]["KineticEnergy"]) > 0
+
+    # the reader thread is ahead of the generation, but only the entries
+    # actually used to generate primaries are counted
+    for depth, n in num_used_entries.items():
+        b = n == source.n
+        utility.print_test(
+            b, f"Prefetch depth {depth}: {n} entries used for {source.n} events"
+        )
+        is_ok = is_ok and b
+    for k in outputs[0]:
+        b = np.array_equal(outputs[0][k], outputs[3][k])
+        utility.print_test(b, f"Same values of {k} with and without prefetching")
+        is_ok = is_ok and b
+
+    utility.test_ok(is_ok)
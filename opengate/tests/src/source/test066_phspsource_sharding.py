@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import opengate as gate
+import numpy as np
+from opengate.tests import utility
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(
+        __file__, "test066_PhsSource_Activity", output_folder="test066"
+    )
+
+    # create the simulation
+    sim = gate.Simulation()
+
+    # main options
+    sim.g4_verbose = False
+    sim.check_volumes_overlap = False
+    sim.number_of_threads = 3
+    sim.random_seed = 987654321
+    sim.output_dir = paths.output
+
+    # units
+    m = gate.g4_units.m
+    mm = gate.g4_units.mm
+    nm = gate.g4_units.nm
+
+    #  adapt world size
+    world = sim.world
+    world.size = [1 * m, 1 * m, 2 * m]
+    world.material = "G4_Galactic"
+
+    plane_1 = sim.add_volume("Box", "plan_1")
+    plane_1.material = "G4_Galactic"
+    plane_1.size = [1 * m, 1 * m, 1 * nm]
+
+    # the phsp is split into one range per thread
+    source = sim.add_source("PhaseSpaceSource", "phsp_source")
+    source.attached_to = plane_1.name
+    source.phsp_file = paths.output_ref.parent / "test019" / "test019_hits.root"
+    source.position_key = "PrePosition"
+    source.direction_key = "PreDirection"
+    source.weight_key = "Weight"
+    source.global_flag = False
+    source.particle = "gamma"
+    source.batch_size = 1000
+    source.entry_sharding = True
+    source.entry_start = 1234
+    source.n = 6000
+
+    phsp_plane = sim.add_volume("Box", "phase_space_plane_1")
+    phsp_plane.material = "G4_Galactic"
+    phsp_plane.size = [1 * m, 1 * m, 1 * nm]
+    phsp_plane.translation = [0, 0, -1000 * nm]
+
+    phsp_actor = sim.add_actor("PhaseSpaceActor", "PhaseSpace")
+    phsp_actor.attached_to = phsp_plane
+    phsp_actor.attributes = ["KineticEnergy", "PrePosition", "PreDirection"]
+
+    stats = sim.add_actor("SimulationStatisticsActor", "Stats")
+    sim.physics_manager.physics_list_name = "G4EmStandardPhysics_option3"
+
+    phsp_actor.output_filename = "test066_sharding.root"
+
+    sim.run()
+    print(stats)
+
+    # the ranges of the threads are disjoint and cover the whole phsp
+    consumption = {
+        tid: c for tid, c in source.entries_consumption.items() if c.shard is not None
+    }
+    num_entries = source.num_entries
+    covered = np.zeros(num_entries, dtype=int)
+    for tid, c in consumption.items():
+        print(
+            f"Thread {tid}: range of {c.shard[1]} entries starting at {c.shard[0]}, "
+            f"{c.num_used_entries} entries used, {c.cycle_count} pass(es) completed"
+        )
+        covered[(c.shard[0] + np.arange(c.shard[1])) % num_entries] += 1
+    is_ok = len(consumption) == sim.number_of_threads
+    utility.print_test(is_ok, "One range per thread")
+    b = np.all(covered == 1)
+    utility.print_test(b, f"Ranges are disjoint and cover the {num_entries} entries")
+    is_ok = is_ok and b
+
+    # a thread reads its range again only once it is exhausted
+    b = all(
+        c.num_used_entries <= (c.cycle_count + 1) * c.shard[1]
+        for c in consumption.values()
+    )
+    b = b and sum(c.num_used_entries for c in consumption.values()) == source.n
+    utility.print_test(b, "Each thread only used the entries of its range")
+    is_ok = is_ok and b
+
+    utility.test_ok(is_ok)